@@ -0,0 +1,85 @@
+# Throughput and memory benchmark for the Excel order sheet writer
+#
+# Writes order sheets with the streaming writer (write-only workbook,
+# template parsed once) and with a regular in-memory openpyxl workbook
+# styled per order, as ExcelHandler was meant to work before. Reports
+# orders per second and the peak Python memory of writing one order.
+#
+# Usage: python tshirt_fulfillment/benchmarks/bench_excel_writer.py --orders 200 --fields 2000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from openpyxl import Workbook  # noqa: E402
+from openpyxl.styles import Font  # noqa: E402
+from openpyxl.styles import PatternFill  # noqa: E402
+
+from tshirt_fulfillment.src.adapters.services.excel_writer import get_order_template  # noqa: E402
+from tshirt_fulfillment.src.adapters.services.excel_writer import write_order_workbook  # noqa: E402
+
+
+def write_in_memory(file_path, order_id, customer_info, template_path=None):
+    """Build the whole workbook in memory, styling the header per order"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = f"Order {order_id}"
+    sheet.append(["Field", "Value"])
+    for column in range(1, 3):
+        cell = sheet.cell(row=1, column=column)
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
+    sheet.append(["Order ID", order_id])
+    for key, value in customer_info.items():
+        sheet.append([key, value])
+    workbook.save(file_path)
+
+
+def write_streaming(file_path, order_id, customer_info, template_path=None):
+    write_order_workbook(file_path, order_id, customer_info, get_order_template(template_path))
+
+
+def customer_info(fields):
+    info = {"name": "Nguyễn Văn A", "email": "example@example.com", "size": "L", "quantity": 1}
+    for index in range(max(fields - len(info), 0)):
+        info[f"line_item_{index}"] = f"Áo thun cotton, màu xanh, cỡ L, in mặt trước #{index}"
+    return info
+
+
+def run(writer, orders, info, output_dir, template_path):
+    """Write order sheets, return (orders/s, peak bytes of one order)"""
+    start = time.perf_counter()
+    for index in range(orders):
+        order_id = f"order-{index}"
+        writer(os.path.join(output_dir, f"{order_id}.xlsx"), order_id, info, template_path)
+    throughput = orders / (time.perf_counter() - start)
+
+    tracemalloc.start()
+    writer(os.path.join(output_dir, "order-peak.xlsx"), "order-peak", info, template_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return throughput, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel order sheet writer benchmark")
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--fields", type=int, default=10, help="rows per order sheet")
+    parser.add_argument("--template", default=None, help="optional .xlsx template")
+    args = parser.parse_args()
+
+    info = customer_info(args.fields)
+    print(f"{args.orders} orders, {len(info)} fields per order")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for label, writer in (("in-memory", write_in_memory), ("streaming", write_streaming)):
+            throughput, peak = run(writer, args.orders, info, output_dir, args.template)
+            print(f"{label:>10}: {throughput:8.1f} orders/s  peak {peak / 1024:8.0f} KiB/order")
+
+
+if __name__ == "__main__":
+    main()
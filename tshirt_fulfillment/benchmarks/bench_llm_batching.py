@@ -0,0 +1,88 @@
+# Throughput benchmark for LLM micro-batching
+#
+# Starts the fake Ollama server configured like a GPU-backed model server:
+# forward passes are serialized, but a whole batch is served in one pass for
+# little more than the cost of a single request. Then drives
+# TShirtFulfillmentAgent._call_llm from many concurrent callers, with and
+# without the micro-batching dispatcher.
+#
+# Usage: python tshirt_fulfillment/benchmarks/bench_llm_batching.py
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from tshirt_fulfillment.src.adapters.services.llm_batching import LLMBatchDispatcher  # noqa: E402
+from tshirt_fulfillment.src.adapters.services.llm_batching import OllamaBatchBackend  # noqa: E402
+from tshirt_fulfillment.src.core.resilience import ResilientDependency  # noqa: E402
+from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent  # noqa: E402
+from tshirt_fulfillment.utils.fake_ollama import FakeOllamaConfig  # noqa: E402
+from tshirt_fulfillment.utils.fake_ollama import FakeOllamaServer  # noqa: E402
+
+
+def run_load(agent, requests_count, concurrency):
+    """Send requests_count LLM calls from concurrency threads, return req/s"""
+    messages = [
+        [{"role": "user", "content": f"A cat playing guitar #{i}"}] for i in range(requests_count)
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(agent._call_llm, messages))
+    elapsed = time.perf_counter() - start
+    failures = sum(1 for result in results if result is None)
+    return requests_count / elapsed, elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM micro-batching throughput benchmark")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--window-ms", type=int, default=20)
+    args = parser.parse_args()
+
+    # 50ms per forward pass plus 2ms per request in the batch, one pass at a time
+    server = FakeOllamaServer(
+        FakeOllamaConfig(latency=0.05, per_item_latency=0.002, parallel_slots=1)
+    ).start()
+    base_url = server.url
+
+    # Allow every benchmark thread through the LLM concurrency limit
+    unbatched = TShirtFulfillmentAgent(
+        redis_url="",
+        model_name="fake",
+        llm_dependency=ResilientDependency("unbatched", max_concurrency=args.concurrency),
+    )
+    unbatched.ollama_base_url = base_url
+
+    dispatcher = LLMBatchDispatcher(
+        OllamaBatchBackend(base_url, "fake", batch_url=f"{base_url}/api/generate/batch"),
+        max_batch_size=args.max_batch_size,
+        max_wait=args.window_ms / 1000,
+    )
+    batched = TShirtFulfillmentAgent(
+        redis_url="",
+        model_name="fake",
+        llm_dispatcher=dispatcher,
+        llm_dependency=ResilientDependency("batched", max_concurrency=args.concurrency),
+    )
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"max batch {args.max_batch_size}, window {args.window_ms}ms"
+    )
+    for label, agent in (("unbatched", unbatched), ("batched", batched)):
+        throughput, elapsed, failures = run_load(agent, args.requests, args.concurrency)
+        print(f"{label:>10}: {throughput:8.1f} req/s  ({elapsed:.2f}s, {failures} failures)")
+    print(f"average batch size: {dispatcher.average_batch_size:.1f}")
+
+    dispatcher.close()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Offline load test for TShirtFulfillmentAgent
+#
+# Starts the fake Ollama server with a realistic latency distribution and
+# optional error injection, then drives TShirtFulfillmentAgent.process_order
+# through the LLM path from many concurrent callers and reports throughput
+# and latency percentiles. No model needs to be installed.
+#
+# Usage: python tshirt_fulfillment/benchmarks/load_agent.py --orders 200 --concurrency 16
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from tshirt_fulfillment.src.core.resilience import ResilientDependency  # noqa: E402
+from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent  # noqa: E402
+from tshirt_fulfillment.utils.fake_ollama import FakeOllamaConfig  # noqa: E402
+from tshirt_fulfillment.utils.fake_ollama import FakeOllamaServer  # noqa: E402
+
+
+def timed_order(agent, index):
+    """Process one order, return (seconds, success)"""
+    start = time.perf_counter()
+    result = agent.process_order(
+        f"load-{index}", f"A cat playing guitar in style #{index}", language="en"
+    )
+    return time.perf_counter() - start, result["success"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the fulfillment agent")
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--slots", type=int, default=4, help="Parallel model slots")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        latency_distribution="lognormal",
+        parallel_slots=args.slots,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    with FakeOllamaServer(config) as server:
+        agent = TShirtFulfillmentAgent(
+            redis_url="",
+            model_name="mistral",
+            llm_dependency=ResilientDependency("load", max_concurrency=args.concurrency),
+        )
+        agent.ollama_base_url = server.url
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda i: timed_order(agent, i), range(args.orders)))
+        elapsed = time.perf_counter() - start
+        stats = server.stats()
+
+    latencies = sorted(seconds for seconds, _ in results)
+    failures = sum(1 for _, success in results if not success)
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    print(
+        f"{args.orders} orders, concurrency {args.concurrency}, "
+        f"LLM latency {args.latency}s +/- {args.jitter}s, {args.slots} slots"
+    )
+    print(f"throughput: {args.orders / elapsed:8.1f} orders/s  ({elapsed:.2f}s)")
+    print(f"latency:    p50 {statistics.median(latencies):.3f}s  p95 {p95:.3f}s")
+    print(
+        f"failures:   {failures}  "
+        f"(server: {stats['requests']} requests, {stats['errors']} injected errors)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ setup(
         "uvicorn>=0.22.0",
         "langchain-community>=0.0.10",
         "openpyxl>=3.1.0",
+        "Pillow>=9.1.0",
         "google-api-python-client>=2.100.0",
         "google-auth-httplib2>=0.1.0",
         "google-auth-oauthlib>=1.0.0",
@@ -24,5 +25,6 @@ setup(
         "pytest>=6.0.0",
         "pytest-cov>=2.12.0",
     ],
+    extras_require={"analytics": ["pyarrow>=12.0.0"]},
     python_requires=">=3.8",
 )
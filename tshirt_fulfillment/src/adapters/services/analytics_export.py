@@ -0,0 +1,314 @@
+# Columnar export of orders, phases and tool calls for analytics
+
+import csv
+import gzip
+import json
+import logging
+import os
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PARQUET = "parquet"
+CSV = "csv"
+
+# Columns of each dataset with their type: "string", "timestamp", "int" or "bool"
+DATASET_COLUMNS = {
+    "orders": (
+        ("order_id", "string"),
+        ("created_at", "timestamp"),
+        ("status", "string"),
+        ("language", "string"),
+        ("customer_name", "string"),
+        ("customer_email", "string"),
+        ("size", "string"),
+        ("color", "string"),
+        ("quantity", "int"),
+        ("design_path", "string"),
+        ("excel_path", "string"),
+        ("drive_link", "string"),
+    ),
+    "order_phases": (
+        ("order_id", "string"),
+        ("phase", "string"),
+        ("timestamp", "timestamp"),
+        ("details", "string"),
+    ),
+    "tool_calls": (
+        ("order_id", "string"),
+        ("session_id", "string"),
+        ("tool_name", "string"),
+        ("success", "bool"),
+        ("timestamp", "timestamp"),
+        ("input", "string"),
+        ("output", "string"),
+    ),
+}
+
+
+class _PartitionedDataset:
+    """Writes one dataset as files partitioned by date and status.
+
+    Files are laid out Hive-style as
+    ``<dataset>/date=<YYYY-MM-DD>/status=<status>/part-<run>.<ext>`` and
+    written under a hidden temporary name until ``close`` renames them.
+    """
+
+    def __init__(self, root: str, name: str, file_format: str, run_id: str, row_group_size: int):
+        self.root = os.path.join(root, name)
+        self.columns = DATASET_COLUMNS[name]
+        self.file_format = file_format
+        self.run_id = run_id
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._partitions: dict[tuple[str, str], dict[str, Any]] = {}
+
+    def write(self, timestamp: Optional[float], status: str, row: dict[str, Any]) -> None:
+        """Add a row to the partition of its date and status."""
+        day = _to_datetime(timestamp).date().isoformat() if timestamp else "unknown"
+        partition = self._partitions.get((day, status))
+        if partition is None:
+            partition = self._open(day, status)
+            self._partitions[(day, status)] = partition
+        if self.file_format == PARQUET:
+            partition["buffer"].append(row)
+            if len(partition["buffer"]) >= self.row_group_size:
+                self._flush(partition)
+        else:
+            partition["writer"].writerow([_csv_value(row[name]) for name, _ in self.columns])
+        self.rows += 1
+
+    def close(self) -> list[str]:
+        """Finish every partition file and move it into place."""
+        files = []
+        for partition in self._partitions.values():
+            if self.file_format == PARQUET:
+                self._flush(partition)
+                partition["writer"].close()
+            else:
+                partition["file"].close()
+            os.replace(partition["temp_path"], partition["path"])
+            files.append(partition["path"])
+        self._partitions.clear()
+        return files
+
+    def abort(self) -> None:
+        """Close and remove every unfinished partition file."""
+        for partition in self._partitions.values():
+            try:
+                if self.file_format == PARQUET:
+                    partition["writer"].close()
+                else:
+                    partition["file"].close()
+            finally:
+                os.remove(partition["temp_path"])
+        self._partitions.clear()
+
+    def _open(self, day: str, status: str) -> dict[str, Any]:
+        directory = os.path.join(self.root, f"date={day}", f"status={_path_safe(status)}")
+        os.makedirs(directory, exist_ok=True)
+        extension = "parquet" if self.file_format == PARQUET else "csv.gz"
+        filename = f"part-{self.run_id}.{extension}"
+        partition = {
+            "path": os.path.join(directory, filename),
+            # Leading dot: dataset readers skip files still being written
+            "temp_path": os.path.join(directory, f".{filename}.tmp"),
+        }
+        if self.file_format == PARQUET:
+            import pyarrow.parquet as pq
+
+            partition["schema"] = _arrow_schema(self.columns)
+            partition["writer"] = pq.ParquetWriter(
+                partition["temp_path"], partition["schema"], compression="zstd"
+            )
+            partition["buffer"] = []
+        else:
+            partition["file"] = gzip.open(
+                partition["temp_path"], "wt", newline="", encoding="utf-8"
+            )
+            partition["writer"] = csv.writer(partition["file"])
+            partition["writer"].writerow([name for name, _ in self.columns])
+        return partition
+
+    def _flush(self, partition: dict[str, Any]) -> None:
+        """Write the buffered rows of a Parquet partition as one row group."""
+        if not partition["buffer"]:
+            return
+        import pyarrow as pa
+
+        table = pa.Table.from_pylist(partition["buffer"], schema=partition["schema"])
+        partition["writer"].write_table(table)
+        partition["buffer"] = []
+
+
+class AnalyticsExporter:
+    """Streams orders, their phases and tool calls into columnar files.
+
+    Each dataset ("orders", "order_phases", "tool_calls") is partitioned
+    by date and order status, so offline reports read only the partitions
+    they need. Parquet (zstd-compressed) is written with pyarrow; without
+    pyarrow, or with ``file_format="csv"``, gzip-compressed CSV files with
+    the same layout are written instead. Orders are read in one pass and
+    at most ``row_group_size`` rows per partition are held in memory.
+    """
+
+    def __init__(self, output_dir: str, file_format: str = PARQUET, row_group_size: int = 50_000):
+        """Initialize the exporter.
+
+        Args:
+            output_dir: Root directory of the datasets
+            file_format: "parquet" or "csv"
+            row_group_size: Rows per Parquet row group
+        """
+        if file_format not in (PARQUET, CSV):
+            raise ValueError(f"Unsupported analytics export format: {file_format}")
+        if file_format == PARQUET:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                logger.warning("pyarrow is not installed. Exporting analytics as CSV.")
+                file_format = CSV
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.row_group_size = row_group_size
+
+    def export(
+        self, orders: Iterable[Any], sessions: Optional[Iterable[Any]] = None
+    ) -> dict[str, Any]:
+        """Export orders and agent sessions.
+
+        Args:
+            orders: Orders, e.g. ``OrderRepository.iter_all()``. Their
+                phases and the tool history in their result are exported too.
+            sessions: Optional agent sessions whose tool history to export
+
+        Returns:
+            Dict with success status, the "format", the written "files" and
+            the number of "rows" per dataset
+        """
+        run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        datasets = {
+            name: _PartitionedDataset(
+                self.output_dir, name, self.file_format, run_id, self.row_group_size
+            )
+            for name in DATASET_COLUMNS
+        }
+        try:
+            for order in orders:
+                self._write_order(datasets, order)
+            for session in sessions or ():
+                status = _enum_value(session.status)
+                for call in session.tool_history:
+                    row = _tool_call_row(session.order_id, session.id, call)
+                    datasets["tool_calls"].write(_get(call, "timestamp"), status, row)
+            files = [path for dataset in datasets.values() for path in dataset.close()]
+        except Exception as e:
+            logger.error(f"Error exporting analytics: {str(e)}")
+            for dataset in datasets.values():
+                dataset.abort()
+            return {"success": False, "error": str(e)}
+
+        rows = {name: dataset.rows for name, dataset in datasets.items()}
+        logger.info(f"Exported analytics rows {rows} as {self.file_format}")
+        return {"success": True, "format": self.file_format, "files": files, "rows": rows}
+
+    def _write_order(self, datasets: dict[str, _PartitionedDataset], order: Any) -> None:
+        order_id = getattr(order, "id", None) or order.order_id
+        status = _enum_value(order.status)
+        result = order.result or {}
+        design = _get(result, "design") or {}
+        created_at = getattr(order, "created_at", None)
+        datasets["orders"].write(
+            created_at,
+            status,
+            {
+                "order_id": order_id,
+                "created_at": _to_datetime(created_at),
+                "status": status,
+                "language": getattr(order, "language", None),
+                "customer_name": order.customer_name,
+                "customer_email": order.customer_email,
+                "size": order.size,
+                "color": order.color,
+                "quantity": _to_int(order.quantity),
+                "design_path": _get(result, "design_path") or _get(design, "image_path"),
+                "excel_path": _get(result, "excel_path"),
+                "drive_link": _get(result, "drive_link"),
+            },
+        )
+        for phase in order.phases or ():
+            timestamp = _get(phase, "timestamp")
+            datasets["order_phases"].write(
+                timestamp,
+                status,
+                {
+                    "order_id": order_id,
+                    "phase": _get(phase, "phase"),
+                    "timestamp": _to_datetime(timestamp),
+                    "details": _get(phase, "details"),
+                },
+            )
+        for call in _get(result, "tool_history") or ():
+            row = _tool_call_row(order_id, None, call)
+            datasets["tool_calls"].write(_get(call, "timestamp"), status, row)
+
+
+def _tool_call_row(order_id: Optional[str], session_id: Optional[str], call: Any) -> dict[str, Any]:
+    return {
+        "order_id": order_id,
+        "session_id": session_id,
+        "tool_name": _get(call, "tool_name"),
+        "success": bool(_get(call, "success")),
+        "timestamp": _to_datetime(_get(call, "timestamp")),
+        "input": json.dumps(_get(call, "input"), default=str, ensure_ascii=False),
+        "output": json.dumps(_get(call, "output"), default=str, ensure_ascii=False),
+    }
+
+
+def _arrow_schema(columns: tuple[tuple[str, str], ...]) -> Any:
+    import pyarrow as pa
+
+    types = {
+        "string": pa.string(),
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _get(item: Any, name: str) -> Any:
+    """Read a field from a dict or an object."""
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+def _enum_value(value: Any) -> str:
+    return str(getattr(value, "value", value) or "unknown")
+
+
+def _to_datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def _path_safe(value: str) -> str:
+    return value.replace("/", "_").replace("\\", "_").replace("=", "_")
@@ -0,0 +1,262 @@
+# Content-addressed blob store for design and order artifacts
+
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path: str) -> str:
+    """Get the hex SHA-256 digest of a file.
+
+    The file is memory-mapped and hashed in place, so large print files
+    are neither read into memory nor copied.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+class BlobStore:
+    """Content-addressed store of artifact files with named references.
+
+    Each distinct content is stored once, as
+    ``<root>/objects/<aa>/<bb>/<digest><ext>``, so reprints and repeated
+    designs share their bytes and the number of directories stays bounded
+    however many orders there are. Artifacts are looked up by name (e.g.
+    "designs/<order_id>/design.png"); a SQLite index maps names to blobs
+    and counts the references to each blob. Blobs without references are
+    deleted by ``gc`` once they have been unreferenced for
+    ``grace_seconds``.
+    """
+
+    def __init__(self, root: str, shard_depth: int = 2, grace_seconds: float = 3600):
+        """Initialize the store, creating its directories and index.
+
+        Args:
+            root: Directory holding the blobs and the index
+            shard_depth: Directory levels of two hex digits above each blob
+            grace_seconds: How long an unreferenced blob is kept before
+                ``gc`` deletes it
+        """
+        self.root = root
+        self.shard_depth = shard_depth
+        self.grace_seconds = grace_seconds
+        self.objects_dir = os.path.join(root, "objects")
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                "refcount INTEGER NOT NULL, released_at REAL)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS refs (name TEXT PRIMARY KEY, key TEXT)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS unreferenced ON blobs (refcount)")
+        self.stored = 0
+        self.deduplicated = 0
+        self.deduplicated_bytes = 0
+
+    def scratch_dir(self) -> str:
+        """Create a private directory to write an artifact in before storing it.
+
+        Scratch directories are on the store's filesystem, so ``put_file``
+        with ``move=True`` stores their files with a rename. Callers remove
+        them when done; ``gc`` removes any left behind.
+        """
+        return tempfile.mkdtemp(dir=self.tmp_dir)
+
+    def put_file(self, name: str, source_path: str, move: bool = False) -> dict[str, Any]:
+        """Store a file under a name, replacing what the name referred to.
+
+        Args:
+            name: Artifact name, e.g. "designs/<order_id>/design.png"
+            source_path: File to store
+            move: Move the file into the store instead of copying it
+
+        Returns:
+            Dict with the blob "path", "digest", "key" and "size", the
+            file's display "name" (the last part of the artifact name),
+            and "deduplicated" set if the content was already stored
+        """
+        digest = file_digest(source_path)
+        key = f"{digest}{os.path.splitext(name)[1].lower()}"
+        path = self._blob_path(key)
+        size = os.path.getsize(source_path)
+
+        # Stage the content next to the store so adding it is a rename
+        staged = source_path
+        if not move:
+            fd, staged = tempfile.mkstemp(dir=self.tmp_dir, suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(source_path, staged)
+
+        with self._lock:
+            deduplicated = os.path.exists(path)
+            if deduplicated:
+                os.remove(staged)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                try:
+                    os.replace(staged, path)
+                except OSError:
+                    # Moving across filesystems
+                    shutil.copyfile(staged, path)
+                    os.remove(staged)
+            self._reference(name, key, size)
+            self.stored += 1
+            if deduplicated:
+                self.deduplicated += 1
+                self.deduplicated_bytes += size
+        return {
+            "path": path,
+            "digest": digest,
+            "key": key,
+            "size": size,
+            "name": os.path.basename(name),
+            "deduplicated": deduplicated,
+        }
+
+    def put_bytes(self, name: str, data: bytes) -> dict[str, Any]:
+        """Store bytes under a name; see ``put_file``."""
+        fd, temp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return self.put_file(name, temp_path, move=True)
+
+    def get(self, name: str) -> Optional[dict[str, Any]]:
+        """Get the blob an artifact name refers to.
+
+        Returns:
+            Dict with the blob "path", "digest", "key" and "size", or None
+            if nothing is stored under the name
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT blobs.key, blobs.size FROM refs JOIN blobs ON blobs.key = refs.key "
+                "WHERE refs.name = ?",
+                (name,),
+            ).fetchone()
+        if row is None:
+            return None
+        key, size = row
+        return {"path": self._blob_path(key), "digest": key[:64], "key": key, "size": size}
+
+    def release(self, name: str) -> bool:
+        """Drop an artifact name; its blob is deleted by ``gc`` once unreferenced.
+
+        Returns:
+            True if the name existed
+        """
+        with self._lock, self._db:
+            row = self._db.execute("SELECT key FROM refs WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return False
+            self._db.execute("DELETE FROM refs WHERE name = ?", (name,))
+            self._unreference(row[0])
+        return True
+
+    def gc(self) -> dict[str, int]:
+        """Delete blobs unreferenced for longer than the grace period.
+
+        Also removes scratch files and directories older than the grace
+        period, left behind by interrupted writes.
+
+        Returns:
+            Dict with the number of "removed" blobs, "bytes_freed" and
+            "scratch_removed" entries
+        """
+        cutoff = time.time() - self.grace_seconds
+        removed = bytes_freed = 0
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, size FROM blobs WHERE refcount <= 0 AND released_at < ?", (cutoff,)
+            ).fetchall()
+            with self._db:
+                for key, size in rows:
+                    try:
+                        os.remove(self._blob_path(key))
+                    except FileNotFoundError:
+                        pass
+                    self._db.execute("DELETE FROM blobs WHERE key = ?", (key,))
+                    removed += 1
+                    bytes_freed += size
+
+        scratch_removed = 0
+        for entry in os.scandir(self.tmp_dir):
+            if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
+            scratch_removed += 1
+        if removed or scratch_removed:
+            logger.info(f"Blob store gc removed {removed} blobs ({bytes_freed} bytes)")
+        return {"removed": removed, "bytes_freed": bytes_freed, "scratch_removed": scratch_removed}
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the store counters as a plain dict."""
+        with self._lock:
+            blobs, total_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+            (unreferenced,) = self._db.execute(
+                "SELECT COUNT(*) FROM blobs WHERE refcount <= 0"
+            ).fetchone()
+            (refs,) = self._db.execute("SELECT COUNT(*) FROM refs").fetchone()
+            return {
+                "blobs": blobs,
+                "bytes": total_bytes,
+                "refs": refs,
+                "unreferenced": unreferenced,
+                "stored": self.stored,
+                "deduplicated": self.deduplicated,
+                "deduplicated_bytes": self.deduplicated_bytes,
+            }
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            self._db.close()
+
+    def _reference(self, name: str, key: str, size: int) -> None:
+        """Point a name at a blob, adjusting reference counts (lock held)."""
+        with self._db:
+            row = self._db.execute("SELECT key FROM refs WHERE name = ?", (name,)).fetchone()
+            if row is not None and row[0] == key:
+                return
+            self._db.execute(
+                "INSERT INTO blobs (key, size, refcount) VALUES (?, ?, 1) "
+                "ON CONFLICT(key) DO UPDATE SET refcount = refcount + 1, released_at = NULL",
+                (key, size),
+            )
+            self._db.execute("INSERT OR REPLACE INTO refs (name, key) VALUES (?, ?)", (name, key))
+            if row is not None:
+                self._unreference(row[0])
+
+    def _unreference(self, key: str) -> None:
+        """Drop one reference to a blob (lock held, in a transaction)."""
+        self._db.execute(
+            "UPDATE blobs SET refcount = refcount - 1, "
+            "released_at = CASE WHEN refcount <= 1 THEN ? ELSE NULL END WHERE key = ?",
+            (time.time(), key),
+        )
+
+    def _blob_path(self, key: str) -> str:
+        shards = [key[2 * level : 2 * level + 2] for level in range(self.shard_depth)]
+        return os.path.join(self.objects_dir, *shards, key)
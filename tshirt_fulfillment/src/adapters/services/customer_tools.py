@@ -0,0 +1,84 @@
+# Customer tool registration for the T-shirt Fulfillment AI Agent
+
+from typing import Optional
+
+from tshirt_fulfillment.src.adapters.services.external_services import CustomerNotifier
+from tshirt_fulfillment.src.adapters.services.external_services import DesignGenerator
+from tshirt_fulfillment.src.adapters.services.external_services import ExcelHandler
+from tshirt_fulfillment.src.adapters.services.external_services import GoogleDriveManager
+from tshirt_fulfillment.src.core.domain.tools import ToolCategory
+from tshirt_fulfillment.src.core.domain.tools import ToolDefinition
+from tshirt_fulfillment.src.core.domain.tools import ToolRegistry
+
+
+def register_customer_tools(
+    registry: ToolRegistry,
+    design_generator: Optional[DesignGenerator] = None,
+    excel_handler: Optional[ExcelHandler] = None,
+    drive_manager: Optional[GoogleDriveManager] = None,
+    notifier: Optional[CustomerNotifier] = None,
+) -> ToolRegistry:
+    """Register the customer flow tools backed by the external services.
+
+    Args:
+        registry: Registry to add the tools to
+        design_generator: Design generator to use (created if None)
+        excel_handler: Excel handler to use (created if None)
+        drive_manager: Google Drive manager to use (created if None)
+        notifier: Customer notifier to use (created if None)
+
+    Returns:
+        The registry, for chaining
+    """
+    design_generator = design_generator or DesignGenerator()
+    excel_handler = excel_handler or ExcelHandler()
+    drive_manager = drive_manager or GoogleDriveManager()
+    notifier = notifier or CustomerNotifier()
+
+    registry.register(
+        ToolDefinition(
+            name="generate_design",
+            description="Generates a T-shirt design image based on prompt.",
+            category=ToolCategory.DESIGN,
+            input_schema={
+                "order_id": "str",
+                "prompt": "str",
+                "style": "Optional[str]",
+                "priority": "Optional[str]",
+                "customer_id": "Optional[str]",
+            },
+            output_schema={"success": "bool", "image_path": "str", "error": "Optional[str]"},
+            handler=design_generator.generate,
+        )
+    )
+    registry.register(
+        ToolDefinition(
+            name="create_excel_file",
+            description="Generates an Excel order sheet based on customer info.",
+            category=ToolCategory.EXCEL,
+            input_schema={"order_id": "str", "customer_info": "Dict"},
+            output_schema={"success": "bool", "file_path": "str", "error": "Optional[str]"},
+            handler=excel_handler.create_order_file,
+        )
+    )
+    registry.register(
+        ToolDefinition(
+            name="upload_to_drive",
+            description="Uploads a file to Google Drive and returns the sharing link.",
+            category=ToolCategory.DRIVE,
+            input_schema={"order_id": "str", "file_path": "str", "name": "Optional[str]"},
+            output_schema={"success": "bool", "drive_url": "str", "error": "Optional[str]"},
+            handler=drive_manager.upload_file,
+        )
+    )
+    registry.register(
+        ToolDefinition(
+            name="notify_customer",
+            description="Sends notification to customer about order status.",
+            category=ToolCategory.NOTIFICATION,
+            input_schema={"order_id": "str", "message": "str", "language": "str"},
+            output_schema={"success": "bool", "notification_id": "str", "error": "Optional[str]"},
+            handler=notifier.send_notification,
+        )
+    )
+    return registry
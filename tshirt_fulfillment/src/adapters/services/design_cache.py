@@ -0,0 +1,294 @@
+# Content-addressed cache of generated designs
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIX = ".png"
+METADATA_SUFFIX = ".json"
+
+
+def design_cache_key(
+    provider: str, prompt: str, style: Optional[str] = None, size: Optional[str] = None
+) -> str:
+    """Get the cache key for a design request.
+
+    Prompts are compared after trimming and collapsing whitespace and
+    ignoring case, so trivially different spellings share an entry.
+
+    Args:
+        provider: Design generator provider
+        prompt: Design description
+        style: Optional style parameter
+        size: Optional image size
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    normalized = {
+        "provider": provider,
+        "prompt": " ".join(prompt.lower().split()),
+        "style": " ".join(style.lower().split()) if style else None,
+        "size": size,
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+class DesignCache:
+    """On-disk cache of generated designs keyed by request content.
+
+    Images are stored as ``<cache_dir>/<key[:2]>/<key>.png`` next to a JSON
+    file with the generation metadata. The least recently used entries are
+    evicted when the cache exceeds ``max_bytes`` or ``max_entries``.
+    Concurrent requests for the same key share one generation
+    (single-flight).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, max_entries: Optional[int] = None):
+        """Initialize the cache, indexing entries already on disk.
+
+        Args:
+            cache_dir: Directory holding the cached images
+            max_bytes: Maximum total size of cached images
+            max_entries: Optional maximum number of cached images
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()  # key -> size, LRU first
+        self._in_flight: dict[str, Future] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Get the cached result for a key.
+
+        Args:
+            key: Cache key from ``design_cache_key``
+
+        Returns:
+            Stored generation result with "image_path" pointing into the
+            cache, or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        return self._read_metadata(key)
+
+    def put(self, key: str, image_path: str, result: dict[str, Any]) -> dict[str, Any]:
+        """Copy a generated image into the cache.
+
+        Args:
+            key: Cache key from ``design_cache_key``
+            image_path: Path of the generated image
+            result: Generation result to store as metadata
+
+        Returns:
+            The stored result, with "image_path" pointing into the cache
+        """
+        cached_path = self._image_path(key)
+        os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+        _atomic_copy(image_path, cached_path)
+        stored = {**result, "image_path": cached_path}
+        _atomic_write(self._metadata_path(key), json.dumps(stored))
+
+        size = os.path.getsize(cached_path)
+        with self._lock:
+            self.total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            evicted = self._evict()
+        for evicted_key in evicted:
+            self._remove_files(evicted_key)
+        return stored
+
+    def get_or_generate(
+        self, key: str, output_path: str, generate: Callable[[], dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Get a design from the cache, generating it at most once.
+
+        On a hit the cached image is hard-linked (or copied) to
+        ``output_path``, so callers must not modify the image in place.
+        On a miss the first caller runs ``generate`` while concurrent
+        callers with the same key wait for its result.
+
+        Args:
+            key: Cache key from ``design_cache_key``
+            output_path: Where the caller wants the image
+            generate: Function generating the design and returning a dict
+                with "success" and "image_path"
+
+        Returns:
+            Generation result for ``output_path``, with "cached" set to True
+            if no new generation was run for this caller
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self._count(hits=1)
+            return self._deliver(cached, output_path)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            self._count(deduplicated=1)
+            result = future.result()
+            if not result["success"]:
+                return result
+            return self._deliver(result, output_path)
+
+        self._count(misses=1)
+        try:
+            result = generate()
+            # Waiting callers get the cached copy, not this caller's file
+            shared = self.put(key, result["image_path"], result) if result["success"] else result
+            future.set_result(shared)
+        except Exception as e:
+            logger.error(f"Error generating design for cache key {key}: {str(e)}")
+            result = {"success": False, "error": str(e)}
+            future.set_result(result)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return {**result, "cached": False} if result["success"] else result
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of requests served without a new generation."""
+        with self._lock:
+            served = self.hits + self.deduplicated
+            total = served + self.misses
+            return served / total if total else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the cache counters as a plain dict."""
+        hit_rate = self.hit_rate
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "deduplicated": self.deduplicated,
+                "evictions": self.evictions,
+                "hit_rate": hit_rate,
+            }
+
+    def _deliver(self, result: dict[str, Any], output_path: str) -> dict[str, Any]:
+        """Place a cached image at the caller's output path."""
+        source = result["image_path"]
+        if os.path.abspath(source) != os.path.abspath(output_path):
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            _link_or_copy(source, output_path)
+        return {**result, "image_path": output_path, "cached": True}
+
+    def _evict(self) -> list[str]:
+        """Drop least recently used entries over the limits (lock held)."""
+        evicted = []
+        while self._entries and (
+            self.total_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _load_index(self) -> None:
+        """Index images already in the cache directory, oldest access first."""
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(IMAGE_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                found.append((stat.st_atime, name[: -len(IMAGE_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+        for key in self._evict():
+            self._remove_files(key)
+
+    def _read_metadata(self, key: str) -> Optional[dict[str, Any]]:
+        try:
+            with open(self._metadata_path(key)) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            result = {"success": True}
+        result["image_path"] = self._image_path(key)
+        return result if os.path.exists(result["image_path"]) else None
+
+    def _remove_files(self, key: str) -> None:
+        for path in (self._image_path(key), self._metadata_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _image_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}{IMAGE_SUFFIX}")
+
+    def _metadata_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}{METADATA_SUFFIX}")
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for counter, delta in deltas.items():
+                setattr(self, counter, getattr(self, counter) + delta)
+
+
+def _atomic_copy(source: str, destination: str) -> None:
+    """Copy a file so readers never see a partial destination."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(destination), suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _atomic_write(path: str, data: str) -> None:
+    """Write a text file so readers never see a partial file."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """Hard-link a cached image to a destination, copying across filesystems."""
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
@@ -0,0 +1,218 @@
+# Design generation providers
+
+import logging
+import time
+from concurrent.futures import Future
+from typing import Any
+from typing import Optional
+
+from tshirt_fulfillment.src.adapters.services.design_workers import write_placeholder_image
+from tshirt_fulfillment.src.config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+def _full_prompt(prompt: str, style: Optional[str]) -> str:
+    return f"{prompt}, {style}" if style else prompt
+
+
+class StableDiffusionProvider:
+    """Design provider running Stable Diffusion locally.
+
+    With a ``DesignWorkerPool`` the model stays loaded in worker processes
+    and prompts can be run as model batches; otherwise generation is
+    simulated in-process.
+    """
+
+    name = "stable_diffusion"
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        worker_pool: Optional[Any] = None,
+        simulated_seconds: float = 2.0,
+    ):
+        """Initialize the provider.
+
+        Args:
+            config: Stable Diffusion configuration ("model", "use_gpu")
+            worker_pool: Optional ``DesignWorkerPool`` with the model loaded
+            simulated_seconds: Time a simulated generation takes
+        """
+        self.config = config
+        self.worker_pool = worker_pool
+        self.simulated_seconds = simulated_seconds
+
+    @property
+    def supports_batching(self) -> bool:
+        """Whether ``submit_batch`` runs prompts as one model batch."""
+        return self.worker_pool is not None
+
+    def generate(
+        self, prompt: str, output_path: str, style: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Generate a design into output_path, whose directory must exist.
+
+        Args:
+            prompt: Design description
+            output_path: Path to save the generated image
+            style: Optional style parameter
+
+        Returns:
+            Dict with success status and image path
+        """
+        if self.worker_pool is not None:
+            result = self.worker_pool.generate(
+                _full_prompt(prompt, style), output_path, timeout=Config.DESIGN_JOB_TIMEOUT_SECONDS
+            )
+            return self._result(result, prompt, style)
+
+        # In a real implementation this would run the diffusers pipeline
+        # in-process; see DiffusersModel in design_workers.
+        logger.info(f"Simulating Stable Diffusion generation with prompt: {prompt}")
+        time.sleep(self.simulated_seconds)
+        write_placeholder_image(_full_prompt(prompt, style), output_path)
+        return {
+            "success": True,
+            "image_path": output_path,
+            "prompt_used": prompt,
+            "style_applied": style,
+            "generation_time": f"{self.simulated_seconds:.1f}s",
+            "provider": self.name,
+        }
+
+    def submit_batch(
+        self, prompts: list[str], output_paths: list[str], style: Optional[str] = None
+    ) -> list[Future]:
+        """Queue prompts as one model batch on the worker pool.
+
+        Args:
+            prompts: Design descriptions
+            output_paths: Paths to save the generated images, one per prompt
+            style: Optional style parameter applied to every prompt
+
+        Returns:
+            One future per prompt, resolving to the same dict as ``generate``
+        """
+        futures = self.worker_pool.submit_batch(
+            [_full_prompt(prompt, style) for prompt in prompts], output_paths
+        )
+        results = []
+        for future, prompt in zip(futures, prompts):
+            result: Future = Future()
+            future.add_done_callback(
+                lambda done, result=result, prompt=prompt: result.set_result(
+                    self._result(done.result(), prompt, style)
+                )
+            )
+            results.append(result)
+        return results
+
+    def _result(self, result: dict[str, Any], prompt: str, style: Optional[str]) -> dict[str, Any]:
+        """Describe a worker pool result like an in-process generation."""
+        if not result["success"]:
+            return result
+        return {
+            **result,
+            "prompt_used": prompt,
+            "style_applied": style,
+            "provider": self.name,
+        }
+
+
+class DalleProvider:
+    """Design provider calling the DALL-E API."""
+
+    name = "dalle"
+    supports_batching = False
+
+    def __init__(self, config: dict[str, Any], simulated_seconds: float = 1.0):
+        """Initialize the provider.
+
+        Args:
+            config: DALL-E configuration ("api_key", "size")
+            simulated_seconds: Time a simulated API call takes
+        """
+        self.config = config
+        self.simulated_seconds = simulated_seconds
+
+    def generate(
+        self, prompt: str, output_path: str, style: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Generate a design into output_path, whose directory must exist.
+
+        In a real implementation this would call ``openai.Image.create``
+        with the full prompt and download the image to output_path.
+
+        Args:
+            prompt: Design description
+            output_path: Path to save the generated image
+            style: Optional style parameter
+
+        Returns:
+            Dict with success status and image path
+        """
+        logger.info(f"Simulating DALL-E API generation with prompt: {prompt}")
+        time.sleep(self.simulated_seconds)
+        write_placeholder_image(_full_prompt(prompt, style), output_path)
+        return {
+            "success": True,
+            "image_path": output_path,
+            "prompt_used": prompt,
+            "style_applied": style,
+            "generation_time": f"{self.simulated_seconds:.1f}s",
+            "provider": self.name,
+        }
+
+
+class DesignProviderRegistry:
+    """Registry of design providers by name.
+
+    Providers are created once and looked up by name, so generating a
+    design is a single dict lookup followed by the provider call.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._providers: dict[str, Any] = {}
+
+    def register(self, provider: Any) -> None:
+        """Register a provider under its ``name``, replacing any previous one.
+
+        Args:
+            provider: Object with ``name``, ``supports_batching`` and
+                ``generate(prompt, output_path, style)``; batching
+                providers also have ``submit_batch(prompts, output_paths, style)``
+        """
+        self._providers[provider.name] = provider
+
+    def get(self, name: str) -> Any:
+        """Get a provider by name.
+
+        Raises:
+            ValueError: If no provider is registered under the name
+        """
+        try:
+            return self._providers[name]
+        except KeyError:
+            raise ValueError(f"Unknown design generator provider: {name}") from None
+
+    def names(self) -> list[str]:
+        """Get the names of the registered providers."""
+        return list(self._providers)
+
+
+def build_design_provider_registry(worker_pool: Optional[Any] = None) -> DesignProviderRegistry:
+    """Create a registry with the built-in providers.
+
+    Args:
+        worker_pool: Optional ``DesignWorkerPool`` for Stable Diffusion
+
+    Returns:
+        DesignProviderRegistry with Stable Diffusion and DALL-E
+    """
+    configs = Config.get_design_provider_configs()
+    registry = DesignProviderRegistry()
+    registry.register(StableDiffusionProvider(configs["stable_diffusion"], worker_pool))
+    registry.register(DalleProvider(configs["dalle"]))
+    return registry
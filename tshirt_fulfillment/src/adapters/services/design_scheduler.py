@@ -0,0 +1,217 @@
+# Priority scheduling of design generation jobs
+
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from tshirt_fulfillment.src.core.domain.design import DesignPriority
+
+
+@dataclass
+class _Ticket:
+    """A design job waiting for a provider slot."""
+
+    provider: str
+    priority: DesignPriority
+    customer_id: str
+    seq: int
+    enqueued_at: float
+    granted: threading.Event = field(default_factory=threading.Event)
+
+
+class _PriorityStats:
+    """Queue and wait-time counters of one priority class (lock held by caller)."""
+
+    def __init__(self):
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def snapshot(self, oldest_wait: float) -> dict[str, Any]:
+        started = self.running + self.completed
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "avg_wait_seconds": self.total_wait / started if started else 0.0,
+            "max_wait_seconds": self.max_wait,
+            "oldest_wait_seconds": oldest_wait,
+        }
+
+
+class DesignJobScheduler:
+    """Admission control for design jobs by priority, customer and provider.
+
+    Each provider runs at most its configured number of jobs at once. When a
+    slot frees up, the waiting job with the best effective priority runs
+    next; a job's priority improves by one class for every
+    ``aging_seconds`` it has waited, so bulk jobs are delayed but never
+    starved. Within a priority class customers take turns (the one served
+    least recently goes first), and each customer's jobs run in order.
+
+    Jobs run on the caller's thread; the scheduler only decides when.
+    """
+
+    def __init__(
+        self,
+        provider_concurrency: dict[str, int],
+        aging_seconds: float = 30.0,
+        default_concurrency: int = 1,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            provider_concurrency: Maximum concurrent jobs per provider
+            aging_seconds: Wait after which a job is promoted one priority
+                class; 0 disables aging
+            default_concurrency: Limit for providers not in
+                ``provider_concurrency``
+        """
+        if any(limit < 1 for limit in provider_concurrency.values()) or default_concurrency < 1:
+            raise ValueError("Provider concurrency must be at least 1")
+        self.provider_concurrency = dict(provider_concurrency)
+        self.aging_seconds = aging_seconds
+        self.default_concurrency = default_concurrency
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        # provider -> (priority, customer) -> tickets in arrival order
+        self._queues: dict[str, dict[tuple[DesignPriority, str], deque]] = {}
+        self._running: dict[str, int] = {}
+        # Customers with queued or running jobs only, so neither map grows
+        # with every customer ever seen
+        self._last_served: dict[str, float] = {}  # customer ID -> monotonic time
+        self._customer_jobs: dict[str, int] = {}  # customer ID -> queued or running jobs
+        self._stats = {priority: _PriorityStats() for priority in DesignPriority}
+
+    def run(
+        self,
+        provider: str,
+        func: Callable[[], Any],
+        priority: DesignPriority = DesignPriority.STANDARD,
+        customer_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Wait for a slot on the provider, then run a job.
+
+        Args:
+            provider: Design provider the job runs on
+            func: The job
+            priority: Priority class of the job
+            customer_id: Customer the job belongs to, for fairness
+            timeout: Maximum seconds to wait for a slot
+
+        Returns:
+            The job's return value
+
+        Raises:
+            TimeoutError: If no slot became free within ``timeout``
+        """
+        ticket = self._enqueue(provider, priority, customer_id or "")
+        if not ticket.granted.wait(timeout):
+            if self._withdraw(ticket):
+                raise TimeoutError(f"No {provider} design slot free after {timeout}s")
+            # Granted just as the wait timed out
+        try:
+            return func()
+        finally:
+            self._release(ticket)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get queue depth and wait times per priority class, and provider load."""
+        now = time.monotonic()
+        with self._lock:
+            oldest = dict.fromkeys(DesignPriority, 0.0)
+            for queues in self._queues.values():
+                for (priority, _), tickets in queues.items():
+                    oldest[priority] = max(oldest[priority], now - tickets[0].enqueued_at)
+            return {
+                "priorities": {
+                    priority.value: self._stats[priority].snapshot(oldest[priority])
+                    for priority in DesignPriority
+                },
+                "providers": {
+                    provider: {
+                        "running": self._running.get(provider, 0),
+                        "limit": self._limit(provider),
+                    }
+                    for provider in sorted(set(self.provider_concurrency) | set(self._running))
+                },
+            }
+
+    def _enqueue(self, provider: str, priority: DesignPriority, customer_id: str) -> _Ticket:
+        ticket = _Ticket(provider, priority, customer_id, next(self._seq), time.monotonic())
+        with self._lock:
+            queues = self._queues.setdefault(provider, {})
+            queues.setdefault((priority, customer_id), deque()).append(ticket)
+            self._customer_jobs[customer_id] = self._customer_jobs.get(customer_id, 0) + 1
+            self._stats[priority].queued += 1
+            self._dispatch(provider)
+        return ticket
+
+    def _withdraw(self, ticket: _Ticket) -> bool:
+        """Remove a ticket that timed out; False if it was granted meanwhile."""
+        with self._lock:
+            if ticket.granted.is_set():
+                return False
+            queues = self._queues[ticket.provider]
+            key = (ticket.priority, ticket.customer_id)
+            queues[key].remove(ticket)
+            if not queues[key]:
+                del queues[key]
+            self._stats[ticket.priority].queued -= 1
+            self._job_done(ticket.customer_id)
+            return True
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._lock:
+            self._running[ticket.provider] -= 1
+            stats = self._stats[ticket.priority]
+            stats.running -= 1
+            stats.completed += 1
+            self._job_done(ticket.customer_id)
+            self._dispatch(ticket.provider)
+
+    def _job_done(self, customer_id: str) -> None:
+        """Forget a customer's turn once they have no jobs left (lock held)."""
+        self._customer_jobs[customer_id] -= 1
+        if not self._customer_jobs[customer_id]:
+            del self._customer_jobs[customer_id]
+            self._last_served.pop(customer_id, None)
+
+    def _dispatch(self, provider: str) -> None:
+        """Grant free slots to the best waiting tickets (lock held)."""
+        queues = self._queues.get(provider, {})
+        while queues and self._running.get(provider, 0) < self._limit(provider):
+            now = time.monotonic()
+            key = min(queues, key=lambda k: self._order(queues[k][0], now))
+            ticket = queues[key].popleft()
+            if not queues[key]:
+                del queues[key]
+
+            wait = now - ticket.enqueued_at
+            stats = self._stats[ticket.priority]
+            stats.queued -= 1
+            stats.running += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            self._running[provider] = self._running.get(provider, 0) + 1
+            self._last_served[ticket.customer_id] = now
+            ticket.granted.set()
+
+    def _order(self, ticket: _Ticket, now: float) -> tuple[int, float, int]:
+        """Sort key of a waiting ticket: effective priority, fairness, arrival."""
+        rank = ticket.priority.rank
+        if self.aging_seconds > 0:
+            rank -= int((now - ticket.enqueued_at) // self.aging_seconds)
+        return max(rank, 0), self._last_served.get(ticket.customer_id, 0.0), ticket.seq
+
+    def _limit(self, provider: str) -> int:
+        return self.provider_concurrency.get(provider, self.default_concurrency)
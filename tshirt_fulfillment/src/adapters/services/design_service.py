@@ -2,11 +2,19 @@
 
 import logging
 import os
-import time
+import shutil
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import as_completed
 from typing import Any
 from typing import Optional
 
-from config.settings import Config
+from tshirt_fulfillment.src.adapters.services.design_cache import design_cache_key
+from tshirt_fulfillment.src.adapters.services.design_providers import DesignProviderRegistry
+from tshirt_fulfillment.src.adapters.services.design_providers import build_design_provider_registry
+from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.src.core.domain.design import DesignPriority
 
 # Set up logging
 logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
@@ -17,134 +25,403 @@ class DesignServiceAdapter:
     """Adapter for design generation services.
 
     This adapter provides a consistent interface to different design generation
-    technologies (Stable Diffusion, DALL-E, etc.).
+    technologies (Stable Diffusion, DALL-E, etc.). The provider is resolved
+    from the registry once; every design then goes through the shared cache
+    and scheduler, if configured, before reaching the provider. With a
+    post-processor, order designs also get their thumbnail, preview and
+    print variants. With a blob store, order designs are stored there by
+    content instead of in a directory per order.
     """
 
-    def __init__(self):
-        """Initialize the design service adapter based on configuration."""
-        self.config = Config.get_design_generator_config()
-        self.provider = self.config["provider"]
+    def __init__(
+        self,
+        providers: Optional[DesignProviderRegistry] = None,
+        provider: Optional[str] = None,
+        worker_pool: Optional[Any] = None,
+        cache: Optional[Any] = None,
+        scheduler: Optional[Any] = None,
+        post_processor: Optional[Any] = None,
+        blob_store: Optional[Any] = None,
+    ):
+        """Initialize the design service adapter based on configuration.
+
+        Args:
+            providers: Registry of design providers. Defaults to the built-in
+                providers, with Stable Diffusion on ``worker_pool``.
+            provider: Name of the provider to use. Defaults to the configured one.
+            worker_pool: Optional ``DesignWorkerPool`` running Stable
+                Diffusion in worker processes with the model kept loaded
+            cache: Optional ``DesignCache``; identical requests then reuse
+                one generated image
+            scheduler: Optional ``DesignJobScheduler`` deciding which
+                waiting job runs next on the provider
+            post_processor: Optional ``DesignPostProcessor`` rendering the
+                variants of order designs and batches
+            blob_store: Optional ``BlobStore`` order designs and their
+                variants are stored in
+        """
+        self.providers = providers or build_design_provider_registry(worker_pool)
+        self.provider = provider or Config.get_design_generator_config()["provider"]
+        self.backend = self.providers.get(self.provider)
+        self.size = self.backend.config.get("size")
+        self.cache = cache
+        self.scheduler = scheduler
+        self.post_processor = post_processor
+        self.blob_store = blob_store
+        self.output_dir = Config.DESIGN_OUTPUT_DIR
+        os.makedirs(self.output_dir, exist_ok=True)
         logger.info(f"Initializing DesignServiceAdapter with provider: {self.provider}")
 
     def generate(
-        self, prompt: str, output_path: str, style: Optional[str] = None
+        self,
+        prompt: str,
+        output_path: str,
+        style: Optional[str] = None,
+        priority: Optional[str] = None,
+        customer_id: Optional[str] = None,
     ) -> dict[str, Any]:
         """Generate a design based on prompt.
 
         Args:
             prompt: Design description
-            output_path: Path to save the generated image
+            output_path: Path to save the generated image; its directory
+                must exist
             style: Optional style parameter
+            priority: Scheduling priority ("rush", "standard" or "bulk")
+            customer_id: Customer the design is for, for fair scheduling
 
         Returns:
             Dict with success status and image path
         """
+
+        def generate_scheduled() -> dict[str, Any]:
+            if self.scheduler is None:
+                return self.backend.generate(prompt, output_path, style)
+            return self.scheduler.run(
+                self.provider,
+                lambda: self.backend.generate(prompt, output_path, style),
+                priority=DesignPriority.parse(priority),
+                customer_id=customer_id,
+                timeout=Config.DESIGN_JOB_TIMEOUT_SECONDS,
+            )
+
         try:
-            if self.provider == "stable_diffusion":
-                return self._generate_with_stable_diffusion(prompt, output_path, style)
-            elif self.provider == "dalle":
-                return self._generate_with_dalle(prompt, output_path, style)
-            else:
-                raise ValueError(f"Unknown design generator provider: {self.provider}")
+            # Cache hits and deduplicated requests never wait for a slot
+            if self.cache is not None:
+                return self.cache.get_or_generate(
+                    self._cache_key(prompt, style), output_path, generate_scheduled
+                )
+            return generate_scheduled()
         except Exception as e:
             logger.error(f"Error generating design: {str(e)}")
             return {"success": False, "error": str(e)}
 
-    def _generate_with_stable_diffusion(
-        self, prompt: str, output_path: str, style: Optional[str] = None
+    def generate_for_order(
+        self,
+        order_id: str,
+        prompt: str,
+        style: Optional[str] = None,
+        priority: Optional[str] = None,
+        customer_id: Optional[str] = None,
     ) -> dict[str, Any]:
-        """Generate design using local Stable Diffusion.
+        """Generate the design of an order into the order's design directory.
+
+        With a blob store, the design is generated in a scratch directory
+        and stored as "designs/<order_id>/design.png", its variants next to
+        it, and the returned paths point into the store.
+
+        Args:
+            order_id: Unique identifier for the order
+            prompt: Design description
+            style: Optional style parameter
+            priority: Scheduling priority ("rush", "standard" or "bulk")
+            customer_id: Customer the design is for, for fair scheduling
 
-        In a real implementation, this would use the diffusers library.
-        For this sample, we'll simulate the process.
+        Returns:
+            Dict with success status and image path, plus the "variants"
+            when post-processing is enabled
         """
+        logger.info(f"Generating design for order {order_id} with prompt: {prompt}")
+        if self.blob_store is not None:
+            order_dir = self.blob_store.scratch_dir()
+        else:
+            order_dir = os.path.join(self.output_dir, order_id)
         try:
-            # In a real implementation, this would be:
-            #
-            # from diffusers import StableDiffusionPipeline
-            # import torch
-            #
-            # # Load model
-            # model_id = self.config["model"]
-            # pipe = StableDiffusionPipeline.from_pretrained(model_id)
-            # device = "cuda" if torch.cuda.is_available() and self.config["use_gpu"] else "cpu"
-            # pipe = pipe.to(device)
-            #
-            # # Add style to prompt if provided
-            # full_prompt = f"{prompt}, {style}" if style else prompt
-            #
-            # # Generate image
-            # start_time = time.time()
-            # image = pipe(full_prompt).images[0]
-            # generation_time = time.time() - start_time
-            #
-            # # Save image
-            # image.save(output_path)
-
-            # For this sample, we'll simulate the process
-            logger.info(f"Simulating Stable Diffusion generation with prompt: {prompt}")
-            time.sleep(2)  # Simulate processing time
-
-            # Create parent directory if it doesn't exist
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-            # In a real implementation, the image would be saved here
-            # For now, just create an empty file
-            with open(output_path, "w") as f:
-                f.write("# This is a placeholder for a generated image")
-
-            return {"success": True, "image_path": output_path, "provider": "stable_diffusion"}
+            os.makedirs(order_dir, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Error creating design directory: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+        try:
+            result = self.generate(
+                prompt, os.path.join(order_dir, "design.png"), style, priority, customer_id
+            )
+            if self.post_processor is not None:
+                # The order directory holds one design, so variants keep plain names
+                result = self.post_processor.process(
+                    result, timeout=Config.DESIGN_JOB_TIMEOUT_SECONDS, prefix=""
+                )
+            if self.blob_store is None or not result["success"]:
+                return result
+            return self._store_design(order_id, result)
+        finally:
+            if self.blob_store is not None:
+                shutil.rmtree(order_dir, ignore_errors=True)
+
+    def generate_batch(
+        self,
+        prompts: list[str],
+        output_paths: list[str],
+        style: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        priority: Optional[str] = "bulk",
+        customer_id: Optional[str] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Generate designs for several prompts, yielding each as it completes.
+
+        Providers that support batching (Stable Diffusion on the worker
+        pool) run the prompts as model batches of ``batch_size``; others
+        run them on a bounded pool of threads. With a scheduler, each model
+        batch or single generation is a job at ``priority``, so rush orders
+        are not stuck behind a large batch. Cached designs are yielded
+        first. With a post-processor, variants are rendered while later
+        designs are still generating.
+
+        Args:
+            prompts: Design descriptions
+            output_paths: Paths to save the generated images, one per prompt
+            style: Optional style parameter applied to every prompt
+            batch_size: Prompts per model batch. Defaults to DESIGN_BATCH_SIZE.
+            max_concurrency: Maximum concurrent generations when batching is
+                not supported. Defaults to DESIGN_BATCH_CONCURRENCY.
+            priority: Scheduling priority ("rush", "standard" or "bulk")
+            customer_id: Customer the designs are for, for fair scheduling
+
+        Yields:
+            Dict with success status and image path, plus the "index" of
+            the prompt it belongs to and its "variants" when post-processing
+            is enabled
+        """
+        if len(prompts) != len(output_paths):
+            raise ValueError("prompts and output_paths must have the same length")
+        results = self._generate_batch(
+            prompts, output_paths, style, batch_size, max_concurrency, priority, customer_id
+        )
+        if self.post_processor is None:
+            return results
+        return self.post_processor.process_stream(results)
 
+    def _generate_batch(
+        self,
+        prompts: list[str],
+        output_paths: list[str],
+        style: Optional[str],
+        batch_size: Optional[int],
+        max_concurrency: Optional[int],
+        priority: Optional[str],
+        customer_id: Optional[str],
+    ) -> Iterator[dict[str, Any]]:
+        """Generate the designs of a batch without post-processing."""
+        for directory in {os.path.dirname(path) for path in output_paths}:
+            os.makedirs(directory or ".", exist_ok=True)
+
+        pending = list(range(len(prompts)))
+        if self.cache is not None:
+            misses = []
+            for index in pending:
+                if self.cache.get(self._cache_key(prompts[index], style)) is None:
+                    misses.append(index)
+                else:
+                    result = self.generate(
+                        prompts[index], output_paths[index], style, priority, customer_id
+                    )
+                    yield {**result, "index": index}
+            pending = misses
+        if not pending:
+            return
+
+        batch_size = batch_size or Config.DESIGN_BATCH_SIZE
+        max_concurrency = max_concurrency or Config.DESIGN_BATCH_CONCURRENCY
+        if self.backend.supports_batching and self.scheduler is not None:
+            yield from self._generate_scheduled_batches(
+                prompts,
+                output_paths,
+                pending,
+                style,
+                batch_size,
+                max_concurrency,
+                DesignPriority.parse(priority),
+                customer_id,
+            )
+        elif self.backend.supports_batching:
+            yield from self._generate_in_batches(prompts, output_paths, pending, style, batch_size)
+        else:
+            yield from self._generate_concurrently(
+                prompts, output_paths, pending, style, max_concurrency, priority, customer_id
+            )
+
+    def _generate_in_batches(
+        self,
+        prompts: list[str],
+        output_paths: list[str],
+        indexes: list[int],
+        style: Optional[str],
+        batch_size: int,
+    ) -> Iterator[dict[str, Any]]:
+        """Run prompts as model batches on the provider."""
+        futures = {}
+        try:
+            for start in range(0, len(indexes), batch_size):
+                chunk = indexes[start : start + batch_size]
+                batch_futures = self.backend.submit_batch(
+                    [prompts[i] for i in chunk], [output_paths[i] for i in chunk], style
+                )
+                futures.update(zip(batch_futures, chunk))
         except Exception as e:
-            logger.error(f"Error in Stable Diffusion generation: {str(e)}")
-            return {"success": False, "error": str(e)}
+            logger.error(f"Error submitting design batch: {str(e)}")
+            submitted = set(futures.values())
+            for index in indexes:
+                if index not in submitted:
+                    yield {"success": False, "error": str(e), "index": index}
 
-    def _generate_with_dalle(
-        self, prompt: str, output_path: str, style: Optional[str] = None
-    ) -> dict[str, Any]:
-        """Generate design using DALL-E API.
+        done = set()
+        try:
+            for future in as_completed(futures, timeout=Config.DESIGN_JOB_TIMEOUT_SECONDS):
+                index = futures[future]
+                done.add(index)
+                result = future.result()
+                if result["success"] and self.cache is not None:
+                    self.cache.put(
+                        self._cache_key(prompts[index], style), output_paths[index], result
+                    )
+                yield {**result, "index": index}
+        except FutureTimeoutError:
+            logger.error("Timed out waiting for design batch")
+            for index in futures.values():
+                if index not in done:
+                    yield {"success": False, "error": "Design job timed out", "index": index}
+
+    def _generate_scheduled_batches(
+        self,
+        prompts: list[str],
+        output_paths: list[str],
+        indexes: list[int],
+        style: Optional[str],
+        batch_size: int,
+        max_concurrency: int,
+        priority: DesignPriority,
+        customer_id: Optional[str],
+    ) -> Iterator[dict[str, Any]]:
+        """Run prompts as model batches, each waiting for a scheduler slot."""
+
+        def run_batch(chunk: list[int]) -> list[dict[str, Any]]:
+            batch_futures = self.backend.submit_batch(
+                [prompts[i] for i in chunk], [output_paths[i] for i in chunk], style
+            )
+            return [f.result(timeout=Config.DESIGN_JOB_TIMEOUT_SECONDS) for f in batch_futures]
+
+        def run_scheduled(chunk: list[int]) -> list[dict[str, Any]]:
+            return self.scheduler.run(
+                self.provider,
+                lambda: run_batch(chunk),
+                priority=priority,
+                customer_id=customer_id,
+                timeout=Config.DESIGN_JOB_TIMEOUT_SECONDS,
+            )
 
-        In a real implementation, this would use the OpenAI API.
-        For this sample, we'll simulate the process.
+        chunks = [
+            indexes[start : start + batch_size] for start in range(0, len(indexes), batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(chunks))) as executor:
+            futures = {executor.submit(run_scheduled, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error(f"Error generating design batch: {str(e)}")
+                    results = [{"success": False, "error": str(e)}] * len(chunk)
+                for index, result in zip(chunk, results):
+                    if result["success"] and self.cache is not None:
+                        self.cache.put(
+                            self._cache_key(prompts[index], style), output_paths[index], result
+                        )
+                    yield {**result, "index": index}
+
+    def _generate_concurrently(
+        self,
+        prompts: list[str],
+        output_paths: list[str],
+        indexes: list[int],
+        style: Optional[str],
+        max_concurrency: int,
+        priority: Optional[str],
+        customer_id: Optional[str],
+    ) -> Iterator[dict[str, Any]]:
+        """Run prompts one by one on a bounded pool of threads."""
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(indexes))) as executor:
+            futures = {
+                executor.submit(
+                    self.generate, prompts[i], output_paths[i], style, priority, customer_id
+                ): i
+                for i in indexes
+            }
+            for future in as_completed(futures):
+                yield {**future.result(), "index": futures[future]}
+
+    def find_artifact(self, order_id: str, filename: str) -> Optional[dict[str, Any]]:
+        """Find a design file of an order, in the blob store or on disk.
+
+        Args:
+            order_id: Unique identifier for the order
+            filename: Design file name, e.g. "design.png" or "preview.webp"
+
+        Returns:
+            Dict with the file "path", "size" and an "etag" that changes
+            with the content, or None if the order has no such file
         """
+        for part in (order_id, filename):
+            if os.path.basename(part) != part or part in ("", ".", ".."):
+                return None
+        if self.blob_store is not None:
+            stored = self.blob_store.get(f"designs/{order_id}/{filename}")
+            if stored is not None:
+                # Content-addressed, so the digest is a strong validator
+                etag = f'"{stored["digest"]}"'
+                return {"path": stored["path"], "size": stored["size"], "etag": etag}
+
+        path = os.path.join(self.output_dir, order_id, filename)
         try:
-            # In a real implementation, this would be:
-            #
-            # import openai
-            #
-            # # Configure OpenAI API
-            # openai.api_key = self.config["api_key"]
-            #
-            # # Add style to prompt if provided
-            # full_prompt = f"{prompt}, {style}" if style else prompt
-            #
-            # # Generate image
-            # start_time = time.time()
-            # response = openai.Image.create(
-            #     prompt=full_prompt,
-            #     n=1,
-            #     size=self.config["size"]
-            # )
-            # generation_time = time.time() - start_time
-            #
-            # # Download and save image
-            # image_url = response['data'][0]['url']
-            # # Download image from URL and save to output_path
-
-            # For this sample, we'll simulate the process
-            logger.info(f"Simulating DALL-E generation with prompt: {prompt}")
-            time.sleep(1)  # Simulate processing time
-
-            # Create parent directory if it doesn't exist
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-            # In a real implementation, the image would be saved here
-            # For now, just create an empty file
-            with open(output_path, "w") as f:
-                f.write("# This is a placeholder for a generated image")
-
-            return {"success": True, "image_path": output_path, "provider": "dalle"}
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        return {"path": path, "size": stat_result.st_size, "etag": etag}
 
+    def _store_design(self, order_id: str, result: dict[str, Any]) -> dict[str, Any]:
+        """Move an order design and its variants into the blob store."""
+        try:
+            stored = self.blob_store.put_file(
+                f"designs/{order_id}/design.png", result["image_path"], move=True
+            )
+            stored_result = {
+                **result,
+                "image_path": stored["path"],
+                "file_name": stored["name"],
+                "digest": stored["digest"],
+            }
+            if "variants" in result:
+                stored_result["variants"] = {
+                    name: self.blob_store.put_file(
+                        f"designs/{order_id}/{os.path.basename(path)}", path, move=True
+                    )["path"]
+                    for name, path in result["variants"].items()
+                }
+            return stored_result
         except Exception as e:
-            logger.error(f"Error in DALL-E generation: {str(e)}")
+            logger.error(f"Error storing design for order {order_id}: {str(e)}")
             return {"success": False, "error": str(e)}
+
+    def _cache_key(self, prompt: str, style: Optional[str] = None) -> str:
+        return design_cache_key(self.provider, prompt, style, self.size)
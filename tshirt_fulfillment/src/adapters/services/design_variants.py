@@ -0,0 +1,263 @@
+# Post-processing of generated designs into web and print variants
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL = "thumbnail"
+PREVIEW = "preview"
+PRINT = "print"
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    """How one variant of a design is rendered.
+
+    Web variants are shrunk to fit ``size`` and converted to sRGB without
+    an embedded profile; print variants are resized to exactly ``size``,
+    converted to sRGB and tagged with the profile and ``dpi``.
+    """
+
+    name: str
+    filename: str
+    format: str
+    size: tuple[int, int]
+    quality: Optional[int] = None
+    dpi: Optional[int] = None
+    print_ready: bool = False
+
+
+def default_variant_specs(
+    thumbnail_size: int = 256,
+    preview_size: int = 1024,
+    preview_quality: int = 75,
+    print_size: tuple[int, int] = (4500, 5400),
+    print_dpi: int = 300,
+) -> list[VariantSpec]:
+    """Get the standard thumbnail, WebP preview and print PNG variants."""
+    return [
+        VariantSpec(THUMBNAIL, "thumbnail.jpg", "JPEG", (thumbnail_size, thumbnail_size), 80),
+        VariantSpec(PREVIEW, "preview.webp", "WEBP", (preview_size, preview_size), preview_quality),
+        VariantSpec(PRINT, "print.png", "PNG", print_size, dpi=print_dpi, print_ready=True),
+    ]
+
+
+def render_variants(
+    image_path: str, output_dir: str, specs: list[VariantSpec], prefix: str = ""
+) -> dict[str, str]:
+    """Render the variants of a design image.
+
+    Runs in a post-processing worker process. Each file is written under a
+    temporary name and renamed, so readers never see a partial variant.
+
+    Args:
+        image_path: Generated design image
+        output_dir: Directory the variants are written to
+        specs: Variants to render
+        prefix: Prepended to each variant's filename, so the variants of
+            several designs can share ``output_dir``
+
+    Returns:
+        Dict mapping variant name to file path
+    """
+    from PIL import Image
+
+    # Opened by path on purpose: Pillow memory-maps uncompressed single-tile
+    # sources itself when it knows the file name, and PNG, JPEG and WebP are
+    # decoded front to back, so mapping the file here would only add a copy
+    with Image.open(image_path) as source:
+        source.load()
+        image = _to_srgb(source)
+
+    paths = {}
+    for spec in specs:
+        if spec.print_ready:
+            variant = image.resize(spec.size, Image.Resampling.LANCZOS)
+        else:
+            variant = image.copy()
+            variant.thumbnail(spec.size, Image.Resampling.LANCZOS)
+
+        options: dict[str, Any] = {}
+        if spec.quality is not None:
+            options["quality"] = spec.quality
+        if spec.dpi is not None:
+            options["dpi"] = (spec.dpi, spec.dpi)
+        if spec.print_ready:
+            options["icc_profile"] = _srgb_profile_bytes()
+        if spec.format == "WEBP":
+            options["method"] = 4
+
+        path = os.path.join(output_dir, f"{prefix}{spec.filename}")
+        temp_path = f"{path}.tmp"
+        variant.save(temp_path, spec.format, **options)
+        os.replace(temp_path, path)
+        paths[spec.name] = path
+    return paths
+
+
+def _to_srgb(image: Any) -> Any:
+    """Convert an image to RGB in the sRGB color space."""
+    from PIL import ImageCms
+
+    icc_profile = image.info.get("icc_profile")
+    if icc_profile:
+        try:
+            source_profile = ImageCms.ImageCmsProfile(BytesIO(icc_profile))
+            srgb = ImageCms.createProfile("sRGB")
+            return ImageCms.profileToProfile(image, source_profile, srgb, outputMode="RGB")
+        except (ImageCms.PyCMSError, OSError) as e:
+            logger.warning(f"Ignoring unusable color profile: {str(e)}")
+    return image.convert("RGB")
+
+
+def _srgb_profile_bytes() -> bytes:
+    from PIL import ImageCms
+
+    return ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+
+
+class DesignPostProcessor:
+    """Process pool rendering design variants off the request threads.
+
+    Resizing and encoding a print-resolution image is CPU bound, so it runs
+    in worker processes; the caller only waits for the small result dict.
+    """
+
+    def __init__(
+        self,
+        specs: Optional[list[VariantSpec]] = None,
+        max_workers: int = 2,
+        start_method: str = "spawn",
+    ):
+        """Initialize the post-processor.
+
+        Args:
+            specs: Variants to render. Defaults to ``default_variant_specs()``.
+            max_workers: Number of worker processes
+            start_method: multiprocessing start method for the workers
+        """
+        self.specs = specs if specs is not None else default_variant_specs()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context(start_method)
+        )
+
+    def submit(
+        self, image_path: str, output_dir: Optional[str] = None, prefix: Optional[str] = None
+    ) -> Future:
+        """Queue rendering the variants of a design image.
+
+        Args:
+            image_path: Generated design image
+            output_dir: Directory for the variants; defaults to the image's
+            prefix: Prepended to the variant filenames; defaults to the
+                image's name without extension and "_", e.g.
+                "design_preview.webp"
+
+        Returns:
+            Future resolving to a dict mapping variant name to file path
+        """
+        output_dir = output_dir or os.path.dirname(image_path)
+        if prefix is None:
+            prefix = f"{os.path.splitext(os.path.basename(image_path))[0]}_"
+        return self._executor.submit(render_variants, image_path, output_dir, self.specs, prefix)
+
+    def process(
+        self, result: dict[str, Any], timeout: Optional[float] = None, prefix: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Add the variants of a successful design result.
+
+        Post-processing failures are reported under "variants_error" and
+        do not fail the design itself.
+
+        Args:
+            result: Design generation result with "image_path"
+            timeout: Maximum seconds to wait
+            prefix: Prepended to the variant filenames, see ``submit``
+
+        Returns:
+            The result with "variants" mapping variant name to file path
+        """
+        if not result.get("success"):
+            return result
+        try:
+            variants = self.submit(result["image_path"], prefix=prefix).result(timeout=timeout)
+            return {**result, "variants": variants}
+        except Exception as e:
+            logger.error(f"Error post-processing design {result['image_path']}: {str(e)}")
+            return {**result, "variants": {}, "variants_error": str(e) or type(e).__name__}
+
+    def process_stream(self, results: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """Post-process design results as they arrive.
+
+        ``results`` is consumed on a background thread, so generation of
+        later designs overlaps with post-processing of earlier ones.
+        Results are yielded in completion order.
+
+        Args:
+            results: Design generation results, e.g. from ``generate_batch``
+
+        Yields:
+            Each result with its "variants" added
+        """
+        done: queue.Queue = queue.Queue()
+        fed: list[int] = []  # Number of results read, once the source is exhausted
+
+        def feed() -> None:
+            count = 0
+            try:
+                for result in results:
+                    count += 1
+                    if not result.get("success"):
+                        done.put((result, None))
+                        continue
+                    try:
+                        future = self.submit(result["image_path"])
+                    except Exception as e:
+                        # The pool is closed or broken; report it on this result
+                        logger.error(
+                            f"Error post-processing design {result['image_path']}: {str(e)}"
+                        )
+                        done.put(({**result, "success": False, "error": str(e)}, None))
+                        continue
+                    future.add_done_callback(lambda f, result=result: done.put((result, f)))
+            except Exception as e:
+                # Raised by ``results`` itself, so no result was counted for it
+                logger.error(f"Error reading design results: {str(e)}")
+                count += 1
+                done.put(({"success": False, "error": str(e)}, None))
+            finally:
+                fed.append(count)
+                done.put(None)
+
+        threading.Thread(target=feed, name="design-postprocess-feed", daemon=True).start()
+        received = 0
+        while not fed or received < fed[0]:
+            item = done.get()
+            if item is None:
+                continue
+            received += 1
+            result, future = item
+            if future is None:
+                yield result
+                continue
+            try:
+                yield {**result, "variants": future.result()}
+            except Exception as e:
+                logger.error(f"Error post-processing design {result['image_path']}: {str(e)}")
+                yield {**result, "variants": {}, "variants_error": str(e) or type(e).__name__}
+
+    def close(self) -> None:
+        """Stop the worker processes after the queued work is done."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,343 @@
+# Design generation worker processes
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Messages sent from workers to the pool
+_READY = "ready"
+_STARTED = "started"
+_DONE = "done"
+
+# Extra time per additional image in a simulated batch, relative to one image
+BATCH_ITEM_COST = 0.25
+
+
+class SimulatedDiffusionModel:
+    """Stand-in for a diffusion pipeline when diffusers is not installed.
+
+    Loading and inference only sleep, but the pool treats it exactly like a
+    real model, so the load cost is still paid once per worker.
+    """
+
+    def __init__(self, load_seconds: float = 2.0, generate_seconds: float = 2.0):
+        """Load the simulated model.
+
+        Args:
+            load_seconds: Simulated model load time
+            generate_seconds: Simulated time per image
+        """
+        self.generate_seconds = generate_seconds
+        time.sleep(load_seconds)
+
+    def generate(self, prompt: str, output_path: str) -> None:
+        """Write a placeholder image for the prompt to output_path."""
+        self.generate_batch([prompt], [output_path])
+
+    def generate_batch(self, prompts: list[str], output_paths: list[str]) -> None:
+        """Write placeholder images for several prompts in one batch.
+
+        Like a real pipeline, a batch costs much less than running the
+        prompts one by one: each extra image adds a quarter of the time.
+        """
+        time.sleep(self.generate_seconds * (1 + BATCH_ITEM_COST * (len(prompts) - 1)))
+        for prompt, output_path in zip(prompts, output_paths):
+            write_placeholder_image(prompt, output_path)
+
+
+class DiffusersModel:
+    """Stable Diffusion pipeline loaded with the diffusers library."""
+
+    def __init__(self, model_id: str, use_gpu: bool = True):
+        """Load the pipeline.
+
+        Args:
+            model_id: Hugging Face model ID
+            use_gpu: Use CUDA if available
+        """
+        import torch
+        from diffusers import StableDiffusionPipeline
+
+        device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
+        self.pipe = StableDiffusionPipeline.from_pretrained(model_id).to(device)
+
+    def generate(self, prompt: str, output_path: str) -> None:
+        """Generate an image for the prompt and save it to output_path."""
+        self.pipe(prompt).images[0].save(output_path)
+
+    def generate_batch(self, prompts: list[str], output_paths: list[str]) -> None:
+        """Generate images for several prompts in one pipeline call."""
+        for image, output_path in zip(self.pipe(prompts).images, output_paths):
+            image.save(output_path)
+
+
+def load_design_model(model_config: dict[str, Any]) -> Any:
+    """Load the design model described by a model configuration.
+
+    Args:
+        model_config: Dict with "model" and "use_gpu"; "simulate" forces the
+            simulated model, and "load_seconds"/"generate_seconds" tune it
+
+    Returns:
+        Model with ``generate(prompt, output_path)`` and
+        ``generate_batch(prompts, output_paths)`` methods
+    """
+    if not model_config.get("simulate"):
+        try:
+            return DiffusersModel(model_config["model"], model_config.get("use_gpu", True))
+        except ImportError:
+            logger.warning("diffusers is not installed. Using the simulated design model.")
+    return SimulatedDiffusionModel(
+        load_seconds=model_config.get("load_seconds", 2.0),
+        generate_seconds=model_config.get("generate_seconds", 2.0),
+    )
+
+
+def _worker_main(model_config: dict[str, Any], jobs: Any, results: Any) -> None:
+    """Worker process loop: load the model once, then serve jobs until None.
+
+    Each job is a batch of (job ID, prompt, output path) items generated in
+    one model call.
+    """
+    pid = os.getpid()
+    model = load_design_model(model_config)
+    results.put((_READY, None, pid, None))
+
+    while True:
+        batch = jobs.get()
+        if batch is None:
+            return
+        job_ids = [job_id for job_id, _, _ in batch]
+        prompts = [prompt for _, prompt, _ in batch]
+        output_paths = [output_path for _, _, output_path in batch]
+        results.put((_STARTED, job_ids, pid, None))
+        start = time.perf_counter()
+        try:
+            for output_path in output_paths:
+                os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            if len(batch) == 1:
+                model.generate(prompts[0], output_paths[0])
+            else:
+                model.generate_batch(prompts, output_paths)
+            generation_time = f"{time.perf_counter() - start:.1f}s"
+            batch_results = [
+                {
+                    "success": True,
+                    "image_path": output_path,
+                    "generation_time": generation_time,
+                    "worker_pid": pid,
+                    "batch_size": len(batch),
+                }
+                for output_path in output_paths
+            ]
+        except Exception as e:
+            batch_results = [{"success": False, "error": str(e)} for _ in batch]
+        results.put((_DONE, job_ids, pid, batch_results))
+
+
+class DesignWorkerPool:
+    """Pool of worker processes that each keep a design model loaded.
+
+    Jobs go to the workers over a queue and results come back over another;
+    a collector thread in the parent resolves the callers' futures. Workers
+    that die are replaced and the job they were running fails.
+    """
+
+    def __init__(
+        self,
+        model_config: dict[str, Any],
+        num_workers: int = 1,
+        start_method: str = "spawn",
+    ):
+        """Start the workers.
+
+        Args:
+            model_config: Model configuration passed to ``load_design_model``
+                in each worker
+            num_workers: Number of worker processes
+            start_method: multiprocessing start method; "spawn" keeps the
+                API process's threads and sockets out of the workers
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.model_config = model_config
+        self.num_workers = num_workers
+        self._context = multiprocessing.get_context(start_method)
+        self._jobs = self._context.Queue()
+        self._results = self._context.Queue()
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future] = {}
+        self._running: dict[int, list[str]] = {}  # worker pid -> job IDs
+        self._ready = threading.Semaphore(0)
+        self._closed = False
+        self.workers: list[Any] = [self._start_worker() for _ in range(num_workers)]
+        self._collector = threading.Thread(
+            target=self._collect, name="design-worker-collector", daemon=True
+        )
+        self._collector.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every worker has loaded its model.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if all workers are ready
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for _ in range(self.num_workers):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._ready.acquire(timeout=remaining):
+                return False
+        for _ in range(self.num_workers):
+            self._ready.release()
+        return True
+
+    def submit(self, prompt: str, output_path: str) -> Future:
+        """Queue a design job.
+
+        Args:
+            prompt: Full prompt, including any style
+            output_path: Path the image is written to
+
+        Returns:
+            Future resolving to a dict with success status and image path
+
+        Raises:
+            RuntimeError: If the pool is closed
+        """
+        return self.submit_batch([prompt], [output_path])[0]
+
+    def submit_batch(self, prompts: list[str], output_paths: list[str]) -> list[Future]:
+        """Queue several design jobs to run as one model batch on one worker.
+
+        Args:
+            prompts: Full prompts, including any style
+            output_paths: Paths the images are written to, one per prompt
+
+        Returns:
+            One future per prompt, resolving to a dict with success status
+            and image path
+
+        Raises:
+            RuntimeError: If the pool is closed
+        """
+        if len(prompts) != len(output_paths):
+            raise ValueError("prompts and output_paths must have the same length")
+        batch = [(str(uuid.uuid4()), prompt, path) for prompt, path in zip(prompts, output_paths)]
+        futures: list[Future] = [Future() for _ in batch]
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Design worker pool is closed")
+            for (job_id, _, _), future in zip(batch, futures):
+                self._futures[job_id] = future
+        self._jobs.put(batch)
+        return futures
+
+    def generate(
+        self, prompt: str, output_path: str, timeout: Optional[float] = None
+    ) -> dict[str, Any]:
+        """Run a design job and wait for its result.
+
+        Args:
+            prompt: Full prompt, including any style
+            output_path: Path the image is written to
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Dict with success status and image path
+        """
+        try:
+            return self.submit(prompt, output_path).result(timeout=timeout)
+        except Exception as e:
+            logger.error(f"Error running design job: {str(e)}")
+            return {"success": False, "error": str(e) or type(e).__name__}
+
+    def close(self) -> None:
+        """Stop the workers after the queued jobs are done."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in self.workers:
+            self._jobs.put(None)
+        for worker in self.workers:
+            worker.join()
+        self._collector.join()
+
+    def _start_worker(self) -> Any:
+        worker = self._context.Process(
+            target=_worker_main,
+            args=(self.model_config, self._jobs, self._results),
+            name="design-worker",
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    def _collect(self) -> None:
+        """Collector loop: resolve futures and replace dead workers."""
+        while True:
+            try:
+                kind, job_ids, pid, results = self._results.get(timeout=0.5)
+            except queue.Empty:
+                with self._lock:
+                    closed = self._closed
+                if closed and not any(worker.is_alive() for worker in self.workers):
+                    return
+                if not closed:
+                    self._replace_dead_workers()
+                continue
+
+            if kind == _READY:
+                self._ready.release()
+            elif kind == _STARTED:
+                with self._lock:
+                    self._running[pid] = job_ids
+            else:
+                with self._lock:
+                    self._running.pop(pid, None)
+                    futures = [self._futures.pop(job_id, None) for job_id in job_ids]
+                for future, result in zip(futures, results):
+                    if future is not None:
+                        future.set_result(result)
+
+    def _replace_dead_workers(self) -> None:
+        for index, worker in enumerate(self.workers):
+            if worker.is_alive():
+                continue
+            logger.error(f"Design worker {worker.pid} exited with code {worker.exitcode}")
+            self.workers[index] = self._start_worker()
+            with self._lock:
+                job_ids = self._running.pop(worker.pid, [])
+                futures = [self._futures.pop(job_id, None) for job_id in job_ids]
+            for future in futures:
+                if future is not None:
+                    future.set_result({"success": False, "error": "Design worker crashed"})
+
+
+def write_placeholder_image(prompt: str, output_path: str) -> None:
+    """Write a placeholder image with a color derived from the prompt."""
+    try:
+        from PIL import Image
+
+        Image.new("RGB", (512, 512), color=_prompt_color(prompt)).save(output_path, "PNG")
+    except ImportError:
+        with open(output_path, "w") as f:
+            f.write("# This is a placeholder for a generated image")
+
+
+def _prompt_color(prompt: str) -> tuple[int, int, int]:
+    """Deterministic placeholder color for a prompt."""
+    value = sum(ord(char) for char in prompt)
+    return (value * 37 % 256, value * 91 % 256, value * 53 % 256)
@@ -0,0 +1,500 @@
+# Google Drive REST client with resumable, chunked uploads
+
+import json
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any
+from typing import BinaryIO
+from typing import Callable
+from typing import Optional
+
+import requests
+
+from tshirt_fulfillment.src.core.resilience import TokenBucket
+from tshirt_fulfillment.src.core.resilience import remaining_time
+
+logger = logging.getLogger(__name__)
+
+DRIVE_API_URL = "https://www.googleapis.com"
+TOKEN_URL = "https://oauth2.googleapis.com/token"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+FILE_FIELDS = "id,name,mimeType,parents,webViewLink"
+
+# Drive requires every upload chunk but the last to be a multiple of 256 KiB
+CHUNK_ALIGNMENT = 256 * 1024
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+# Most calls Drive accepts in one batch request
+BATCH_LIMIT = 100
+
+ProgressCallback = Callable[[int, int], None]
+# (method, path below the API root, JSON body or None) of one batched call
+BatchCall = tuple[str, str, Optional[dict[str, Any]]]
+
+
+class DriveError(Exception):
+    """A Drive request failed."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        """Whether the request may succeed if repeated."""
+        return self.status is None or self.status in RETRYABLE_STATUSES
+
+
+class _UploadSessionExpired(DriveError):
+    """The resumable upload session is gone; the upload must start over."""
+
+
+class DriveClient:
+    """Minimal Google Drive v3 client for creating folders and uploading files.
+
+    Files are uploaded with Drive's resumable protocol in chunks of
+    ``chunk_size`` bytes. When a chunk fails with a transient error or a
+    dropped connection, the client asks Drive how many bytes it has
+    persisted and resumes from there, up to ``max_resumes`` times per
+    upload. Sessions that still failed are remembered, so uploading the
+    same file again (e.g. a retry by the resilience layer) resumes them
+    instead of starting from zero.
+
+    Every request is paced by a token bucket sized to the account's
+    quota, and metadata and permission calls can be combined into Drive
+    batch requests; concurrent ``share`` calls are batched automatically.
+    The client is thread-safe and meant to be shared per account.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        refresh_token: str,
+        api_url: str = DRIVE_API_URL,
+        token_url: str = TOKEN_URL,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_resumes: int = 5,
+        resume_delay: float = 0.5,
+        timeout: Optional[float] = 60.0,
+        requests_per_second: Optional[float] = None,
+        request_burst: Optional[int] = None,
+        batch_window: float = 0.0,
+    ):
+        """Initialize the client.
+
+        Args:
+            client_id: OAuth client ID
+            client_secret: OAuth client secret
+            refresh_token: OAuth refresh token for the Drive account
+            api_url: Base URL of the Drive API
+            token_url: OAuth token endpoint
+            chunk_size: Bytes per upload request, a multiple of 256 KiB
+            max_resumes: Times an upload is resumed after transient failures
+            resume_delay: Seconds before the first resume, doubled each time
+            timeout: HTTP timeout in seconds, shortened by an active deadline
+            requests_per_second: Drive requests allowed per second on
+                average (each call of a batch counts); None for no limit
+            request_burst: Requests allowed at once before pacing starts
+            batch_window: Seconds a ``share`` call waits for others to
+                batch with
+        """
+        if chunk_size <= 0 or chunk_size % CHUNK_ALIGNMENT:
+            raise ValueError(f"chunk_size must be a positive multiple of {CHUNK_ALIGNMENT} bytes")
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.api_url = api_url.rstrip("/")
+        self.token_url = token_url
+        self.chunk_size = chunk_size
+        self.max_resumes = max_resumes
+        self.resume_delay = resume_delay
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._token_lock = threading.Lock()
+        self._access_token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._uploads_lock = threading.Lock()
+        self._pending_uploads: dict[tuple, str] = {}
+        self.rate_limiter = (
+            TokenBucket(requests_per_second, request_burst) if requests_per_second else None
+        )
+        self.batch_window = batch_window
+        self._share_lock = threading.Lock()
+        self._pending_shares: list[tuple[str, Future]] = []
+        self.resumes = 0
+        self.batches = 0
+        self.batched_calls = 0
+
+    def create_folder(self, name: str, parent_id: Optional[str] = None) -> dict[str, Any]:
+        """Create a folder.
+
+        Returns:
+            Metadata of the folder, including its "id"
+        """
+        metadata: dict[str, Any] = {"name": name, "mimeType": FOLDER_MIME_TYPE}
+        if parent_id:
+            metadata["parents"] = [parent_id]
+        response = self._request(
+            "POST", f"{self.api_url}/drive/v3/files", params={"fields": FILE_FIELDS}, json=metadata
+        )
+        return _json_or_raise(response, f"create folder {name}")
+
+    def share(self, file_id: str) -> None:
+        """Make a file readable by anyone with its link.
+
+        Calls made by other threads within ``batch_window`` seconds are
+        sent together in one batch request.
+
+        Raises:
+            DriveError: If Drive rejects the permission
+        """
+        future: Future = Future()
+        with self._share_lock:
+            self._pending_shares.append((file_id, future))
+            leader = len(self._pending_shares) == 1
+        if leader:
+            # The first caller waits for company, then sends for everyone
+            if self.batch_window:
+                time.sleep(self.batch_window)
+            with self._share_lock:
+                pending, self._pending_shares = self._pending_shares, []
+            try:
+                errors = self._share_files([file_id for file_id, _ in pending])
+            except Exception as e:
+                errors = [e] * len(pending)
+            for (_, waiting), error in zip(pending, errors):
+                if error is None:
+                    waiting.set_result(None)
+                else:
+                    waiting.set_exception(error)
+        future.result()
+
+    def share_files(self, file_ids: list[str]) -> None:
+        """Make files readable by anyone with their links, in batch requests.
+
+        Raises:
+            DriveError: If Drive rejects any of the permissions
+        """
+        for error in self._share_files(file_ids):
+            if error is not None:
+                raise error
+
+    def batch(self, calls: list[BatchCall]) -> list[tuple[int, dict[str, Any]]]:
+        """Send metadata or permission calls through Drive's batch endpoint.
+
+        Calls are sent up to ``BATCH_LIMIT`` per HTTP request. Each call
+        still counts against the request quota.
+
+        Args:
+            calls: (method, path, JSON body or None) of each call, with
+                paths below the API root, e.g. "/drive/v3/files/<id>"
+
+        Returns:
+            (HTTP status, JSON body) of each call, in order
+
+        Raises:
+            DriveError: If a batch request as a whole fails
+        """
+        results: list[tuple[int, dict[str, Any]]] = []
+        for start in range(0, len(calls), BATCH_LIMIT):
+            group = calls[start : start + BATCH_LIMIT]
+            boundary = f"batch_{uuid.uuid4().hex}"
+            response = self._request(
+                "POST",
+                f"{self.api_url}/batch/drive/v3",
+                data=_encode_batch(group, boundary),
+                headers={"Content-Type": f"multipart/mixed; boundary={boundary}"},
+                cost=len(group),
+            )
+            if response.status_code >= 400:
+                raise DriveError(
+                    f"Batch request failed: HTTP {response.status_code}: {response.text[:200]}",
+                    response.status_code,
+                )
+            results.extend(_decode_batch(response, len(group)))
+            self.batches += 1
+            self.batched_calls += len(group)
+        return results
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the client counters as a plain dict."""
+        return {
+            "resumes": self.resumes,
+            "batches": self.batches,
+            "batched_calls": self.batched_calls,
+            "rate_limit": self.rate_limiter.snapshot() if self.rate_limiter else None,
+        }
+
+    def upload_file(
+        self,
+        file_path: str,
+        name: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> dict[str, Any]:
+        """Upload a file with a resumable upload.
+
+        Args:
+            file_path: File to upload
+            name: Name in Drive, defaults to the file name
+            parent_id: Folder to upload into
+            mime_type: Content type, guessed from the name by default
+            progress: Called as ``progress(bytes_uploaded, total_bytes)``
+                after every chunk
+
+        Returns:
+            Metadata of the uploaded file, including "id" and "webViewLink"
+
+        Raises:
+            DriveError: If Drive rejects the upload, or it keeps failing
+                after ``max_resumes`` resumes
+        """
+        name = name or os.path.basename(file_path)
+        mime_type = mime_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
+        stat = os.stat(file_path)
+        size = stat.st_size
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, size, name, parent_id)
+        resumes = 0
+
+        with open(file_path, "rb") as f:
+            while True:
+                try:
+                    with self._uploads_lock:
+                        upload_url = self._pending_uploads.get(key)
+                    if upload_url is None:
+                        upload_url = self._start_upload(name, parent_id, mime_type, size)
+                        with self._uploads_lock:
+                            self._pending_uploads[key] = upload_url
+                        offset, file = 0, None
+                    else:
+                        offset, file = self._upload_status(upload_url, size)
+                    if file is None:
+                        file = self._send_chunks(f, upload_url, offset, size, progress)
+                    with self._uploads_lock:
+                        self._pending_uploads.pop(key, None)
+                    return file
+                except (DriveError, requests.ConnectionError, requests.Timeout) as e:
+                    if isinstance(e, _UploadSessionExpired):
+                        with self._uploads_lock:
+                            self._pending_uploads.pop(key, None)
+                    elif isinstance(e, DriveError) and not e.retryable:
+                        with self._uploads_lock:
+                            self._pending_uploads.pop(key, None)
+                        raise
+                    resumes += 1
+                    if resumes > self.max_resumes:
+                        raise DriveError(
+                            f"Upload of {name} failed after {resumes - 1} resumes: {e}"
+                        ) from e
+                    self.resumes += 1
+                    logger.warning(f"Upload of {name} interrupted, resuming: {str(e)}")
+                    time.sleep(self.resume_delay * 2 ** (resumes - 1))
+
+    def _share_files(self, file_ids: list[str]) -> list[Optional[Exception]]:
+        """Share files, getting None or the error of each."""
+        permission = {"type": "anyone", "role": "reader"}
+        if len(file_ids) == 1:
+            response = self._request(
+                "POST",
+                f"{self.api_url}/drive/v3/files/{file_ids[0]}/permissions",
+                params={"fields": "id"},
+                json=permission,
+            )
+            try:
+                _json_or_raise(response, f"share {file_ids[0]}")
+            except DriveError as e:
+                return [e]
+            return [None]
+        calls = [
+            ("POST", f"/drive/v3/files/{file_id}/permissions?fields=id", permission)
+            for file_id in file_ids
+        ]
+        return [
+            None
+            if status < 400
+            else DriveError(f"Failed to share {file_id}: HTTP {status}: {body}", status)
+            for file_id, (status, body) in zip(file_ids, self.batch(calls))
+        ]
+
+    def _start_upload(self, name: str, parent_id: Optional[str], mime_type: str, size: int) -> str:
+        """Open a resumable upload session and get its URL."""
+        metadata: dict[str, Any] = {"name": name, "mimeType": mime_type}
+        if parent_id:
+            metadata["parents"] = [parent_id]
+        response = self._request(
+            "POST",
+            f"{self.api_url}/upload/drive/v3/files",
+            params={"uploadType": "resumable", "fields": FILE_FIELDS},
+            json=metadata,
+            headers={"X-Upload-Content-Type": mime_type, "X-Upload-Content-Length": str(size)},
+        )
+        _json_or_raise(response, f"start upload of {name}", allow_empty=True)
+        upload_url = response.headers.get("Location")
+        if not upload_url:
+            raise DriveError(f"Drive returned no upload URL for {name}", response.status_code)
+        return upload_url
+
+    def _upload_status(self, upload_url: str, size: int) -> tuple[int, Optional[dict[str, Any]]]:
+        """Ask Drive how much of an upload it has persisted."""
+        response = self._request(
+            "PUT", upload_url, data=b"", headers={"Content-Range": f"bytes */{size}"}
+        )
+        return _upload_progress(response, size)
+
+    def _send_chunks(
+        self,
+        f: BinaryIO,
+        upload_url: str,
+        offset: int,
+        size: int,
+        progress: Optional[ProgressCallback],
+    ) -> dict[str, Any]:
+        """Send the file from ``offset`` on, one chunk per request."""
+        while True:
+            f.seek(offset)
+            chunk = f.read(self.chunk_size)
+            if chunk:
+                content_range = f"bytes {offset}-{offset + len(chunk) - 1}/{size}"
+            else:
+                content_range = f"bytes */{size}"
+            response = self._request(
+                "PUT", upload_url, data=chunk, headers={"Content-Range": content_range}
+            )
+            persisted, file = _upload_progress(response, size)
+            if progress is not None:
+                progress(persisted, size)
+            if file is not None:
+                return file
+            if persisted <= offset and chunk:
+                raise DriveError(f"Drive persisted nothing of the chunk at byte {offset}")
+            offset = persisted
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict[str, str]] = None,
+        cost: int = 1,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send an authorized request, refreshing the access token once on 401.
+
+        Waits for ``cost`` tokens from the rate limiter first.
+        """
+        for refresh in (False, True):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(cost)
+            authorization = {"Authorization": f"Bearer {self._token(refresh)}"}
+            response = self._session.request(
+                method,
+                url,
+                headers={**(headers or {}), **authorization},
+                timeout=remaining_time(self.timeout),
+                **kwargs,
+            )
+            if response.status_code != 401:
+                break
+        return response
+
+    def _token(self, refresh: bool = False) -> str:
+        """Get an access token, refreshing it when expired or asked to."""
+        with self._token_lock:
+            if refresh or self._access_token is None or time.time() >= self._token_expires_at:
+                response = self._session.post(
+                    self.token_url,
+                    data={
+                        "client_id": self.client_id,
+                        "client_secret": self.client_secret,
+                        "refresh_token": self.refresh_token,
+                        "grant_type": "refresh_token",
+                    },
+                    timeout=remaining_time(self.timeout),
+                )
+                token = _json_or_raise(response, "refresh access token")
+                self._access_token = token["access_token"]
+                # Refresh a minute early so tokens do not expire mid-request
+                self._token_expires_at = time.time() + int(token.get("expires_in", 3600)) - 60
+            return self._access_token
+
+
+def _upload_progress(
+    response: requests.Response, size: int
+) -> tuple[int, Optional[dict[str, Any]]]:
+    """Read an upload response as (bytes persisted, uploaded file or None)."""
+    if response.status_code in (200, 201):
+        return size, response.json()
+    if response.status_code == 308:
+        # "Range: bytes=0-<last byte>", absent while nothing is persisted
+        match = re.fullmatch(r"bytes=0-(\d+)", response.headers.get("Range", ""))
+        return (int(match.group(1)) + 1 if match else 0), None
+    if response.status_code in (404, 410):
+        raise _UploadSessionExpired("Upload session expired", response.status_code)
+    raise DriveError(
+        f"Upload failed with HTTP {response.status_code}: {response.text[:200]}",
+        response.status_code,
+    )
+
+
+def _encode_batch(calls: list[BatchCall], boundary: str) -> bytes:
+    """Encode calls as a multipart/mixed batch request body."""
+    body = bytearray()
+    for index, (method, path, payload) in enumerate(calls):
+        body += (
+            f"--{boundary}\r\nContent-Type: application/http\r\n"
+            f"Content-ID: <item{index}>\r\n\r\n{method} {path} HTTP/1.1\r\n"
+        ).encode()
+        if payload is None:
+            body += b"\r\n"
+        else:
+            data = json.dumps(payload).encode()
+            body += (
+                f"Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n"
+            ).encode() + data
+        body += b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    return bytes(body)
+
+
+def _decode_batch(response: requests.Response, count: int) -> list[tuple[int, dict[str, Any]]]:
+    """Decode a batch response into (status, JSON body) per call, in call order."""
+    match = re.search(r"boundary=\"?([^\";]+)", response.headers.get("Content-Type", ""))
+    if match is None:
+        raise DriveError("Batch response is not multipart", response.status_code)
+    results: list[Optional[tuple[int, dict[str, Any]]]] = [None] * count
+    for part in response.content.split(b"--" + match.group(1).encode())[1:]:
+        if part.startswith(b"--"):
+            break
+        part_headers, _, message = part.strip(b"\r\n").partition(b"\r\n\r\n")
+        content_id = re.search(rb"Content-ID:\s*<response-item(\d+)>", part_headers, re.I)
+        status_line, _, rest = message.partition(b"\r\n")
+        body = rest.partition(b"\r\n\r\n")[2].strip()
+        if content_id is None or int(content_id.group(1)) >= count:
+            continue
+        status = int(status_line.split()[1])
+        results[int(content_id.group(1))] = (status, json.loads(body) if body else {})
+    missing = [index for index, result in enumerate(results) if result is None]
+    if missing:
+        raise DriveError(f"Batch response is missing calls {missing}", response.status_code)
+    return results  # type: ignore[return-value]
+
+
+def _json_or_raise(
+    response: requests.Response, action: str, allow_empty: bool = False
+) -> dict[str, Any]:
+    if response.status_code >= 400:
+        raise DriveError(
+            f"Failed to {action}: HTTP {response.status_code}: {response.text[:200]}",
+            response.status_code,
+        )
+    if allow_empty and not response.content:
+        return {}
+    return response.json()
@@ -0,0 +1,95 @@
+# Persistent map of orders to their Google Drive folders
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DriveFolderMap:
+    """Remembers the Drive folder of each order across uploads and restarts.
+
+    Every file of an order goes into one "Order <order_id>" folder; the
+    folder is created on the first upload and its ID stored in a SQLite
+    file, so later uploads (the Excel file after the design, retries,
+    reprints) cost no folder-create call. Concurrent uploads for the same
+    order wait for each other instead of creating two folders.
+    """
+
+    def __init__(self, path: str, lock_stripes: int = 64):
+        """Initialize the map, creating its SQLite file if needed.
+
+        Args:
+            path: SQLite file, or ":memory:" for a map that is not persisted
+            lock_stripes: Locks shared out among orders to serialize folder
+                creation per order
+        """
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._order_locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS folders ("
+                "order_id TEXT PRIMARY KEY, folder_id TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+        self.hits = 0
+        self.created = 0
+
+    def get(self, order_id: str) -> Optional[str]:
+        """Get the folder ID of an order, or None if it has none yet."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT folder_id FROM folders WHERE order_id = ?", (order_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_or_create(self, order_id: str, create: Callable[[], str]) -> str:
+        """Get the folder ID of an order, creating the folder on first use.
+
+        Args:
+            order_id: Unique identifier for the order
+            create: Creates the folder in Drive and returns its ID; called
+                at most once per order while its folder is remembered
+
+        Returns:
+            The folder ID
+        """
+        with self._order_locks[hash(order_id) % len(self._order_locks)]:
+            folder_id = self.get(order_id)
+            if folder_id is not None:
+                with self._lock:
+                    self.hits += 1
+                return folder_id
+            folder_id = create()
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO folders (order_id, folder_id, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (order_id, folder_id, time.time()),
+                )
+                self.created += 1
+            return folder_id
+
+    def forget(self, order_id: str) -> None:
+        """Drop the folder of an order, e.g. after it was deleted in Drive."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM folders WHERE order_id = ?", (order_id,))
+
+    def snapshot(self) -> dict[str, int]:
+        """Get the map counters as a plain dict."""
+        with self._lock:
+            (folders,) = self._db.execute("SELECT COUNT(*) FROM folders").fetchone()
+            return {"folders": folders, "hits": self.hits, "created": self.created}
+
+    def close(self) -> None:
+        """Close the SQLite file."""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,309 @@
+# Durable outbox of Google Drive uploads drained in the background
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from tshirt_fulfillment.src.core.resilience import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+_COLUMNS = (
+    "id, order_id, file_path, name, kind, status, attempts, next_attempt_at, "
+    "drive_url, file_id, error, created_at, updated_at"
+)
+
+
+class DriveUploadOutbox:
+    """Upload jobs waiting to be sent to Google Drive, kept in SQLite.
+
+    Enqueueing a job is a local write, so the order pipeline does not wait
+    for Drive. Jobs survive restarts: a job claimed by an uploader that
+    died is handed out again once its lease expires. Failed jobs are
+    retried with exponential backoff until ``retry.max_attempts`` attempts
+    have been made, then marked failed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        retry: Optional[RetryPolicy] = None,
+        lease_seconds: float = 600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the outbox, creating its SQLite file if needed.
+
+        Args:
+            path: SQLite file, or ":memory:" for an outbox that is not persisted
+            retry: Attempts and backoff per job. Defaults to 8 attempts
+                backing off from 5 seconds up to 10 minutes.
+            lease_seconds: How long a claimed job is reserved for its uploader
+            clock: Wall-clock time source, overridable for tests
+        """
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.retry = retry or RetryPolicy(max_attempts=8, base_delay=5.0, max_delay=600.0)
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._new_jobs = threading.Event()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, order_id TEXT NOT NULL, "
+                "file_path TEXT NOT NULL, name TEXT, kind TEXT NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, "
+                "lease_until REAL, drive_url TEXT, file_id TEXT, error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS uploads_due ON uploads (status, next_attempt_at)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS uploads_order ON uploads (order_id)")
+
+    def enqueue(
+        self, order_id: str, file_path: str, kind: str = "file", name: Optional[str] = None
+    ) -> int:
+        """Add an upload job.
+
+        Args:
+            order_id: Unique identifier for the order
+            file_path: Path to the file to upload
+            kind: What the file is to the order, e.g. "design" or "excel"
+            name: Name of the file in Drive, defaults to the file name
+
+        Returns:
+            The job ID
+        """
+        now = self.clock()
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO uploads (order_id, file_path, name, kind, status, next_attempt_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (order_id, file_path, name, kind, PENDING, now, now, now),
+            )
+        self._new_jobs.set()
+        logger.info(f"Queued Drive upload {cursor.lastrowid} of {kind} for order {order_id}")
+        return cursor.lastrowid
+
+    def claim(self, limit: int = 8) -> list[dict[str, Any]]:
+        """Reserve due jobs for upload.
+
+        Due jobs are pending jobs whose backoff has passed and claimed jobs
+        whose lease expired. Each claim counts as an attempt.
+
+        Args:
+            limit: Maximum number of jobs to claim
+
+        Returns:
+            The claimed jobs, oldest first
+        """
+        now = self.clock()
+        with self._lock, self._db:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM uploads "
+                "WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND lease_until <= ?) "
+                "ORDER BY next_attempt_at, id LIMIT ?",
+                (PENDING, now, IN_PROGRESS, now, limit),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE uploads SET status = ?, attempts = attempts + 1, lease_until = ?, "
+                "updated_at = ? WHERE id = ?",
+                [(IN_PROGRESS, now + self.lease_seconds, now, row["id"]) for row in rows],
+            )
+        jobs = [dict(row) for row in rows]
+        for job in jobs:
+            job["status"] = IN_PROGRESS
+            job["attempts"] += 1
+        return jobs
+
+    def complete(self, job_id: int, result: dict[str, Any]) -> None:
+        """Mark a job uploaded, storing its Drive link."""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE uploads SET status = ?, drive_url = ?, file_id = ?, error = NULL, "
+                "lease_until = NULL, updated_at = ? WHERE id = ?",
+                (DONE, result.get("drive_url"), result.get("file_id"), self.clock(), job_id),
+            )
+
+    def fail(self, job_id: int, error: str) -> bool:
+        """Record a failed attempt of a job.
+
+        Returns:
+            True if the job will be retried, False if it has run out of attempts
+        """
+        now = self.clock()
+        with self._lock, self._db:
+            (attempts,) = self._db.execute(
+                "SELECT attempts FROM uploads WHERE id = ?", (job_id,)
+            ).fetchone()
+            retry = attempts < self.retry.max_attempts
+            self._db.execute(
+                "UPDATE uploads SET status = ?, next_attempt_at = ?, error = ?, "
+                "lease_until = NULL, updated_at = ? WHERE id = ?",
+                (
+                    PENDING if retry else FAILED,
+                    now + self.retry.backoff(attempts) if retry else now,
+                    error,
+                    now,
+                    job_id,
+                ),
+            )
+        return retry
+
+    def jobs(self, order_id: str) -> list[dict[str, Any]]:
+        """Get every upload job of an order."""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM uploads WHERE order_id = ? ORDER BY id", (order_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def unfinished(self, order_id: str) -> int:
+        """Count the jobs of an order that are not uploaded or failed yet."""
+        with self._lock:
+            (count,) = self._db.execute(
+                "SELECT COUNT(*) FROM uploads WHERE order_id = ? AND status IN (?, ?)",
+                (order_id, PENDING, IN_PROGRESS),
+            ).fetchone()
+        return count
+
+    def wait_for_jobs(self, timeout: float) -> None:
+        """Block until a job is enqueued or ``timeout`` seconds have passed."""
+        self._new_jobs.wait(timeout)
+        self._new_jobs.clear()
+
+    def notify(self) -> None:
+        """Wake up uploaders waiting in ``wait_for_jobs``."""
+        self._new_jobs.set()
+
+    def snapshot(self) -> dict[str, int]:
+        """Get the number of jobs per status as a plain dict."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) FROM uploads GROUP BY status"
+            ).fetchall()
+        counts = {PENDING: 0, IN_PROGRESS: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        """Close the SQLite file."""
+        with self._lock:
+            self._db.close()
+
+
+class DriveUploader:
+    """Background thread draining a ``DriveUploadOutbox``.
+
+    Claimed jobs are uploaded through the ``GoogleDriveManager`` upload
+    pool, so the pool's concurrency and the Google Drive circuit breaker
+    still apply. Once a job is uploaded, or has failed for good,
+    ``on_finished(job, result)`` is called; ``job["unfinished"]`` then holds
+    the number of jobs of the same order still waiting.
+    """
+
+    def __init__(
+        self,
+        outbox: DriveUploadOutbox,
+        drive_manager: Any,
+        on_finished: Optional[Callable[[dict[str, Any], dict[str, Any]], None]] = None,
+        poll_interval: float = 1.0,
+        batch_size: int = 8,
+    ):
+        """Initialize the uploader without starting it.
+
+        Args:
+            outbox: Outbox to drain
+            drive_manager: ``GoogleDriveManager`` to upload with
+            on_finished: Called with each finished job and its upload result
+            poll_interval: Seconds between checks for jobs whose backoff passed
+            batch_size: Jobs claimed and uploaded at a time
+        """
+        self.outbox = outbox
+        self.drive_manager = drive_manager
+        self.on_finished = on_finished
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start draining the outbox in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="drive-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the thread after the uploads in flight; queued jobs stay in the outbox."""
+        self._stopped.set()
+        self.outbox.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def drain(self) -> int:
+        """Upload one batch of due jobs.
+
+        Returns:
+            Number of jobs attempted
+        """
+        jobs = self.outbox.claim(self.batch_size)
+        uploads = [
+            (job, self.drive_manager.submit(job["order_id"], job["file_path"], name=job["name"]))
+            for job in jobs
+        ]
+        for job, future in uploads:
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            if result.get("success"):
+                self.outbox.complete(job["id"], result)
+            elif self.outbox.fail(job["id"], result.get("error") or "Upload failed"):
+                logger.warning(
+                    f"Drive upload {job['id']} of order {job['order_id']} failed "
+                    f"(attempt {job['attempts']}), retrying: {result.get('error')}"
+                )
+                continue
+            else:
+                logger.error(
+                    f"Drive upload {job['id']} of order {job['order_id']} failed "
+                    f"after {job['attempts']} attempts: {result.get('error')}"
+                )
+            self._finished(job, result)
+        return len(jobs)
+
+    def _finished(self, job: dict[str, Any], result: dict[str, Any]) -> None:
+        if self.on_finished is None:
+            return
+        job["unfinished"] = self.outbox.unfinished(job["order_id"])
+        try:
+            self.on_finished(job, result)
+        except Exception as e:
+            logger.error(f"Error recording Drive upload {job['id']}: {str(e)}")
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                attempted = self.drain()
+            except Exception as e:
+                logger.error(f"Error draining Drive upload outbox: {str(e)}")
+                attempted = 0
+            if attempted < self.batch_size:
+                self.outbox.wait_for_jobs(self.poll_interval)
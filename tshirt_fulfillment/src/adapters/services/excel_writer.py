@@ -0,0 +1,161 @@
+# Streaming Excel order sheets with a cached template
+
+import os
+import tempfile
+from collections.abc import Iterable
+from copy import copy
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+from typing import Optional
+
+from openpyxl import Workbook
+from openpyxl import load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment
+from openpyxl.styles import Font
+from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+
+# Characters Excel does not allow in sheet titles, and its title length limit
+INVALID_TITLE_CHARACTERS = str.maketrans(dict.fromkeys("[]:*?/\\", "_"))
+MAX_TITLE_LENGTH = 31
+
+
+@dataclass(frozen=True)
+class OrderSheetTemplate:
+    """Layout and styles of an order sheet, parsed once and reused.
+
+    Style objects are immutable in openpyxl, so one template is shared by
+    every workbook written from it.
+    """
+
+    title: str = "Order {order_id}"
+    headers: tuple[str, ...] = ("Field", "Value")
+    column_widths: tuple[float, ...] = (24, 48)
+    header_font: Font = Font(bold=True)
+    header_fill: PatternFill = PatternFill(
+        start_color="DDDDDD", end_color="DDDDDD", fill_type="solid"
+    )
+    header_alignment: Alignment = Alignment(horizontal="center")
+
+    def sheet_title(self, order_id: str) -> str:
+        """Get a valid sheet title for an order."""
+        title = self.title.format(order_id=order_id).translate(INVALID_TITLE_CHARACTERS)
+        return title[:MAX_TITLE_LENGTH]
+
+
+def get_order_template(template_path: Optional[str] = None) -> OrderSheetTemplate:
+    """Get the order sheet template, parsing a template file at most once.
+
+    The parsed template is cached until the file changes.
+
+    Args:
+        template_path: Optional .xlsx file whose first sheet gives the title
+            (with an optional "{order_id}" placeholder), the header row with
+            its styles and the column widths. Defaults to the built-in layout.
+
+    Returns:
+        OrderSheetTemplate for writing order sheets
+    """
+    if not template_path:
+        return OrderSheetTemplate()
+    return _load_template(template_path, os.stat(template_path).st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _load_template(template_path: str, mtime_ns: int) -> OrderSheetTemplate:
+    """Parse a template file (cached per file version)."""
+    workbook = load_workbook(template_path)
+    try:
+        sheet = workbook.worksheets[0]
+        header_cells = [cell for cell in sheet[1] if cell.value is not None]
+        if not header_cells:
+            raise ValueError(f"Excel template {template_path} has no header row")
+        first = header_cells[0]
+        return OrderSheetTemplate(
+            title=sheet.title,
+            headers=tuple(str(cell.value) for cell in header_cells),
+            column_widths=tuple(
+                sheet.column_dimensions[get_column_letter(cell.column)].width
+                for cell in header_cells
+            ),
+            header_font=copy(first.font),
+            header_fill=copy(first.fill),
+            header_alignment=copy(first.alignment),
+        )
+    finally:
+        workbook.close()
+
+
+def write_order_workbook(
+    file_path: str,
+    order_id: str,
+    customer_info: dict[str, Any],
+    template: Optional[OrderSheetTemplate] = None,
+) -> str:
+    """Write the order sheet of an order as an .xlsx file.
+
+    Uses openpyxl's write-only mode, so rows are streamed to the file
+    instead of building the workbook in memory. The file is written under
+    a temporary name and renamed, so readers never see a partial file.
+
+    Args:
+        file_path: Path of the .xlsx file to write
+        order_id: Unique identifier for the order
+        customer_info: Dictionary containing customer information
+        template: Sheet layout and styles. Defaults to the built-in one.
+
+    Returns:
+        file_path
+    """
+    template = template or OrderSheetTemplate()
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(template.sheet_title(order_id))
+    for index, width in enumerate(template.column_widths, start=1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+
+    sheet.append(header_row(sheet, template.headers, template))
+    sheet.append(["Order ID", cell_value(sheet, order_id)])
+    for key, value in customer_info.items():
+        sheet.append([cell_value(sheet, key), cell_value(sheet, value)])
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        workbook.save(temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return file_path
+
+
+def header_row(sheet: Any, headers: Iterable[str], template: OrderSheetTemplate) -> list[Any]:
+    """Get header cells styled like the template's, for a write-only sheet."""
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(sheet, value=header)
+        cell.font = template.header_font
+        cell.fill = template.header_fill
+        cell.alignment = template.header_alignment
+        cells.append(cell)
+    return cells
+
+
+def cell_value(sheet: Any, value: Any) -> Any:
+    """Cell value for customer input; numbers, booleans and dates stay typed.
+
+    Text that openpyxl would write as a formula is wrapped in a cell forced
+    to hold a string; everything else is appended as a plain value, which
+    is much cheaper than a cell object.
+    """
+    if value is None or isinstance(value, (bool, int, float, datetime)):
+        return value
+    text = str(value)
+    if not text.startswith("="):
+        return text
+    cell = WriteOnlyCell(sheet, value=text)
+    cell.data_type = "s"
+    return cell
@@ -1,182 +1,138 @@
 # Tool implementations for T-shirt Fulfillment AI Agent
 
+import contextvars
 import logging
 import os
+import shutil
+import threading
 import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Optional
 
 # Import configuration
-from config.settings import Config
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.drive_client import DriveClient
+from tshirt_fulfillment.src.adapters.services.drive_client import DriveError
+from tshirt_fulfillment.src.adapters.services.drive_client import ProgressCallback
+from tshirt_fulfillment.src.adapters.services.drive_folders import DriveFolderMap
+from tshirt_fulfillment.src.adapters.services.drive_outbox import DriveUploadOutbox
+from tshirt_fulfillment.src.adapters.services.excel_writer import get_order_template
+from tshirt_fulfillment.src.adapters.services.excel_writer import write_order_workbook
+from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.src.core.resilience import ResilienceError
+from tshirt_fulfillment.src.core.resilience import get_configured_dependency
+from tshirt_fulfillment.src.core.resilience import result_failed
 
 # Set up logging
 logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+# Upload pool shared by every GoogleDriveManager without its own, so managers
+# created per call start no threads of their own and uploads of all managers
+# together stay within the Google Drive concurrency limit
+_upload_pool: Optional[ThreadPoolExecutor] = None
+_upload_pool_lock = threading.Lock()
+
+
+def _shared_upload_pool() -> ThreadPoolExecutor:
+    """Get the shared Drive upload pool, starting it on first use."""
+    global _upload_pool
+    with _upload_pool_lock:
+        if _upload_pool is None:
+            # Not above the dependency's concurrency limit, so queued uploads are never rejected
+            _upload_pool = ThreadPoolExecutor(
+                max_workers=Config.DRIVE_MAX_CONCURRENCY,
+                thread_name_prefix="drive-upload",
+            )
+        return _upload_pool
+
+
+def shutdown_upload_pool() -> None:
+    """Wait for queued uploads and stop the shared Drive upload pool.
+
+    The pool is started again by the next upload.
+    """
+    global _upload_pool
+    with _upload_pool_lock:
+        pool, _upload_pool = _upload_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
 
 class DesignGenerator:
     """Tool for generating T-shirt designs.
 
     This class provides methods for generating T-shirt designs using either
     local Stable Diffusion or external APIs like DALL-E, depending on configuration.
+    Generation is delegated to a ``DesignServiceAdapter``, which holds the
+    provider, cache and scheduler.
     """
 
-    def __init__(self):
-        """Initialize the design generator based on configuration."""
-        self.config = Config.get_design_generator_config()
-        self.provider = self.config["provider"]
-        logger.info(f"Initializing DesignGenerator with provider: {self.provider}")
+    def __init__(
+        self,
+        worker_pool: Optional[Any] = None,
+        cache: Optional[Any] = None,
+        scheduler: Optional[Any] = None,
+        service: Optional[DesignServiceAdapter] = None,
+    ):
+        """Initialize the design generator based on configuration.
 
-        # Create output directory if it doesn't exist
-        os.makedirs(Config.DESIGN_OUTPUT_DIR, exist_ok=True)
+        Args:
+            worker_pool: Optional ``DesignWorkerPool`` running Stable
+                Diffusion in worker processes with the model kept loaded
+            cache: Optional ``DesignCache``; identical requests then reuse
+                one generated image
+            scheduler: Optional ``DesignJobScheduler`` deciding which
+                waiting job runs next on the provider
+            service: Design service to use. If given, the other arguments
+                are ignored.
+        """
+        self.service = service or DesignServiceAdapter(
+            worker_pool=worker_pool, cache=cache, scheduler=scheduler
+        )
+        self.provider = self.service.provider
+        logger.info(f"Initializing DesignGenerator with provider: {self.provider}")
 
-    def generate(self, order_id: str, prompt: str, style: Optional[str] = None) -> dict[str, Any]:
+    def generate(
+        self,
+        order_id: str,
+        prompt: str,
+        style: Optional[str] = None,
+        priority: Optional[str] = None,
+        customer_id: Optional[str] = None,
+    ) -> dict[str, Any]:
         """Generate a T-shirt design based on prompt.
 
         Args:
             order_id: Unique identifier for the order
             prompt: Design description
             style: Optional style parameter
+            priority: Scheduling priority ("rush", "standard" or "bulk")
+            customer_id: Customer the design is for, for fair scheduling
 
         Returns:
             Dict with success status and image path
         """
-        logger.info(f"Generating design for order {order_id} with prompt: {prompt}")
-
-        # Create order-specific directory
-        order_dir = os.path.join(Config.DESIGN_OUTPUT_DIR, order_id)
-        os.makedirs(order_dir, exist_ok=True)
-
-        try:
-            if self.provider == "stable_diffusion":
-                return self._generate_with_stable_diffusion(order_id, prompt, style)
-            elif self.provider == "dalle":
-                return self._generate_with_dalle(order_id, prompt, style)
-            else:
-                raise ValueError(f"Unknown design generator provider: {self.provider}")
-        except Exception as e:
-            logger.error(f"Error generating design: {str(e)}")
-            return {"success": False, "error": str(e)}
-
-    def _generate_with_stable_diffusion(
-        self, order_id: str, prompt: str, style: Optional[str] = None
-    ) -> dict[str, Any]:
-        """Generate design using local Stable Diffusion.
-
-        In a real implementation, this would use the diffusers library.
-        For this sample, we'll simulate the process.
-        """
-        try:
-            # In a real implementation, this would be:
-            #
-            # from diffusers import StableDiffusionPipeline
-            # import torch
-            #
-            # # Load model
-            # model_id = self.config["model"]
-            # pipe = StableDiffusionPipeline.from_pretrained(model_id)
-            # device = "cuda" if torch.cuda.is_available() and self.config["use_gpu"] else "cpu"
-            # pipe = pipe.to(device)
-            #
-            # # Add style to prompt if provided
-            # full_prompt = f"{prompt}, {style}" if style else prompt
-            #
-            # # Generate image
-            # start_time = time.time()
-            # image = pipe(full_prompt).images[0]
-            # generation_time = time.time() - start_time
-            #
-            # # Save image
-            # image_path = os.path.join(Config.DESIGN_OUTPUT_DIR, order_id, "design.png")
-            # image.save(image_path)
-
-            # For this sample, we'll simulate the process
-            logger.info(f"Simulating Stable Diffusion generation for order {order_id}")
-            time.sleep(2)  # Simulate processing time
-
-            # Create a placeholder image path
-            image_path = os.path.join(Config.DESIGN_OUTPUT_DIR, order_id, "design.png")
+        return self.service.generate_for_order(order_id, prompt, style, priority, customer_id)
 
-            # In a real implementation, the image would be saved here
-            # For now, just create an empty file
-            with open(image_path, "w") as f:
-                f.write("# This is a placeholder for a generated image")
 
-            return {
-                "success": True,
-                "image_path": image_path,
-                "prompt_used": prompt,
-                "style_applied": style,
-                "generation_time": "2.0s",
-                "provider": "stable_diffusion",
-            }
+class ExcelHandler:
+    """Tool for creating Excel files for orders.
 
-        except Exception as e:
-            logger.error(f"Error in Stable Diffusion generation: {str(e)}")
-            return {"success": False, "error": str(e)}
+    Order sheets are streamed with openpyxl's write-only mode from a
+    template parsed once and shared across orders.
+    """
 
-    def _generate_with_dalle(
-        self, order_id: str, prompt: str, style: Optional[str] = None
-    ) -> dict[str, Any]:
-        """Generate design using DALL-E API.
+    def __init__(self, blob_store: Optional[Any] = None):
+        """Initialize the Excel handler.
 
-        In a real implementation, this would use the OpenAI API.
-        For this sample, we'll simulate the process.
+        Args:
+            blob_store: Optional ``BlobStore`` order files are stored in,
+                instead of in a directory per order
         """
-        try:
-            # In a real implementation, this would be:
-            #
-            # import openai
-            # openai.api_key = self.config["api_key"]
-            #
-            # # Add style to prompt if provided
-            # full_prompt = f"{prompt}, {style}" if style else prompt
-            #
-            # # Generate image
-            # start_time = time.time()
-            # response = openai.Image.create(
-            #     prompt=full_prompt,
-            #     n=1,
-            #     size=self.config["size"]
-            # )
-            # generation_time = time.time() - start_time
-            #
-            # # Download and save image
-            # image_url = response['data'][0]['url']
-            # # Code to download image from URL and save to file
-            # image_path = os.path.join(Config.DESIGN_OUTPUT_DIR, order_id, "design.png")
-
-            # For this sample, we'll simulate the process
-            logger.info(f"Simulating DALL-E API generation for order {order_id}")
-            time.sleep(1)  # Simulate processing time
-
-            # Create a placeholder image path
-            image_path = os.path.join(Config.DESIGN_OUTPUT_DIR, order_id, "design.png")
-
-            # In a real implementation, the image would be saved here
-            # For now, just create an empty file
-            with open(image_path, "w") as f:
-                f.write("# This is a placeholder for a generated image")
-
-            return {
-                "success": True,
-                "image_path": image_path,
-                "prompt_used": prompt,
-                "style_applied": style,
-                "generation_time": "1.0s",
-                "provider": "dalle",
-            }
-
-        except Exception as e:
-            logger.error(f"Error in DALL-E generation: {str(e)}")
-            return {"success": False, "error": str(e)}
-
-
-class ExcelHandler:
-    """Tool for creating Excel files for orders."""
-
-    def __init__(self):
-        """Initialize the Excel handler."""
+        self.blob_store = blob_store
         logger.info("Initializing ExcelHandler")
 
         # Create output directory if it doesn't exist
@@ -194,145 +150,281 @@ class ExcelHandler:
         """
         logger.info(f"Creating Excel file for order {order_id}")
 
-        # Create order-specific directory
-        order_dir = os.path.join(Config.ORDER_FILES_DIR, order_id)
-        os.makedirs(order_dir, exist_ok=True)
+        # Create order-specific directory, or a scratch one to store from
+        if self.blob_store is not None:
+            order_dir = self.blob_store.scratch_dir()
+        else:
+            order_dir = os.path.join(Config.ORDER_FILES_DIR, order_id)
+            os.makedirs(order_dir, exist_ok=True)
 
         try:
-            # In a real implementation, this would use openpyxl:
-            #
-            # import openpyxl
-            # from openpyxl.styles import Font, Alignment, PatternFill
-            #
-            # # Create a new workbook and select the active worksheet
-            # wb = openpyxl.Workbook()
-            # ws = wb.active
-            # ws.title = f"Order {order_id}"
-            #
-            # # Add headers
-            # headers = ["Field", "Value"]
-            # ws.append(headers)
-            #
-            # # Style headers
-            # for col in range(1, 3):
-            #     cell = ws.cell(row=1, column=col)
-            #     cell.font = Font(bold=True)
-            #     cell.fill = PatternFill(
-            #         start_color="DDDDDD", end_color="DDDDDD", fill_type="solid"
-            #     )
-            #
-            # # Add customer info
-            # for key, value in customer_info.items():
-            #     ws.append([key, value])
-            #
-            # # Save the workbook
-            # file_path = os.path.join(order_dir, "order_details.xlsx")
-            # wb.save(file_path)
-
-            # For this sample, we'll simulate the process
-            logger.info(f"Simulating Excel file creation for order {order_id}")
-            time.sleep(0.5)  # Simulate processing time
-
-            # Create a placeholder Excel file
-            file_path = os.path.join(order_dir, "order_details.xlsx")
-
-            # In a real implementation, an Excel file would be created
-            # For now, just create a text file with the order details
-            with open(file_path.replace(".xlsx", ".txt"), "w") as f:
-                f.write(f"Order ID: {order_id}\n")
-                for key, value in customer_info.items():
-                    f.write(f"{key}: {value}\n")
+            file_path = write_order_workbook(
+                os.path.join(order_dir, "order_details.xlsx"),
+                order_id,
+                customer_info,
+                get_order_template(Config.EXCEL_TEMPLATE_PATH),
+            )
+
+            if self.blob_store is not None:
+                stored = self.blob_store.put_file(
+                    f"orders/{order_id}/order_details.xlsx", file_path, move=True
+                )
+                # The blob is named by digest; keep the name to upload it under
+                return {
+                    "success": True,
+                    "file_path": stored["path"],
+                    "file_name": stored["name"],
+                    "digest": stored["digest"],
+                }
 
             return {"success": True, "file_path": file_path}
 
         except Exception as e:
             logger.error(f"Error creating Excel file: {str(e)}")
             return {"success": False, "error": str(e)}
+        finally:
+            if self.blob_store is not None:
+                shutil.rmtree(order_dir, ignore_errors=True)
 
 
 class GoogleDriveManager:
-    """Tool for managing files in Google Drive."""
+    """Tool for managing files in Google Drive.
 
-    def __init__(self):
-        """Initialize the Google Drive manager."""
+    Uploads run on a bounded pool of threads shared by all managers (see
+    ``shutdown_upload_pool``): uploads beyond that wait in line instead of
+    being rejected, and the files of one order upload concurrently with
+    ``upload_files``.
+    """
+
+    def __init__(
+        self,
+        client: Optional[DriveClient] = None,
+        folder_map: Optional[DriveFolderMap] = None,
+        max_workers: Optional[int] = None,
+        outbox: Optional[DriveUploadOutbox] = None,
+    ):
+        """Initialize the Google Drive manager.
+
+        Args:
+            client: Drive client to upload with. Created from the configured
+                credentials if None; without credentials uploads are simulated.
+            folder_map: Map of orders to their Drive folders. Opened at
+                DRIVE_FOLDER_MAP_PATH if None.
+            max_workers: Concurrent uploads of a pool owned by this manager.
+                If None, the shared pool of DRIVE_MAX_CONCURRENCY threads is
+                used.
+            outbox: Outbox that ``enqueue_upload`` writes to. Without one,
+                queued uploads run inline.
+        """
         self.config = Config.get_google_drive_config()
+        self.dependency = get_configured_dependency("google_drive")
         logger.info("Initializing GoogleDriveManager")
 
-        if not self.config:
+        self.client = client
+        if self.client is None and self.config:
+            self.client = DriveClient(**self.config, **Config.get_drive_upload_config())
+        if self.client is None:
             logger.warning("Google Drive credentials not configured. Using local storage only.")
 
-    def upload_file(self, order_id: str, file_path: str) -> dict[str, Any]:
+        self.folder_map = folder_map
+        if self.folder_map is None and self.client is not None:
+            self.folder_map = DriveFolderMap(Config.DRIVE_FOLDER_MAP_PATH)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if max_workers:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="drive-upload"
+            )
+        self.outbox = outbox
+        # Files uploaded by a call still trying to share them, so retries do not upload again
+        self._unshared: dict[tuple[str, str, Optional[str]], tuple[dict[str, Any], str]] = {}
+        self._unshared_lock = threading.Lock()
+
+    def upload_file(
+        self,
+        order_id: str,
+        file_path: str,
+        progress: Optional[ProgressCallback] = None,
+        name: Optional[str] = None,
+    ) -> dict[str, Any]:
         """Upload a file to Google Drive.
 
+        Files are sent in resumable chunks, so an interrupted upload of a
+        large print file continues where it stopped. Failed uploads are
+        retried with backoff; calls are rejected immediately while the
+        Google Drive circuit is open.
+
         Args:
             order_id: Unique identifier for the order
             file_path: Path to the file to upload
+            progress: Optional callback taking (bytes_uploaded, total_bytes)
+            name: Name of the file in Drive, defaults to the file name. Set
+                it for files from a blob store, which are named by digest.
 
         Returns:
             Dict with success status and Drive URL
         """
+        return self.submit(order_id, file_path, progress, name).result()
+
+    def upload_files(self, order_id: str, file_paths: list[str]) -> dict[str, Any]:
+        """Upload several files of an order concurrently.
+
+        Args:
+            order_id: Unique identifier for the order
+            file_paths: Paths of the files to upload
+
+        Returns:
+            Dict with overall success status and the "files" result of
+            each upload, in order
+        """
+        futures = [self.submit(order_id, file_path) for file_path in file_paths]
+        files = [future.result() for future in futures]
+        return {"success": all(file["success"] for file in files), "files": files}
+
+    def enqueue_upload(
+        self, order_id: str, file_path: str, kind: str = "file", name: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Queue a file for upload by the background ``DriveUploader``.
+
+        The job is written to the outbox and the call returns at once, so
+        a slow Drive API does not hold up the order.
+
+        Args:
+            order_id: Unique identifier for the order
+            file_path: Path to the file to upload
+            kind: What the file is to the order, e.g. "design" or "excel"
+            name: Name of the file in Drive, defaults to the file name
+
+        Returns:
+            Dict with success status and the outbox "job_id", or the
+            ``upload_file`` result if there is no outbox
+        """
+        if self.outbox is None:
+            return self.upload_file(order_id, file_path, name=name)
+        try:
+            job_id = self.outbox.enqueue(order_id, file_path, kind, name)
+        except Exception as e:
+            logger.error(f"Error queueing Google Drive upload: {str(e)}")
+            return {"success": False, "error": str(e)}
+        return {"success": True, "queued": True, "job_id": job_id}
+
+    def submit(
+        self,
+        order_id: str,
+        file_path: str,
+        progress: Optional[ProgressCallback] = None,
+        name: Optional[str] = None,
+    ) -> Future:
+        """Queue a file upload on the upload pool.
+
+        Returns:
+            Future resolving to the result of ``upload_file``
+        """
+        # Run in the caller's context so its deadline applies to the upload
+        context = contextvars.copy_context()
+        executor = self._executor or _shared_upload_pool()
+        return executor.submit(
+            context.run, self._guarded_upload, order_id, file_path, progress, name
+        )
+
+    def close(self) -> None:
+        """Wait for queued uploads and stop the pool owned by this manager.
+
+        The shared pool is stopped with ``shutdown_upload_pool``.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _guarded_upload(
+        self,
+        order_id: str,
+        file_path: str,
+        progress: Optional[ProgressCallback],
+        name: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Upload through the Google Drive dependency guard."""
+        try:
+            return self.dependency.call(
+                self._upload_file, order_id, file_path, progress, name, is_failure=result_failed
+            )
+        except ResilienceError as e:
+            logger.error(f"Google Drive upload rejected: {str(e)}")
+            return {"success": False, "error": str(e)}
+        finally:
+            with self._unshared_lock:
+                self._unshared.pop((order_id, file_path, name), None)
+
+    def _upload_file(
+        self,
+        order_id: str,
+        file_path: str,
+        progress: Optional[ProgressCallback] = None,
+        name: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Upload a file to Google Drive in a single attempt.
+
+        A file that was uploaded by an earlier attempt of the same call
+        but could not be shared is only shared again, not uploaded twice.
+        """
         logger.info(f"Uploading {file_path} to Google Drive " f"for order {order_id}")
 
         try:
-            if not self.config:
+            if self.client is None:
                 return self._simulate_upload(order_id, file_path)
 
-            # In a real implementation, this would use the Google Drive API:
-            #
-            # from googleapiclient.discovery import build
-            # from google.oauth2.credentials import Credentials
-            # from googleapiclient.http import MediaFileUpload
-            #
-            # # Set up credentials
-            # credentials = Credentials.from_authorized_user_info({
-            #     "client_id": self.config["client_id"],
-            #     "client_secret": self.config["client_secret"],
-            #     "refresh_token": self.config["refresh_token"]
-            # })
-            #
-            # # Create Drive API client
-            # drive_service = build('drive', 'v3', credentials=credentials)
-            #
-            # # Create folder for order if it doesn't exist
-            # folder_metadata = {
-            #     'name': f'Order {order_id}',
-            #     'mimeType': 'application/vnd.google-apps.folder'
-            # }
-            # folder = drive_service.files().create(body=folder_metadata, fields='id').execute()
-            # folder_id = folder.get('id')
-            #
-            # # Upload file to folder
-            # file_metadata = {
-            #     'name': os.path.basename(file_path),
-            #     'parents': [folder_id]
-            # }
-            # media = MediaFileUpload(file_path)
-            # file = drive_service.files().create(
-            #     body=file_metadata,
-            #     media_body=media,
-            #     fields='id,webViewLink'
-            # ).execute()
-            #
-            # # Make file viewable by anyone with the link
-            # drive_service.permissions().create(
-            #     fileId=file.get('id'),
-            #     body={'type': 'anyone', 'role': 'reader'},
-            #     fields='id'
-            # ).execute()
-            #
-            # return {
-            #     "success": True,
-            #     "drive_url": file.get('webViewLink'),
-            #     "file_id": file.get('id'),
-            #     "folder_id": folder_id
-            # }
-
-            return self._simulate_upload(order_id, file_path)
+            key = (order_id, file_path, name)
+            with self._unshared_lock:
+                uploaded = self._unshared.get(key)
+            if uploaded is None:
+                uploaded = self._upload_to_order_folder(order_id, file_path, progress, name)
+                with self._unshared_lock:
+                    self._unshared[key] = uploaded
+            file, folder_id = uploaded
+            # Make file viewable by anyone with the link
+            self.client.share(file["id"])
+
+            return {
+                "success": True,
+                "drive_url": file.get("webViewLink"),
+                "file_id": file["id"],
+                "folder_id": folder_id,
+            }
 
         except Exception as e:
             logger.error(f"Error uploading to Google Drive: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    def _upload_to_order_folder(
+        self,
+        order_id: str,
+        file_path: str,
+        progress: Optional[ProgressCallback],
+        name: Optional[str],
+    ) -> tuple[dict[str, Any], str]:
+        """Upload a file into the order's folder; get its metadata and the folder ID."""
+        folder_id = self._order_folder(order_id)
+        try:
+            file = self.client.upload_file(
+                file_path, name=name, parent_id=folder_id, progress=progress
+            )
+        except DriveError as e:
+            if e.status != 404:
+                raise
+            # The folder was deleted in Drive; create it again
+            logger.warning(f"Drive folder of order {order_id} is gone, recreating it")
+            self.folder_map.forget(order_id)
+            folder_id = self._order_folder(order_id)
+            file = self.client.upload_file(
+                file_path, name=name, parent_id=folder_id, progress=progress
+            )
+        return file, folder_id
+
+    def _order_folder(self, order_id: str) -> str:
+        """Get the ID of the order's Drive folder, creating it on first use."""
+        return self.folder_map.get_or_create(
+            order_id, lambda: self.client.create_folder(f"Order {order_id}")["id"]
+        )
+
     def _simulate_upload(self, order_id: str, file_path: str) -> dict[str, Any]:
         """Simulate uploading a file to Google Drive."""
         logger.info(f"Simulating Google Drive upload for order {order_id}")
@@ -354,6 +446,7 @@ class CustomerNotifier:
 
     def __init__(self):
         """Initialize the customer notifier."""
+        self.dependency = get_configured_dependency("notifications")
         logger.info("Initializing CustomerNotifier")
 
     def send_notification(
@@ -369,7 +462,17 @@ class CustomerNotifier:
         Returns:
             Dict with success status and notification ID
         """
-        logger.info(f"Sending notification for order {order_id} " f"in {language}: {message}")
+        try:
+            return self.dependency.call(
+                self._send_notification, order_id, message, language, is_failure=result_failed
+            )
+        except ResilienceError as e:
+            logger.error(f"Notification rejected: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def _send_notification(self, order_id: str, message: str, language: str) -> dict[str, Any]:
+        """Send a notification to a customer in a single attempt."""
+        logger.info(f"Sending notification for order {order_id} in {language}: {message}")
 
         try:
             # In a real implementation, this would use an email or messaging service
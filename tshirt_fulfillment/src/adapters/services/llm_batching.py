@@ -0,0 +1,240 @@
+# Micro-batching of LLM requests
+
+import contextlib
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+import requests
+
+from tshirt_fulfillment.src.core.resilience import deadline_scope
+from tshirt_fulfillment.src.core.resilience import remaining_time
+
+logger = logging.getLogger(__name__)
+
+# A batch function receives the message lists of every request in the batch
+# and returns one response (or None) per request, in the same order.
+BatchFunction = Callable[[list[list[dict[str, Any]]]], list[Optional[str]]]
+
+# HTTP timeout of batch backends unless one is given
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+
+class LLMBatchDispatcher:
+    """Groups concurrent LLM requests into batches.
+
+    Callers block in ``submit`` while a collector thread gathers requests
+    arriving within ``max_wait`` seconds of the first one (or until
+    ``max_batch_size`` is reached), hands them to ``batch_fn`` in one call
+    and fans the responses back out to the waiting callers. A batch runs
+    under the latest deadline of its callers, so ``remaining_time`` in the
+    batch function never cuts a request short of its caller's deadline.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFunction,
+        max_batch_size: int = 8,
+        max_wait: float = 0.02,
+        max_concurrent_batches: int = 1,
+    ):
+        """Initialize the dispatcher.
+
+        Args:
+            batch_fn: Function that serves one batch of requests
+            max_batch_size: Maximum number of requests per batch
+            max_wait: Seconds to wait for more requests after the first one
+            max_concurrent_batches: Number of batches that may be in flight
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix="llm-batch"
+        )
+        self._lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._closed = False
+        self.batches_sent = 0
+        self.requests_sent = 0
+
+    def submit(self, messages: list[dict[str, Any]], timeout: Optional[float] = None) -> Any:
+        """Queue a request and wait for its response.
+
+        Args:
+            messages: Conversation messages for the request
+            timeout: Maximum seconds to wait for the response
+
+        Returns:
+            The response produced for this request by the batch function
+
+        Raises:
+            RuntimeError: If the dispatcher is closed
+            Exception: Whatever the batch function raised for this batch
+        """
+        future: Future = Future()
+        remaining = remaining_time()
+        deadline = time.monotonic() + remaining if remaining is not None else None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("LLM batch dispatcher is closed")
+            self._ensure_collector()
+            self._queue.put((messages, future, deadline))
+        return future.result(timeout=timeout)
+
+    def close(self) -> None:
+        """Stop the collector thread once queued requests are dispatched."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if self._collector is not None:
+            self._collector.join()
+        self._executor.shutdown(wait=True)
+
+    @property
+    def average_batch_size(self) -> float:
+        """Average number of requests per dispatched batch."""
+        return self.requests_sent / self.batches_sent if self.batches_sent else 0.0
+
+    def _ensure_collector(self) -> None:
+        """Start the collector thread on first use."""
+        if self._collector is None:
+            self._collector = threading.Thread(
+                target=self._collect, name="llm-batch-collector", daemon=True
+            )
+            self._collector.start()
+
+    def _collect(self) -> None:
+        """Collector loop: build batches and hand them to the executor."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self.batches_sent += 1
+            self.requests_sent += len(batch)
+            self._executor.submit(self._dispatch, batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: list[tuple[list[dict[str, Any]], Future, Optional[float]]]) -> None:
+        """Run one batch and resolve the futures of its callers."""
+        deadlines = [deadline for _, _, deadline in batch]
+        if None in deadlines:
+            scope = contextlib.nullcontext()
+        else:
+            scope = deadline_scope(max(deadlines) - time.monotonic())
+        try:
+            with scope:
+                responses = self.batch_fn([messages for messages, _, _ in batch])
+            if len(responses) != len(batch):
+                raise ValueError(
+                    f"Batch function returned {len(responses)} responses for {len(batch)} requests"
+                )
+        except Exception as e:
+            logger.error(f"Error serving LLM batch of {len(batch)}: {str(e)}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, _), response in zip(batch, responses):
+            future.set_result(response)
+
+
+class OllamaBatchBackend:
+    """Batch function for Ollama-compatible servers.
+
+    If ``batch_url`` is set, the whole batch is sent in a single request as
+    ``{"model", "requests": [{"messages": ...}, ...]}`` and the server must
+    answer ``{"responses": [...]}`` in order (a batching proxy in front of
+    the model). Otherwise every request is sent to ``/api/generate``
+    concurrently, which still lets a server with parallel slots overlap them.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model_name: str,
+        batch_url: Optional[str] = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+    ):
+        """Initialize the backend.
+
+        Args:
+            base_url: Base URL of the Ollama server
+            model_name: Name of the model to use
+            batch_url: Optional URL of a batch endpoint
+            timeout: HTTP timeout in seconds, shortened to the deadline of
+                the batch. None waits for the server indefinitely.
+        """
+        self.base_url = base_url
+        self.model_name = model_name
+        self.batch_url = batch_url
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def __call__(self, batch: list[list[dict[str, Any]]]) -> list[Optional[str]]:
+        """Serve a batch of requests."""
+        if self.batch_url:
+            response = self._session.post(
+                self.batch_url,
+                json={
+                    "model": self.model_name,
+                    "requests": [{"messages": messages} for messages in batch],
+                    "stream": False,
+                },
+                timeout=remaining_time(self.timeout),
+            )
+            response.raise_for_status()
+            return response.json()["responses"]
+
+        if len(batch) == 1:
+            return [self._generate(batch[0])]
+        # Each request runs in a copy of this context, so the batch deadline applies
+        contexts = [contextvars.copy_context() for _ in batch]
+        with ThreadPoolExecutor(max_workers=len(batch)) as pool:
+            return list(pool.map(self._generate_in, contexts, batch))
+
+    def _generate_in(
+        self, context: contextvars.Context, messages: list[dict[str, Any]]
+    ) -> Optional[str]:
+        """Send a single request in the given context."""
+        return context.run(self._generate, messages)
+
+    def _generate(self, messages: list[dict[str, Any]]) -> Optional[str]:
+        """Send a single request to ``/api/generate``."""
+        response = self._session.post(
+            f"{self.base_url}/api/generate",
+            json={"model": self.model_name, "messages": messages, "stream": False},
+            timeout=remaining_time(self.timeout),
+        )
+        response.raise_for_status()
+        return response.json()["response"]
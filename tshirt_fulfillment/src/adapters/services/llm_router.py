@@ -0,0 +1,277 @@
+# Latency-aware routing across several LLM backends
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+import requests
+
+from tshirt_fulfillment.src.core.prompts import DESIGN_REQUEST
+from tshirt_fulfillment.src.core.prompts import INTENT_REQUEST
+from tshirt_fulfillment.src.core.resilience import deadline_scope
+from tshirt_fulfillment.src.core.resilience import remaining_time
+
+logger = logging.getLogger(__name__)
+
+# Quality tiers: higher tiers are larger, better models
+SMALL_MODEL_TIER = 1
+LARGE_MODEL_TIER = 2
+
+DEFAULT_REQUEST_TIERS = {
+    INTENT_REQUEST: SMALL_MODEL_TIER,
+    DESIGN_REQUEST: LARGE_MODEL_TIER,
+}
+
+
+class LatencyTracker:
+    """Rolling latency and error statistics for one backend."""
+
+    def __init__(self, window: int = 100, clock: Callable[[], float] = time.monotonic):
+        """Initialize the tracker.
+
+        Args:
+            window: Number of most recent calls kept
+            clock: Time source, overridable for tests
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=window)
+        self._outcomes: deque = deque(maxlen=window)
+        self.last_failure: Optional[float] = None
+
+    def record(self, latency: float, success: bool) -> None:
+        """Record one call."""
+        with self._lock:
+            self._outcomes.append(success)
+            if success:
+                self._latencies.append(latency)
+            else:
+                self.last_failure = self._clock()
+
+    @property
+    def samples(self) -> int:
+        """Number of calls in the window."""
+        with self._lock:
+            return len(self._outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of failed calls in the window."""
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Get a latency percentile of successful calls, in seconds.
+
+        Args:
+            percent: Percentile between 0 and 100
+
+        Returns:
+            The latency, or None if no call has succeeded yet
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(percent / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def seconds_since_failure(self) -> Optional[float]:
+        """Seconds since the last failed call, or None if none failed."""
+        if self.last_failure is None:
+            return None
+        return self._clock() - self.last_failure
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the current statistics as a plain dict."""
+        return {
+            "samples": self.samples,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "error_rate": self.error_rate,
+        }
+
+
+class ModelBackend:
+    """One LLM backend the router can send requests to."""
+
+    def __init__(
+        self,
+        name: str,
+        complete: Callable[[list[dict[str, Any]]], Optional[str]],
+        tier: int,
+        tracker: Optional[LatencyTracker] = None,
+    ):
+        """Initialize the backend.
+
+        Args:
+            name: Backend name used in logs and metrics
+            complete: Function sending messages to the model and returning
+                the response text
+            tier: Quality tier of the model
+            tracker: Latency tracker, created if not given
+        """
+        self.name = name
+        self.complete = complete
+        self.tier = tier
+        self.tracker = tracker or LatencyTracker()
+
+
+class OllamaModel:
+    """Completion function for one model on an Ollama server."""
+
+    def __init__(self, base_url: str, model_name: str, timeout: Optional[float] = None):
+        """Initialize the completion function.
+
+        Args:
+            base_url: Base URL of the Ollama server
+            model_name: Name of the model to use
+            timeout: Optional HTTP timeout in seconds, shortened to the
+                active deadline
+        """
+        self.base_url = base_url
+        self.model_name = model_name
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def __call__(self, messages: list[dict[str, Any]]) -> Optional[str]:
+        """Send messages to ``/api/generate`` and return the response text."""
+        response = self._session.post(
+            f"{self.base_url}/api/generate",
+            json={"model": self.model_name, "messages": messages, "stream": False},
+            timeout=remaining_time(self.timeout),
+        )
+        response.raise_for_status()
+        return response.json()["response"]
+
+
+class LLMRouter:
+    """Routes each request to the fastest healthy model good enough for it.
+
+    Every request class needs a minimum quality tier. Among the backends at
+    or above that tier, healthy ones (error rate within the limit) are
+    tried first, fastest p95 latency first. Backends without enough
+    samples yet are tried before measured ones so every backend gets
+    measured. An unhealthy backend is probed again once
+    ``recovery_seconds`` have passed since its last failure.
+    """
+
+    def __init__(
+        self,
+        backends: list[ModelBackend],
+        request_tiers: Optional[dict[str, int]] = None,
+        max_error_rate: float = 0.2,
+        min_samples: int = 5,
+        recovery_seconds: float = 30.0,
+    ):
+        """Initialize the router.
+
+        Args:
+            backends: Available model backends
+            request_tiers: Minimum quality tier per request class
+            max_error_rate: Highest error rate of a healthy backend
+            min_samples: Calls needed before a backend's latency is trusted
+            recovery_seconds: Seconds before an unhealthy backend is probed
+        """
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = backends
+        self.request_tiers = dict(DEFAULT_REQUEST_TIERS)
+        if request_tiers:
+            self.request_tiers.update(request_tiers)
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.recovery_seconds = recovery_seconds
+
+    def candidates(self, request_class: str) -> list[ModelBackend]:
+        """Get the backends for a request class in the order they are tried.
+
+        Args:
+            request_class: Request class, e.g. ``INTENT_REQUEST``
+
+        Returns:
+            Backends meeting the quality tier, best first. If no backend
+            meets the tier, the highest-tier backends are used instead.
+        """
+        required_tier = self.request_tiers.get(request_class, SMALL_MODEL_TIER)
+        eligible = [backend for backend in self.backends if backend.tier >= required_tier]
+        if not eligible:
+            best_tier = max(backend.tier for backend in self.backends)
+            eligible = [backend for backend in self.backends if backend.tier == best_tier]
+
+        return sorted(eligible, key=self._rank)
+
+    def select(self, request_class: str) -> ModelBackend:
+        """Get the backend the next request of a class will go to."""
+        return self.candidates(request_class)[0]
+
+    def complete(
+        self,
+        messages: list[dict[str, Any]],
+        request_class: str,
+        timeout: Optional[float] = None,
+    ) -> Optional[str]:
+        """Send a request to the best backend, falling back on errors.
+
+        Args:
+            messages: Conversation messages
+            request_class: Request class, e.g. ``DESIGN_REQUEST``
+            timeout: Optional seconds for the whole request, fallbacks
+                included. Backends see it as the active deadline.
+
+        Returns:
+            Response text from the first backend that succeeded
+
+        Raises:
+            DeadlineExceededError: If the deadline passed before a backend
+                answered
+            Exception: The last error if every candidate backend failed
+        """
+        last_error: Optional[Exception] = None
+        with deadline_scope(timeout) if timeout is not None else nullcontext():
+            for backend in self.candidates(request_class):
+                # Raises instead of trying another backend past the deadline
+                remaining_time()
+                start = time.perf_counter()
+                try:
+                    response = backend.complete(messages)
+                except Exception as e:
+                    backend.tracker.record(time.perf_counter() - start, success=False)
+                    logger.warning(f"LLM backend {backend.name} failed: {str(e)}")
+                    last_error = e
+                    continue
+                backend.tracker.record(time.perf_counter() - start, success=True)
+                return response
+
+        raise last_error
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Get the statistics of every backend."""
+        return {
+            backend.name: {"tier": backend.tier, **backend.tracker.snapshot()}
+            for backend in self.backends
+        }
+
+    def _is_healthy(self, backend: ModelBackend) -> bool:
+        if backend.tracker.error_rate <= self.max_error_rate:
+            return True
+        since_failure = backend.tracker.seconds_since_failure()
+        return since_failure is not None and since_failure >= self.recovery_seconds
+
+    def _rank(self, backend: ModelBackend) -> tuple:
+        healthy = self._is_healthy(backend)
+        measured = backend.tracker.samples >= self.min_samples
+        p95 = backend.tracker.percentile(95)
+        return (
+            not healthy,
+            measured,
+            p95 if p95 is not None else 0.0,
+            backend.tracker.error_rate,
+        )
@@ -0,0 +1,210 @@
+# Consolidated Excel export of many orders
+
+import logging
+import os
+import tempfile
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+from typing import Optional
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from tshirt_fulfillment.src.adapters.services.excel_writer import MAX_TITLE_LENGTH
+from tshirt_fulfillment.src.adapters.services.excel_writer import OrderSheetTemplate
+from tshirt_fulfillment.src.adapters.services.excel_writer import cell_value
+from tshirt_fulfillment.src.adapters.services.excel_writer import header_row
+
+logger = logging.getLogger(__name__)
+
+# Excel's row limit per sheet, less the header row
+EXCEL_MAX_DATA_ROWS = 1_048_575
+
+EXPORT_COLUMNS = (
+    ("Order ID", 28),
+    ("Created", 20),
+    ("Status", 16),
+    ("Customer", 24),
+    ("Email", 28),
+    ("Size", 8),
+    ("Color", 12),
+    ("Quantity", 10),
+    ("Design Prompt", 48),
+    ("Design File", 40),
+    ("Excel File", 40),
+    ("Drive Link", 40),
+)
+
+
+def order_row(order: Any) -> list[Any]:
+    """Get the export row of an order."""
+    result = order.result or {}
+    created_at = getattr(order, "created_at", None)
+    return [
+        getattr(order, "id", None) or order.order_id,
+        datetime.fromtimestamp(created_at) if created_at else None,
+        _status(order),
+        order.customer_name,
+        order.customer_email,
+        order.size,
+        order.color,
+        order.quantity,
+        order.design_prompt,
+        _result_field(result, "design_path"),
+        _result_field(result, "excel_path"),
+        _result_field(result, "drive_link"),
+    ]
+
+
+class _ExportFile:
+    """One workbook of an export, with its sheets being appended to."""
+
+    def __init__(self, path: str, template: OrderSheetTemplate):
+        self.path = path
+        self.template = template
+        self.workbook = Workbook(write_only=True)
+        self.sheets: dict[str, Any] = {}  # group -> current sheet
+        self.sheet_rows: dict[str, int] = {}  # group -> rows in current sheet
+        self.sheet_counts: dict[str, int] = {}  # group -> sheets so far
+        self.rows = 0
+
+    def append(self, group: str, row: list[Any], max_sheet_rows: int) -> None:
+        """Append a row to the group's sheet, starting a new sheet when full."""
+        if group not in self.sheets or self.sheet_rows[group] >= max_sheet_rows:
+            self.add_sheet(group)
+        sheet = self.sheets[group]
+        sheet.append([cell_value(sheet, value) for value in row])
+        self.sheet_rows[group] += 1
+        self.rows += 1
+
+    def save(self) -> None:
+        """Write the workbook under a temporary name and rename it into place."""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        os.close(fd)
+        try:
+            self.workbook.save(temp_path)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def add_sheet(self, group: str) -> None:
+        """Start a new sheet for the group, with the header row."""
+        count = self.sheet_counts.get(group, 0) + 1
+        suffix = f" ({count})" if count > 1 else ""
+        title = f"{group[: MAX_TITLE_LENGTH - len(suffix)]}{suffix}"
+        sheet = self.workbook.create_sheet(title)
+        for index, (_, width) in enumerate(EXPORT_COLUMNS, start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+        sheet.append(header_row(sheet, [name for name, _ in EXPORT_COLUMNS], self.template))
+        self.sheets[group] = sheet
+        self.sheet_rows[group] = 0
+        self.sheet_counts[group] = count
+
+
+class OrderExcelExporter:
+    """Exports many orders into consolidated workbooks, one row per order.
+
+    Orders are streamed from an iterable into write-only workbooks, so
+    memory does not grow with the number of orders. A sheet rolls over to
+    a new one at ``max_sheet_rows`` rows and a file to a new one at
+    ``max_file_rows`` rows; the file limit also bounds openpyxl's shared
+    string table, the one structure that grows with the rows of a file.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        max_sheet_rows: int = EXCEL_MAX_DATA_ROWS,
+        max_file_rows: int = 2_000_000,
+        template: Optional[OrderSheetTemplate] = None,
+    ):
+        """Initialize the exporter.
+
+        Args:
+            output_dir: Directory the export files are written to
+            max_sheet_rows: Maximum orders per sheet, at most Excel's limit
+            max_file_rows: Maximum orders per file
+            template: Header styles. Defaults to the built-in order sheet ones.
+        """
+        if not 0 < max_sheet_rows <= EXCEL_MAX_DATA_ROWS:
+            raise ValueError(f"max_sheet_rows must be between 1 and {EXCEL_MAX_DATA_ROWS}")
+        self.output_dir = output_dir
+        self.max_sheet_rows = max_sheet_rows
+        self.max_file_rows = max_file_rows
+        self.template = template or OrderSheetTemplate()
+
+    def export(
+        self,
+        orders: Iterable[Any],
+        batch_name: Optional[str] = None,
+        split_by_status: bool = False,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> dict[str, Any]:
+        """Export orders into one or more workbooks.
+
+        Args:
+            orders: Orders to export, e.g. ``OrderRepository.iter_all()``
+            batch_name: File name prefix. Defaults to "orders-<date>".
+            split_by_status: Put each status on its own sheet
+            since: Only export orders created at or after this timestamp
+            until: Only export orders created before this timestamp
+
+        Returns:
+            Dict with success status, the written "files", and the number
+            of exported "orders"
+        """
+        if batch_name is None:
+            day = datetime.fromtimestamp(since).date() if since else datetime.now().date()
+            batch_name = f"orders-{day}"
+        if os.path.basename(batch_name) != batch_name or batch_name in (".", ".."):
+            return {"success": False, "error": f"Invalid batch name: {batch_name}", "files": []}
+        files: list[str] = []
+        current: Optional[_ExportFile] = None
+        exported = 0
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            for order in orders:
+                created_at = getattr(order, "created_at", None) or 0
+                if (since is not None and created_at < since) or (
+                    until is not None and created_at >= until
+                ):
+                    continue
+                if current is None or current.rows >= self.max_file_rows:
+                    current = self._next_file(current, batch_name, files)
+                group = _status(order) if split_by_status else "Orders"
+                current.append(group, order_row(order), self.max_sheet_rows)
+                exported += 1
+            if current is None:
+                # Nothing to export; still write the header
+                current = self._next_file(None, batch_name, files)
+                current.add_sheet("Orders")
+            current.save()
+        except Exception as e:
+            logger.error(f"Error exporting orders to {batch_name}: {str(e)}")
+            return {"success": False, "error": str(e), "files": files[:-1]}
+
+        logger.info(f"Exported {exported} orders to {len(files)} file(s) for {batch_name}")
+        return {"success": True, "files": files, "orders": exported}
+
+    def _next_file(
+        self, current: Optional[_ExportFile], batch_name: str, files: list[str]
+    ) -> _ExportFile:
+        """Save the current file, if any, and start the next one."""
+        if current is not None:
+            current.save()
+        path = os.path.join(self.output_dir, f"{batch_name}-{len(files) + 1:03d}.xlsx")
+        files.append(path)
+        return _ExportFile(path, self.template)
+
+
+def _status(order: Any) -> str:
+    return getattr(order.status, "value", order.status) or "unknown"
+
+
+def _result_field(result: Any, name: str) -> Optional[str]:
+    if isinstance(result, dict):
+        return result.get(name)
+    return getattr(result, name, None)
@@ -24,6 +24,32 @@ class Config:
     # LLM Settings
     LLM_PROVIDER = os.getenv("LLM_PROVIDER", "mistral")
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434")
+    LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", "4096"))
+    LLM_RESPONSE_TOKENS = int(os.getenv("LLM_RESPONSE_TOKENS", "512"))
+
+    # LLM Batching Settings
+    LLM_BATCHING_ENABLED = os.getenv("LLM_BATCHING_ENABLED", "false").lower() == "true"
+    LLM_BATCH_URL = os.getenv("LLM_BATCH_URL", "")  # Batch endpoint; empty means fan out
+    LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "8"))
+    LLM_BATCH_WINDOW_MS = int(os.getenv("LLM_BATCH_WINDOW_MS", "20"))
+
+    # LLM Router Settings
+    # Comma-separated "model=tier" pairs, e.g. "phi3=1,mistral=2"; empty disables routing
+    LLM_ROUTER_MODELS = os.getenv("LLM_ROUTER_MODELS", "")
+    LLM_INTENT_TIER = int(os.getenv("LLM_INTENT_TIER", "1"))
+    LLM_DESIGN_TIER = int(os.getenv("LLM_DESIGN_TIER", "2"))
+    LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.2"))
+
+    # Resilience Settings
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    DRIVE_TIMEOUT_SECONDS = float(os.getenv("DRIVE_TIMEOUT_SECONDS", "120"))
+    DRIVE_MAX_CONCURRENCY = int(os.getenv("DRIVE_MAX_CONCURRENCY", "4"))
+    NOTIFICATION_TIMEOUT_SECONDS = float(os.getenv("NOTIFICATION_TIMEOUT_SECONDS", "10"))
+    NOTIFICATION_MAX_CONCURRENCY = int(os.getenv("NOTIFICATION_MAX_CONCURRENCY", "16"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RECOVERY_SECONDS = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
 
     # Logging Settings
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -40,10 +66,63 @@ class Config:
     GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
     GOOGLE_REFRESH_TOKEN = os.getenv("GOOGLE_REFRESH_TOKEN", "")
+    # API endpoints can point at a local fake server (utils/fake_drive.py)
+    DRIVE_API_URL = os.getenv("DRIVE_API_URL", "https://www.googleapis.com")
+    DRIVE_TOKEN_URL = os.getenv("DRIVE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+    # Resumable upload chunk size (a multiple of 256 KiB) and resumes per upload
+    DRIVE_CHUNK_SIZE_KB = int(os.getenv("DRIVE_CHUNK_SIZE_KB", "8192"))
+    DRIVE_MAX_RESUMES = int(os.getenv("DRIVE_MAX_RESUMES", "5"))
+    # Drive request quota per user (batched calls count individually); 0 disables pacing
+    DRIVE_REQUESTS_PER_SECOND = float(os.getenv("DRIVE_REQUESTS_PER_SECOND", "10"))
+    DRIVE_REQUEST_BURST = int(os.getenv("DRIVE_REQUEST_BURST", "20"))
+    # Milliseconds a permission grant waits for others to share one batch request
+    DRIVE_BATCH_WINDOW_MS = int(os.getenv("DRIVE_BATCH_WINDOW_MS", "50"))
+    # SQLite file remembering the Drive folder of each order
+    DRIVE_FOLDER_MAP_PATH = os.getenv("DRIVE_FOLDER_MAP_PATH", "drive_folders.sqlite3")
+    # Upload order files in the background from a SQLite outbox
+    DRIVE_OUTBOX_ENABLED = os.getenv("DRIVE_OUTBOX_ENABLED", "false").lower() == "true"
+    DRIVE_OUTBOX_PATH = os.getenv("DRIVE_OUTBOX_PATH", "drive_outbox.sqlite3")
+    DRIVE_OUTBOX_MAX_ATTEMPTS = int(os.getenv("DRIVE_OUTBOX_MAX_ATTEMPTS", "8"))
+    DRIVE_OUTBOX_RETRY_DELAY_SECONDS = float(os.getenv("DRIVE_OUTBOX_RETRY_DELAY_SECONDS", "5"))
+    DRIVE_OUTBOX_POLL_SECONDS = float(os.getenv("DRIVE_OUTBOX_POLL_SECONDS", "1"))
 
     # Design Generator Configuration
     DESIGN_GENERATOR = os.getenv("DESIGN_GENERATOR", "local")  # 'local' or 'api'
     DALLE_API_KEY = os.getenv("DALLE_API_KEY", "")  # Only needed if using DALL-E
+    # Worker processes keeping the design model loaded; 0 generates in-process
+    DESIGN_WORKERS = int(os.getenv("DESIGN_WORKERS", "0"))
+    DESIGN_JOB_TIMEOUT_SECONDS = float(os.getenv("DESIGN_JOB_TIMEOUT_SECONDS", "300"))
+    # Prompts per model batch, and concurrent generations for providers without batching
+    DESIGN_BATCH_SIZE = int(os.getenv("DESIGN_BATCH_SIZE", "4"))
+    DESIGN_BATCH_CONCURRENCY = int(os.getenv("DESIGN_BATCH_CONCURRENCY", "4"))
+    # Concurrent design jobs per provider ("provider=limit,..."); empty disables scheduling
+    DESIGN_PROVIDER_CONCURRENCY = os.getenv(
+        "DESIGN_PROVIDER_CONCURRENCY", "stable_diffusion=2,dalle=4"
+    )
+    # Waiting design jobs move up one priority class after this many seconds
+    DESIGN_PRIORITY_AGING_SECONDS = float(os.getenv("DESIGN_PRIORITY_AGING_SECONDS", "30"))
+    SPECULATIVE_DESIGN_ENABLED = os.getenv("SPECULATIVE_DESIGN_ENABLED", "false").lower() == "true"
+    # Minimum word overlap (0-1) between customer message and LLM prompt to keep the speculation
+    SPECULATIVE_DESIGN_SIMILARITY = float(os.getenv("SPECULATIVE_DESIGN_SIMILARITY", "0.6"))
+    SPECULATIVE_DESIGN_WORKERS = int(os.getenv("SPECULATIVE_DESIGN_WORKERS", "4"))
+    # Content-addressed cache of generated designs, shared by identical requests
+    DESIGN_CACHE_ENABLED = os.getenv("DESIGN_CACHE_ENABLED", "false").lower() == "true"
+    DESIGN_CACHE_DIR = os.getenv("DESIGN_CACHE_DIR", "designs/.cache")
+    DESIGN_CACHE_MAX_MB = int(os.getenv("DESIGN_CACHE_MAX_MB", "1024"))
+    DESIGN_CACHE_MAX_ENTRIES = int(os.getenv("DESIGN_CACHE_MAX_ENTRIES", "0"))  # 0 for no limit
+    # Processes rendering thumbnail, preview and print variants; 0 disables post-processing
+    DESIGN_POSTPROCESS_WORKERS = int(os.getenv("DESIGN_POSTPROCESS_WORKERS", "0"))
+    DESIGN_THUMBNAIL_SIZE = int(os.getenv("DESIGN_THUMBNAIL_SIZE", "256"))
+    DESIGN_PREVIEW_SIZE = int(os.getenv("DESIGN_PREVIEW_SIZE", "1024"))
+    DESIGN_PREVIEW_QUALITY = int(os.getenv("DESIGN_PREVIEW_QUALITY", "75"))
+    DESIGN_PRINT_SIZE = os.getenv("DESIGN_PRINT_SIZE", "4500x5400")  # 15x18in at 300 DPI
+    DESIGN_PRINT_DPI = int(os.getenv("DESIGN_PRINT_DPI", "300"))
+
+    # Content-addressed store for design and order artifacts
+    BLOB_STORE_ENABLED = os.getenv("BLOB_STORE_ENABLED", "false").lower() == "true"
+    BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "artifacts")
+    # Unreferenced blobs are kept this long before garbage collection deletes them
+    BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
 
     # Application Settings
     MAX_AGENT_ITERATIONS = int(os.getenv("MAX_AGENT_ITERATIONS", "10"))
@@ -51,6 +130,15 @@ class Config:
     # Paths Configuration
     DESIGN_OUTPUT_DIR = os.getenv("DESIGN_OUTPUT_DIR", "designs")
     ORDER_FILES_DIR = os.getenv("ORDER_FILES_DIR", "orders")
+    # Optional .xlsx whose first sheet sets the order sheet title, header row and column widths
+    EXCEL_TEMPLATE_PATH = os.getenv("EXCEL_TEMPLATE_PATH", "")
+    # Consolidated order exports roll over to a new sheet / file at these row counts
+    ORDER_EXPORT_DIR = os.getenv("ORDER_EXPORT_DIR", "exports")
+    ORDER_EXPORT_MAX_SHEET_ROWS = int(os.getenv("ORDER_EXPORT_MAX_SHEET_ROWS", "1048575"))
+    ORDER_EXPORT_MAX_FILE_ROWS = int(os.getenv("ORDER_EXPORT_MAX_FILE_ROWS", "2000000"))
+    # Columnar analytics export: "parquet" (needs pyarrow, else falls back to CSV) or "csv"
+    ANALYTICS_EXPORT_DIR = os.getenv("ANALYTICS_EXPORT_DIR", "analytics")
+    ANALYTICS_EXPORT_FORMAT = os.getenv("ANALYTICS_EXPORT_FORMAT", "parquet")
 
     @classmethod
     def get_llm_config(cls) -> dict[str, Any]:
@@ -69,17 +157,117 @@ class Config:
                 "temperature": 0.7,
             }
 
+    @classmethod
+    def get_llm_batching_config(cls) -> Optional[dict[str, Any]]:
+        """Get LLM micro-batching configuration if batching is enabled."""
+        if not cls.LLM_BATCHING_ENABLED:
+            return None
+        return {
+            "batch_url": cls.LLM_BATCH_URL or None,
+            "max_batch_size": cls.LLM_BATCH_MAX_SIZE,
+            "max_wait": cls.LLM_BATCH_WINDOW_MS / 1000,
+        }
+
+    @classmethod
+    def get_llm_router_config(cls) -> Optional[dict[str, Any]]:
+        """Get multi-model routing configuration if router models are set."""
+        models = []
+        for entry in cls.LLM_ROUTER_MODELS.split(","):
+            if not entry.strip():
+                continue
+            name, _, tier = entry.strip().partition("=")
+            models.append({"name": name, "tier": int(tier or 1)})
+        if not models:
+            return None
+        return {
+            "models": models,
+            "request_tiers": {"intent": cls.LLM_INTENT_TIER, "design": cls.LLM_DESIGN_TIER},
+            "max_error_rate": cls.LLM_ROUTER_MAX_ERROR_RATE,
+        }
+
+    @classmethod
+    def get_resilience_config(cls, dependency: str) -> dict[str, Any]:
+        """Get circuit breaker, retry and concurrency settings for a dependency."""
+        limits = {
+            "ollama": (cls.LLM_TIMEOUT_SECONDS, cls.LLM_MAX_CONCURRENCY),
+            "google_drive": (cls.DRIVE_TIMEOUT_SECONDS, cls.DRIVE_MAX_CONCURRENCY),
+            "notifications": (cls.NOTIFICATION_TIMEOUT_SECONDS, cls.NOTIFICATION_MAX_CONCURRENCY),
+        }
+        timeout, max_concurrency = limits.get(dependency, (None, 8))
+        return {
+            "timeout": timeout,
+            "max_concurrency": max_concurrency,
+            "failure_threshold": cls.CIRCUIT_FAILURE_THRESHOLD,
+            "recovery_timeout": cls.CIRCUIT_RECOVERY_SECONDS,
+            "max_attempts": cls.RETRY_MAX_ATTEMPTS,
+        }
+
     @classmethod
     def get_design_generator_config(cls) -> dict[str, Any]:
-        """Get design generator configuration."""
-        if cls.DESIGN_GENERATOR == "api":
-            return {"provider": "dalle", "api_key": cls.DALLE_API_KEY, "size": "1024x1024"}
-        else:
-            return {
-                "provider": "stable_diffusion",
+        """Get the configuration of the selected design provider."""
+        provider = "dalle" if cls.DESIGN_GENERATOR == "api" else "stable_diffusion"
+        return {"provider": provider, **cls.get_design_provider_configs()[provider]}
+
+    @classmethod
+    def get_design_provider_configs(cls) -> dict[str, dict[str, Any]]:
+        """Get the configuration of every design provider by name."""
+        return {
+            "stable_diffusion": {
                 "model": "runwayml/stable-diffusion-v1-5",
                 "use_gpu": True,  # Set to False if no GPU available
-            }
+                "workers": cls.DESIGN_WORKERS,
+            },
+            "dalle": {"api_key": cls.DALLE_API_KEY, "size": "1024x1024"},
+        }
+
+    @classmethod
+    def get_design_scheduler_config(cls) -> Optional[dict[str, Any]]:
+        """Get design job scheduling configuration if provider limits are set."""
+        provider_concurrency = {}
+        for entry in cls.DESIGN_PROVIDER_CONCURRENCY.split(","):
+            if not entry.strip():
+                continue
+            provider, _, limit = entry.strip().partition("=")
+            provider_concurrency[provider] = int(limit or 1)
+        if not provider_concurrency:
+            return None
+        return {
+            "provider_concurrency": provider_concurrency,
+            "aging_seconds": cls.DESIGN_PRIORITY_AGING_SECONDS,
+        }
+
+    @classmethod
+    def get_design_cache_config(cls) -> Optional[dict[str, Any]]:
+        """Get design cache configuration if the cache is enabled."""
+        if not cls.DESIGN_CACHE_ENABLED:
+            return None
+        return {
+            "cache_dir": cls.DESIGN_CACHE_DIR,
+            "max_bytes": cls.DESIGN_CACHE_MAX_MB * 1024 * 1024,
+            "max_entries": cls.DESIGN_CACHE_MAX_ENTRIES or None,
+        }
+
+    @classmethod
+    def get_design_postprocess_config(cls) -> Optional[dict[str, Any]]:
+        """Get design post-processing configuration if it is enabled."""
+        if cls.DESIGN_POSTPROCESS_WORKERS <= 0:
+            return None
+        width, _, height = cls.DESIGN_PRINT_SIZE.lower().partition("x")
+        return {
+            "max_workers": cls.DESIGN_POSTPROCESS_WORKERS,
+            "thumbnail_size": cls.DESIGN_THUMBNAIL_SIZE,
+            "preview_size": cls.DESIGN_PREVIEW_SIZE,
+            "preview_quality": cls.DESIGN_PREVIEW_QUALITY,
+            "print_size": (int(width), int(height or width)),
+            "print_dpi": cls.DESIGN_PRINT_DPI,
+        }
+
+    @classmethod
+    def get_blob_store_config(cls) -> Optional[dict[str, Any]]:
+        """Get artifact blob store configuration if the store is enabled."""
+        if not cls.BLOB_STORE_ENABLED:
+            return None
+        return {"root": cls.BLOB_STORE_DIR, "grace_seconds": cls.BLOB_GC_GRACE_SECONDS}
 
     @classmethod
     def get_google_drive_config(cls) -> Optional[dict[str, str]]:
@@ -92,6 +280,31 @@ class Config:
             }
         return None
 
+    @classmethod
+    def get_drive_outbox_config(cls) -> Optional[dict[str, Any]]:
+        """Get Google Drive upload outbox configuration if the outbox is enabled."""
+        if not cls.DRIVE_OUTBOX_ENABLED:
+            return None
+        return {
+            "path": cls.DRIVE_OUTBOX_PATH,
+            "max_attempts": cls.DRIVE_OUTBOX_MAX_ATTEMPTS,
+            "retry_delay": cls.DRIVE_OUTBOX_RETRY_DELAY_SECONDS,
+            "poll_interval": cls.DRIVE_OUTBOX_POLL_SECONDS,
+        }
+
+    @classmethod
+    def get_drive_upload_config(cls) -> dict[str, Any]:
+        """Get Google Drive endpoint and resumable upload settings."""
+        return {
+            "api_url": cls.DRIVE_API_URL,
+            "token_url": cls.DRIVE_TOKEN_URL,
+            "chunk_size": cls.DRIVE_CHUNK_SIZE_KB * 1024,
+            "max_resumes": cls.DRIVE_MAX_RESUMES,
+            "requests_per_second": cls.DRIVE_REQUESTS_PER_SECOND or None,
+            "request_burst": cls.DRIVE_REQUEST_BURST,
+            "batch_window": cls.DRIVE_BATCH_WINDOW_MS / 1000,
+        }
+
     @classmethod
     def is_production(cls) -> bool:
         """Check if running in production environment."""
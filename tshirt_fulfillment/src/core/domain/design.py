@@ -28,6 +28,29 @@ class DesignStyle(Enum):
     PHOTOREALISTIC = "photorealistic"
 
 
+class DesignPriority(Enum):
+    """Enum representing the scheduling priority of a design job."""
+
+    RUSH = "rush"  # Rush orders and simple reprints
+    STANDARD = "standard"
+    BULK = "bulk"  # Large wholesale orders
+
+    @property
+    def rank(self) -> int:
+        """Position of the priority class, 0 being the most urgent."""
+        return list(DesignPriority).index(self)
+
+    @classmethod
+    def parse(cls, value: Optional[Any]) -> "DesignPriority":
+        """Get the priority for a value, defaulting to STANDARD."""
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(str(value).strip().lower())
+        except ValueError:
+            return cls.STANDARD
+
+
 @dataclass
 class DesignParameters:
     """Value object representing parameters for design generation."""
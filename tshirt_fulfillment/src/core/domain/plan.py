@@ -0,0 +1,103 @@
+# Agent plan domain model
+
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class StepOutput:
+    """Reference to a value produced by an earlier plan step.
+
+    Used as a value inside ``PlanStep.input``; it is resolved to
+    ``outputs[step_id][key]`` right before the step runs. If ``template`` is
+    given, the resolved value is substituted into it as ``{value}``.
+    """
+
+    step_id: str
+    key: str
+    template: Optional[str] = None
+
+    def resolve(self, outputs: dict[str, dict[str, Any]]) -> Any:
+        """Resolve the reference against the outputs of completed steps."""
+        value = outputs[self.step_id].get(self.key)
+        if self.template is not None:
+            return self.template.format(value=value)
+        return value
+
+
+@dataclass
+class PlanStep:
+    """A single tool call in an agent plan.
+
+    Steps only run once every step listed in ``depends_on`` has succeeded,
+    so steps without a path between them may run concurrently.
+    """
+
+    id: str
+    tool_name: str
+    input: dict[str, Any] = field(default_factory=dict)
+    depends_on: list[str] = field(default_factory=list)
+
+    def resolve_input(self, outputs: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        """Build the tool input, resolving ``StepOutput`` references."""
+        return {
+            key: value.resolve(outputs) if isinstance(value, StepOutput) else value
+            for key, value in self.input.items()
+        }
+
+
+@dataclass
+class ExecutionPlan:
+    """An ordered collection of plan steps with declared dependencies."""
+
+    steps: list[PlanStep] = field(default_factory=list)
+
+    def add_step(
+        self,
+        step_id: str,
+        tool_name: str,
+        input_data: Optional[dict[str, Any]] = None,
+        depends_on: Optional[list[str]] = None,
+    ) -> PlanStep:
+        """Append a step to the plan and return it."""
+        step = PlanStep(
+            id=step_id,
+            tool_name=tool_name,
+            input=input_data or {},
+            depends_on=list(depends_on or []),
+        )
+        self.steps.append(step)
+        return step
+
+    def get_step(self, step_id: str) -> Optional[PlanStep]:
+        """Get a step by ID."""
+        return next((step for step in self.steps if step.id == step_id), None)
+
+    def validate(self) -> None:
+        """Check that step IDs are unique and dependencies form a DAG.
+
+        Raises:
+            ValueError: If the plan is malformed
+        """
+        step_ids = [step.id for step in self.steps]
+        if len(step_ids) != len(set(step_ids)):
+            raise ValueError("Plan step IDs must be unique")
+
+        known = set(step_ids)
+        for step in self.steps:
+            missing = [dep for dep in step.depends_on if dep not in known]
+            if missing:
+                raise ValueError(f"Step {step.id} depends on unknown steps: {missing}")
+
+        # Kahn's algorithm: every step must become ready eventually
+        remaining = {step.id: set(step.depends_on) for step in self.steps}
+        while remaining:
+            ready = [step_id for step_id, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Plan has a dependency cycle between: {sorted(remaining)}")
+            for step_id in ready:
+                del remaining[step_id]
+            for deps in remaining.values():
+                deps.difference_update(ready)
@@ -34,12 +34,14 @@ class ToolRegistry:
 
     def __init__(self):
         self._tools: dict[str, ToolDefinition] = {}
+        self._description_cache: dict[bool, str] = {}
 
     def register(self, tool: ToolDefinition) -> None:
         """Register a new tool."""
         if tool.name in self._tools:
             raise ValueError(f"Tool {tool.name} is already registered")
         self._tools[tool.name] = tool
+        self._description_cache.clear()
 
     def get_tool(self, name: str) -> Optional[ToolDefinition]:
         """Get a tool by name."""
@@ -57,6 +59,24 @@ class ToolRegistry:
         """Get all tools available to admins."""
         return [tool for tool in self._tools.values() if tool.admin_only]
 
+    def describe_tools(self, admin: bool = False) -> str:
+        """Get the tool list rendered for prompts.
+
+        The rendering is cached until another tool is registered.
+
+        Args:
+            admin: Describe the admin tools instead of the customer tools
+        """
+        description = self._description_cache.get(admin)
+        if description is None:
+            tools = self.get_admin_tools() if admin else self.get_customer_tools()
+            description = "\n".join(
+                f"{index}. {tool.name}({', '.join(tool.input_schema)}): {tool.description}"
+                for index, tool in enumerate(tools, start=1)
+            )
+            self._description_cache[admin] = description
+        return description
+
 
 # Default tool registry instance
 default_registry = ToolRegistry()
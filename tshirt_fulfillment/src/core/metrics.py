@@ -0,0 +1,64 @@
+"""Thread-safe runtime counters shared by the use cases."""
+
+import threading
+from typing import Any
+
+
+class HitMissMetrics:
+    """Thread-safe hit/miss counters.
+
+    Subclasses that track more counters extend ``_counts`` and ``_clear``,
+    which are called with the lock held.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        """Record one hit or miss."""
+        with self._lock:
+            self._record(hit)
+
+    @property
+    def total(self) -> int:
+        """Total number of hits and misses recorded."""
+        with self._lock:
+            return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of recorded outcomes that were hits."""
+        with self._lock:
+            total = self.hits + self.misses
+            return self.hits / total if total else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the current counters as a plain dict."""
+        with self._lock:
+            return self._counts()
+
+    def reset(self) -> None:
+        """Reset all counters."""
+        with self._lock:
+            self._clear()
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def _counts(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total": total,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _clear(self) -> None:
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,165 @@
+"""Prompt templates and prompt-size budgeting for the AI agent."""
+
+import logging
+import re
+from functools import lru_cache
+from string import Template
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Prompt Roles
+DESIGN_ASSISTANT_ROLE = "design_assistant"
+CUSTOMER_ROLE = "customer"
+ADMIN_ROLE = "admin"
+
+# LLM Request Classes (see ``LLMRouter``)
+INTENT_REQUEST = "intent"
+DESIGN_REQUEST = "design"
+
+# Templates are parsed once at import; ``$tool_section`` is empty unless
+# tool descriptions are supplied.
+_SYSTEM_TEMPLATES = {
+    DESIGN_ASSISTANT_ROLE: Template(
+        "You are a T-shirt design assistant. "
+        "Help customers create their T-shirt designs based on their "
+        "descriptions. Ask clarifying questions if needed."
+        "$language_section$tool_section"
+    ),
+    CUSTOMER_ROLE: Template(
+        "You are an AI agent for t-shirt order processing.$language_section$tool_section"
+    ),
+    ADMIN_ROLE: Template("You are an AI admin agent.$language_section$tool_section"),
+}
+
+LANGUAGE_NAMES = {"vi": "Vietnamese", "en": "English"}
+
+# Rough average for English/Vietnamese text on Llama/Mistral tokenizers
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=128)
+def get_system_prompt(role: str, language: str = "vi", tool_descriptions: str = "") -> str:
+    """Render the system prompt for a role and language.
+
+    Rendered prompts are cached, so repeated calls for the same role,
+    language and tool set return the same string without re-rendering.
+
+    Args:
+        role: One of the prompt roles defined in this module
+        language: Language code the agent should reply in
+        tool_descriptions: Pre-rendered tool list (see
+            ``ToolRegistry.describe_tools``)
+
+    Returns:
+        The rendered system prompt
+
+    Raises:
+        ValueError: If the role is unknown
+    """
+    template = _SYSTEM_TEMPLATES.get(role)
+    if template is None:
+        raise ValueError(f"Unknown prompt role: {role}")
+
+    language_name = LANGUAGE_NAMES.get(language)
+    language_section = f" Always reply in {language_name}." if language_name else ""
+    tool_section = f"\n\nAvailable tools:\n{tool_descriptions}" if tool_descriptions else ""
+    return template.substitute(language_section=language_section, tool_section=tool_section)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(message: dict[str, Any]) -> int:
+    """Estimate the number of tokens a chat message takes in the prompt."""
+    return estimate_tokens(str(message.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS
+
+
+def prompt_similarity(first: str, second: str) -> float:
+    """Measure how much two design prompts overlap.
+
+    Uses the Jaccard similarity of their lower-cased word sets, so word
+    order and punctuation are ignored.
+
+    Args:
+        first: First prompt
+        second: Second prompt
+
+    Returns:
+        Similarity between 0.0 (no shared words) and 1.0 (same words)
+    """
+    first_words = set(_WORD_PATTERN.findall(first.lower()))
+    second_words = set(_WORD_PATTERN.findall(second.lower()))
+    if not first_words and not second_words:
+        return 1.0
+    return len(first_words & second_words) / len(first_words | second_words)
+
+
+class PromptBudget:
+    """Token budget for the prompt sent to the LLM.
+
+    ``trim`` keeps every leading system message and the latest message,
+    then adds as much of the most recent history as fits in
+    ``max_context_tokens - reserved_response_tokens``.
+    """
+
+    def __init__(self, max_context_tokens: int = 4096, reserved_response_tokens: int = 512):
+        """Initialize the prompt budget.
+
+        Args:
+            max_context_tokens: Context window of the model
+            reserved_response_tokens: Tokens kept free for the response
+        """
+        if reserved_response_tokens >= max_context_tokens:
+            raise ValueError("reserved_response_tokens must be below max_context_tokens")
+        self.max_context_tokens = max_context_tokens
+        self.reserved_response_tokens = reserved_response_tokens
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Number of tokens available for the prompt."""
+        return self.max_context_tokens - self.reserved_response_tokens
+
+    def trim(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Drop the oldest history messages until the prompt fits the budget.
+
+        Args:
+            messages: Conversation messages, oldest first
+
+        Returns:
+            The messages to send, oldest first
+        """
+        if not messages:
+            return messages
+
+        total = sum(estimate_message_tokens(message) for message in messages)
+        if total <= self.prompt_tokens:
+            return messages
+
+        system_count = 0
+        while system_count < len(messages) - 1 and messages[system_count].get("role") == "system":
+            system_count += 1
+        system_messages = messages[:system_count]
+        history = messages[system_count:-1]
+        latest = messages[-1]
+
+        used = sum(estimate_message_tokens(m) for m in system_messages)
+        used += estimate_message_tokens(latest)
+        kept: list[dict[str, Any]] = []
+        for message in reversed(history):
+            cost = estimate_message_tokens(message)
+            if used + cost > self.prompt_tokens:
+                break
+            kept.append(message)
+            used += cost
+
+        dropped = len(history) - len(kept)
+        logger.info(f"Trimmed {dropped} history messages to fit {self.prompt_tokens} tokens")
+        if used > self.prompt_tokens:
+            logger.warning(f"Prompt still exceeds budget after trimming: {used} tokens")
+        return system_messages + list(reversed(kept)) + [latest]
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Optional
 
 from core.domain.agent import AgentSession
@@ -55,6 +56,19 @@ class AgentRepository:
             return self.session.query(AgentSession).all()
         return list(self._sessions.values())
 
+    def iter_all(self, batch_size: int = 1000) -> Iterator[AgentSession]:
+        """Iterate over all agent sessions without loading them all at once.
+
+        Args:
+            batch_size: Number of sessions fetched from the database at a time
+
+        Returns:
+            Iterator[AgentSession]: Iterator over all agent sessions
+        """
+        if self.session:
+            return iter(self.session.query(AgentSession).yield_per(batch_size))
+        return iter(list(self._sessions.values()))
+
     def update(self, agent_session: AgentSession) -> AgentSession:
         """Update an existing agent session.
 
@@ -0,0 +1,105 @@
+import json
+from typing import Any
+from typing import Optional
+
+DEFAULT_KEY_PREFIX = "conversation:"
+
+
+class ConversationRepository:
+    """Repository for agent conversation history.
+
+    Each conversation is stored as one document holding a rolling summary
+    and the messages that are not summarized yet. With a Redis client the
+    documents live outside the process, so a session can be resumed on any
+    worker.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl_seconds: Optional[int] = None,
+        key_prefix: str = DEFAULT_KEY_PREFIX,
+    ):
+        """Initialize the repository with an optional Redis client.
+
+        Args:
+            redis_client: Optional Redis client. If None, uses in-memory storage.
+            ttl_seconds: Expiry of idle conversations in Redis, None to keep them
+            key_prefix: Prefix of the Redis keys
+        """
+        self._conversations: dict[str, dict[str, Any]] = {}  # In-memory storage
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(
+        cls, redis_url: str, ttl_seconds: Optional[int] = None
+    ) -> "ConversationRepository":
+        """Create a Redis-backed repository.
+
+        Args:
+            redis_url: URL for Redis connection
+            ttl_seconds: Expiry of idle conversations, None to keep them
+
+        Returns:
+            ConversationRepository: Repository storing conversations in Redis
+        """
+        import redis
+
+        return cls(redis.Redis.from_url(redis_url), ttl_seconds=ttl_seconds)
+
+    def get(self, conversation_id: str) -> dict[str, Any]:
+        """Get a conversation by its ID.
+
+        Args:
+            conversation_id: The ID of the conversation (usually the session ID)
+
+        Returns:
+            Dict with "summary" and "messages"; empty if the conversation is new
+        """
+        if self.redis_client:
+            data = self.redis_client.get(self._key(conversation_id))
+            if data is None:
+                return _empty_conversation()
+            return json.loads(data)
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            return _empty_conversation()
+        return {"summary": conversation["summary"], "messages": list(conversation["messages"])}
+
+    def save(self, conversation_id: str, summary: str, messages: list[dict[str, Any]]) -> None:
+        """Replace the stored state of a conversation.
+
+        Args:
+            conversation_id: The ID of the conversation
+            summary: Rolling summary of older messages
+            messages: Messages not covered by the summary, oldest first
+        """
+        conversation = {"summary": summary, "messages": list(messages)}
+        if self.redis_client:
+            self.redis_client.set(
+                self._key(conversation_id), json.dumps(conversation), ex=self.ttl_seconds
+            )
+        else:
+            self._conversations[conversation_id] = conversation
+
+    def delete(self, conversation_id: str) -> bool:
+        """Delete a conversation by its ID.
+
+        Args:
+            conversation_id: The ID of the conversation to delete
+
+        Returns:
+            bool: True if the conversation existed, False otherwise
+        """
+        if self.redis_client:
+            return bool(self.redis_client.delete(self._key(conversation_id)))
+        return self._conversations.pop(conversation_id, None) is not None
+
+    def _key(self, conversation_id: str) -> str:
+        return f"{self.key_prefix}{conversation_id}"
+
+
+def _empty_conversation() -> dict[str, Any]:
+    return {"summary": "", "messages": []}
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Optional
 
 from tshirt_fulfillment.src.core.domain.order import Order
@@ -54,6 +55,19 @@ class OrderRepository:
             return self.session.query(Order).all()
         return list(self._orders.values())
 
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Order]:
+        """Iterate over all orders without loading them all at once.
+
+        Args:
+            batch_size: Number of orders fetched from the database at a time
+
+        Returns:
+            Iterator[Order]: Iterator over all orders
+        """
+        if self.session:
+            return iter(self.session.query(Order).yield_per(batch_size))
+        return iter(list(self._orders.values()))
+
     def update(self, order: Order) -> Order:
         """Update an existing order.
 
@@ -0,0 +1,472 @@
+"""Resilience primitives for calls to external dependencies.
+
+Each external dependency (the LLM, Google Drive, the notification service)
+gets one process-wide ``ResilientDependency`` combining a circuit breaker,
+jittered exponential backoff, deadline propagation and a concurrency limit,
+so a failing dependency sheds load quickly instead of tying up threads.
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from tshirt_fulfillment.src.config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ResilienceError(Exception):
+    """Base class for calls rejected by the resilience layer."""
+
+
+class CircuitOpenError(ResilienceError):
+    """Raised when a dependency's circuit breaker is open."""
+
+
+class ConcurrencyLimitError(ResilienceError):
+    """Raised when a dependency already has too many calls in flight."""
+
+
+class DeadlineExceededError(ResilienceError):
+    """Raised when the caller's deadline expires before the call completes."""
+
+
+class CircuitState(Enum):
+    """Enum representing the states of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker for a single dependency.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected for ``recovery_timeout`` seconds. Then a limited
+    number of trial calls are let through (half-open); a success closes
+    the circuit, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before trial calls
+            half_open_max_calls: Trial calls allowed while half-open
+            clock: Time source, overridable for tests
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once recovered."""
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed, reserving a trial slot if half-open."""
+        with self._lock:
+            self._refresh_state()
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.HALF_OPEN:
+                if self._half_open_calls < self.half_open_max_calls:
+                    self._half_open_calls += 1
+                    return True
+            return False
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._state = CircuitState.CLOSED
+            self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        with self._lock:
+            self._failures += 1
+            if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._half_open_calls = 0
+
+    def release(self) -> None:
+        """Give back a trial slot reserved by ``allow_request`` without an outcome.
+
+        For calls that ended before the dependency answered, e.g. because
+        the caller's deadline expired; the next caller gets the trial.
+        """
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def _refresh_state(self) -> None:
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 5.0):
+        """Initialize the retry policy.
+
+        Args:
+            max_attempts: Total attempts including the first one
+            base_delay: Backoff before the first retry, in seconds
+            max_delay: Upper bound for any single backoff, in seconds
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Get the jittered delay before retry number ``attempt`` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class TokenBucket:
+    """Token bucket rate limiter for requests counted against a quota.
+
+    Allows ``rate`` tokens per second on average with bursts of up to
+    ``capacity``. Callers that find the bucket empty reserve their tokens
+    and sleep until they are refilled, so waiting callers are served in
+    arrival order and a spike is smoothed out instead of rejected.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize the bucket, full.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held, i.e. the largest burst. Defaults
+                to one second's worth.
+            clock: Time source, overridable for tests
+            sleep: Sleep function, overridable for tests
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity or rate, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Take tokens, waiting until the bucket has refilled enough.
+
+        Args:
+            tokens: Tokens to take, e.g. the number of calls in a batch
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            DeadlineExceededError: If the wait would outlast the active
+                deadline; no tokens are taken then
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            delay = max(0.0, (tokens - self._tokens) / self.rate)
+            remaining = remaining_time()
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceededError("Deadline exceeded waiting for rate limit")
+            # Tokens may go negative: later callers wait for this reservation too
+            self._tokens -= tokens
+            if delay:
+                self.waits += 1
+                self.waited_seconds += delay
+        if delay:
+            self._sleep(delay)
+        return delay
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the wait counters as a plain dict."""
+        with self._lock:
+            return {"waits": self.waits, "waited_seconds": round(self.waited_seconds, 3)}
+
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[float]:
+    """Set a deadline for every dependency call made inside the block.
+
+    Nested scopes can only shorten the active deadline, never extend it.
+
+    Args:
+        timeout: Seconds from now until the deadline
+    """
+    deadline = time.monotonic() + timeout
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time(default: Optional[float] = None) -> Optional[float]:
+    """Get the seconds left before the active deadline.
+
+    Args:
+        default: Value returned when no deadline is active. If both a
+            deadline and a default exist, the smaller one wins.
+
+    Raises:
+        DeadlineExceededError: If the active deadline has already passed
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceededError("Deadline exceeded")
+    return min(remaining, default) if default is not None else remaining
+
+
+class ResilientDependency:
+    """Guards calls to one external dependency."""
+
+    def __init__(
+        self,
+        name: str,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        max_concurrency: int = 8,
+        timeout: Optional[float] = None,
+    ):
+        """Initialize the dependency guard.
+
+        Args:
+            name: Dependency name used in logs and metrics
+            circuit_breaker: Breaker for this dependency
+            retry_policy: Retry policy for failed calls
+            max_concurrency: Maximum calls in flight at once
+            timeout: Default deadline in seconds for each ``call``
+        """
+        self.name = name
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.rejections = 0
+
+    def call(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        is_failure: Optional[Callable[[Any], bool]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Call ``func`` with circuit breaking, retries and concurrency limits.
+
+        Args:
+            func: Function performing the dependency call. It can read its
+                timeout with ``remaining_time()``.
+            *args: Positional arguments for ``func``
+            is_failure: Optional predicate marking a returned value as a
+                failure (e.g. ``{"success": False}``), which is retried
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            The value returned by ``func``. If every attempt failed through
+            ``is_failure``, the last returned value.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            ConcurrencyLimitError: If too many calls are in flight
+            DeadlineExceededError: If the deadline expires
+            Exception: The last exception raised by ``func``
+        """
+        if self.timeout is not None:
+            with deadline_scope(self.timeout):
+                return self._call(func, args, kwargs, is_failure)
+        return self._call(func, args, kwargs, is_failure)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the current state and counters as a plain dict."""
+        with self._lock:
+            return {
+                "state": self.circuit_breaker.state.value,
+                "in_flight": self.in_flight,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejections": self.rejections,
+            }
+
+    def _call(
+        self,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: dict[str, Any],
+        is_failure: Optional[Callable[[Any], bool]],
+    ) -> Any:
+        if not self._slots.acquire(blocking=False):
+            self._count(rejections=1)
+            raise ConcurrencyLimitError(f"Too many concurrent calls to {self.name}")
+        self._count(in_flight=1)
+        try:
+            return self._call_with_retries(func, args, kwargs, is_failure)
+        finally:
+            self._count(in_flight=-1)
+            self._slots.release()
+
+    def _call_with_retries(
+        self,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: dict[str, Any],
+        is_failure: Optional[Callable[[Any], bool]],
+    ) -> Any:
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining_time()  # Fail fast if the deadline already passed
+            if not self.circuit_breaker.allow_request():
+                self._count(rejections=1)
+                raise CircuitOpenError(f"Circuit open for {self.name}")
+
+            self._count(calls=1)
+            try:
+                result = func(*args, **kwargs)
+            except ResilienceError:
+                # No answer from the dependency, e.g. the deadline ran out
+                self.circuit_breaker.release()
+                raise
+            except Exception as e:
+                self._on_failure(attempt, str(e))
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+            else:
+                if is_failure is None or not is_failure(result):
+                    self.circuit_breaker.record_success()
+                    return result
+                self._on_failure(attempt, "call returned a failure result")
+                if attempt >= self.retry_policy.max_attempts:
+                    return result
+
+            self._sleep_before_retry(attempt)
+
+    def _on_failure(self, attempt: int, reason: str) -> None:
+        self._count(failures=1)
+        self.circuit_breaker.record_failure()
+        logger.warning(f"Call to {self.name} failed (attempt {attempt}): {reason}")
+
+    def _sleep_before_retry(self, attempt: int) -> None:
+        delay = self.retry_policy.backoff(attempt)
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceededError(f"Deadline exceeded while retrying {self.name}")
+        time.sleep(delay)
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for counter, delta in deltas.items():
+                setattr(self, counter, getattr(self, counter) + delta)
+
+
+_dependencies: dict[str, ResilientDependency] = {}
+_dependencies_lock = threading.Lock()
+
+
+def get_dependency(name: str, **options: Any) -> ResilientDependency:
+    """Get the process-wide guard for a dependency, creating it on first use.
+
+    Args:
+        name: Dependency name
+        **options: ``ResilientDependency`` options, used only on creation
+    """
+    with _dependencies_lock:
+        dependency = _dependencies.get(name)
+        if dependency is None:
+            dependency = ResilientDependency(name, **options)
+            _dependencies[name] = dependency
+        return dependency
+
+
+def get_configured_dependency(name: str) -> ResilientDependency:
+    """Get the process-wide guard for a dependency using settings from Config."""
+    with _dependencies_lock:
+        dependency = _dependencies.get(name)
+    if dependency is not None:
+        return dependency
+
+    options = Config.get_resilience_config(name)
+    return get_dependency(
+        name,
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=options["failure_threshold"],
+            recovery_timeout=options["recovery_timeout"],
+        ),
+        retry_policy=RetryPolicy(max_attempts=options["max_attempts"]),
+        max_concurrency=options["max_concurrency"],
+        timeout=options["timeout"],
+    )
+
+
+def dependencies_snapshot() -> dict[str, dict[str, Any]]:
+    """Get the state of every registered dependency."""
+    with _dependencies_lock:
+        dependencies = list(_dependencies.values())
+    return {dependency.name: dependency.snapshot() for dependency in dependencies}
+
+
+def result_failed(result: Any) -> bool:
+    """Failure predicate for tool-style ``{"success": bool}`` results."""
+    return isinstance(result, dict) and not result.get("success", False)
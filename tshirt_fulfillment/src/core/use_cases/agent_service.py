@@ -1,17 +1,85 @@
+import logging
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from typing import Any
 from typing import Optional
 
 from core.domain.agent import AgentRole
 from core.domain.agent import AgentSession
 from core.domain.agent import AgentStatus
 from core.domain.tools import ToolRegistry
-from core.use_cases.design_generator import DesignGenerator
-from core.use_cases.order_processor import OrderProcessor
-from langchain.agents import AgentExecutor
-from langchain.agents import create_react_agent
-from langchain.llms import Ollama
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import PromptTemplate
+from core.prompts import ADMIN_ROLE
+from core.prompts import CUSTOMER_ROLE
+from core.prompts import get_system_prompt
+from core.repositories.conversation_repository import ConversationRepository
+from core.use_cases.conversation_memory import ConversationMemory
+from core.use_cases.conversation_memory import MemoryMode
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing them at runtime pulls in requests
+    # and the settings module for every consumer of this service.
+    from core.use_cases.design_generator import DesignGenerator
+    from core.use_cases.order_processor import OrderProcessor
+
+# LangChain is imported lazily (see ``AgentService.llm`` and
+# ``_create_agent_session``) so that API workers and CLI tools which never
+# start an agent session do not pay its import cost.
+DEFAULT_ADMIN_LANGUAGE = "en"
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "Progressively summarize the conversation, adding onto the previous summary.\n"
+    "Previous summary:\n{summary}\n\nNew lines of conversation:\n{lines}\n\nNew summary:"
+)
+
+
+@lru_cache(maxsize=32)
+def _get_agent_prompt_template(system_prompt: str) -> Any:
+    """Build the ReAct prompt template for a system prompt, once per prompt."""
+    from langchain.prompts import PromptTemplate
+
+    escaped_prompt = system_prompt.replace("{", "{{").replace("}", "}}")
+    return PromptTemplate(
+        input_variables=["input", "chat_history", "tools", "tool_names", "agent_scratchpad"],
+        template=(
+            f"{escaped_prompt}\n"
+            "Available tools: {tools}\n"
+            "Tool names: {tool_names}\n"
+            "Conversation so far:\n{chat_history}\n"
+            "{input}\n"
+            "{agent_scratchpad}"
+        ),
+    )
+
+
+def _create_llm(llm_config: dict[str, Any], ollama_base_url: str) -> Any:
+    """Build the LangChain LLM for a provider configuration.
+
+    Args:
+        llm_config: Provider settings, as returned by ``Config.get_llm_config``
+        ollama_base_url: Base URL of the Ollama server
+
+    Returns:
+        An OpenAI LLM for the "openai" provider, an Ollama LLM otherwise
+    """
+    if llm_config["provider"] == "openai":
+        from langchain.llms import OpenAI
+
+        return OpenAI(
+            model_name=llm_config["model"],
+            temperature=llm_config["temperature"],
+            openai_api_key=llm_config["api_key"],
+        )
+
+    from langchain.llms import Ollama
+
+    return Ollama(
+        model=llm_config["model"],
+        base_url=ollama_base_url,
+        temperature=llm_config["temperature"],
+    )
 
 
 @dataclass
@@ -32,10 +100,15 @@ class AgentService:
 
     def __init__(
         self,
-        order_processor: OrderProcessor,
-        design_generator: DesignGenerator,
+        order_processor: "OrderProcessor",
+        design_generator: "DesignGenerator",
         tool_registry: ToolRegistry,
         redis_url: str = "redis://localhost:6379/0",
+        llm: Optional[Any] = None,
+        memory_repository: Optional[ConversationRepository] = None,
+        memory_mode: MemoryMode = MemoryMode.TOKEN_WINDOW,
+        memory_window_size: int = 10,
+        memory_max_tokens: int = 1024,
     ):
         """Initialize the agent service.
 
@@ -44,14 +117,78 @@ class AgentService:
             design_generator: Service for generating designs
             tool_registry: Registry of available tools
             redis_url: URL for Redis connection
+            llm: Optional LangChain LLM. If None, one is created on first
+                use for the configured provider (``Config.get_llm_config``).
+            memory_repository: Repository for conversation history. If None,
+                history is kept in Redis at ``redis_url`` (in process memory
+                if the redis package is not installed).
+            memory_mode: How conversation history is bounded
+            memory_window_size: Messages kept in buffer-window mode
+            memory_max_tokens: History token budget in token-window and
+                summary modes
         """
         self.order_processor = order_processor
         self.design_generator = design_generator
         self.tool_registry = tool_registry
         self.redis_url = redis_url
 
-        # Initialize LLM
-        self.llm = Ollama(model="mistral")
+        # The LLM is created lazily on first access
+        self._llm = llm
+
+        self._memory_repository = memory_repository
+        self.memory_mode = memory_mode
+        self.memory_window_size = memory_window_size
+        self.memory_max_tokens = memory_max_tokens
+
+    @property
+    def llm(self) -> Any:
+        """LLM used by agent sessions, created on first access."""
+        if self._llm is None:
+            from config.settings import Config
+
+            self._llm = _create_llm(Config.get_llm_config(), Config.OLLAMA_BASE_URL)
+        return self._llm
+
+    @llm.setter
+    def llm(self, value: Any) -> None:
+        self._llm = value
+
+    @property
+    def memory_repository(self) -> ConversationRepository:
+        """Repository for conversation history, created on first access."""
+        if self._memory_repository is None:
+            try:
+                self._memory_repository = ConversationRepository.from_url(self.redis_url)
+            except ImportError:
+                logger.warning("redis is not installed. Keeping conversations in memory.")
+                self._memory_repository = ConversationRepository()
+        return self._memory_repository
+
+    def get_memory(self, session: AgentSession) -> ConversationMemory:
+        """Get the conversation memory of a session.
+
+        The memory is keyed by session ID, so a session resumed on another
+        worker sees the same history.
+
+        Args:
+            session: The agent session
+
+        Returns:
+            ConversationMemory for the session
+        """
+        return ConversationMemory(
+            self.memory_repository,
+            session.id,
+            mode=self.memory_mode,
+            window_size=self.memory_window_size,
+            max_tokens=self.memory_max_tokens,
+            summarizer=self._summarize_conversation,
+        )
+
+    def _summarize_conversation(self, summary: str, messages: list[dict[str, Any]]) -> str:
+        """Fold messages into the rolling summary using the LLM."""
+        lines = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        return str(self.llm.invoke(SUMMARY_PROMPT.format(summary=summary, lines=lines)))
 
     def _create_agent_session(
         self, session: AgentSession, tools: list, system_prompt: str
@@ -67,24 +204,18 @@ class AgentService:
             AgentServiceResult with success status and session
         """
         try:
-            # Initialize memory
-            memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+            from langchain.agents import AgentExecutor
+            from langchain.agents import create_react_agent
+
+            # Bounded, persisted history instead of an in-process buffer
+            memory = self.get_memory(session)
 
             # Get tool names and handlers
             tool_names = [str(tool.name) for tool in tools]
             tool_handlers = list(tools)
 
-            # Create agent with string tool names
-            prompt = PromptTemplate(
-                input_variables=["input", "tools", "tool_names", "agent_scratchpad"],
-                template=(
-                    f"{system_prompt}\n"
-                    "Available tools: {tools}\n"
-                    "Tool names: {tool_names}\n"
-                    "{input}\n"
-                    "{agent_scratchpad}"
-                ),
-            )
+            # Reuse the precompiled template for this system prompt
+            prompt = _get_agent_prompt_template(system_prompt)
 
             # Create agent with handlers but pass string names to prompt
             agent = create_react_agent(llm=self.llm, tools=tool_handlers, prompt=prompt)
@@ -93,7 +224,6 @@ class AgentService:
             executor = AgentExecutor.from_agent_and_tools(
                 agent=agent,
                 tools=tool_handlers,
-                memory=memory,
                 verbose=True,
                 handle_parsing_errors=True,
             )
@@ -102,6 +232,7 @@ class AgentService:
             session.update_context("executor", executor)
             session.update_context("tool_names", tool_names)
             session.update_context("tools", tools)
+            session.update_context("memory", memory)
 
             return AgentServiceResult(success=True, session=session)
         except Exception as e:
@@ -132,7 +263,7 @@ class AgentService:
             return self._create_agent_session(
                 session=session,
                 tools=tools,
-                system_prompt="You are an AI agent for t-shirt order processing.",
+                system_prompt=get_system_prompt(CUSTOMER_ROLE, order_result.order.language),
             )
         except Exception as e:
             return AgentServiceResult(success=False, error=str(e))
@@ -155,7 +286,9 @@ class AgentService:
 
             # Create agent session
             return self._create_agent_session(
-                session=session, tools=tools, system_prompt="You are an AI admin agent."
+                session=session,
+                tools=tools,
+                system_prompt=get_system_prompt(ADMIN_ROLE, DEFAULT_ADMIN_LANGUAGE),
             )
         except Exception as e:
             return AgentServiceResult(success=False, error=str(e))
@@ -177,6 +310,7 @@ class AgentService:
             executor = session.context.get("executor")
             if not executor:
                 raise ValueError("No executor found in session context")
+            memory = session.context.get("memory") or self.get_memory(session)
 
             # Prepare input based on session role
             if session.role == AgentRole.CUSTOMER:
@@ -184,20 +318,17 @@ class AgentService:
                 order_result = self.order_processor.get_order(session.order_id)
                 if not order_result.success:
                     raise ValueError(f"Order not found: {session.order_id}")
-                # Execute agent
-                result = executor.invoke(
-                    {
-                        "input": (
-                            f"Process order {session.order_id}: "
-                            f"{order_result.order.customer_message}"
-                        )
-                    }
+                agent_input = (
+                    f"Process order {session.order_id}: {order_result.order.customer_message}"
                 )
             else:
-                # Execute admin command
-                result = executor.invoke(
-                    {"input": (f"Execute admin command " f"{session.command_id}")}
-                )
+                agent_input = f"Execute admin command {session.command_id}"
+
+            # Execute agent with the bounded history
+            result = executor.invoke({"input": agent_input, "chat_history": memory.render()})
+            memory.add_message("user", agent_input)
+            output = result.get("output", result) if isinstance(result, dict) else result
+            memory.add_message("assistant", str(output))
             # Update session with result
             session.update_context("result", result)
             session.update_status(AgentStatus.COMPLETED)
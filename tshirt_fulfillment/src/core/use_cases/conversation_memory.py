@@ -0,0 +1,164 @@
+"""Bounded conversation memory for agent sessions."""
+
+import logging
+from enum import Enum
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from tshirt_fulfillment.src.core.prompts import estimate_message_tokens
+from tshirt_fulfillment.src.core.prompts import estimate_tokens
+from tshirt_fulfillment.src.core.repositories.conversation_repository import ConversationRepository
+
+logger = logging.getLogger(__name__)
+
+# A summarizer folds messages into the previous summary and returns the new one
+Summarizer = Callable[[str, list[dict[str, Any]]], str]
+
+
+class MemoryMode(Enum):
+    """Enum representing how much conversation history is kept."""
+
+    BUFFER_WINDOW = "buffer_window"  # The last ``window_size`` messages
+    TOKEN_WINDOW = "token_window"  # The most recent messages within ``max_tokens``
+    SUMMARY = "summary"  # Recent messages plus a rolling summary of older ones
+
+
+def truncating_summarizer(max_tokens: int) -> Summarizer:
+    """Create a summarizer that keeps the tail of the transcript.
+
+    Used when no LLM summarizer is available: it appends the folded
+    messages to the summary and keeps only the most recent
+    ``max_tokens`` worth of text.
+
+    Args:
+        max_tokens: Maximum size of the summary
+    """
+    max_chars = max_tokens * 4
+
+    def summarize(summary: str, messages: list[dict[str, Any]]) -> str:
+        lines = [summary] if summary else []
+        lines.extend(f"{message['role']}: {message['content']}" for message in messages)
+        text = "\n".join(lines)
+        return text[-max_chars:]
+
+    return summarize
+
+
+class ConversationMemory:
+    """Conversation history of one session with a constant size.
+
+    History is compacted every time a message is added, so both the stored
+    conversation and the rendered prompt stay bounded no matter how long
+    the session runs.
+    """
+
+    def __init__(
+        self,
+        repository: ConversationRepository,
+        conversation_id: str,
+        mode: MemoryMode = MemoryMode.TOKEN_WINDOW,
+        window_size: int = 10,
+        max_tokens: int = 1024,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        """Initialize the memory.
+
+        Args:
+            repository: Repository persisting the conversation
+            conversation_id: The ID of the conversation (usually the session ID)
+            mode: How history is bounded
+            window_size: Messages kept in ``BUFFER_WINDOW`` mode
+            max_tokens: Token budget of the history in ``TOKEN_WINDOW`` and
+                ``SUMMARY`` modes
+            summarizer: Function folding old messages into the summary in
+                ``SUMMARY`` mode. Defaults to ``truncating_summarizer``.
+        """
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1")
+        self.repository = repository
+        self.conversation_id = conversation_id
+        self.mode = mode
+        self.window_size = window_size
+        self.max_tokens = max_tokens
+        self.summarizer = summarizer or truncating_summarizer(max_tokens // 4)
+
+    def add_message(self, role: str, content: str) -> None:
+        """Append a message and compact the stored history.
+
+        Args:
+            role: Message role, e.g. "user" or "assistant"
+            content: Message text
+        """
+        conversation = self.repository.get(self.conversation_id)
+        messages = conversation["messages"] + [{"role": role, "content": content}]
+        summary, messages = self._compact(conversation["summary"], messages)
+        self.repository.save(self.conversation_id, summary, messages)
+
+    def load(self) -> list[dict[str, Any]]:
+        """Get the history to put in the prompt, oldest first.
+
+        In ``SUMMARY`` mode a non-empty summary comes first as a system message.
+        """
+        conversation = self.repository.get(self.conversation_id)
+        messages = conversation["messages"]
+        if conversation["summary"]:
+            summary = {
+                "role": "system",
+                "content": f"Summary of earlier conversation: {conversation['summary']}",
+            }
+            return [summary] + messages
+        return messages
+
+    def render(self) -> str:
+        """Get the history as plain text for prompt templates."""
+        return "\n".join(f"{message['role']}: {message['content']}" for message in self.load())
+
+    def clear(self) -> None:
+        """Forget the conversation."""
+        self.repository.delete(self.conversation_id)
+
+    def _compact(
+        self, summary: str, messages: list[dict[str, Any]]
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """Bound the history according to the memory mode."""
+        if self.mode == MemoryMode.BUFFER_WINDOW:
+            return summary, messages[-self.window_size :]
+
+        kept = _recent_within_budget(messages, self.max_tokens - estimate_tokens(summary))
+        if self.mode == MemoryMode.TOKEN_WINDOW:
+            return summary, kept
+
+        # SUMMARY: fold whatever no longer fits into the rolling summary. A
+        # longer summary leaves less room, so fold again if needed.
+        folded = messages[: len(messages) - len(kept)]
+        while folded:
+            summary = self._summarize(summary, folded)
+            remaining = _recent_within_budget(kept, self.max_tokens - estimate_tokens(summary))
+            folded = kept[: len(kept) - len(remaining)]
+            kept = remaining
+        return summary, kept
+
+    def _summarize(self, summary: str, messages: list[dict[str, Any]]) -> str:
+        try:
+            return self.summarizer(summary, messages)
+        except Exception as e:
+            logger.error(f"Error summarizing conversation: {str(e)}")
+            return truncating_summarizer(self.max_tokens // 4)(summary, messages)
+
+
+def _recent_within_budget(messages: list[dict[str, Any]], budget: int) -> list[dict[str, Any]]:
+    """Get the most recent messages fitting in ``budget`` tokens, oldest first.
+
+    The latest message is always kept, even if it alone exceeds the budget.
+    """
+    kept: list[dict[str, Any]] = []
+    used = 0
+    for message in reversed(messages):
+        cost = estimate_message_tokens(message)
+        if kept and used + cost > budget:
+            break
+        kept.append(message)
+        used += cost
+    kept.reverse()
+    return kept
@@ -1,9 +1,11 @@
 # Design generation use case
 
+import time
 from dataclasses import dataclass
 from typing import Optional
 
-from core.domain.design import Design
+from tshirt_fulfillment.src.core.domain.design import Design
+from tshirt_fulfillment.src.core.domain.design import DesignProvider
 
 
 @dataclass
@@ -23,15 +25,20 @@ class DesignGenerator:
     independent of the specific design generation technology used.
     """
 
-    def __init__(self, design_repository, llm_service=None):
+    def __init__(self, design_repository, llm_service=None, design_service=None):
         """Initialize the design generator use case.
 
         Args:
             design_repository: Repository for design persistence
             llm_service: Service for generating designs using LLM
+            design_service: Service rendering designs with the configured
+                provider (anything with ``generate_for_order(order_id,
+                prompt, style)``, e.g. ``DesignServiceAdapter``). Takes
+                precedence over ``llm_service``.
         """
         self.design_repository = design_repository
         self.llm_service = llm_service
+        self.design_service = design_service
 
     def generate_design(
         self, order_id: str, prompt: str, style: Optional[str] = None
@@ -47,6 +54,9 @@ class DesignGenerator:
             DesignGenerationResult with success status, design and image path
         """
         try:
+            if self.design_service is not None:
+                return self._generate_with_design_service(order_id, prompt, style)
+
             # Generate image using LLM service if available
             image_url = None
             if self.llm_service:
@@ -67,6 +77,27 @@ class DesignGenerator:
         except Exception as e:
             return DesignGenerationResult(success=False, error=str(e))
 
+    def _generate_with_design_service(
+        self, order_id: str, prompt: str, style: Optional[str] = None
+    ) -> DesignGenerationResult:
+        """Render the design with the design service and save it."""
+        start = time.perf_counter()
+        result = self.design_service.generate_for_order(order_id, prompt, style)
+        if not result["success"]:
+            return DesignGenerationResult(success=False, error=result.get("error"))
+
+        design = Design.create(
+            order_id=order_id,
+            prompt=prompt,
+            provider=DesignProvider(result.get("provider", DesignProvider.MOCK.value)),
+            style=style,
+        )
+        design.set_result(result["image_path"], time.perf_counter() - start)
+        saved_design = self.design_repository.save(design)
+        return DesignGenerationResult(
+            success=True, design=saved_design, image_path=result["image_path"]
+        )
+
     def get_design(self, design_id: str) -> DesignGenerationResult:
         """Get a design by ID.
 
@@ -0,0 +1,103 @@
+"""Completion of order uploads that run after the order pipeline."""
+
+import logging
+from dataclasses import asdict
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from tshirt_fulfillment.src.core.domain.order import Order
+from tshirt_fulfillment.src.core.domain.order import OrderPhase
+from tshirt_fulfillment.src.core.domain.order import OrderStatus
+from tshirt_fulfillment.src.core.repositories.order_repository import OrderRepository
+
+logger = logging.getLogger(__name__)
+
+DESIGN_LINK_MESSAGE = "Your T-shirt design is ready: {value}"
+
+
+class DriveUploadTracker:
+    """Records background Drive uploads on their orders.
+
+    Used as the ``on_finished`` callback of a ``DriveUploader``. The design
+    upload sets ``drive_link`` on the order result and sends the customer
+    the link; once no upload of an order is left, an order waiting in
+    ``EXCEL_CREATED`` becomes ``COMPLETED``. An upload that failed for good
+    fails the order.
+    """
+
+    def __init__(
+        self,
+        order_repository: OrderRepository,
+        notify: Optional[Callable[[str, str, str], dict[str, Any]]] = None,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            order_repository: Repository holding the orders
+            notify: Sends a customer notification, called with
+                (order_id, message, language)
+        """
+        self.order_repository = order_repository
+        self.notify = notify
+
+    def __call__(self, job: dict[str, Any], result: dict[str, Any]) -> None:
+        """Record a finished upload job on its order.
+
+        Args:
+            job: Outbox job with "order_id", "kind" and "unfinished", the
+                number of uploads of the order still waiting
+            result: Result of the upload
+        """
+        order = self.order_repository.get_by_id(job["order_id"])
+        if order is None:
+            logger.warning(f"Drive upload finished for unknown order {job['order_id']}")
+            return
+
+        if not result.get("success"):
+            _add_phase(
+                order,
+                "drive_upload_failed",
+                f"Upload of {job['kind']} failed: {result.get('error')}",
+            )
+            _update_status(order, OrderStatus.FAILED)
+            self.order_repository.update(order)
+            return
+
+        _add_phase(order, "drive_upload_completed", f"Uploaded {job['kind']} to Google Drive")
+        if job["kind"] == "design":
+            _set_result(order, "drive_link", result.get("drive_url"))
+            if self.notify is not None:
+                message = DESIGN_LINK_MESSAGE.format(value=result.get("drive_url"))
+                notification = self.notify(job["order_id"], message, order.language)
+                _set_result(order, "notification_sent", bool(notification.get("success")))
+        if not job["unfinished"] and order.status == OrderStatus.EXCEL_CREATED:
+            _update_status(order, OrderStatus.COMPLETED)
+        self.order_repository.update(order)
+
+
+def _add_phase(order: Order, phase: str, details: str) -> None:
+    """Record a phase in the form the order keeps them.
+
+    Orders created by the API keep their result and phases as plain dicts.
+    """
+    if isinstance(order.result, dict):
+        order.phases.append(asdict(OrderPhase.create(phase, details)))
+    else:
+        order.add_phase(phase, details)
+
+
+def _update_status(order: Order, status: OrderStatus) -> None:
+    """Change the status of an order, recording the change as a phase."""
+    order.status = status
+    _add_phase(
+        order, f"status_changed_to_{status.value}", f"Order status changed to {status.value}"
+    )
+
+
+def _set_result(order: Order, name: str, value: Any) -> None:
+    """Set a field of the order result, which may be an OrderResult or a dict."""
+    if isinstance(order.result, dict):
+        order.result[name] = value
+    else:
+        setattr(order.result, name, value)
@@ -0,0 +1,151 @@
+"""Rule-based planning for well-formed orders."""
+
+from dataclasses import dataclass
+from typing import Any
+from typing import Optional
+
+from tshirt_fulfillment.src.core.domain.design import DesignPriority
+from tshirt_fulfillment.src.core.domain.plan import ExecutionPlan
+from tshirt_fulfillment.src.core.metrics import HitMissMetrics
+from tshirt_fulfillment.src.core.use_cases.plan_executor import build_order_fulfillment_plan
+
+REQUIRED_ORDER_FIELDS = ("size", "color", "quantity")
+VALID_SIZES = ("XS", "S", "M", "L", "XL", "XXL", "2XL", "3XL")
+MIN_PROMPT_WORDS = 3
+# Orders of at least this many shirts are scheduled as bulk design jobs
+BULK_ORDER_QUANTITY = 20
+
+
+@dataclass
+class OrderPlanDecision:
+    """Outcome of checking whether an order can skip the LLM planner"""
+
+    fast_path: bool
+    reason: str
+    prompt: Optional[str] = None
+
+
+class FastPathMetrics(HitMissMetrics):
+    """Thread-safe counters for fast-path planning decisions."""
+
+
+# Process-wide fast-path metrics
+fast_path_metrics = FastPathMetrics()
+
+
+def design_priority(customer_info: dict[str, Any]) -> DesignPriority:
+    """Get the design scheduling priority of an order.
+
+    An explicit ``customer_info["priority"]`` wins; otherwise reprints are
+    rushed and orders of ``BULK_ORDER_QUANTITY`` shirts or more are bulk.
+
+    Args:
+        customer_info: Structured order details
+
+    Returns:
+        DesignPriority of the order's design job
+    """
+    if customer_info.get("priority"):
+        return DesignPriority.parse(customer_info["priority"])
+    if customer_info.get("reprint"):
+        return DesignPriority.RUSH
+    try:
+        if int(customer_info.get("quantity") or 0) >= BULK_ORDER_QUANTITY:
+            return DesignPriority.BULK
+    except (TypeError, ValueError):
+        pass
+    return DesignPriority.STANDARD
+
+
+class RuleBasedOrderPlanner:
+    """Planner that builds the fixed fulfillment plan for complete orders.
+
+    An order is complete when ``customer_info`` carries a valid size, a
+    color and a positive quantity, and the design prompt (either
+    ``customer_info["design_prompt"]`` or the customer message) is a clear
+    statement rather than a question. Anything else is left to the LLM.
+    """
+
+    def __init__(self, metrics: Optional[FastPathMetrics] = None, async_upload: bool = False):
+        """Initialize the planner.
+
+        Args:
+            metrics: Metrics to record decisions in. Defaults to the
+                process-wide ``fast_path_metrics``.
+            async_upload: Leave the Drive uploads and the notification out
+                of the plan, for a background uploader to do
+        """
+        self.metrics = metrics if metrics is not None else fast_path_metrics
+        self.async_upload = async_upload
+
+    def evaluate(
+        self, customer_message: str, customer_info: Optional[dict[str, Any]]
+    ) -> OrderPlanDecision:
+        """Decide whether an order can take the fast path.
+
+        Args:
+            customer_message: Customer's order description
+            customer_info: Structured order details, if any
+
+        Returns:
+            OrderPlanDecision with the reason for the decision
+        """
+        if not customer_info:
+            return OrderPlanDecision(fast_path=False, reason="missing customer_info")
+
+        missing = [key for key in REQUIRED_ORDER_FIELDS if not customer_info.get(key)]
+        if missing:
+            return OrderPlanDecision(fast_path=False, reason=f"missing fields: {missing}")
+
+        size = str(customer_info["size"]).strip().upper()
+        if size not in VALID_SIZES:
+            return OrderPlanDecision(fast_path=False, reason=f"unknown size: {size}")
+
+        try:
+            quantity = int(customer_info["quantity"])
+        except (TypeError, ValueError):
+            return OrderPlanDecision(fast_path=False, reason="quantity is not a number")
+        if quantity <= 0:
+            return OrderPlanDecision(fast_path=False, reason="quantity must be positive")
+
+        prompt = (customer_info.get("design_prompt") or customer_message or "").strip()
+        if len(prompt.split()) < MIN_PROMPT_WORDS:
+            return OrderPlanDecision(fast_path=False, reason="design prompt too short")
+        if "?" in prompt:
+            return OrderPlanDecision(fast_path=False, reason="design prompt is a question")
+
+        return OrderPlanDecision(fast_path=True, reason="complete order", prompt=prompt)
+
+    def plan(
+        self,
+        order_id: str,
+        customer_message: str,
+        customer_info: Optional[dict[str, Any]],
+        language: str = "vi",
+    ) -> Optional[ExecutionPlan]:
+        """Build the fulfillment plan if the order qualifies for the fast path.
+
+        Args:
+            order_id: Unique identifier for the order
+            customer_message: Customer's order description
+            customer_info: Structured order details, if any
+            language: Language code for the notification
+
+        Returns:
+            The fixed fulfillment plan, or None if the LLM should plan instead
+        """
+        decision = self.evaluate(customer_message, customer_info)
+        self.metrics.record(decision.fast_path)
+        if not decision.fast_path:
+            return None
+
+        return build_order_fulfillment_plan(
+            order_id=order_id,
+            prompt=decision.prompt,
+            customer_info=customer_info,
+            language=language,
+            style=customer_info.get("style"),
+            priority=design_priority(customer_info).value,
+            customer_id=customer_info.get("email") or customer_info.get("name"),
+            async_upload=self.async_upload,
+        )
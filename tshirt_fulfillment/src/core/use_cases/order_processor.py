@@ -1,19 +1,114 @@
 """Order processing use case implementation."""
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from dataclasses import dataclass
 from typing import Any
+from typing import Callable
 from typing import Optional
 
 import requests
 
 from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.src.core.domain.agent import AgentSession
 from tshirt_fulfillment.src.core.domain.design import Design
 from tshirt_fulfillment.src.core.domain.order import Order
 from tshirt_fulfillment.src.core.domain.order import OrderStatus
+from tshirt_fulfillment.src.core.domain.plan import ExecutionPlan
+from tshirt_fulfillment.src.core.domain.tools import ToolRegistry
+from tshirt_fulfillment.src.core.metrics import HitMissMetrics
+from tshirt_fulfillment.src.core.prompts import DESIGN_ASSISTANT_ROLE
+from tshirt_fulfillment.src.core.prompts import DESIGN_REQUEST
+from tshirt_fulfillment.src.core.prompts import PromptBudget
+from tshirt_fulfillment.src.core.prompts import get_system_prompt
+from tshirt_fulfillment.src.core.prompts import prompt_similarity
+from tshirt_fulfillment.src.core.resilience import ResilientDependency
+from tshirt_fulfillment.src.core.resilience import get_configured_dependency
+from tshirt_fulfillment.src.core.resilience import remaining_time
+from tshirt_fulfillment.src.core.use_cases.order_planner import RuleBasedOrderPlanner
+from tshirt_fulfillment.src.core.use_cases.plan_executor import PlanExecutor
 
 logger = logging.getLogger(__name__)
 
 
+class SpeculationMetrics(HitMissMetrics):
+    """Thread-safe counters for speculative designs.
+
+    A hit is a speculative design that was kept, a miss one that was not
+    used. Misses whose generation had already started are also counted as
+    wasted.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.wasted = 0
+
+    def record(self, kept: bool, wasted: bool = False) -> None:
+        """Record the outcome of one speculative design."""
+        with self._lock:
+            self._record(kept)
+            if wasted and not kept:
+                self.wasted += 1
+
+    def _counts(self) -> dict[str, Any]:
+        return {**super()._counts(), "wasted": self.wasted}
+
+    def _clear(self) -> None:
+        super()._clear()
+        self.wasted = 0
+
+
+# Process-wide speculative design metrics
+speculation_metrics = SpeculationMetrics()
+
+
+class _Speculation:
+    """A speculative design job that can be abandoned.
+
+    ``Future.cancel`` only stops jobs still waiting for a worker; a job
+    abandoned in the window after a worker picked it up skips the design
+    generation instead of running it for nothing.
+    """
+
+    def __init__(
+        self,
+        executor: ThreadPoolExecutor,
+        generate: Callable[[str], dict[str, Any]],
+        description: str,
+    ):
+        self._lock = threading.Lock()
+        self._abandoned = False
+        self._started = False
+        self.future = executor.submit(self._run, generate, description)
+
+    def result(self) -> Optional[dict[str, Any]]:
+        """Wait for the speculative design result."""
+        return self.future.result()
+
+    def abandon(self) -> bool:
+        """Give up on the job; its result, if any, is ignored.
+
+        Returns:
+            True if the design generation had already started, i.e. its
+            work is wasted
+        """
+        with self._lock:
+            self._abandoned = True
+            started = self._started
+        self.future.cancel()
+        return started
+
+    def _run(
+        self, generate: Callable[[str], dict[str, Any]], description: str
+    ) -> Optional[dict[str, Any]]:
+        with self._lock:
+            if self._abandoned:
+                return None
+            self._started = True
+        return generate(description)
+
+
 @dataclass
 class OrderProcessingResult:
     """Result of order processing operations"""
@@ -138,52 +233,110 @@ class OrderProcessor:
 class TShirtFulfillmentAgent:
     """AI agent for processing T-shirt orders."""
 
-    def __init__(self, redis_url: str, model_name: str):
+    def __init__(
+        self,
+        redis_url: str,
+        model_name: str,
+        tool_registry: Optional[ToolRegistry] = None,
+        planner: Optional[RuleBasedOrderPlanner] = None,
+        llm_dispatcher: Optional[Any] = None,
+        llm_dependency: Optional[ResilientDependency] = None,
+        speculative_design: Optional[bool] = None,
+        llm_router: Optional[Any] = None,
+    ):
         """Initialize the agent.
 
         Args:
             redis_url: URL for Redis connection
             model_name: Name of the LLM model to use
+            tool_registry: Registry with the customer tools. Required for
+                the fast path; without it every order goes through the LLM.
+            planner: Rule-based planner used to detect complete orders
+            llm_dispatcher: Optional micro-batching dispatcher (anything with
+                a ``submit(messages)`` method) shared by concurrent orders
+            llm_dependency: Circuit breaker, retry and concurrency guard for
+                LLM calls. Defaults to the process-wide "ollama" guard.
+            speculative_design: Start generating the design from the
+                customer message while the LLM is still answering. Defaults
+                to ``Config.SPECULATIVE_DESIGN_ENABLED``.
+            llm_router: Optional multi-model router (anything with a
+                ``complete(messages, request_class, timeout)`` method). Takes
+                precedence over ``llm_dispatcher``.
         """
         self.redis_url = redis_url
         self.model_name = model_name
         self.ollama_base_url = Config.OLLAMA_BASE_URL
         self.max_iterations = Config.MAX_AGENT_ITERATIONS
+        self.tool_registry = tool_registry
+        self.planner = planner or RuleBasedOrderPlanner()
+        self.llm_dispatcher = llm_dispatcher
+        self.llm_router = llm_router
+        self.llm_dependency = llm_dependency or get_configured_dependency("ollama")
+        self.prompt_budget = PromptBudget(
+            max_context_tokens=Config.LLM_CONTEXT_TOKENS,
+            reserved_response_tokens=Config.LLM_RESPONSE_TOKENS,
+        )
+        if speculative_design is None:
+            speculative_design = Config.SPECULATIVE_DESIGN_ENABLED
+        self.speculative_design = speculative_design
+        self.speculation_threshold = Config.SPECULATIVE_DESIGN_SIMILARITY
+        self._speculation_executor: Optional[ThreadPoolExecutor] = None
+        self._speculation_lock = threading.Lock()
 
     def process_order(
-        self, order_id: str, customer_message: str, language: str = "vi"
+        self,
+        order_id: str,
+        customer_message: str,
+        language: str = "vi",
+        customer_info: Optional[dict[str, Any]] = None,
     ) -> dict[str, Any]:
         """Process a T-shirt order using AI.
 
+        Complete orders (see ``RuleBasedOrderPlanner``) run the fixed
+        fulfillment pipeline directly; only ambiguous messages are sent to
+        the LLM.
+
         Args:
             order_id: Unique identifier for the order
             customer_message: Customer's order description
             language: Language code for the order (default: "vi")
+            customer_info: Structured order details, if any
 
         Returns:
             Dict containing processing results
         """
+        if self.tool_registry is not None:
+            plan = self.planner.plan(order_id, customer_message, customer_info, language)
+            if plan is not None:
+                return self._run_fast_path(order_id, plan)
+
         try:
             # Initialize conversation with the LLM
+            tool_descriptions = self.tool_registry.describe_tools() if self.tool_registry else ""
             messages = [
                 {
                     "role": "system",
-                    "content": (
-                        "You are a T-shirt design assistant. "
-                        "Help customers create their T-shirt designs based on their "
-                        "descriptions. Ask clarifying questions if needed."
+                    "content": get_system_prompt(
+                        DESIGN_ASSISTANT_ROLE, language, tool_descriptions
                     ),
                 },
                 {"role": "user", "content": customer_message},
             ]
 
+            # Optionally start on the design before the LLM has answered
+            speculation = self._start_speculative_design(customer_message)
+
             # Get initial response from LLM
             response = self._call_llm(messages)
             if not response:
+                if speculation is not None:
+                    speculation_metrics.record(False, wasted=speculation.abandon())
                 return {"success": False, "error": "Failed to get response from LLM"}
 
             # Process the response and generate design
-            design_result = self._generate_design(response)
+            design_result, speculative = self._resolve_design(
+                customer_message, response, speculation
+            )
             if not design_result["success"]:
                 return design_result
 
@@ -192,32 +345,156 @@ class TShirtFulfillmentAgent:
                 "order_id": order_id,
                 "design": design_result["design"],
                 "conversation": messages + [{"role": "assistant", "content": response}],
+                "fast_path": False,
+                "speculative_design": speculative,
             }
 
         except Exception as e:
             logger.error(f"Error processing order {order_id}: {str(e)}")
             return {"success": False, "error": f"Error processing order: {str(e)}"}
 
-    def _call_llm(self, messages: list) -> Optional[str]:
+    def _run_fast_path(self, order_id: str, plan: ExecutionPlan) -> dict[str, Any]:
+        """Run the fixed fulfillment plan without consulting the LLM.
+
+        Args:
+            order_id: Unique identifier for the order
+            plan: Fulfillment plan built by the rule-based planner
+
+        Returns:
+            Dict containing processing results
+        """
+        logger.info(f"Processing order {order_id} on the fast path")
+        session = AgentSession.create_customer_session(order_id)
+        result = PlanExecutor(self.tool_registry).execute(plan, session)
+
+        response = {
+            "success": result.success,
+            "order_id": order_id,
+            "design": result.outputs.get("design"),
+            "excel": result.outputs.get("excel"),
+            "drive_link": result.outputs.get("upload_design", {}).get("drive_url"),
+            "notification": result.outputs.get("notify"),
+            "tool_history": [asdict(call) for call in session.tool_history],
+            "fast_path": True,
+            "uploads_deferred": self.planner.async_upload,
+        }
+        if not result.success:
+            response["error"] = result.error
+        return response
+
+    def _call_llm(self, messages: list, request_class: str = DESIGN_REQUEST) -> Optional[str]:
         """Call the LLM API.
 
         Args:
-            messages: List of conversation messages
+            messages: List of conversation messages. The oldest history is
+                dropped if the prompt would overflow the model context.
+            request_class: Request class used to pick a model when an LLM
+                router is configured
 
         Returns:
             LLM response text or None if failed
         """
         try:
-            response = requests.post(
-                f"{self.ollama_base_url}/api/generate",
-                json={"model": self.model_name, "messages": messages, "stream": False},
-            )
-            response.raise_for_status()
-            return response.json()["response"]
+            messages = self.prompt_budget.trim(messages)
+            return self.llm_dependency.call(self._request_llm, messages, request_class)
         except Exception as e:
             logger.error(f"Error calling LLM: {str(e)}")
             return None
 
+    def _request_llm(self, messages: list, request_class: str = DESIGN_REQUEST) -> Optional[str]:
+        """Send one request to the LLM, bounded by the active deadline.
+
+        Args:
+            messages: List of conversation messages
+            request_class: Request class used by the LLM router
+
+        Returns:
+            LLM response text
+        """
+        timeout = remaining_time(default=Config.LLM_TIMEOUT_SECONDS)
+        if self.llm_router is not None:
+            return self.llm_router.complete(messages, request_class, timeout=timeout)
+        if self.llm_dispatcher is not None:
+            return self.llm_dispatcher.submit(messages, timeout=timeout)
+
+        response = requests.post(
+            f"{self.ollama_base_url}/api/generate",
+            json={"model": self.model_name, "messages": messages, "stream": False},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return response.json()["response"]
+
+    def _start_speculative_design(self, customer_message: str) -> Optional[_Speculation]:
+        """Start generating a design from the raw customer message.
+
+        Args:
+            customer_message: Customer's order description
+
+        Returns:
+            The speculative design job, or None if speculation is disabled
+        """
+        if not self.speculative_design:
+            return None
+        with self._speculation_lock:
+            if self._speculation_executor is None:
+                self._speculation_executor = ThreadPoolExecutor(
+                    max_workers=Config.SPECULATIVE_DESIGN_WORKERS,
+                    thread_name_prefix="speculative-design",
+                )
+            executor = self._speculation_executor
+        return _Speculation(executor, self._generate_design, customer_message)
+
+    def close(self) -> None:
+        """Stop the speculative design threads.
+
+        Speculative designs still running are finished; queued ones are
+        dropped.
+        """
+        with self._speculation_lock:
+            executor, self._speculation_executor = self._speculation_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _resolve_design(
+        self, customer_message: str, response: str, speculation: Optional[_Speculation]
+    ) -> tuple[dict[str, Any], bool]:
+        """Pick the speculative design or generate one from the LLM response.
+
+        The speculative design is kept when the LLM response is close enough
+        to the customer message (see ``prompt_similarity``) and the
+        speculative generation succeeded; otherwise it is abandoned and the
+        design is generated from the response.
+
+        Args:
+            customer_message: Customer's order description
+            response: Refined design description from the LLM
+            speculation: Job returned by ``_start_speculative_design``
+
+        Returns:
+            Tuple of the design result and whether it came from speculation
+        """
+        if speculation is None:
+            return self._generate_design(response), False
+
+        similarity = prompt_similarity(customer_message, response)
+        if similarity >= self.speculation_threshold:
+            try:
+                result = speculation.result()
+            except Exception as e:
+                logger.warning(f"Speculative design failed: {str(e)}")
+                result = None
+            if result is not None and result["success"]:
+                speculation_metrics.record(True)
+                return result, True
+            speculation_metrics.record(False)
+        else:
+            wasted = speculation.abandon()
+            speculation_metrics.record(False, wasted=wasted)
+            logger.info(f"Discarding speculative design (similarity {similarity:.2f})")
+
+        return self._generate_design(response), False
+
     def _generate_design(self, description: str) -> dict[str, Any]:
         """Generate a T-shirt design based on the description.
 
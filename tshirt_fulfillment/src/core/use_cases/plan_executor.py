@@ -0,0 +1,221 @@
+"""Concurrent execution of agent plans."""
+
+import logging
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Optional
+
+from tshirt_fulfillment.src.core.domain.agent import AgentSession
+from tshirt_fulfillment.src.core.domain.plan import ExecutionPlan
+from tshirt_fulfillment.src.core.domain.plan import PlanStep
+from tshirt_fulfillment.src.core.domain.plan import StepOutput
+from tshirt_fulfillment.src.core.domain.tools import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PlanExecutionResult:
+    """Result of plan execution"""
+
+    success: bool
+    outputs: dict[str, dict[str, Any]] = field(default_factory=dict)
+    failed_steps: list[str] = field(default_factory=list)
+    skipped_steps: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class PlanExecutor:
+    """Use case for running agent plans against a tool registry.
+
+    Steps whose dependencies have all succeeded are submitted to a thread
+    pool together, so independent tool calls (e.g. design generation and
+    Excel creation) overlap. Steps depending on a failed step are skipped.
+    Every executed step is recorded on the session via
+    ``AgentSession.add_tool_call``.
+    """
+
+    def __init__(self, tool_registry: ToolRegistry, max_workers: int = 4):
+        """Initialize the plan executor.
+
+        Args:
+            tool_registry: Registry used to resolve step tool names
+            max_workers: Maximum number of tool calls running at once
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.tool_registry = tool_registry
+        self.max_workers = max_workers
+
+    def execute(self, plan: ExecutionPlan, session: AgentSession) -> PlanExecutionResult:
+        """Execute a plan, running independent steps concurrently.
+
+        Args:
+            plan: Plan to execute
+            session: Session that receives the tool call history
+
+        Returns:
+            PlanExecutionResult with the output of every executed step
+        """
+        try:
+            plan.validate()
+            for step in plan.steps:
+                if not self.tool_registry.get_tool(step.tool_name):
+                    raise ValueError(f"Unknown tool in step {step.id}: {step.tool_name}")
+        except ValueError as e:
+            return PlanExecutionResult(success=False, error=str(e))
+
+        result = PlanExecutionResult(success=True)
+        pending = {step.id: step for step in plan.steps}
+        running: dict[Future, tuple[PlanStep, dict[str, Any]]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                self._skip_blocked_steps(pending, result)
+
+                for step in self._ready_steps(pending, result):
+                    del pending[step.id]
+                    try:
+                        step_input = step.resolve_input(result.outputs)
+                    except (KeyError, IndexError, ValueError) as e:
+                        self._record(session, result, step, {}, {"success": False, "error": str(e)})
+                        continue
+                    future = pool.submit(self._run_step, step, step_input)
+                    running[future] = (step, step_input)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, step_input = running.pop(future)
+                    self._record(session, result, step, step_input, future.result())
+
+        if result.failed_steps or result.skipped_steps:
+            result.success = False
+            result.error = f"Plan steps failed: {result.failed_steps}"
+        return result
+
+    def _run_step(self, step: PlanStep, step_input: dict[str, Any]) -> dict[str, Any]:
+        """Invoke the tool handler for a step, never raising."""
+        tool = self.tool_registry.get_tool(step.tool_name)
+        try:
+            output = tool.handler(**step_input)
+        except Exception as e:
+            logger.error(f"Error running tool {step.tool_name} for step {step.id}: {str(e)}")
+            return {"success": False, "error": str(e)}
+        if not isinstance(output, dict):
+            output = {"success": True, "result": output}
+        return output
+
+    @staticmethod
+    def _record(
+        session: AgentSession,
+        result: PlanExecutionResult,
+        step: PlanStep,
+        step_input: dict[str, Any],
+        output: dict[str, Any],
+    ) -> None:
+        """Store a step output and add it to the session tool history."""
+        success = bool(output.get("success", True))
+        result.outputs[step.id] = output
+        if not success:
+            result.failed_steps.append(step.id)
+        # Only the coordinating thread touches the session
+        session.add_tool_call(step.tool_name, step_input, output, success)
+
+    @staticmethod
+    def _ready_steps(pending: dict[str, PlanStep], result: PlanExecutionResult) -> list[PlanStep]:
+        """Get pending steps whose dependencies have all completed."""
+        return [
+            step
+            for step in pending.values()
+            if all(dep in result.outputs for dep in step.depends_on)
+        ]
+
+    @staticmethod
+    def _skip_blocked_steps(pending: dict[str, PlanStep], result: PlanExecutionResult) -> None:
+        """Skip pending steps that depend on a failed or skipped step."""
+        blocked = set(result.failed_steps) | set(result.skipped_steps)
+        changed = True
+        while changed:
+            changed = False
+            for step in list(pending.values()):
+                if blocked.intersection(step.depends_on):
+                    del pending[step.id]
+                    result.skipped_steps.append(step.id)
+                    blocked.add(step.id)
+                    changed = True
+
+
+def build_order_fulfillment_plan(
+    order_id: str,
+    prompt: str,
+    customer_info: dict[str, Any],
+    language: str = "vi",
+    style: Optional[str] = None,
+    priority: Optional[str] = None,
+    customer_id: Optional[str] = None,
+    async_upload: bool = False,
+) -> ExecutionPlan:
+    """Build the standard customer order plan.
+
+    Excel creation does not depend on the design, so it runs alongside
+    design generation; each file is uploaded as soon as it exists and the
+    customer is notified once both uploads are done. ``priority`` and
+    ``customer_id`` are passed to the design generator for scheduling.
+    With ``async_upload`` the plan ends once both files exist: uploading
+    them and notifying the customer is left to the background uploader.
+    """
+    design_input = {"order_id": order_id, "prompt": prompt, "style": style}
+    if priority is not None:
+        design_input["priority"] = priority
+    if customer_id is not None:
+        design_input["customer_id"] = customer_id
+    plan = ExecutionPlan()
+    plan.add_step("design", "generate_design", design_input)
+    plan.add_step(
+        "excel",
+        "create_excel_file",
+        {"order_id": order_id, "customer_info": customer_info},
+    )
+    if async_upload:
+        return plan
+    plan.add_step(
+        "upload_design",
+        "upload_to_drive",
+        {
+            "order_id": order_id,
+            "file_path": StepOutput("design", "image_path"),
+            "name": StepOutput("design", "file_name"),
+        },
+        depends_on=["design"],
+    )
+    plan.add_step(
+        "upload_excel",
+        "upload_to_drive",
+        {
+            "order_id": order_id,
+            "file_path": StepOutput("excel", "file_path"),
+            "name": StepOutput("excel", "file_name"),
+        },
+        depends_on=["excel"],
+    )
+    plan.add_step(
+        "notify",
+        "notify_customer",
+        {
+            "order_id": order_id,
+            "message": StepOutput(
+                "upload_design", "drive_url", template="Your T-shirt design is ready: {value}"
+            ),
+            "language": language,
+        },
+        depends_on=["upload_design", "upload_excel"],
+    )
+    return plan
@@ -1,9 +1,40 @@
+from functools import lru_cache
+from typing import Optional
+
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
 from tshirt_fulfillment.src.adapters.services.admin_services import GoogleSheetAdmin
+from tshirt_fulfillment.src.adapters.services.analytics_export import AnalyticsExporter
+from tshirt_fulfillment.src.adapters.services.blob_store import BlobStore
+from tshirt_fulfillment.src.adapters.services.customer_tools import register_customer_tools
+from tshirt_fulfillment.src.adapters.services.design_cache import DesignCache
+from tshirt_fulfillment.src.adapters.services.design_scheduler import DesignJobScheduler
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.design_variants import DesignPostProcessor
+from tshirt_fulfillment.src.adapters.services.design_variants import default_variant_specs
+from tshirt_fulfillment.src.adapters.services.design_workers import DesignWorkerPool
+from tshirt_fulfillment.src.adapters.services.drive_client import DriveClient
+from tshirt_fulfillment.src.adapters.services.drive_folders import DriveFolderMap
+from tshirt_fulfillment.src.adapters.services.drive_outbox import DriveUploader
+from tshirt_fulfillment.src.adapters.services.drive_outbox import DriveUploadOutbox
+from tshirt_fulfillment.src.adapters.services.excel_writer import get_order_template
+from tshirt_fulfillment.src.adapters.services.external_services import CustomerNotifier
+from tshirt_fulfillment.src.adapters.services.external_services import DesignGenerator
+from tshirt_fulfillment.src.adapters.services.external_services import ExcelHandler
+from tshirt_fulfillment.src.adapters.services.external_services import GoogleDriveManager
+from tshirt_fulfillment.src.adapters.services.llm_batching import LLMBatchDispatcher
+from tshirt_fulfillment.src.adapters.services.llm_batching import OllamaBatchBackend
+from tshirt_fulfillment.src.adapters.services.llm_router import LLMRouter
+from tshirt_fulfillment.src.adapters.services.llm_router import ModelBackend
+from tshirt_fulfillment.src.adapters.services.llm_router import OllamaModel
+from tshirt_fulfillment.src.adapters.services.order_export import OrderExcelExporter
 from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.src.core.domain.tools import ToolRegistry
 from tshirt_fulfillment.src.core.repositories.order_repository import OrderRepository
+from tshirt_fulfillment.src.core.resilience import RetryPolicy
+from tshirt_fulfillment.src.core.use_cases.drive_uploads import DriveUploadTracker
+from tshirt_fulfillment.src.core.use_cases.order_planner import RuleBasedOrderPlanner
 from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent
 
 
@@ -13,14 +44,226 @@ def get_db():
     return None
 
 
+@lru_cache(maxsize=1)
+def get_memory_order_repository() -> OrderRepository:
+    """Get the process-wide in-memory order repository, used without a database."""
+    return OrderRepository()
+
+
 def get_order_repository(db: Session = Depends(get_db)) -> OrderRepository:
-    """Get order repository instance."""
+    """Get order repository instance.
+
+    Without a database session every caller shares one in-memory
+    repository, so orders saved by one request or background job are
+    seen by the others.
+    """
+    if db is None:
+        return get_memory_order_repository()
     return OrderRepository(db)
 
 
+@lru_cache(maxsize=1)
+def get_design_worker_pool() -> Optional[DesignWorkerPool]:
+    """Get the process-wide design worker pool, if design workers are enabled."""
+    design_config = Config.get_design_generator_config()
+    if design_config["provider"] != "stable_diffusion" or not design_config["workers"]:
+        return None
+    return DesignWorkerPool(design_config, num_workers=design_config["workers"])
+
+
+@lru_cache(maxsize=1)
+def get_design_cache() -> Optional[DesignCache]:
+    """Get the process-wide design cache, if caching is enabled."""
+    cache_config = Config.get_design_cache_config()
+    if not cache_config:
+        return None
+    return DesignCache(**cache_config)
+
+
+@lru_cache(maxsize=1)
+def get_design_scheduler() -> Optional[DesignJobScheduler]:
+    """Get the process-wide design job scheduler, if provider limits are set."""
+    scheduler_config = Config.get_design_scheduler_config()
+    if not scheduler_config:
+        return None
+    return DesignJobScheduler(**scheduler_config)
+
+
+@lru_cache(maxsize=1)
+def get_design_post_processor() -> Optional[DesignPostProcessor]:
+    """Get the process-wide design post-processor, if post-processing is enabled."""
+    postprocess_config = Config.get_design_postprocess_config()
+    if not postprocess_config:
+        return None
+    max_workers = postprocess_config.pop("max_workers")
+    return DesignPostProcessor(default_variant_specs(**postprocess_config), max_workers)
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> Optional[BlobStore]:
+    """Get the process-wide artifact blob store, if it is enabled."""
+    blob_store_config = Config.get_blob_store_config()
+    if not blob_store_config:
+        return None
+    return BlobStore(**blob_store_config)
+
+
+@lru_cache(maxsize=1)
+def get_design_service() -> DesignServiceAdapter:
+    """Get the process-wide design service with its providers, cache and scheduler."""
+    return DesignServiceAdapter(
+        worker_pool=get_design_worker_pool(),
+        cache=get_design_cache(),
+        scheduler=get_design_scheduler(),
+        post_processor=get_design_post_processor(),
+        blob_store=get_blob_store(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_drive_client() -> Optional[DriveClient]:
+    """Get the process-wide Google Drive client, if Drive credentials are set.
+
+    Sharing one client shares its HTTP connections and access token.
+    """
+    drive_config = Config.get_google_drive_config()
+    if not drive_config:
+        return None
+    return DriveClient(**drive_config, **Config.get_drive_upload_config())
+
+
+@lru_cache(maxsize=1)
+def get_drive_folder_map() -> Optional[DriveFolderMap]:
+    """Get the process-wide map of orders to Drive folders, if Drive is configured."""
+    if get_drive_client() is None:
+        return None
+    return DriveFolderMap(Config.DRIVE_FOLDER_MAP_PATH)
+
+
+@lru_cache(maxsize=1)
+def get_drive_outbox() -> Optional[DriveUploadOutbox]:
+    """Get the process-wide outbox of Drive uploads, if background uploads are enabled."""
+    outbox_config = Config.get_drive_outbox_config()
+    if not outbox_config:
+        return None
+    retry = RetryPolicy(
+        max_attempts=outbox_config["max_attempts"],
+        base_delay=outbox_config["retry_delay"],
+        max_delay=600.0,
+    )
+    return DriveUploadOutbox(outbox_config["path"], retry=retry)
+
+
+@lru_cache(maxsize=1)
+def get_drive_manager() -> GoogleDriveManager:
+    """Get the process-wide Google Drive manager."""
+    return GoogleDriveManager(
+        client=get_drive_client(), folder_map=get_drive_folder_map(), outbox=get_drive_outbox()
+    )
+
+
+@lru_cache(maxsize=1)
+def get_drive_uploader() -> Optional[DriveUploader]:
+    """Get the process-wide background Drive uploader, if background uploads are enabled.
+
+    Finished uploads are recorded on their orders and the customer is sent
+    the design link.
+    """
+    outbox = get_drive_outbox()
+    if outbox is None:
+        return None
+    tracker = DriveUploadTracker(
+        get_order_repository(get_db()), notify=CustomerNotifier().send_notification
+    )
+    return DriveUploader(
+        outbox,
+        get_drive_manager(),
+        on_finished=tracker,
+        poll_interval=Config.DRIVE_OUTBOX_POLL_SECONDS,
+    )
+
+
+def get_order_exporter() -> OrderExcelExporter:
+    """Get the consolidated order exporter."""
+    return OrderExcelExporter(
+        Config.ORDER_EXPORT_DIR,
+        max_sheet_rows=Config.ORDER_EXPORT_MAX_SHEET_ROWS,
+        max_file_rows=Config.ORDER_EXPORT_MAX_FILE_ROWS,
+        template=get_order_template(Config.EXCEL_TEMPLATE_PATH),
+    )
+
+
+def get_analytics_exporter() -> AnalyticsExporter:
+    """Get the columnar analytics exporter."""
+    return AnalyticsExporter(Config.ANALYTICS_EXPORT_DIR, Config.ANALYTICS_EXPORT_FORMAT)
+
+
+@lru_cache(maxsize=1)
+def get_customer_tool_registry() -> ToolRegistry:
+    """Get the process-wide registry of customer tools."""
+    design_generator = DesignGenerator(service=get_design_service())
+    excel_handler = ExcelHandler(blob_store=get_blob_store())
+    return register_customer_tools(
+        ToolRegistry(),
+        design_generator=design_generator,
+        excel_handler=excel_handler,
+        drive_manager=get_drive_manager(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_llm_dispatcher() -> Optional[LLMBatchDispatcher]:
+    """Get the process-wide LLM batch dispatcher, if batching is enabled."""
+    batching_config = Config.get_llm_batching_config()
+    if not batching_config:
+        return None
+    backend = OllamaBatchBackend(
+        base_url=Config.OLLAMA_BASE_URL,
+        model_name=Config.LLM_PROVIDER,
+        batch_url=batching_config["batch_url"],
+        timeout=Config.LLM_TIMEOUT_SECONDS,
+    )
+    return LLMBatchDispatcher(
+        backend,
+        max_batch_size=batching_config["max_batch_size"],
+        max_wait=batching_config["max_wait"],
+    )
+
+
+@lru_cache(maxsize=1)
+def get_llm_router() -> Optional[LLMRouter]:
+    """Get the process-wide multi-model LLM router, if router models are set."""
+    router_config = Config.get_llm_router_config()
+    if not router_config:
+        return None
+    backends = [
+        ModelBackend(
+            name=model["name"],
+            complete=OllamaModel(
+                Config.OLLAMA_BASE_URL, model["name"], timeout=Config.LLM_TIMEOUT_SECONDS
+            ),
+            tier=model["tier"],
+        )
+        for model in router_config["models"]
+    ]
+    return LLMRouter(
+        backends,
+        request_tiers=router_config["request_tiers"],
+        max_error_rate=router_config["max_error_rate"],
+    )
+
+
+@lru_cache(maxsize=1)
 def get_agent() -> TShirtFulfillmentAgent:
     """Get AI agent instance."""
-    return TShirtFulfillmentAgent(redis_url=Config.REDIS_URL, model_name=Config.LLM_PROVIDER)
+    return TShirtFulfillmentAgent(
+        redis_url=Config.REDIS_URL,
+        model_name=Config.LLM_PROVIDER,
+        tool_registry=get_customer_tool_registry(),
+        planner=RuleBasedOrderPlanner(async_upload=get_drive_outbox() is not None),
+        llm_dispatcher=get_llm_dispatcher(),
+        llm_router=get_llm_router(),
+    )
 
 
 def get_google_sheet_admin() -> GoogleSheetAdmin:
@@ -5,7 +5,23 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from tshirt_fulfillment.src.adapters.services.external_services import shutdown_upload_pool
 from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.src.core.resilience import dependencies_snapshot
+from tshirt_fulfillment.src.core.use_cases.order_planner import fast_path_metrics
+from tshirt_fulfillment.src.core.use_cases.order_processor import speculation_metrics
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_agent
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_blob_store
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_design_cache
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_design_post_processor
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_design_scheduler
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_design_worker_pool
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_client
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_folder_map
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_manager
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_outbox
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_uploader
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_llm_router
 from tshirt_fulfillment.src.interfaces.api.routes import admin_routes
 from tshirt_fulfillment.src.interfaces.api.routes import order_routes
 
@@ -30,6 +46,47 @@ app.include_router(order_routes.router)
 app.include_router(admin_routes.router)
 
 
+# Collect unreferenced artifacts on startup
+@app.on_event("startup")
+def collect_artifact_garbage():
+    """Delete blobs that lost their last reference before the grace period."""
+    blob_store = get_blob_store()
+    if blob_store is not None:
+        blob_store.gc()
+
+
+# Drain queued Drive uploads, including those left over from the last run
+@app.on_event("startup")
+def start_drive_uploader():
+    """Start the background Drive uploader if background uploads are enabled."""
+    drive_uploader = get_drive_uploader()
+    if drive_uploader is not None:
+        drive_uploader.start()
+
+
+# Stop design workers on shutdown
+@app.on_event("shutdown")
+def shutdown_design_workers():
+    """Stop the design workers, post-processing, speculative designs and Drive uploads."""
+    if get_agent.cache_info().currsize:
+        get_agent().close()
+    if get_design_worker_pool.cache_info().currsize:
+        worker_pool = get_design_worker_pool()
+        if worker_pool is not None:
+            worker_pool.close()
+    if get_design_post_processor.cache_info().currsize:
+        post_processor = get_design_post_processor()
+        if post_processor is not None:
+            post_processor.close()
+    if get_drive_uploader.cache_info().currsize:
+        drive_uploader = get_drive_uploader()
+        if drive_uploader is not None:
+            drive_uploader.stop()
+    if get_drive_manager.cache_info().currsize:
+        get_drive_manager().close()
+    shutdown_upload_pool()
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -37,6 +94,31 @@ async def health_check():
     return {"status": "healthy"}
 
 
+# Metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics endpoint."""
+    llm_router = get_llm_router()
+    design_cache = get_design_cache()
+    design_scheduler = get_design_scheduler()
+    blob_store = get_blob_store()
+    drive_client = get_drive_client()
+    drive_folders = get_drive_folder_map()
+    drive_outbox = get_drive_outbox()
+    return {
+        "fast_path": fast_path_metrics.snapshot(),
+        "speculative_design": speculation_metrics.snapshot(),
+        "dependencies": dependencies_snapshot(),
+        "llm_router": llm_router.snapshot() if llm_router else None,
+        "design_cache": design_cache.snapshot() if design_cache else None,
+        "design_queue": design_scheduler.snapshot() if design_scheduler else None,
+        "blob_store": blob_store.snapshot() if blob_store else None,
+        "drive": drive_client.snapshot() if drive_client else None,
+        "drive_folders": drive_folders.snapshot() if drive_folders else None,
+        "drive_outbox": drive_outbox.snapshot() if drive_outbox else None,
+    }
+
+
 # Run the API server
 if __name__ == "__main__":
     import uvicorn
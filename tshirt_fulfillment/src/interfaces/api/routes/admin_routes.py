@@ -9,7 +9,13 @@ from fastapi.security import APIKeyHeader
 from pydantic import BaseModel
 
 from tshirt_fulfillment.src.adapters.services.admin_services import GoogleSheetAdmin
+from tshirt_fulfillment.src.adapters.services.analytics_export import AnalyticsExporter
+from tshirt_fulfillment.src.adapters.services.order_export import OrderExcelExporter
+from tshirt_fulfillment.src.core.repositories.order_repository import OrderRepository
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_analytics_exporter
 from tshirt_fulfillment.src.interfaces.api.dependencies import get_google_sheet_admin
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_order_exporter
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_order_repository
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -54,6 +60,13 @@ class SummarySheetRequest(BaseModel):
     summary_type: str
 
 
+class OrderExportRequest(BaseModel):
+    batch_name: Optional[str] = None
+    split_by_status: bool = False
+    since: Optional[float] = None
+    until: Optional[float] = None
+
+
 @router.post("/sheets/find")
 async def find_google_sheet(
     request: FindSheetRequest,
@@ -125,3 +138,40 @@ async def generate_summary_sheet(
         raise HTTPException(status_code=400, detail=result["error"])
 
     return result
+
+
+@router.post("/exports/orders")
+def export_orders(
+    request: OrderExportRequest,
+    api_key: str = Depends(get_api_key),
+    order_repository: OrderRepository = Depends(get_order_repository),
+    exporter: OrderExcelExporter = Depends(get_order_exporter),
+):
+    """Export orders into consolidated Excel workbooks for the print shop."""
+    result = exporter.export(
+        order_repository.iter_all(),
+        batch_name=request.batch_name,
+        split_by_status=request.split_by_status,
+        since=request.since,
+        until=request.until,
+    )
+
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return result
+
+
+@router.post("/exports/analytics")
+def export_analytics(
+    api_key: str = Depends(get_api_key),
+    order_repository: OrderRepository = Depends(get_order_repository),
+    exporter: AnalyticsExporter = Depends(get_analytics_exporter),
+):
+    """Export orders, phases and tool calls as partitioned columnar files."""
+    result = exporter.export(order_repository.iter_all())
+
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return result
@@ -1,23 +1,44 @@
+import mimetypes
 import time
 import uuid
+from collections.abc import Iterator
 from typing import Any
 from typing import Optional
+from urllib.parse import quote
 
 from fastapi import APIRouter
 from fastapi import BackgroundTasks
 from fastapi import Depends
 from fastapi import HTTPException
+from fastapi import Request
+from fastapi.responses import FileResponse
+from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.design_variants import default_variant_specs
+from tshirt_fulfillment.src.adapters.services.external_services import GoogleDriveManager
 from tshirt_fulfillment.src.core.domain.order import Order
 from tshirt_fulfillment.src.core.domain.order import OrderStatus
 from tshirt_fulfillment.src.core.repositories.order_repository import OrderRepository
 from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent
 from tshirt_fulfillment.src.interfaces.api.dependencies import get_agent
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_design_service
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_manager
 from tshirt_fulfillment.src.interfaces.api.dependencies import get_order_repository
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
+# Bytes read at a time when streaming part of a design file
+RANGE_CHUNK_SIZE = 64 * 1024
+
+# Downloadable design files by variant name
+DESIGN_FILES = {
+    "design": "design.png",
+    **{spec.name: spec.filename for spec in default_variant_specs()},
+}
+
 
 # Request and response models
 class OrderRequest(BaseModel):
@@ -45,8 +66,14 @@ def process_order_task(
     request: OrderRequest,
     agent: TShirtFulfillmentAgent,
     order_repository: OrderRepository,
+    drive_manager: Optional[GoogleDriveManager] = None,
 ):
-    """Background task to process an order using the AI agent."""
+    """Background task to process an order using the AI agent.
+
+    If the agent left the Drive uploads to the background uploader, the
+    order is stored as EXCEL_CREATED before its uploads are queued; the
+    uploader completes it.
+    """
     try:
         # Get the order
         order = order_repository.get_by_id(order_id)
@@ -66,11 +93,24 @@ def process_order_task(
 
         # Process the order using the AI agent
         result = agent.process_order(
-            order_id=order_id, customer_message=request.customer_message, language=request.language
+            order_id=order_id,
+            customer_message=request.customer_message,
+            language=request.language,
+            customer_info=request.customer_info,
         )
 
         # Update order status based on result
-        if result["success"]:
+        uploads_deferred = result["success"] and result.get("uploads_deferred")
+        if uploads_deferred:
+            order.status = OrderStatus.EXCEL_CREATED
+            order.phases.append(
+                {
+                    "phase": "uploads_queued",
+                    "timestamp": time.time(),
+                    "details": "Design and Excel file created, uploading to Google Drive",
+                }
+            )
+        elif result["success"]:
             order.status = OrderStatus.COMPLETED
             order.phases.append(
                 {
@@ -93,6 +133,29 @@ def process_order_task(
         order.result = result
         order_repository.update(order)
 
+        if uploads_deferred:
+            drive_manager = drive_manager or get_drive_manager()
+            design, excel = result["design"], result["excel"]
+            queued = [
+                drive_manager.enqueue_upload(
+                    order_id, design["image_path"], "design", design.get("file_name")
+                ),
+                drive_manager.enqueue_upload(
+                    order_id, excel["file_path"], "excel", excel.get("file_name")
+                ),
+            ]
+            errors = [upload["error"] for upload in queued if not upload["success"]]
+            if errors:
+                order.status = OrderStatus.FAILED
+                order.phases.append(
+                    {
+                        "phase": "uploads_queue_failed",
+                        "timestamp": time.time(),
+                        "details": f"Could not queue Drive uploads: {errors[0]}",
+                    }
+                )
+                order_repository.update(order)
+
     except Exception as e:
         if order:
             order.status = OrderStatus.FAILED
@@ -112,6 +175,7 @@ async def create_order(
     background_tasks: BackgroundTasks,
     agent: TShirtFulfillmentAgent = Depends(get_agent),
     order_repository: OrderRepository = Depends(get_order_repository),
+    drive_manager: GoogleDriveManager = Depends(get_drive_manager),
 ):
     """Create a new order and start processing it."""
     # Generate a unique order ID
@@ -137,7 +201,9 @@ async def create_order(
     order_repository.save(order)
 
     # Start processing the order in the background
-    background_tasks.add_task(process_order_task, order_id, request, agent, order_repository)
+    background_tasks.add_task(
+        process_order_task, order_id, request, agent, order_repository, drive_manager
+    )
 
     return OrderResponse(
         order_id=order_id, status="received", message="Order received and processing has started"
@@ -186,6 +252,7 @@ async def retry_order(
     background_tasks: BackgroundTasks,
     agent: TShirtFulfillmentAgent = Depends(get_agent),
     order_repository: OrderRepository = Depends(get_order_repository),
+    drive_manager: GoogleDriveManager = Depends(get_drive_manager),
 ):
     """Retry processing an order."""
     order = order_repository.get_by_id(order_id)
@@ -207,6 +274,137 @@ async def retry_order(
     order_repository.update(order)
 
     # Start processing the order in the background
-    background_tasks.add_task(process_order_task, order_id, request, agent, order_repository)
+    background_tasks.add_task(
+        process_order_task, order_id, request, agent, order_repository, drive_manager
+    )
 
     return {"message": "Order processing restarted"}
+
+
+@router.get("/{order_id}/designs/{variant}")
+def download_design(
+    order_id: str,
+    variant: str,
+    request: Request,
+    design_service: DesignServiceAdapter = Depends(get_design_service),
+):
+    """Download a design file of an order ("preview", "thumbnail", "print" or "design").
+
+    The file is streamed from disk, never read into memory, with
+    revalidation through ETag/If-None-Match. A single byte range is served
+    as 206 Partial Content, unless If-Range names another version of the
+    file; several ranges or an invalid Range header get the whole file.
+    """
+    filename = DESIGN_FILES.get(variant)
+    if filename is None:
+        raise HTTPException(status_code=404, detail="Unknown design variant")
+    artifact = design_service.find_artifact(order_id, filename)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Design not found")
+
+    headers = {"etag": artifact["etag"], "cache-control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), artifact["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    headers["accept-ranges"] = "bytes"
+    range_header = request.headers.get("range")
+    if range_header is None:
+        return FileResponse(
+            artifact["path"],
+            headers=headers,
+            filename=f"{order_id}-{filename}",
+            content_disposition_type="inline",
+        )
+
+    # Range responses are built here rather than left to FileResponse,
+    # which only understands Range from starlette 0.39 on
+    size = artifact["size"]
+    headers["content-disposition"] = _inline_disposition(f"{order_id}-{filename}")
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if if_range is None or if_range.strip() == artifact["etag"]:
+        try:
+            byte_range = _parse_byte_range(range_header, size)
+        except ValueError:
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+    headers["content-length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file(artifact["path"], start, end - start + 1),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+    )
+
+
+def _parse_byte_range(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    """Parse a Range header asking for a single byte range of a file.
+
+    Args:
+        range_header: Value of the Range header, e.g. "bytes=100-199"
+        size: Size of the file in bytes
+
+    Returns:
+        The first and last byte offsets, inclusive, or None if the header
+        is to be ignored: other units, several ranges or invalid syntax
+
+    Raises:
+        ValueError: If the range lies outside the file
+    """
+    unit, _, spec = range_header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if unit.strip().lower() != "bytes" or "," in spec or not dash:
+        return None
+    if first.isdigit() and (last.isdigit() or not last):
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    elif not first and last.isdigit():
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+        if int(last) == 0:
+            raise ValueError("Empty suffix range")
+    else:
+        return None
+    if start >= size:
+        raise ValueError(f"Range starts after the end of the file ({size} bytes)")
+    return start, end
+
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    """Read ``length`` bytes of a file from ``start`` in chunks."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _inline_disposition(filename: str) -> str:
+    """Build an inline Content-Disposition header the way FileResponse does."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"inline; filename*=utf-8''{quoted}"
+    return f'inline; filename="{filename}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,71 @@
+# Unit tests for ConversationRepository
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from tshirt_fulfillment.src.core.repositories.conversation_repository import ConversationRepository
+
+MESSAGES = [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi"}]
+
+
+@pytest.fixture
+def redis_client():
+    """Mock Redis client"""
+    return MagicMock()
+
+
+def test_new_conversation_is_empty():
+    """Unknown conversations have no summary and no messages"""
+    repository = ConversationRepository()
+
+    assert repository.get("session-1") == {"summary": "", "messages": []}
+
+
+def test_save_and_get_in_memory():
+    """Saved conversations are returned as copies"""
+    repository = ConversationRepository()
+    repository.save("session-1", "Earlier chat", MESSAGES)
+
+    conversation = repository.get("session-1")
+    conversation["messages"].append({"role": "user", "content": "Changed"})
+
+    assert repository.get("session-1") == {"summary": "Earlier chat", "messages": MESSAGES}
+
+
+def test_delete_in_memory():
+    """Deleting reports whether the conversation existed"""
+    repository = ConversationRepository()
+    repository.save("session-1", "", MESSAGES)
+
+    assert repository.delete("session-1") is True
+    assert repository.delete("session-1") is False
+
+
+def test_save_writes_json_to_redis(redis_client):
+    """Redis-backed conversations are stored as one JSON document with a TTL"""
+    repository = ConversationRepository(redis_client, ttl_seconds=3600)
+
+    repository.save("session-1", "Earlier chat", MESSAGES)
+
+    key, data = redis_client.set.call_args.args
+    assert key == "conversation:session-1"
+    assert json.loads(data) == {"summary": "Earlier chat", "messages": MESSAGES}
+    assert redis_client.set.call_args.kwargs == {"ex": 3600}
+
+
+def test_get_reads_json_from_redis(redis_client):
+    """Conversations saved by another worker are loaded from Redis"""
+    redis_client.get.return_value = json.dumps({"summary": "", "messages": MESSAGES})
+    repository = ConversationRepository(redis_client)
+
+    assert repository.get("session-1")["messages"] == MESSAGES
+    redis_client.get.assert_called_once_with("conversation:session-1")
+
+
+def test_get_missing_conversation_from_redis(redis_client):
+    """Missing Redis keys are empty conversations"""
+    redis_client.get.return_value = None
+    repository = ConversationRepository(redis_client)
+
+    assert repository.get("session-1") == {"summary": "", "messages": []}
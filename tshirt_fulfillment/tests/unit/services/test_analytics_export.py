@@ -0,0 +1,159 @@
+# Unit tests for the columnar analytics export
+import csv
+import gzip
+import os
+from dataclasses import asdict
+
+import pytest
+
+from tshirt_fulfillment.src.adapters.services.analytics_export import AnalyticsExporter
+from tshirt_fulfillment.src.core.domain.agent import AgentSession
+from tshirt_fulfillment.src.core.domain.agent import AgentStatus
+from tshirt_fulfillment.src.core.domain.agent import ToolCall
+from tshirt_fulfillment.src.core.domain.order import Order
+from tshirt_fulfillment.src.core.domain.order import OrderStatus
+
+# 2023-11-14 and 2023-11-15 UTC
+DAY_ONE = 1_700_000_000.0
+DAY_TWO = DAY_ONE + 86_400
+
+
+def make_order(order_id, status, created_at):
+    order = Order(
+        id=order_id,
+        customer_name="Nguyễn Văn A",
+        customer_email="a@example.com",
+        design_prompt="A cat",
+        size="L",
+        color="Blue",
+        quantity=2,
+    )
+    order.status = status
+    order.created_at = created_at
+    order.phases = [
+        {"phase": "order_received", "timestamp": created_at, "details": "Received"},
+        {"phase": "processing_completed", "timestamp": created_at + 60, "details": "Done"},
+    ]
+    call = ToolCall("generate_design", {"prompt": "A cat"}, {"success": True}, True, created_at)
+    order.result = {
+        "design": {"image_path": f"designs/{order_id}/design.png"},
+        "tool_history": [asdict(call)],
+    }
+    return order
+
+
+def read_csv(path):
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def dataset_file(root, result, dataset):
+    return next(path for path in result["files"] if os.path.relpath(path, root).startswith(dataset))
+
+
+def relative(root, files):
+    return sorted(os.path.relpath(os.path.dirname(path), root) for path in files)
+
+
+@pytest.fixture
+def orders():
+    return [
+        make_order("order-1", OrderStatus.COMPLETED, DAY_ONE),
+        make_order("order-2", OrderStatus.FAILED, DAY_ONE + 10),
+        make_order("order-3", OrderStatus.COMPLETED, DAY_TWO),
+    ]
+
+
+def test_csv_datasets_are_partitioned_by_date_and_status(tmp_path, orders):
+    result = AnalyticsExporter(str(tmp_path), file_format="csv").export(iter(orders))
+
+    assert result["success"]
+    assert result["format"] == "csv"
+    assert result["rows"] == {"orders": 3, "order_phases": 6, "tool_calls": 3}
+    assert relative(str(tmp_path / "orders"), result["files"][:3]) == [
+        os.path.join("date=2023-11-14", "status=completed"),
+        os.path.join("date=2023-11-14", "status=failed"),
+        os.path.join("date=2023-11-15", "status=completed"),
+    ]
+    assert all(path.endswith(".csv.gz") for path in result["files"])
+
+    completed = dataset_file(str(tmp_path), result, "orders")
+    rows = read_csv(completed)
+    assert rows == [
+        {
+            "order_id": "order-1",
+            "created_at": "2023-11-14T22:13:20+00:00",
+            "status": "completed",
+            "language": "en",
+            "customer_name": "Nguyễn Văn A",
+            "customer_email": "a@example.com",
+            "size": "L",
+            "color": "Blue",
+            "quantity": "2",
+            "design_path": "designs/order-1/design.png",
+            "excel_path": "",
+            "drive_link": "",
+        }
+    ]
+
+
+def test_phases_and_tool_calls_are_exported(tmp_path, orders):
+    result = AnalyticsExporter(str(tmp_path), file_format="csv").export(orders[:1])
+
+    phases = read_csv(dataset_file(str(tmp_path), result, "order_phases"))
+    calls = read_csv(dataset_file(str(tmp_path), result, "tool_calls"))
+    assert [row["phase"] for row in phases] == ["order_received", "processing_completed"]
+    assert calls[0]["tool_name"] == "generate_design"
+    assert calls[0]["success"] == "True"
+    assert calls[0]["input"] == '{"prompt": "A cat"}'
+
+
+def test_agent_session_tool_history_is_exported(tmp_path):
+    session = AgentSession.create_customer_session("order-9")
+    session.status = AgentStatus.FAILED
+    session.add_tool_call("upload_to_drive", {"file_path": "x"}, {"success": False}, False)
+
+    result = AnalyticsExporter(str(tmp_path), file_format="csv").export([], sessions=[session])
+
+    assert result["rows"]["tool_calls"] == 1
+    (path,) = result["files"]
+    assert os.path.basename(os.path.dirname(path)) == "status=failed"
+    assert read_csv(path)[0]["session_id"] == session.id
+
+
+def test_repeated_exports_do_not_overwrite(tmp_path, orders):
+    exporter = AnalyticsExporter(str(tmp_path), file_format="csv")
+
+    first = exporter.export(orders)
+    second = exporter.export(orders)
+
+    assert not set(first["files"]) & set(second["files"])
+    assert all(os.path.exists(path) for path in first["files"] + second["files"])
+
+
+def test_failed_export_leaves_no_partial_files(tmp_path, orders):
+    def broken():
+        yield orders[0]
+        raise RuntimeError("database went away")
+
+    result = AnalyticsExporter(str(tmp_path), file_format="csv").export(broken())
+
+    assert result == {"success": False, "error": "database went away"}
+    assert [files for _, _, files in os.walk(tmp_path) if files] == []
+
+
+def test_falls_back_to_csv_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(__import__("sys").modules, "pyarrow", None)
+
+    assert AnalyticsExporter(str(tmp_path)).file_format == "csv"
+
+
+def test_parquet_export(tmp_path, orders):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    result = AnalyticsExporter(str(tmp_path), row_group_size=1).export(orders)
+
+    assert result["format"] == "parquet"
+    table = pq.read_table(str(tmp_path / "orders"))
+    assert sorted(table.column("order_id").to_pylist()) == ["order-1", "order-2", "order-3"]
+    assert sorted(set(table.column("status").to_pylist())) == ["completed", "failed"]
@@ -0,0 +1,196 @@
+# Unit tests for the content-addressed artifact blob store
+import hashlib
+import os
+import threading
+
+import pytest
+
+from tshirt_fulfillment.src.adapters.services.blob_store import BlobStore
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.drive_client import DriveClient
+from tshirt_fulfillment.src.adapters.services.drive_folders import DriveFolderMap
+from tshirt_fulfillment.src.adapters.services.drive_outbox import DriveUploader
+from tshirt_fulfillment.src.adapters.services.drive_outbox import DriveUploadOutbox
+from tshirt_fulfillment.src.adapters.services.external_services import ExcelHandler
+from tshirt_fulfillment.src.adapters.services.external_services import GoogleDriveManager
+from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.utils.fake_drive import FakeDriveServer
+
+
+@pytest.fixture
+def store(tmp_path):
+    blob_store = BlobStore(str(tmp_path / "artifacts"), grace_seconds=0)
+    yield blob_store
+    blob_store.close()
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_blobs_are_sharded_by_digest(store):
+    stored = store.put_bytes("designs/order-1/design.png", b"image bytes")
+
+    digest = hashlib.sha256(b"image bytes").hexdigest()
+    assert stored["digest"] == digest
+    assert stored["path"] == os.path.join(
+        store.objects_dir, digest[:2], digest[2:4], f"{digest}.png"
+    )
+    with open(stored["path"], "rb") as f:
+        assert f.read() == b"image bytes"
+    assert store.get("designs/order-1/design.png")["path"] == stored["path"]
+    assert store.get("designs/order-2/design.png") is None
+
+
+def test_identical_content_is_stored_once(store, tmp_path):
+    """A reprint references the original design's bytes"""
+    source = write(tmp_path / "design.png", b"same design")
+
+    first = store.put_file("designs/order-1/design.png", source)
+    reprint = store.put_file("designs/order-2/design.png", source)
+
+    assert not first["deduplicated"]
+    assert reprint["deduplicated"]
+    assert reprint["path"] == first["path"]
+    assert os.path.exists(source)
+    snapshot = store.snapshot()
+    assert snapshot["blobs"] == 1
+    assert snapshot["refs"] == 2
+    assert snapshot["deduplicated_bytes"] == len(b"same design")
+
+
+def test_move_consumes_source(store, tmp_path):
+    scratch = store.scratch_dir()
+    source = os.path.join(scratch, "design.png")
+    with open(source, "wb") as f:
+        f.write(b"moved")
+
+    stored = store.put_file("designs/order-1/design.png", source, move=True)
+
+    assert not os.path.exists(source)
+    assert os.path.exists(stored["path"])
+
+
+def test_gc_deletes_only_unreferenced_blobs(store):
+    shared = store.put_bytes("designs/order-1/design.png", b"shared")
+    store.put_bytes("designs/order-2/design.png", b"shared")
+    replaced = store.put_bytes("orders/order-1/order_details.txt", b"first draft")
+    store.put_bytes("orders/order-1/order_details.txt", b"final")
+
+    assert store.release("designs/order-1/design.png")
+    assert not store.release("designs/order-1/design.png")
+    result = store.gc()
+
+    assert result["removed"] == 1
+    assert result["bytes_freed"] == len(b"first draft")
+    assert not os.path.exists(replaced["path"])
+    assert os.path.exists(shared["path"])
+
+    store.release("designs/order-2/design.png")
+    assert store.gc()["removed"] == 1
+    assert not os.path.exists(shared["path"])
+
+
+def test_gc_keeps_recently_released_blobs(tmp_path):
+    store = BlobStore(str(tmp_path / "artifacts"), grace_seconds=3600)
+    stored = store.put_bytes("designs/order-1/design.png", b"image")
+    store.release("designs/order-1/design.png")
+
+    assert store.gc()["removed"] == 0
+    assert os.path.exists(stored["path"])
+    # Referenced again before collection
+    store.put_bytes("designs/order-2/design.png", b"image")
+    assert store.snapshot()["unreferenced"] == 0
+    store.close()
+
+
+def test_gc_removes_abandoned_scratch(store):
+    scratch = store.scratch_dir()
+
+    assert store.gc()["scratch_removed"] == 1
+    assert not os.path.exists(scratch)
+
+
+def test_index_survives_reopen(store, tmp_path):
+    stored = store.put_bytes("designs/order-1/design.png", b"image")
+    store.close()
+
+    reopened = BlobStore(store.root)
+
+    assert reopened.get("designs/order-1/design.png")["path"] == stored["path"]
+    reopened.close()
+
+
+def test_concurrent_puts_of_same_content(store):
+    results = []
+
+    def put(index):
+        results.append(store.put_bytes(f"designs/order-{index}/design.png", b"popular"))
+
+    threads = [threading.Thread(target=put, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({result["path"] for result in results}) == 1
+    assert sum(not result["deduplicated"] for result in results) == 1
+    assert store.snapshot()["refs"] == 8
+    assert os.listdir(store.tmp_dir) == []
+
+
+class ImageProvider:
+    name = "dalle"
+    supports_batching = False
+    config = {}
+
+    def generate(self, prompt, output_path, style=None):
+        with open(output_path, "wb") as f:
+            f.write(prompt.encode())
+        return {"success": True, "image_path": output_path}
+
+
+def test_order_designs_are_stored_without_order_directories(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path / "designs"))
+    service = DesignServiceAdapter(provider="dalle", blob_store=store)
+    service.backend = ImageProvider()
+
+    first = service.generate_for_order("order-1", "A cat")
+    reprint = service.generate_for_order("order-2", "A cat")
+
+    assert first["image_path"] == reprint["image_path"]
+    assert first["file_name"] == "design.png"
+    assert first["image_path"].startswith(store.objects_dir)
+    assert store.get("designs/order-2/design.png")["digest"] == reprint["digest"]
+    assert os.listdir(tmp_path / "designs") == []
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_order_files_are_stored(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "ORDER_FILES_DIR", str(tmp_path / "orders"))
+    handler = ExcelHandler(blob_store=store)
+
+    result = handler.create_order_file("order-1", {"name": "A", "size": "L"})
+
+    assert result["success"]
+    assert result["file_path"] == store.get("orders/order-1/order_details.xlsx")["path"]
+    assert result["file_path"].endswith(".xlsx")
+    assert os.listdir(tmp_path / "orders") == []
+
+
+def test_stored_files_keep_their_name_in_drive(store, tmp_path, monkeypatch):
+    """Blobs are named by digest, but Drive gets the artifact's file name"""
+    monkeypatch.setattr(Config, "ORDER_FILES_DIR", str(tmp_path / "orders"))
+    excel = ExcelHandler(blob_store=store).create_order_file("order-1", {"name": "A"})
+
+    with FakeDriveServer() as server:
+        client = DriveClient("client-id", "secret", "refresh", server.url, server.token_url)
+        outbox = DriveUploadOutbox(":memory:")
+        manager = GoogleDriveManager(client, DriveFolderMap(":memory:"), outbox=outbox)
+        manager.enqueue_upload("order-1", excel["file_path"], "excel", excel["file_name"])
+        DriveUploader(outbox, manager).drain()
+        manager.close()
+
+        (job,) = outbox.jobs("order-1")
+        assert server.files[job["file_id"]]["name"] == "order_details.xlsx"
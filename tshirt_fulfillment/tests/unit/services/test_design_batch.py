@@ -0,0 +1,194 @@
+# Unit tests for batch design generation
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from tshirt_fulfillment.src.adapters.services.design_cache import DesignCache
+from tshirt_fulfillment.src.adapters.services.design_providers import DesignProviderRegistry
+from tshirt_fulfillment.src.adapters.services.design_scheduler import DesignJobScheduler
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.design_workers import DesignWorkerPool
+
+MODEL_CONFIG = {"simulate": True, "load_seconds": 0.2, "generate_seconds": 0.2}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = DesignWorkerPool(MODEL_CONFIG, num_workers=1)
+    assert pool.wait_ready(timeout=30)
+    yield pool
+    pool.close()
+
+
+def paths(tmp_path, count):
+    return [str(tmp_path / f"variant_{i}.png") for i in range(count)]
+
+
+class FakeProvider:
+    """Provider without batching support that delegates to a function"""
+
+    name = "fake"
+    supports_batching = False
+    config = {}
+
+    def __init__(self, generate):
+        self.generate = generate
+
+
+def fake_service(generate, **kwargs):
+    providers = DesignProviderRegistry()
+    providers.register(FakeProvider(generate))
+    return DesignServiceAdapter(providers=providers, provider="fake", **kwargs)
+
+
+def test_worker_pool_runs_prompts_as_model_batches(pool, tmp_path):
+    """Stable Diffusion prompts are grouped into batches on the workers"""
+    adapter = DesignServiceAdapter(provider="stable_diffusion", worker_pool=pool)
+    prompts = [f"A cat playing guitar, variant {i}" for i in range(8)]
+
+    start = time.perf_counter()
+    results = list(adapter.generate_batch(prompts, paths(tmp_path, 8), batch_size=4))
+    elapsed = time.perf_counter() - start
+
+    assert sorted(result["index"] for result in results) == list(range(8))
+    assert all(result["success"] for result in results)
+    assert all(result["batch_size"] == 4 for result in results)
+    assert all(result["provider"] == "stable_diffusion" for result in results)
+    # Eight single generations on one worker would take 1.6 seconds
+    assert elapsed < 8 * MODEL_CONFIG["generate_seconds"]
+
+
+def test_batch_results_are_streamed(pool, tmp_path):
+    """The first batch is yielded before later batches finish"""
+    adapter = DesignServiceAdapter(provider="stable_diffusion", worker_pool=pool)
+    results = adapter.generate_batch(
+        [f"A dog #{i}" for i in range(4)], paths(tmp_path, 4), batch_size=2
+    )
+
+    start = time.perf_counter()
+    first = next(results)
+    first_at = time.perf_counter() - start
+    rest = list(results)
+    total = time.perf_counter() - start
+
+    assert first["success"]
+    assert len(rest) == 3
+    # One worker runs the two batches one after the other
+    assert first_at < 0.75 * total
+
+
+def test_providers_without_batching_use_bounded_pool(tmp_path):
+    """Other providers run concurrently, never above max_concurrency"""
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def fake_dalle(prompt, output_path, style=None):
+        with lock:
+            running.append(prompt)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(prompt)
+        return {"success": True, "image_path": output_path, "provider": "dalle"}
+
+    adapter = fake_service(fake_dalle)
+    results = list(
+        adapter.generate_batch(
+            [f"A cat #{i}" for i in range(10)], paths(tmp_path, 10), max_concurrency=3
+        )
+    )
+
+    assert sorted(result["index"] for result in results) == list(range(10))
+    assert max(peak) == 3
+
+
+def test_cached_prompts_are_not_regenerated(tmp_path):
+    """Prompts already in the cache are yielded without running the model"""
+    calls = []
+
+    def fake_dalle(prompt, output_path, style=None):
+        calls.append(prompt)
+        with open(output_path, "w") as f:
+            f.write(prompt)
+        return {"success": True, "image_path": output_path, "provider": "dalle"}
+
+    adapter = fake_service(fake_dalle, cache=DesignCache(str(tmp_path / "cache"), 1024 * 1024))
+    adapter.generate("A cat", str(tmp_path / "first.png"))
+
+    results = list(adapter.generate_batch(["A cat", "A dog"], paths(tmp_path, 2)))
+
+    assert calls == ["A cat", "A dog"]
+    assert results[0] == {**results[0], "index": 0, "cached": True}
+
+
+def test_mismatched_lengths_are_rejected(tmp_path):
+    adapter = DesignServiceAdapter()
+
+    with pytest.raises(ValueError):
+        list(adapter.generate_batch(["A cat", "A dog"], paths(tmp_path, 1)))
+
+
+class FakeBatchProvider:
+    """Batching provider recording the order model batches run in"""
+
+    name = "fake"
+    supports_batching = True
+    config = {}
+
+    def __init__(self):
+        self.runs = []
+        self.release = threading.Event()
+
+    def generate(self, prompt, output_path, style=None):
+        self.runs.append([prompt])
+        return {"success": True, "image_path": output_path, "provider": "fake"}
+
+    def submit_batch(self, prompts, output_paths, style=None):
+        self.release.wait(5)
+        self.runs.append(list(prompts))
+        futures = []
+        for path in output_paths:
+            future = Future()
+            future.set_result({"success": True, "image_path": path, "provider": "fake"})
+            futures.append(future)
+        return futures
+
+
+def test_scheduled_batches_queue_as_bulk_behind_rush_jobs(tmp_path):
+    """Model batches wait for scheduler slots as bulk jobs of the customer"""
+    scheduler = DesignJobScheduler({"fake": 1})
+    provider = FakeBatchProvider()
+    providers = DesignProviderRegistry()
+    providers.register(provider)
+    adapter = DesignServiceAdapter(providers=providers, provider="fake", scheduler=scheduler)
+    prompts = [f"A cat #{i}" for i in range(4)]
+
+    batch = threading.Thread(
+        target=lambda: list(
+            adapter.generate_batch(prompts, paths(tmp_path, 4), batch_size=2, customer_id="shop")
+        )
+    )
+    batch.start()
+    # The first model batch holds the slot, the second waits as a bulk job
+    deadline = time.monotonic() + 5
+    while scheduler.snapshot()["priorities"]["bulk"]["queued"] < 1:
+        assert time.monotonic() < deadline, "second batch was not queued"
+        time.sleep(0.005)
+    rush = threading.Thread(
+        target=adapter.generate,
+        args=("A rush order", str(tmp_path / "rush.png")),
+        kwargs={"priority": "rush", "customer_id": "other"},
+    )
+    rush.start()
+    while scheduler.snapshot()["priorities"]["rush"]["queued"] < 1:
+        assert time.monotonic() < deadline, "rush job was not queued"
+        time.sleep(0.005)
+    provider.release.set()
+    batch.join(5)
+    rush.join(5)
+
+    assert provider.runs == [prompts[:2], ["A rush order"], prompts[2:]]
+    assert scheduler.snapshot()["priorities"]["bulk"]["completed"] == 2
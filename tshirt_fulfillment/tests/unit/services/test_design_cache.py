@@ -0,0 +1,162 @@
+# Unit tests for the design cache
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tshirt_fulfillment.src.adapters.services.design_cache import DesignCache
+from tshirt_fulfillment.src.adapters.services.design_cache import design_cache_key
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.external_services import DesignGenerator
+from tshirt_fulfillment.src.config.settings import Config
+
+
+def make_generator(tmp_path, content=b"image", delay=0.0):
+    """Create a generate function writing content and counting its calls"""
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(delay)
+        path = tmp_path / f"generated_{len(calls)}.png"
+        path.write_bytes(content)
+        return {"success": True, "image_path": str(path), "prompt_used": "A cat"}
+
+    return generate, calls
+
+
+def test_cache_key_normalizes_prompt():
+    """Whitespace and case differences share a key; other parameters do not"""
+    key = design_cache_key("stable_diffusion", "A cat  playing guitar", "Watercolor")
+
+    assert key == design_cache_key("stable_diffusion", " a cat playing GUITAR", "watercolor")
+    assert key != design_cache_key("dalle", "A cat playing guitar", "watercolor")
+    assert key != design_cache_key("stable_diffusion", "A cat playing guitar", "pixel art")
+    assert key != design_cache_key(
+        "stable_diffusion", "A cat playing guitar", "watercolor", size="1024x1024"
+    )
+
+
+def test_miss_then_hit(tmp_path):
+    """The second request is served from the cache without generating"""
+    cache = DesignCache(str(tmp_path / "cache"), max_bytes=1024)
+    generate, calls = make_generator(tmp_path)
+
+    first = cache.get_or_generate("key", str(tmp_path / "order-1.png"), generate)
+    second = cache.get_or_generate("key", str(tmp_path / "order-2.png"), generate)
+
+    assert len(calls) == 1
+    assert first["success"] and not first["cached"]
+    assert second["cached"]
+    assert second["prompt_used"] == "A cat"
+    assert second["image_path"] == str(tmp_path / "order-2.png")
+    assert (tmp_path / "order-2.png").read_bytes() == b"image"
+    assert cache.snapshot()["hits"] == 1
+    assert cache.snapshot()["misses"] == 1
+    assert cache.hit_rate == 0.5
+
+
+def test_concurrent_identical_requests_generate_once(tmp_path):
+    """In-flight requests for the same key wait for the first generation"""
+    cache = DesignCache(str(tmp_path / "cache"), max_bytes=1024)
+    generate, calls = make_generator(tmp_path, delay=0.2)
+    barrier = threading.Barrier(8)
+
+    def request(index):
+        barrier.wait()
+        return cache.get_or_generate("key", str(tmp_path / f"order-{index}.png"), generate)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(request, range(8)))
+
+    assert len(calls) == 1
+    assert all(result["success"] for result in results)
+    assert sum(1 for result in results if not result["cached"]) == 1
+    assert all(open(result["image_path"], "rb").read() == b"image" for result in results)
+    assert cache.hit_rate == 7 / 8
+
+
+def test_failed_generation_is_not_cached(tmp_path):
+    """Failures are returned to every waiting caller and retried next time"""
+    cache = DesignCache(str(tmp_path / "cache"), max_bytes=1024)
+
+    def failing():
+        raise RuntimeError("GPU out of memory")
+
+    result = cache.get_or_generate("key", str(tmp_path / "order.png"), failing)
+    generate, calls = make_generator(tmp_path)
+    retried = cache.get_or_generate("key", str(tmp_path / "order.png"), generate)
+
+    assert result == {"success": False, "error": "GPU out of memory"}
+    assert retried["success"] and len(calls) == 1
+
+
+def test_evicts_least_recently_used_by_size(tmp_path):
+    """Entries over the byte limit are evicted oldest access first"""
+    cache = DesignCache(str(tmp_path / "cache"), max_bytes=25)
+    source = tmp_path / "design.png"
+    source.write_bytes(b"x" * 10)
+
+    cache.put("a", str(source), {"success": True})
+    cache.put("b", str(source), {"success": True})
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", str(source), {"success": True})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.snapshot()["bytes"] == 20
+    assert cache.snapshot()["evictions"] == 1
+    assert not os.path.exists(cache._image_path("b"))
+
+
+def test_evicts_by_entry_count(tmp_path):
+    """The optional entry limit is enforced as well"""
+    cache = DesignCache(str(tmp_path / "cache"), max_bytes=1024, max_entries=2)
+    source = tmp_path / "design.png"
+    source.write_bytes(b"x")
+
+    for key in ("a", "b", "c"):
+        cache.put(key, str(source), {"success": True})
+
+    assert cache.get("a") is None
+    assert cache.snapshot()["entries"] == 2
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    """A new cache instance serves entries written by a previous one"""
+    source = tmp_path / "design.png"
+    source.write_bytes(b"image")
+    DesignCache(str(tmp_path / "cache"), max_bytes=1024).put(
+        "key", str(source), {"success": True, "prompt_used": "A cat"}
+    )
+
+    cache = DesignCache(str(tmp_path / "cache"), max_bytes=1024)
+    cached = cache.get("key")
+
+    assert cached["prompt_used"] == "A cat"
+    assert cache.snapshot()["bytes"] == 5
+
+
+def test_design_generator_uses_cache(tmp_path, monkeypatch):
+    """Identical design requests for different orders share one generation"""
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path / "designs"))
+    cache = DesignCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    service = DesignServiceAdapter(provider="stable_diffusion", cache=cache)
+    monkeypatch.setattr(service.backend, "simulated_seconds", 0)
+    generator = DesignGenerator(service=service)
+    calls = []
+    original = service.backend.generate
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(service.backend, "generate", counting)
+
+    first = generator.generate("order-1", "A cat playing guitar", style="watercolor")
+    second = generator.generate("order-2", "a cat playing guitar", style="watercolor")
+
+    assert len(calls) == 1
+    assert first["success"] and second["cached"]
+    assert second["image_path"] == os.path.join(str(tmp_path / "designs"), "order-2", "design.png")
+    assert os.path.exists(second["image_path"])
@@ -0,0 +1,175 @@
+# Unit tests for the design download endpoint
+import hashlib
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from tshirt_fulfillment.src.adapters.services.blob_store import BlobStore
+from tshirt_fulfillment.src.adapters.services.blob_store import file_digest
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_design_service
+from tshirt_fulfillment.src.interfaces.api.routes import order_routes
+
+PREVIEW_BYTES = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    store = BlobStore(str(tmp_path / "artifacts"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch, blob_store):
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path / "designs"))
+    return DesignServiceAdapter(provider="dalle", blob_store=blob_store)
+
+
+@pytest.fixture
+def client(service):
+    app = FastAPI()
+    app.include_router(order_routes.router)
+    app.dependency_overrides[get_design_service] = lambda: service
+    return TestClient(app)
+
+
+def test_preview_is_served_with_content_etag(client, blob_store):
+    stored = blob_store.put_bytes("designs/order-1/preview.webp", PREVIEW_BYTES)
+
+    response = client.get("/orders/order-1/designs/preview")
+
+    assert response.status_code == 200
+    assert response.content == PREVIEW_BYTES
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["etag"] == f'"{stored["digest"]}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"] == 'inline; filename="order-1-preview.webp"'
+
+
+def test_matching_etag_is_not_modified(client, blob_store):
+    stored = blob_store.put_bytes("designs/order-1/preview.webp", PREVIEW_BYTES)
+
+    response = client.get(
+        "/orders/order-1/designs/preview",
+        headers={"If-None-Match": f'"other", W/"{stored["digest"]}"'},
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{stored["digest"]}"'
+    stale = client.get("/orders/order-1/designs/preview", headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+
+
+def test_range_requests_return_partial_content(client, blob_store):
+    blob_store.put_bytes("designs/order-1/print.png", PREVIEW_BYTES)
+
+    response = client.get("/orders/order-1/designs/print", headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.content == PREVIEW_BYTES[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(PREVIEW_BYTES)}"
+    assert response.headers["content-length"] == "100"
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["content-disposition"] == 'inline; filename="order-1-print.png"'
+
+
+@pytest.mark.parametrize(
+    ("range_header", "expected"),
+    [
+        ("bytes=10000-", PREVIEW_BYTES[10000:]),
+        ("bytes=-240", PREVIEW_BYTES[-240:]),
+        ("bytes=10200-99999", PREVIEW_BYTES[10200:]),
+    ],
+)
+def test_open_and_suffix_ranges(client, blob_store, range_header, expected):
+    blob_store.put_bytes("designs/order-1/print.png", PREVIEW_BYTES)
+
+    response = client.get("/orders/order-1/designs/print", headers={"Range": range_header})
+
+    assert response.status_code == 206
+    assert response.content == expected
+
+
+def test_range_past_the_end_is_not_satisfiable(client, blob_store):
+    blob_store.put_bytes("designs/order-1/print.png", PREVIEW_BYTES)
+
+    response = client.get("/orders/order-1/designs/print", headers={"Range": "bytes=99999-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(PREVIEW_BYTES)}"
+
+
+@pytest.mark.parametrize("range_header", ["bytes=0-9, 20-29", "items=0-9", "bytes=9-0"])
+def test_unsupported_ranges_get_the_whole_file(client, blob_store, range_header):
+    blob_store.put_bytes("designs/order-1/print.png", PREVIEW_BYTES)
+
+    response = client.get("/orders/order-1/designs/print", headers={"Range": range_header})
+
+    assert response.status_code == 200
+    assert response.content == PREVIEW_BYTES
+
+
+def test_if_range_only_resumes_the_same_version(client, blob_store):
+    """A client resuming a download gets the rest only if the file is unchanged"""
+    stored = blob_store.put_bytes("designs/order-1/print.png", PREVIEW_BYTES)
+    etag = f'"{stored["digest"]}"'
+
+    resumed = client.get(
+        "/orders/order-1/designs/print", headers={"Range": "bytes=5000-", "If-Range": etag}
+    )
+    changed = client.get(
+        "/orders/order-1/designs/print", headers={"Range": "bytes=5000-", "If-Range": '"old"'}
+    )
+
+    assert resumed.status_code == 206
+    assert resumed.content == PREVIEW_BYTES[5000:]
+    assert changed.status_code == 200
+    assert changed.content == PREVIEW_BYTES
+    assert "content-range" not in changed.headers
+
+
+def test_files_outside_the_store_are_served(client, tmp_path):
+    order_dir = tmp_path / "designs" / "order-2"
+    os.makedirs(order_dir)
+    (order_dir / "design.png").write_bytes(b"loose design")
+
+    response = client.get("/orders/order-2/designs/design")
+    revalidated = client.get(
+        "/orders/order-2/designs/design", headers={"If-None-Match": response.headers["etag"]}
+    )
+
+    assert response.status_code == 200
+    assert response.content == b"loose design"
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/orders/order-1/designs/preview",
+        "/orders/order-1/designs/source",
+        "/orders/../designs/design",
+    ],
+)
+def test_missing_or_unknown_designs_are_not_found(client, url):
+    assert client.get(url).status_code == 404
+
+
+def test_find_artifact_rejects_paths(service):
+    assert service.find_artifact("..", "design.png") is None
+    assert service.find_artifact("order-1", "../secrets.txt") is None
+
+
+def test_file_digest_matches_content(tmp_path):
+    path = tmp_path / "print.png"
+    path.write_bytes(PREVIEW_BYTES)
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+
+    assert file_digest(str(path)) == hashlib.sha256(PREVIEW_BYTES).hexdigest()
+    assert file_digest(str(empty)) == hashlib.sha256(b"").hexdigest()
@@ -0,0 +1,88 @@
+# Unit tests for the design provider registry and design service
+import os
+
+import pytest
+
+from tshirt_fulfillment.src.adapters.services.design_providers import DalleProvider
+from tshirt_fulfillment.src.adapters.services.design_providers import DesignProviderRegistry
+from tshirt_fulfillment.src.adapters.services.design_providers import StableDiffusionProvider
+from tshirt_fulfillment.src.adapters.services.design_providers import (
+    build_design_provider_registry,
+)
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.external_services import DesignGenerator
+from tshirt_fulfillment.src.config.settings import Config
+
+
+@pytest.fixture
+def providers():
+    """Registry with the built-in providers, without simulated latency"""
+    registry = DesignProviderRegistry()
+    registry.register(StableDiffusionProvider({}, simulated_seconds=0))
+    registry.register(DalleProvider({"size": "1024x1024"}, simulated_seconds=0))
+    return registry
+
+
+def test_built_in_registry_has_every_provider():
+    assert sorted(build_design_provider_registry().names()) == ["dalle", "stable_diffusion"]
+
+
+def test_unknown_provider_is_rejected(providers):
+    with pytest.raises(ValueError, match="Unknown design generator provider: midjourney"):
+        providers.get("midjourney")
+
+    with pytest.raises(ValueError):
+        DesignServiceAdapter(providers=providers, provider="midjourney")
+
+
+@pytest.mark.parametrize("name", ["stable_diffusion", "dalle"])
+def test_service_generates_order_designs(providers, tmp_path, monkeypatch, name):
+    """Designs land in the order's directory, described by the provider"""
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path))
+    service = DesignServiceAdapter(providers=providers, provider=name)
+
+    result = service.generate_for_order("order-1", "A cat", style="watercolor")
+
+    assert result["success"]
+    assert result["image_path"] == os.path.join(str(tmp_path), "order-1", "design.png")
+    assert os.path.exists(result["image_path"])
+    assert result["provider"] == name
+    assert result["prompt_used"] == "A cat"
+    assert result["style_applied"] == "watercolor"
+
+
+def test_service_resolves_provider_once(providers, tmp_path, monkeypatch):
+    """Dispatch goes straight to the provider picked at construction"""
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path))
+    service = DesignServiceAdapter(providers=providers, provider="dalle")
+    monkeypatch.setattr(providers, "get", lambda name: pytest.fail("registry looked up again"))
+
+    assert service.generate_for_order("order-1", "A cat")["success"]
+    assert service.backend is providers._providers["dalle"]
+
+
+def test_provider_errors_become_failed_results(providers, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path))
+    service = DesignServiceAdapter(providers=providers, provider="dalle")
+
+    def broken(prompt, output_path, style=None):
+        raise RuntimeError("API quota exceeded")
+
+    monkeypatch.setattr(service.backend, "generate", broken)
+
+    assert service.generate_for_order("order-1", "A cat") == {
+        "success": False,
+        "error": "API quota exceeded",
+    }
+
+
+def test_design_generator_tool_delegates_to_service(providers, tmp_path, monkeypatch):
+    """The customer tool is a thin front for the shared design service"""
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path))
+    service = DesignServiceAdapter(providers=providers, provider="stable_diffusion")
+    generator = DesignGenerator(service=service)
+
+    result = generator.generate("order-1", "A cat playing guitar")
+
+    assert generator.provider == "stable_diffusion"
+    assert result["image_path"] == os.path.join(str(tmp_path), "order-1", "design.png")
@@ -0,0 +1,194 @@
+# Unit tests for the design job scheduler
+import threading
+import time
+
+import pytest
+
+from tshirt_fulfillment.src.adapters.services.design_scheduler import DesignJobScheduler
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.external_services import DesignGenerator
+from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.src.core.domain.design import DesignPriority
+
+
+def total_queued(scheduler):
+    return sum(stats["queued"] for stats in scheduler.snapshot()["priorities"].values())
+
+
+def wait_until_queued(scheduler, count):
+    deadline = time.monotonic() + 5
+    while total_queued(scheduler) < count:
+        assert time.monotonic() < deadline, "jobs were not queued"
+        time.sleep(0.005)
+
+
+class BlockedProvider:
+    """Occupies the only slot of a provider until released"""
+
+    def __init__(self, scheduler, provider="dalle"):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+        def hold():
+            self.started.set()
+            self.release.wait(5)
+
+        self.thread = threading.Thread(
+            target=scheduler.run, args=(provider, hold), kwargs={"customer_id": "blocker"}
+        )
+        self.thread.start()
+        assert self.started.wait(5)
+
+
+def run_in_background(scheduler, order, name, **kwargs):
+    thread = threading.Thread(
+        target=scheduler.run, args=("dalle", lambda: order.append(name)), kwargs=kwargs
+    )
+    thread.start()
+    return thread
+
+
+def test_concurrency_is_limited_per_provider():
+    """Each provider runs at most its configured number of jobs"""
+    scheduler = DesignJobScheduler({"stable_diffusion": 1, "dalle": 2})
+    lock = threading.Lock()
+    running = {"stable_diffusion": 0, "dalle": 0}
+    peak = {"stable_diffusion": 0, "dalle": 0}
+
+    def job(provider):
+        with lock:
+            running[provider] += 1
+            peak[provider] = max(peak[provider], running[provider])
+        time.sleep(0.05)
+        with lock:
+            running[provider] -= 1
+
+    threads = [
+        threading.Thread(target=scheduler.run, args=(provider, lambda p=provider: job(p)))
+        for provider in ["stable_diffusion", "dalle"] * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == {"stable_diffusion": 1, "dalle": 2}
+
+
+def test_higher_priority_runs_first():
+    """A rush job queued after a bulk job still runs before it"""
+    scheduler = DesignJobScheduler({"dalle": 1}, aging_seconds=0)
+    blocker = BlockedProvider(scheduler)
+    order = []
+    threads = []
+    for priority in (DesignPriority.BULK, DesignPriority.STANDARD, DesignPriority.RUSH):
+        threads.append(run_in_background(scheduler, order, priority.value, priority=priority))
+        wait_until_queued(scheduler, len(threads))
+
+    blocker.release.set()
+    for thread in threads + [blocker.thread]:
+        thread.join()
+
+    assert order == ["rush", "standard", "bulk"]
+
+
+def test_customers_take_turns_within_a_priority():
+    """One customer's many jobs do not hold back another customer"""
+    scheduler = DesignJobScheduler({"dalle": 1})
+    blocker = BlockedProvider(scheduler)
+    order = []
+    threads = []
+    for name, customer in [("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b")]:
+        threads.append(run_in_background(scheduler, order, name, customer_id=customer))
+        wait_until_queued(scheduler, len(threads))
+
+    blocker.release.set()
+    for thread in threads + [blocker.thread]:
+        thread.join()
+
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_customers_without_jobs_are_forgotten():
+    """Fairness state is dropped once a customer has no queued or running jobs"""
+    scheduler = DesignJobScheduler({"dalle": 1})
+    for index in range(20):
+        scheduler.run("dalle", lambda: None, customer_id=f"customer-{index}")
+
+    blocker = BlockedProvider(scheduler)
+    with pytest.raises(TimeoutError):
+        scheduler.run("dalle", lambda: None, customer_id="impatient", timeout=0.05)
+    assert set(scheduler._last_served) == {"blocker"}
+
+    blocker.release.set()
+    blocker.thread.join()
+    assert scheduler._last_served == {}
+    assert scheduler._customer_jobs == {}
+
+
+def test_waiting_jobs_age_into_higher_priority():
+    """A bulk job that waited long enough is no longer overtaken"""
+    scheduler = DesignJobScheduler({"dalle": 1}, aging_seconds=0.05)
+    blocker = BlockedProvider(scheduler)
+    order = []
+    threads = [run_in_background(scheduler, order, "bulk", priority=DesignPriority.BULK)]
+    wait_until_queued(scheduler, 1)
+    time.sleep(0.15)
+    threads.append(run_in_background(scheduler, order, "rush", priority=DesignPriority.RUSH))
+    wait_until_queued(scheduler, 2)
+
+    blocker.release.set()
+    for thread in threads + [blocker.thread]:
+        thread.join()
+
+    assert order == ["bulk", "rush"]
+
+
+def test_wait_timeout_leaves_the_queue():
+    """A job that gets no slot in time fails and is removed from the queue"""
+    scheduler = DesignJobScheduler({"dalle": 1})
+    blocker = BlockedProvider(scheduler)
+
+    with pytest.raises(TimeoutError):
+        scheduler.run("dalle", lambda: None, timeout=0.05)
+
+    assert total_queued(scheduler) == 0
+    blocker.release.set()
+    blocker.thread.join()
+
+
+def test_snapshot_reports_depth_and_wait_per_priority():
+    """Queue depth and wait times are broken down by priority class"""
+    scheduler = DesignJobScheduler({"dalle": 1})
+    blocker = BlockedProvider(scheduler)
+    order = []
+    thread = run_in_background(scheduler, order, "bulk", priority=DesignPriority.BULK)
+    wait_until_queued(scheduler, 1)
+    time.sleep(0.05)
+
+    waiting = scheduler.snapshot()
+    blocker.release.set()
+    thread.join()
+    blocker.thread.join()
+    done = scheduler.snapshot()
+
+    assert waiting["priorities"]["bulk"]["queued"] == 1
+    assert waiting["priorities"]["bulk"]["oldest_wait_seconds"] >= 0.05
+    assert waiting["providers"]["dalle"] == {"running": 1, "limit": 1}
+    assert done["priorities"]["bulk"]["completed"] == 1
+    assert done["priorities"]["bulk"]["max_wait_seconds"] >= 0.05
+    assert done["priorities"]["standard"]["completed"] == 1
+
+
+def test_design_generator_runs_through_scheduler(tmp_path, monkeypatch):
+    """Designs are generated under the scheduler with the requested priority"""
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path))
+    scheduler = DesignJobScheduler({"dalle": 1})
+    service = DesignServiceAdapter(provider="dalle", scheduler=scheduler)
+    monkeypatch.setattr(service.backend, "simulated_seconds", 0)
+    generator = DesignGenerator(service=service)
+
+    result = generator.generate("order-1", "A cat", priority="rush", customer_id="shop")
+
+    assert result["success"]
+    assert scheduler.snapshot()["priorities"]["rush"]["completed"] == 1
@@ -0,0 +1,202 @@
+# Unit tests for design post-processing into thumbnail, preview and print variants
+import os
+import threading
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from PIL import ImageCms
+
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.design_variants import PREVIEW
+from tshirt_fulfillment.src.adapters.services.design_variants import PRINT
+from tshirt_fulfillment.src.adapters.services.design_variants import THUMBNAIL
+from tshirt_fulfillment.src.adapters.services.design_variants import DesignPostProcessor
+from tshirt_fulfillment.src.adapters.services.design_variants import default_variant_specs
+from tshirt_fulfillment.src.adapters.services.design_variants import render_variants
+from tshirt_fulfillment.src.config.settings import Config
+
+# Small print size so tests stay fast
+SPECS = default_variant_specs(thumbnail_size=32, preview_size=64, print_size=(90, 108))
+
+
+def write_design(path, size=(200, 160), color=(200, 30, 30), **options):
+    Image.new("RGB", size, color=color).save(path, "PNG", **options)
+    return str(path)
+
+
+@pytest.fixture
+def post_processor():
+    processor = DesignPostProcessor(SPECS, max_workers=2)
+    yield processor
+    processor.close()
+
+
+def test_render_variants_sizes_and_formats(tmp_path):
+    """Web variants fit their box; the print file is exact, tagged and sRGB"""
+    paths = render_variants(write_design(tmp_path / "design.png"), str(tmp_path), SPECS)
+
+    assert set(paths) == {THUMBNAIL, PREVIEW, PRINT}
+    with Image.open(paths[THUMBNAIL]) as thumbnail:
+        assert thumbnail.format == "JPEG"
+        assert thumbnail.size == (32, 26)
+    with Image.open(paths[PREVIEW]) as preview:
+        assert preview.format == "WEBP"
+        assert preview.size == (64, 51)
+    with Image.open(paths[PRINT]) as print_file:
+        assert print_file.format == "PNG"
+        assert print_file.size == (90, 108)
+        assert round(print_file.info["dpi"][0]) == 300
+        profile = ImageCms.ImageCmsProfile(BytesIO(print_file.info["icc_profile"]))
+        assert "sRGB" in ImageCms.getProfileDescription(profile)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_render_variants_converts_embedded_profile(tmp_path, monkeypatch):
+    """Designs tagged with a color profile are converted from it to sRGB"""
+    srgb = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+    design = write_design(tmp_path / "design.png", icc_profile=srgb.tobytes())
+    conversions = []
+    profile_to_profile = ImageCms.profileToProfile
+
+    def spy(image, source, target, **kwargs):
+        conversions.append(kwargs)
+        return profile_to_profile(image, source, target, **kwargs)
+
+    monkeypatch.setattr(ImageCms, "profileToProfile", spy)
+
+    render_variants(design, str(tmp_path), SPECS)
+
+    assert conversions == [{"outputMode": "RGB"}]
+
+
+def test_render_variants_ignores_unusable_profile(tmp_path):
+    design = write_design(tmp_path / "design.png", icc_profile=b"not a profile")
+
+    paths = render_variants(design, str(tmp_path), SPECS)
+
+    with Image.open(paths[PRINT]) as print_file:
+        assert print_file.getpixel((0, 0)) == (200, 30, 30)
+
+
+def test_process_adds_variants(post_processor, tmp_path):
+    result = {"success": True, "image_path": write_design(tmp_path / "design.png")}
+
+    processed = post_processor.process(result, timeout=30)
+
+    assert processed["variants"] == {
+        THUMBNAIL: str(tmp_path / "design_thumbnail.jpg"),
+        PREVIEW: str(tmp_path / "design_preview.webp"),
+        PRINT: str(tmp_path / "design_print.png"),
+    }
+
+
+def test_designs_sharing_a_directory_keep_their_own_variants(post_processor, tmp_path):
+    """Variants are named after their design, so neighbours do not overwrite them"""
+    red = write_design(tmp_path / "red.png", color=(200, 30, 30))
+    blue = write_design(tmp_path / "blue.png", color=(30, 30, 200))
+
+    futures = [post_processor.submit(red), post_processor.submit(blue)]
+    red_variants, blue_variants = (future.result(timeout=30) for future in futures)
+
+    assert red_variants[PRINT] == str(tmp_path / "red_print.png")
+    assert blue_variants[PRINT] == str(tmp_path / "blue_print.png")
+    with Image.open(red_variants[PRINT]) as print_file:
+        assert print_file.getpixel((0, 0)) == (200, 30, 30)
+    with Image.open(blue_variants[PRINT]) as print_file:
+        assert print_file.getpixel((0, 0)) == (30, 30, 200)
+
+
+def test_process_failure_keeps_design(post_processor, tmp_path):
+    """An unreadable image is reported without failing the design"""
+    path = tmp_path / "design.png"
+    path.write_text("not an image")
+
+    processed = post_processor.process({"success": True, "image_path": str(path)}, timeout=30)
+
+    assert processed["success"]
+    assert processed["variants"] == {}
+    assert processed["variants_error"]
+    assert post_processor.process({"success": False, "error": "quota"}) == {
+        "success": False,
+        "error": "quota",
+    }
+
+
+def test_process_stream_overlaps_generation(post_processor, tmp_path):
+    """Earlier designs are post-processed while later ones are generating"""
+    for index in range(3):
+        os.makedirs(tmp_path / str(index))
+    second_started = threading.Event()
+    first_processed = []
+
+    def generated():
+        yield {"success": True, "index": 0, "image_path": write_design(tmp_path / "0" / "d.png")}
+        second_started.set()
+        deadline = time.monotonic() + 30
+        while not first_processed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        yield {"success": True, "index": 1, "image_path": write_design(tmp_path / "1" / "d.png")}
+        yield {"success": False, "index": 2, "error": "quota"}
+
+    results = []
+    for result in post_processor.process_stream(generated()):
+        if result["index"] == 0:
+            first_processed.append(result)
+        results.append(result)
+
+    assert second_started.is_set()
+    assert results[0]["index"] == 0
+    assert sorted(result["index"] for result in results) == [0, 1, 2]
+    assert all(result["variants"] for result in results if result["success"])
+
+
+def test_process_stream_ends_when_the_pool_is_closed(tmp_path):
+    """Results that cannot be submitted fail one by one instead of hanging the stream"""
+    processor = DesignPostProcessor(SPECS, max_workers=1)
+    processor.close()
+    generated = [
+        {"success": True, "index": index, "image_path": write_design(tmp_path / f"{index}.png")}
+        for index in range(3)
+    ]
+    results = []
+
+    consumer = threading.Thread(target=lambda: results.extend(processor.process_stream(generated)))
+    consumer.start()
+    consumer.join(10)
+
+    assert not consumer.is_alive()
+    assert sorted(result["index"] for result in results) == [0, 1, 2]
+    assert not any(result["success"] for result in results)
+
+
+class ImageProvider:
+    """Provider writing real images, without latency"""
+
+    name = "dalle"
+    supports_batching = False
+    config = {}
+
+    def generate(self, prompt, output_path, style=None):
+        write_design(output_path)
+        return {"success": True, "image_path": output_path, "provider": self.name}
+
+
+def test_service_post_processes_order_designs_and_batches(post_processor, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path))
+    service = DesignServiceAdapter(provider="dalle", post_processor=post_processor)
+    service.backend = ImageProvider()
+
+    result = service.generate_for_order("order-1", "A cat")
+    batch = list(
+        service.generate_batch(
+            ["A cat", "A dog"], [str(tmp_path / "a" / "d.png"), str(tmp_path / "b" / "d.png")]
+        )
+    )
+
+    assert result["variants"][PREVIEW] == str(tmp_path / "order-1" / "preview.webp")
+    assert os.path.exists(result["variants"][PREVIEW])
+    assert sorted(result["index"] for result in batch) == [0, 1]
+    assert all(os.path.exists(result["variants"][PRINT]) for result in batch)
+    assert batch[0]["variants"][PRINT].endswith("d_print.png")
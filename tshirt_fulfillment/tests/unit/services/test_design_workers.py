@@ -0,0 +1,81 @@
+# Unit tests for the design worker pool
+import os
+import signal
+import time
+
+import pytest
+
+from tshirt_fulfillment.src.adapters.services.design_service import DesignServiceAdapter
+from tshirt_fulfillment.src.adapters.services.design_workers import DesignWorkerPool
+from tshirt_fulfillment.src.adapters.services.external_services import DesignGenerator
+from tshirt_fulfillment.src.config.settings import Config
+
+MODEL_CONFIG = {"simulate": True, "load_seconds": 0.5, "generate_seconds": 0.05}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = DesignWorkerPool(MODEL_CONFIG, num_workers=2)
+    assert pool.wait_ready(timeout=30)
+    yield pool
+    pool.close()
+
+
+def test_model_is_loaded_once_per_worker(pool, tmp_path):
+    """Jobs reuse the loaded model instead of paying the load cost each time"""
+    worker_pids = {worker.pid for worker in pool.workers}
+
+    start = time.perf_counter()
+    futures = [
+        pool.submit(f"A cat playing guitar #{i}", str(tmp_path / f"design_{i}.png"))
+        for i in range(8)
+    ]
+    results = [future.result(timeout=30) for future in futures]
+    elapsed = time.perf_counter() - start
+
+    assert all(result["success"] for result in results)
+    assert {result["worker_pid"] for result in results} <= worker_pids
+    assert all(os.path.exists(result["image_path"]) for result in results)
+    # 8 model loads would take at least 4 seconds
+    assert elapsed < 8 * MODEL_CONFIG["load_seconds"]
+
+
+def test_dead_worker_is_replaced(tmp_path):
+    """A crashed worker fails its job and is replaced by a fresh one"""
+    pool = DesignWorkerPool({**MODEL_CONFIG, "generate_seconds": 5}, num_workers=1)
+    try:
+        assert pool.wait_ready(timeout=30)
+        future = pool.submit("A slow design", str(tmp_path / "slow.png"))
+        time.sleep(0.5)  # Let the worker pick up the job
+        os.kill(pool.workers[0].pid, signal.SIGKILL)
+
+        result = future.result(timeout=30)
+
+        assert result == {"success": False, "error": "Design worker crashed"}
+        assert pool.workers[0].is_alive()
+    finally:
+        pool.close()
+
+
+def test_submit_after_close_fails():
+    """Closed pools reject new jobs"""
+    pool = DesignWorkerPool({**MODEL_CONFIG, "load_seconds": 0}, num_workers=1)
+    pool.close()
+
+    with pytest.raises(RuntimeError):
+        pool.submit("A cat", "design.png")
+
+
+def test_design_generator_uses_worker_pool(pool, tmp_path, monkeypatch):
+    """Stable Diffusion designs are generated on the worker pool"""
+    monkeypatch.setattr(Config, "DESIGN_OUTPUT_DIR", str(tmp_path))
+    generator = DesignGenerator(
+        service=DesignServiceAdapter(provider="stable_diffusion", worker_pool=pool)
+    )
+
+    result = generator.generate("order-1", "A cat playing guitar", style="watercolor")
+
+    assert result["success"]
+    assert result["image_path"] == os.path.join(str(tmp_path), "order-1", "design.png")
+    assert result["prompt_used"] == "A cat playing guitar"
+    assert os.path.getsize(result["image_path"]) > 0
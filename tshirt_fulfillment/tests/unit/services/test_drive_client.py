@@ -0,0 +1,289 @@
+# Unit tests for resumable Google Drive uploads against the fake Drive server
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tshirt_fulfillment.src.adapters.services.drive_client import CHUNK_ALIGNMENT
+from tshirt_fulfillment.src.adapters.services.drive_client import DriveClient
+from tshirt_fulfillment.src.adapters.services.drive_client import DriveError
+from tshirt_fulfillment.src.adapters.services.drive_folders import DriveFolderMap
+from tshirt_fulfillment.src.adapters.services.external_services import GoogleDriveManager
+from tshirt_fulfillment.src.adapters.services.external_services import shutdown_upload_pool
+from tshirt_fulfillment.utils.fake_drive import FakeDriveConfig
+from tshirt_fulfillment.utils.fake_drive import FakeDriveServer
+
+# Four full chunks and a partial one
+FILE_SIZE = 4 * CHUNK_ALIGNMENT + 1234
+
+
+@pytest.fixture
+def print_file(tmp_path):
+    path = tmp_path / "print.png"
+    path.write_bytes(os.urandom(FILE_SIZE))
+    return str(path)
+
+
+def make_client(server, **options):
+    options = {"chunk_size": CHUNK_ALIGNMENT, "resume_delay": 0, **options}
+    return DriveClient("client-id", "secret", "refresh", server.url, server.token_url, **options)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_upload_in_chunks_reports_progress(print_file):
+    progress = []
+    with FakeDriveServer() as server:
+        client = make_client(server)
+        folder = client.create_folder("Order order-1")
+
+        file = client.upload_file(
+            print_file, parent_id=folder["id"], progress=lambda sent, total: progress.append(sent)
+        )
+
+        assert server.file_content(file["id"]) == read(print_file)
+        assert file["name"] == "print.png"
+        assert file["mimeType"] == "image/png"
+        assert file["parents"] == [folder["id"]]
+        assert server.stats()["chunks"] == 5
+    assert progress == [CHUNK_ALIGNMENT * n for n in range(1, 5)] + [FILE_SIZE]
+
+
+@pytest.mark.parametrize("failure_mode", ["status", "disconnect"])
+def test_failed_chunk_resumes_from_persisted_bytes(print_file, failure_mode):
+    config = FakeDriveConfig(fail_chunks=(2,), failure_mode=failure_mode)
+    with FakeDriveServer(config) as server:
+        client = make_client(server)
+
+        file = client.upload_file(print_file)
+
+        assert server.file_content(file["id"]) == read(print_file)
+        stats = server.stats()
+        assert stats["errors"] == 1
+        # Only the half of the failed chunk that was not persisted is resent
+        assert stats["bytes_received"] == FILE_SIZE
+        assert client.resumes == 1
+
+
+def test_expired_session_restarts_upload(print_file):
+    with FakeDriveServer() as server:
+        client = make_client(server)
+        expired = []
+
+        def expire_once(sent, total):
+            if not expired:
+                expired.append(sent)
+                server.expire_uploads()
+
+        file = client.upload_file(print_file, progress=expire_once)
+
+        assert server.file_content(file["id"]) == read(print_file)
+        assert server.stats()["bytes_received"] == FILE_SIZE + CHUNK_ALIGNMENT
+
+
+def test_upload_gives_up_after_max_resumes(print_file):
+    with FakeDriveServer(FakeDriveConfig(error_rate=1.0, partial_failures=False)) as server:
+        client = make_client(server, max_resumes=2)
+
+        with pytest.raises(DriveError, match="after 2 resumes"):
+            client.upload_file(print_file)
+
+        assert server.stats()["chunks"] == 3
+
+
+def test_uploading_again_resumes_the_failed_session(print_file):
+    with FakeDriveServer(FakeDriveConfig(fail_chunks=(2,))) as server:
+        client = make_client(server, max_resumes=0)
+        with pytest.raises(DriveError):
+            client.upload_file(print_file)
+
+        file = client.upload_file(print_file)
+
+        assert server.file_content(file["id"]) == read(print_file)
+        assert server.stats()["bytes_received"] == FILE_SIZE
+
+
+def test_client_errors_are_not_retried(print_file):
+    with FakeDriveServer() as server:
+        client = make_client(server)
+
+        with pytest.raises(DriveError) as error:
+            client.upload_file(print_file, parent_id="missing-folder")
+
+        assert error.value.status == 404
+        assert server.stats()["chunks"] == 0
+
+
+def test_expired_access_token_is_refreshed(print_file):
+    with FakeDriveServer() as server:
+        client = make_client(server)
+        client.create_folder("Order order-1")
+        server.revoke_tokens()
+
+        file = client.upload_file(print_file)
+
+        assert server.file_content(file["id"]) == read(print_file)
+        assert server.stats()["token_requests"] == 2
+
+
+def test_empty_file_upload(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    with FakeDriveServer() as server:
+        file = make_client(server).upload_file(str(path))
+
+        assert server.file_content(file["id"]) == b""
+
+
+def test_chunk_size_must_be_aligned():
+    with pytest.raises(ValueError):
+        DriveClient("client-id", "secret", "refresh", chunk_size=1000)
+
+
+def test_drive_manager_uploads_and_shares(print_file):
+    with FakeDriveServer(FakeDriveConfig(fail_chunks=(1,))) as server:
+        manager = GoogleDriveManager(make_client(server), DriveFolderMap(":memory:"))
+
+        result = manager.upload_file("order-1", print_file)
+
+        assert result["success"]
+        file = server.files[result["file_id"]]
+        assert result["drive_url"] == file["webViewLink"]
+        assert file["parents"] == [result["folder_id"]]
+        assert server.files[result["folder_id"]]["name"] == "Order order-1"
+        assert file["permissions"][0]["type"] == "anyone"
+        assert bytes(file["content"]) == read(print_file)
+
+
+def test_failed_share_is_retried_without_uploading_again(print_file):
+    """A file that uploaded but could not be shared is shared again, not re-uploaded"""
+    with FakeDriveServer(FakeDriveConfig(fail_permissions=1)) as server:
+        manager = GoogleDriveManager(make_client(server), DriveFolderMap(":memory:"))
+
+        result = manager.upload_file("order-1", print_file)
+
+        assert result["success"]
+        files = [f for f in server.files.values() if not f["mimeType"].endswith("folder")]
+        assert [file["id"] for file in files] == [result["file_id"]]
+        assert files[0]["permissions"][0]["type"] == "anyone"
+        assert server.permission_calls == 2
+
+
+def test_drive_manager_reuses_the_order_folder(print_file, tmp_path):
+    excel_file = tmp_path / "order.xlsx"
+    excel_file.write_bytes(b"order sheet")
+    with FakeDriveServer() as server:
+        manager = GoogleDriveManager(make_client(server), DriveFolderMap(":memory:"))
+
+        design = manager.upload_file("order-1", print_file)
+        excel = manager.upload_file("order-1", str(excel_file))
+
+        assert design["folder_id"] == excel["folder_id"]
+        folders = [f for f in server.files.values() if f["mimeType"].endswith("folder")]
+        assert len(folders) == 1
+
+
+def test_drive_manager_recreates_a_deleted_folder(print_file):
+    with FakeDriveServer() as server:
+        manager = GoogleDriveManager(make_client(server), DriveFolderMap(":memory:"))
+        first = manager.upload_file("order-1", print_file)
+        del server.files[first["folder_id"]]
+
+        second = manager.upload_file("order-1", print_file)
+
+        assert second["success"]
+        assert second["folder_id"] != first["folder_id"]
+        assert manager.folder_map.get("order-1") == second["folder_id"]
+
+
+def test_share_files_uses_one_batch_request():
+    with FakeDriveServer() as server:
+        client = make_client(server)
+        ids = [client.create_folder(f"Order {n}")["id"] for n in range(3)]
+
+        client.share_files(ids)
+
+        assert all(server.files[file_id]["permissions"] for file_id in ids)
+        assert server.stats()["batches"] == 1
+        assert server.stats()["batched_calls"] == 3
+
+
+def test_batch_reports_each_call_failure():
+    with FakeDriveServer() as server:
+        client = make_client(server)
+        folder = client.create_folder("Order order-1")
+
+        results = client.batch(
+            [
+                ("GET", f"/drive/v3/files/{folder['id']}", None),
+                ("GET", "/drive/v3/files/missing", None),
+            ]
+        )
+
+        assert results[0][0] == 200
+        assert results[0][1]["id"] == folder["id"]
+        assert results[1][0] == 404
+        with pytest.raises(DriveError) as error:
+            client.share_files([folder["id"], "missing"])
+        assert error.value.status == 404
+        assert server.files[folder["id"]]["permissions"]
+
+
+def test_concurrent_shares_are_batched():
+    with FakeDriveServer() as server:
+        client = make_client(server, batch_window=0.2)
+        ids = [client.create_folder(f"Order {n}")["id"] for n in range(4)]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(client.share, ids))
+
+        assert all(server.files[file_id]["permissions"] for file_id in ids)
+        assert server.stats()["batches"] == 1
+
+
+def test_requests_are_paced_by_the_rate_limit(print_file):
+    with FakeDriveServer() as server:
+        client = make_client(server, requests_per_second=50, request_burst=2)
+
+        client.upload_file(print_file)
+
+        # Start request and five chunks: four of them waited for tokens
+        assert client.snapshot()["rate_limit"]["waits"] == 4
+
+
+def test_drive_managers_share_one_upload_pool(print_file):
+    """Managers created per call start no upload threads of their own"""
+    with FakeDriveServer() as server:
+        managers = [
+            GoogleDriveManager(make_client(server), DriveFolderMap(":memory:")) for _ in range(3)
+        ]
+        results = [
+            manager.upload_file(f"order-{index}", print_file)
+            for index, manager in enumerate(managers)
+        ]
+
+    assert all(result["success"] for result in results)
+    assert all(manager._executor is None for manager in managers)
+    shutdown_upload_pool()
+    assert not [t for t in threading.enumerate() if t.name.startswith("drive-upload")]
+
+
+def test_drive_manager_uploads_order_files_concurrently(print_file, tmp_path):
+    excel_file = tmp_path / "order.xlsx"
+    excel_file.write_bytes(b"order sheet")
+    with FakeDriveServer(FakeDriveConfig(latency=0.05)) as server:
+        client = make_client(server, batch_window=0.5)
+        manager = GoogleDriveManager(client, DriveFolderMap(":memory:"), max_workers=2)
+
+        result = manager.upload_files("order-1", [print_file, str(excel_file)])
+        manager.close()
+
+        assert result["success"]
+        assert len({file["folder_id"] for file in result["files"]}) == 1
+        assert all(server.files[file["file_id"]]["permissions"] for file in result["files"])
+        # Both permission grants went out in one batch request
+        assert server.stats()["batches"] == 1
@@ -0,0 +1,71 @@
+# Unit tests for the order-to-Drive-folder map
+import threading
+import time
+
+from tshirt_fulfillment.src.adapters.services.drive_folders import DriveFolderMap
+
+
+def test_folder_is_created_once_and_persisted(tmp_path):
+    path = str(tmp_path / "folders.sqlite3")
+    created = []
+
+    def create():
+        created.append(1)
+        return "folder-1"
+
+    folder_map = DriveFolderMap(path)
+    assert folder_map.get_or_create("order-1", create) == "folder-1"
+    assert folder_map.get_or_create("order-1", create) == "folder-1"
+    folder_map.close()
+
+    reopened = DriveFolderMap(path)
+    assert reopened.get_or_create("order-1", create) == "folder-1"
+    assert len(created) == 1
+    assert reopened.snapshot() == {"folders": 1, "hits": 1, "created": 0}
+
+
+def test_concurrent_uploads_share_one_folder():
+    folder_map = DriveFolderMap(":memory:")
+    created = []
+
+    def create():
+        time.sleep(0.05)
+        created.append(1)
+        return f"folder-{len(created)}"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(folder_map.get_or_create("order-1", create)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["folder-1"] * 8
+    assert len(created) == 1
+
+
+def test_forget_creates_a_new_folder_next_time():
+    folder_map = DriveFolderMap(":memory:")
+    folder_map.get_or_create("order-1", lambda: "old")
+
+    folder_map.forget("order-1")
+
+    assert folder_map.get("order-1") is None
+    assert folder_map.get_or_create("order-1", lambda: "new") == "new"
+
+
+def test_failed_create_is_not_remembered():
+    folder_map = DriveFolderMap(":memory:")
+
+    def fail():
+        raise RuntimeError("Drive unavailable")
+
+    try:
+        folder_map.get_or_create("order-1", fail)
+    except RuntimeError:
+        pass
+
+    assert folder_map.get("order-1") is None
@@ -0,0 +1,233 @@
+# Unit tests for the Google Drive upload outbox and background uploader
+import time
+from concurrent.futures import Future
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from tshirt_fulfillment.src.adapters.services.drive_client import CHUNK_ALIGNMENT
+from tshirt_fulfillment.src.adapters.services.drive_client import DriveClient
+from tshirt_fulfillment.src.adapters.services.drive_folders import DriveFolderMap
+from tshirt_fulfillment.src.adapters.services.drive_outbox import DriveUploader
+from tshirt_fulfillment.src.adapters.services.drive_outbox import DriveUploadOutbox
+from tshirt_fulfillment.src.adapters.services.external_services import GoogleDriveManager
+from tshirt_fulfillment.src.config.settings import Config
+from tshirt_fulfillment.src.core.domain.order import Order
+from tshirt_fulfillment.src.core.domain.order import OrderStatus
+from tshirt_fulfillment.src.core.repositories.order_repository import OrderRepository
+from tshirt_fulfillment.src.core.resilience import RetryPolicy
+from tshirt_fulfillment.src.core.use_cases.drive_uploads import DriveUploadTracker
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_db
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_manager
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_outbox
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_drive_uploader
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_memory_order_repository
+from tshirt_fulfillment.src.interfaces.api.dependencies import get_order_repository
+from tshirt_fulfillment.src.interfaces.api.routes import order_routes
+from tshirt_fulfillment.utils.fake_drive import FakeDriveServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyDriveManager:
+    """Drive manager whose first ``failures`` uploads fail."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.uploads = []
+
+    def submit(self, order_id, file_path, name=None):
+        self.uploads.append(file_path)
+        future = Future()
+        if len(self.uploads) <= self.failures:
+            future.set_result({"success": False, "error": "Drive unavailable"})
+        else:
+            future.set_result(
+                {"success": True, "drive_url": f"https://drive/{file_path}", "file_id": "f1"}
+            )
+        return future
+
+
+def make_order(order_id="order-1"):
+    return Order(
+        id=order_id,
+        customer_name="Nguyen Van A",
+        customer_email="a@example.com",
+        design_prompt="A cat surfing a wave",
+        size="L",
+        color="Blue",
+        quantity=1,
+        status=OrderStatus.EXCEL_CREATED.value,
+    )
+
+
+def test_claimed_jobs_are_reclaimed_after_their_lease():
+    clock = FakeClock()
+    outbox = DriveUploadOutbox(":memory:", lease_seconds=60, clock=clock)
+    job_id = outbox.enqueue("order-1", "/tmp/design.png", "design")
+
+    assert [job["id"] for job in outbox.claim()] == [job_id]
+    assert outbox.claim() == []
+
+    # The uploader holding the job died
+    clock.now += 61
+    (job,) = outbox.claim()
+    assert job["id"] == job_id
+    assert job["attempts"] == 2
+
+
+def test_failed_jobs_back_off_then_fail_for_good():
+    clock = FakeClock()
+    retry = RetryPolicy(max_attempts=2, base_delay=10, max_delay=10)
+    outbox = DriveUploadOutbox(":memory:", retry=retry, clock=clock)
+    job_id = outbox.enqueue("order-1", "/tmp/design.png")
+    outbox.claim()
+
+    assert outbox.fail(job_id, "Drive unavailable")
+    clock.now += 10
+    outbox.claim()
+    assert not outbox.fail(job_id, "Drive unavailable")
+
+    clock.now += 1000
+    assert outbox.claim() == []
+    assert outbox.snapshot()["failed"] == 1
+    assert outbox.jobs("order-1")[0]["error"] == "Drive unavailable"
+
+
+def test_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "outbox" / "drive_outbox.sqlite3")
+    outbox = DriveUploadOutbox(path)
+    outbox.enqueue("order-1", "/tmp/design.png", "design")
+    outbox.close()
+
+    reopened = DriveUploadOutbox(path)
+
+    (job,) = reopened.claim()
+    assert (job["order_id"], job["kind"]) == ("order-1", "design")
+    reopened.close()
+
+
+def test_uploader_retries_until_the_upload_succeeds():
+    clock = FakeClock()
+    outbox = DriveUploadOutbox(":memory:", retry=RetryPolicy(3, 0, 0), clock=clock)
+    finished = []
+    uploader = DriveUploader(
+        outbox, FlakyDriveManager(failures=2), on_finished=lambda *args: finished.append(args)
+    )
+    outbox.enqueue("order-1", "design.png", "design")
+
+    while uploader.drain():
+        pass
+
+    ((job, result),) = finished
+    assert result["success"]
+    assert job["attempts"] == 3
+    assert job["unfinished"] == 0
+    assert outbox.snapshot()["done"] == 1
+
+
+def test_uploads_complete_the_order(tmp_path):
+    design = tmp_path / "design.png"
+    design.write_bytes(b"design" * 1000)
+    excel = tmp_path / "order.xlsx"
+    excel.write_bytes(b"order sheet")
+    repository = OrderRepository()
+    repository.save(make_order())
+    notifications = []
+
+    with FakeDriveServer() as server:
+        client = DriveClient(
+            "client-id",
+            "secret",
+            "refresh",
+            server.url,
+            server.token_url,
+            chunk_size=CHUNK_ALIGNMENT,
+        )
+        outbox = DriveUploadOutbox(":memory:")
+        manager = GoogleDriveManager(client, DriveFolderMap(":memory:"), outbox=outbox)
+        tracker = DriveUploadTracker(
+            repository,
+            notify=lambda *args: notifications.append(args) or {"success": True},
+        )
+        uploader = DriveUploader(outbox, manager, on_finished=tracker, poll_interval=0.05)
+
+        queued = manager.enqueue_upload("order-1", str(design), "design")
+        manager.enqueue_upload("order-1", str(excel), "excel")
+        assert queued["queued"]
+        assert server.stats()["chunks"] == 0
+
+        uploader.start()
+        deadline = time.monotonic() + 10
+        while outbox.snapshot()["done"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        uploader.stop()
+        manager.close()
+
+        order = repository.get_by_id("order-1")
+        (design_job,) = [job for job in outbox.jobs("order-1") if job["kind"] == "design"]
+        assert order.status == OrderStatus.COMPLETED
+        assert order.result.drive_link == design_job["drive_url"]
+        assert order.result.drive_link == server.files[design_job["file_id"]]["webViewLink"]
+        assert order.result.notification_sent
+        assert notifications == [
+            ("order-1", f"Your T-shirt design is ready: {order.result.drive_link}", "en")
+        ]
+
+
+def test_upload_that_fails_for_good_fails_the_order():
+    repository = OrderRepository()
+    repository.save(make_order())
+    outbox = DriveUploadOutbox(":memory:", retry=RetryPolicy(max_attempts=1))
+    uploader = DriveUploader(
+        outbox, FlakyDriveManager(failures=1), on_finished=DriveUploadTracker(repository)
+    )
+    outbox.enqueue("order-1", "design.png", "design")
+
+    uploader.drain()
+
+    order = repository.get_by_id("order-1")
+    assert order.status == OrderStatus.FAILED
+    assert order.result.drive_link is None
+    assert order.phases[0].phase == "drive_upload_failed"
+
+
+@pytest.fixture
+def api_uploads(tmp_path, monkeypatch):
+    """Background uploads enabled, with the API's process-wide services"""
+    monkeypatch.setattr(Config, "DRIVE_OUTBOX_ENABLED", True)
+    monkeypatch.setattr(Config, "DRIVE_OUTBOX_PATH", str(tmp_path / "outbox.sqlite3"))
+    caches = [get_memory_order_repository, get_drive_outbox, get_drive_manager, get_drive_uploader]
+    for cache in caches:
+        cache.cache_clear()
+    yield
+    get_drive_manager().close()
+    get_drive_outbox().close()
+    for cache in caches:
+        cache.cache_clear()
+
+
+def test_api_order_shows_the_link_once_the_outbox_drains(api_uploads):
+    """The uploader updates the same orders the API reads"""
+    order = make_order()
+    order.result = {"success": True, "uploads_deferred": True}
+    get_order_repository(get_db()).save(order)
+    app = FastAPI()
+    app.include_router(order_routes.router)
+    client = TestClient(app)
+
+    get_drive_manager().enqueue_upload("order-1", "design.png", "design")
+    get_drive_uploader().drain()
+
+    response = client.get("/orders/order-1")
+    assert response.status_code == 200
+    assert response.json()["status"] == OrderStatus.COMPLETED.value
+    (job,) = get_drive_outbox().jobs("order-1")
+    assert response.json()["result"]["drive_link"] == job["drive_url"]
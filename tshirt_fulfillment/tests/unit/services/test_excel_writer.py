@@ -0,0 +1,131 @@
+# Unit tests for the streaming Excel order sheet writer
+import os
+
+import pytest
+from openpyxl import Workbook
+from openpyxl import load_workbook
+from openpyxl.styles import Font
+from openpyxl.styles import PatternFill
+
+from tshirt_fulfillment.src.adapters.services import excel_writer
+from tshirt_fulfillment.src.adapters.services.excel_writer import OrderSheetTemplate
+from tshirt_fulfillment.src.adapters.services.excel_writer import get_order_template
+from tshirt_fulfillment.src.adapters.services.excel_writer import write_order_workbook
+from tshirt_fulfillment.src.adapters.services.external_services import ExcelHandler
+from tshirt_fulfillment.src.config.settings import Config
+
+CUSTOMER_INFO = {"name": "Nguyễn Văn A", "size": "L", "quantity": 2, "notes": None}
+
+
+def read_rows(path):
+    workbook = load_workbook(path)
+    sheet = workbook.active
+    return workbook, sheet, [[cell.value for cell in row] for row in sheet.iter_rows()]
+
+
+@pytest.fixture
+def template_file(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Đơn {order_id}"
+    sheet.append(["Trường", "Giá trị"])
+    sheet["A1"].font = Font(bold=True, color="FF0000")
+    sheet["A1"].fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+    sheet.column_dimensions["B"].width = 60
+    path = tmp_path / "template.xlsx"
+    workbook.save(path)
+    excel_writer._load_template.cache_clear()
+    return str(path)
+
+
+def test_order_workbook_rows_and_header_style(tmp_path):
+    path = write_order_workbook(str(tmp_path / "order.xlsx"), "order-1", CUSTOMER_INFO)
+
+    workbook, sheet, rows = read_rows(path)
+    assert sheet.title == "Order order-1"
+    assert rows == [
+        ["Field", "Value"],
+        ["Order ID", "order-1"],
+        ["name", "Nguyễn Văn A"],
+        ["size", "L"],
+        ["quantity", 2],
+        ["notes", None],
+    ]
+    assert sheet["A1"].font.b
+    assert sheet["A1"].fill.fgColor.rgb == "00DDDDDD"
+    assert sheet.column_dimensions["B"].width == 48
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_customer_text_is_never_a_formula(tmp_path):
+    path = write_order_workbook(
+        str(tmp_path / "order.xlsx"), "order-1", {"name": '=HYPERLINK("http://x")'}
+    )
+
+    _, sheet, _ = read_rows(path)
+    assert sheet["B3"].data_type == "s"
+    assert sheet["B3"].value == '=HYPERLINK("http://x")'
+
+
+def test_sheet_title_is_valid_for_any_order_id():
+    title = OrderSheetTemplate().sheet_title("order/with:odd*chars_and_a_very_long_suffix")
+
+    assert len(title) == 31
+    assert not set(title) & set("[]:*?/\\")
+
+
+def test_template_file_is_parsed_once(template_file, monkeypatch):
+    first = get_order_template(template_file)
+    monkeypatch.setattr(
+        excel_writer, "load_workbook", lambda *args, **kwargs: pytest.fail("parsed again")
+    )
+
+    assert get_order_template(template_file) is first
+    assert first.headers == ("Trường", "Giá trị")
+    assert first.column_widths[1] == 60
+    assert first.header_font.color.rgb == "00FF0000"
+
+
+def test_template_is_reparsed_when_file_changes(template_file):
+    first = get_order_template(template_file)
+    workbook = load_workbook(template_file)
+    workbook.active["C1"] = "Ghi chú"
+    workbook.save(template_file)
+    os.utime(template_file, ns=(0, os.stat(template_file).st_mtime_ns + 1_000_000))
+
+    assert get_order_template(template_file).headers == ("Trường", "Giá trị", "Ghi chú")
+    assert first.headers == ("Trường", "Giá trị")
+
+
+def test_order_workbook_uses_template(template_file, tmp_path):
+    path = write_order_workbook(
+        str(tmp_path / "order.xlsx"), "order-1", CUSTOMER_INFO, get_order_template(template_file)
+    )
+
+    _, sheet, rows = read_rows(path)
+    assert sheet.title == "Đơn order-1"
+    assert rows[0] == ["Trường", "Giá trị"]
+    assert sheet["A1"].fill.fgColor.rgb == "00FFFF00"
+
+
+def test_excel_handler_writes_workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "ORDER_FILES_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "EXCEL_TEMPLATE_PATH", "")
+
+    result = ExcelHandler().create_order_file("order-1", CUSTOMER_INFO)
+
+    assert result == {
+        "success": True,
+        "file_path": os.path.join(str(tmp_path), "order-1", "order_details.xlsx"),
+    }
+    assert read_rows(result["file_path"])[2][1] == ["Order ID", "order-1"]
+
+
+def test_excel_handler_reports_bad_template(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "ORDER_FILES_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "EXCEL_TEMPLATE_PATH", str(tmp_path / "missing.xlsx"))
+
+    result = ExcelHandler().create_order_file("order-1", CUSTOMER_INFO)
+
+    assert not result["success"]
+    assert "missing.xlsx" in result["error"]
@@ -0,0 +1,152 @@
+# Unit tests for LLM micro-batching
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from tshirt_fulfillment.src.adapters.services.llm_batching import LLMBatchDispatcher
+from tshirt_fulfillment.src.adapters.services.llm_batching import OllamaBatchBackend
+from tshirt_fulfillment.src.core.resilience import deadline_scope
+from tshirt_fulfillment.src.core.resilience import remaining_time
+from tshirt_fulfillment.utils.fake_ollama import FakeOllamaConfig
+from tshirt_fulfillment.utils.fake_ollama import FakeOllamaServer
+
+
+class RecordingBatchFunction:
+    """Fake batch function that records batch sizes"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self.lock:
+            self.batch_sizes.append(len(batch))
+        time.sleep(self.delay)
+        return [f"echo: {messages[-1]['content']}" for messages in batch]
+
+
+def submit_concurrently(dispatcher, count):
+    messages = [[{"role": "user", "content": f"request {i}"}] for i in range(count)]
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(dispatcher.submit, messages))
+
+
+def test_concurrent_requests_are_batched_and_fanned_out():
+    """Requests in the same window share one batch and get their own response"""
+    batch_fn = RecordingBatchFunction()
+    dispatcher = LLMBatchDispatcher(batch_fn, max_batch_size=16, max_wait=0.1)
+
+    responses = submit_concurrently(dispatcher, 8)
+    dispatcher.close()
+
+    assert responses == [f"echo: request {i}" for i in range(8)]
+    assert sum(batch_fn.batch_sizes) == 8
+    assert len(batch_fn.batch_sizes) < 8
+
+
+def test_batches_respect_max_batch_size():
+    """No batch is larger than max_batch_size"""
+    batch_fn = RecordingBatchFunction(delay=0.01)
+    dispatcher = LLMBatchDispatcher(batch_fn, max_batch_size=3, max_wait=0.1)
+
+    submit_concurrently(dispatcher, 10)
+    dispatcher.close()
+
+    assert max(batch_fn.batch_sizes) <= 3
+    assert sum(batch_fn.batch_sizes) == 10
+
+
+def test_single_request_is_sent_after_window():
+    """A lone request is not held longer than the batching window"""
+    batch_fn = RecordingBatchFunction()
+    dispatcher = LLMBatchDispatcher(batch_fn, max_batch_size=8, max_wait=0.05)
+
+    start = time.perf_counter()
+    response = dispatcher.submit([{"role": "user", "content": "hello"}])
+    elapsed = time.perf_counter() - start
+    dispatcher.close()
+
+    assert response == "echo: hello"
+    assert elapsed < 0.5
+    assert batch_fn.batch_sizes == [1]
+
+
+def test_batch_errors_propagate_to_every_caller():
+    """A failing batch raises in every waiting caller"""
+
+    def failing_batch(batch):
+        raise ConnectionError("LLM unavailable")
+
+    dispatcher = LLMBatchDispatcher(failing_batch, max_batch_size=4, max_wait=0.05)
+
+    with pytest.raises(ConnectionError):
+        dispatcher.submit([{"role": "user", "content": "hello"}])
+    dispatcher.close()
+
+
+def test_response_count_mismatch_is_an_error():
+    """The batch function must answer every request"""
+    dispatcher = LLMBatchDispatcher(lambda batch: [], max_batch_size=4, max_wait=0.01)
+
+    with pytest.raises(ValueError):
+        dispatcher.submit([{"role": "user", "content": "hello"}])
+    dispatcher.close()
+
+
+def test_submit_after_close_fails():
+    """Closed dispatchers reject new requests"""
+    dispatcher = LLMBatchDispatcher(RecordingBatchFunction())
+    dispatcher.close()
+
+    with pytest.raises(RuntimeError):
+        dispatcher.submit([{"role": "user", "content": "hello"}])
+
+
+def test_batch_runs_under_the_callers_deadline():
+    """The batch function sees the deadline of the requests it serves"""
+    seen = []
+
+    def batch_fn(batch):
+        seen.append(remaining_time())
+        return ["ok"] * len(batch)
+
+    dispatcher = LLMBatchDispatcher(batch_fn, max_wait=0.01)
+    with deadline_scope(5):
+        dispatcher.submit([{"role": "user", "content": "hello"}])
+    dispatcher.submit([{"role": "user", "content": "hello"}])
+    dispatcher.close()
+
+    assert 0 < seen[0] <= 5
+    assert seen[1] is None
+
+
+def test_hung_backend_request_times_out_at_the_deadline():
+    """A stalled Ollama server cannot hold the batch executor past the deadline"""
+    latency = 1.0
+    with FakeOllamaServer(FakeOllamaConfig(latency=latency)) as server:
+        dispatcher = LLMBatchDispatcher(
+            OllamaBatchBackend(server.url, "mistral"), max_batch_size=2, max_wait=0.05
+        )
+
+        def submit(content):
+            with deadline_scope(0.3):
+                return dispatcher.submit([{"role": "user", "content": content}])
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(submit, f"request {i}") for i in range(2)]
+            for future in futures:
+                with pytest.raises(requests.Timeout):
+                    future.result()
+        assert time.monotonic() - start < 0.9
+        dispatcher.close()
+        # Let the stalled handlers finish so they do not outlive the test
+        time.sleep(max(0.0, start + latency + 0.1 - time.monotonic()))
+
+
+def test_backend_has_a_timeout_by_default():
+    assert OllamaBatchBackend("http://localhost:11434", "mistral").timeout == 30.0
@@ -0,0 +1,182 @@
+# Unit tests for the multi-model LLM router
+import time
+
+import pytest
+
+from tshirt_fulfillment.src.adapters.services.llm_router import LARGE_MODEL_TIER
+from tshirt_fulfillment.src.adapters.services.llm_router import SMALL_MODEL_TIER
+from tshirt_fulfillment.src.adapters.services.llm_router import LatencyTracker
+from tshirt_fulfillment.src.adapters.services.llm_router import LLMRouter
+from tshirt_fulfillment.src.adapters.services.llm_router import ModelBackend
+from tshirt_fulfillment.src.core.prompts import DESIGN_REQUEST
+from tshirt_fulfillment.src.core.prompts import INTENT_REQUEST
+from tshirt_fulfillment.src.core.resilience import DeadlineExceededError
+from tshirt_fulfillment.src.core.resilience import deadline_scope
+from tshirt_fulfillment.src.core.resilience import remaining_time
+from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent
+
+MESSAGES = [{"role": "user", "content": "A cat playing guitar"}]
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_backend(name, tier, latencies=(), failures=0, clock=None):
+    """Backend whose tracker is pre-filled with the given history"""
+    tracker = LatencyTracker(clock=clock or FakeClock())
+    for latency in latencies:
+        tracker.record(latency, success=True)
+    for _ in range(failures):
+        tracker.record(0.0, success=False)
+    return ModelBackend(name, lambda messages: f"{name} response", tier, tracker)
+
+
+def test_latency_percentiles():
+    """p50 and p95 come from successful calls in the window"""
+    tracker = LatencyTracker(window=100)
+    for latency in range(1, 101):
+        tracker.record(latency / 100, success=True)
+    tracker.record(5.0, success=False)
+
+    assert tracker.percentile(50) == pytest.approx(0.51, abs=0.01)
+    assert tracker.percentile(95) == pytest.approx(0.95, abs=0.01)
+    assert tracker.error_rate == pytest.approx(0.01)
+
+
+def test_routes_to_fastest_model_meeting_tier():
+    """Intent requests may use the small model, design requests may not"""
+    small = make_backend("phi3", SMALL_MODEL_TIER, latencies=[0.1] * 10)
+    large = make_backend("mistral", LARGE_MODEL_TIER, latencies=[0.8] * 10)
+    larger = make_backend("mixtral", LARGE_MODEL_TIER, latencies=[2.0] * 10)
+    router = LLMRouter([small, large, larger])
+
+    assert router.select(INTENT_REQUEST) is small
+    assert router.select(DESIGN_REQUEST) is large
+
+
+def test_unhealthy_model_is_avoided():
+    """A fast backend with a high error rate loses to a slower healthy one"""
+    flaky = make_backend("fast", LARGE_MODEL_TIER, latencies=[0.1] * 5, failures=5)
+    steady = make_backend("slow", LARGE_MODEL_TIER, latencies=[1.0] * 10)
+    router = LLMRouter([flaky, steady], max_error_rate=0.2)
+
+    assert router.select(DESIGN_REQUEST) is steady
+
+
+def test_unhealthy_model_is_probed_after_recovery():
+    """After recovery_seconds an unhealthy backend is tried again"""
+    clock = FakeClock()
+    flaky = make_backend("fast", LARGE_MODEL_TIER, latencies=[0.1] * 5, failures=5, clock=clock)
+    steady = make_backend("slow", LARGE_MODEL_TIER, latencies=[1.0] * 10)
+    router = LLMRouter([flaky, steady], recovery_seconds=30)
+
+    clock.now = 30
+
+    assert router.select(DESIGN_REQUEST) is flaky
+
+
+def test_unmeasured_model_is_tried_first():
+    """New backends get traffic so their latency gets measured"""
+    measured = make_backend("measured", LARGE_MODEL_TIER, latencies=[0.1] * 10)
+    new = make_backend("new", LARGE_MODEL_TIER)
+    router = LLMRouter([measured, new], min_samples=5)
+
+    assert router.select(DESIGN_REQUEST) is new
+
+
+def test_complete_falls_back_on_error():
+    """If the best backend fails, the next candidate answers"""
+
+    def broken(messages):
+        raise ConnectionError("model not loaded")
+
+    first = ModelBackend("broken", broken, LARGE_MODEL_TIER)
+    second = make_backend("mistral", LARGE_MODEL_TIER, latencies=[1.0] * 10)
+    router = LLMRouter([first, second])
+
+    assert router.complete(MESSAGES, DESIGN_REQUEST) == "mistral response"
+    assert first.tracker.error_rate == 1.0
+    assert second.tracker.samples == 11
+
+
+def test_complete_raises_when_all_backends_fail():
+    """The last error is raised when no backend can answer"""
+
+    def broken(messages):
+        raise ConnectionError("down")
+
+    router = LLMRouter([ModelBackend("only", broken, SMALL_MODEL_TIER)])
+
+    with pytest.raises(ConnectionError):
+        router.complete(MESSAGES, INTENT_REQUEST)
+
+
+def test_missing_tier_uses_best_available_model():
+    """With only small models, design requests still get an answer"""
+    small = make_backend("phi3", SMALL_MODEL_TIER)
+    router = LLMRouter([small])
+
+    assert router.complete(MESSAGES, DESIGN_REQUEST) == "phi3 response"
+
+
+def test_complete_sets_deadline_for_backends():
+    """Backends see the request timeout as the active deadline"""
+    seen = []
+
+    def complete(messages):
+        seen.append(remaining_time())
+        return "answer"
+
+    router = LLMRouter([ModelBackend("only", complete, LARGE_MODEL_TIER)])
+
+    assert router.complete(MESSAGES, DESIGN_REQUEST, timeout=5.0) == "answer"
+    assert 0 < seen[0] <= 5.0
+
+
+def test_complete_stops_falling_back_after_deadline():
+    """No further backend is tried once the timeout has passed"""
+    calls = []
+
+    def slow_failure(messages):
+        calls.append("slow")
+        time.sleep(0.05)
+        raise ConnectionError("timed out")
+
+    def answer(messages):
+        calls.append("fast")
+        return "answer"
+
+    slow = ModelBackend("slow", slow_failure, LARGE_MODEL_TIER)
+    fast = make_backend("fast", LARGE_MODEL_TIER, latencies=[1.0] * 10)
+    fast.complete = answer
+    router = LLMRouter([slow, fast])
+
+    with pytest.raises(DeadlineExceededError):
+        router.complete(MESSAGES, DESIGN_REQUEST, timeout=0.02)
+    assert calls == ["slow"]
+
+
+def test_agent_passes_remaining_deadline_to_router():
+    """Routed LLM calls keep the deadline of the order"""
+
+    class RecordingRouter:
+        def __init__(self):
+            self.timeouts = []
+
+        def complete(self, messages, request_class, timeout=None):
+            self.timeouts.append(timeout)
+            return "answer"
+
+    router = RecordingRouter()
+    agent = TShirtFulfillmentAgent(redis_url="", model_name="fake", llm_router=router)
+
+    with deadline_scope(1.0):
+        assert agent._request_llm(MESSAGES) == "answer"
+    assert 0 < router.timeouts[0] <= 1.0
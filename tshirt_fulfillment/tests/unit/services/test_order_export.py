@@ -0,0 +1,130 @@
+# Unit tests for the consolidated Excel order export
+import os
+import tracemalloc
+
+import pytest
+from openpyxl import load_workbook
+
+from tshirt_fulfillment.src.adapters.services.order_export import EXPORT_COLUMNS
+from tshirt_fulfillment.src.adapters.services.order_export import OrderExcelExporter
+from tshirt_fulfillment.src.core.domain.order import Order
+from tshirt_fulfillment.src.core.domain.order import OrderStatus
+from tshirt_fulfillment.src.core.repositories.order_repository import OrderRepository
+
+
+def make_order(index, status=OrderStatus.COMPLETED, created_at=1_700_000_000.0):
+    order = Order(
+        id=f"order-{index}",
+        customer_name=f"Customer {index}",
+        customer_email=f"c{index}@example.com",
+        design_prompt=f"A cat #{index}",
+        size="L",
+        color="Blue",
+        quantity=1 + index % 3,
+    )
+    order.status = status
+    order.created_at = created_at + index
+    order.result = {"design_path": f"designs/order-{index}/design.png"}
+    return order
+
+
+def sheets(path):
+    workbook = load_workbook(path, read_only=True)
+    return {
+        sheet.title: [list(row) for row in sheet.iter_rows(values_only=True)]
+        for sheet in workbook.worksheets
+    }
+
+
+def test_one_row_per_order(tmp_path):
+    repository = OrderRepository()
+    for index in range(3):
+        repository.save(make_order(index))
+
+    result = OrderExcelExporter(str(tmp_path)).export(repository.iter_all(), batch_name="day")
+
+    assert result == {
+        "success": True,
+        "files": [os.path.join(str(tmp_path), "day-001.xlsx")],
+        "orders": 3,
+    }
+    rows = sheets(result["files"][0])["Orders"]
+    assert rows[0] == [name for name, _ in EXPORT_COLUMNS]
+    assert [row[0] for row in rows[1:]] == ["order-0", "order-1", "order-2"]
+    assert rows[1][2:9] == ["completed", "Customer 0", "c0@example.com", "L", "Blue", 1, "A cat #0"]
+    assert rows[1][9] == "designs/order-0/design.png"
+    assert rows[1][1].year == 2023
+
+
+def test_sheet_per_status(tmp_path):
+    statuses = [OrderStatus.COMPLETED, OrderStatus.FAILED, OrderStatus.COMPLETED]
+    orders = [make_order(index, status) for index, status in enumerate(statuses)]
+
+    result = OrderExcelExporter(str(tmp_path)).export(orders, "day", split_by_status=True)
+
+    exported = sheets(result["files"][0])
+    assert sorted(exported) == ["completed", "failed"]
+    assert len(exported["completed"]) == 3
+    assert exported["failed"][1][0] == "order-1"
+
+
+def test_rolls_over_to_new_sheets_and_files(tmp_path):
+    exporter = OrderExcelExporter(str(tmp_path), max_sheet_rows=3, max_file_rows=5)
+
+    result = exporter.export((make_order(index) for index in range(12)), "day")
+
+    assert [os.path.basename(path) for path in result["files"]] == [
+        "day-001.xlsx",
+        "day-002.xlsx",
+        "day-003.xlsx",
+    ]
+    first = sheets(result["files"][0])
+    assert list(first) == ["Orders", "Orders (2)"]
+    assert [len(rows) - 1 for rows in first.values()] == [3, 2]
+    exported = [
+        row[0] for path in result["files"] for rows in sheets(path).values() for row in rows[1:]
+    ]
+    assert exported == [f"order-{index}" for index in range(12)]
+
+
+def test_filters_by_creation_time(tmp_path):
+    orders = [make_order(index, created_at=1000.0) for index in range(10)]
+
+    result = OrderExcelExporter(str(tmp_path)).export(orders, "day", since=1003, until=1006)
+
+    assert result["orders"] == 3
+    assert [row[0] for row in sheets(result["files"][0])["Orders"][1:]] == [
+        "order-3",
+        "order-4",
+        "order-5",
+    ]
+
+
+def test_empty_export_writes_header_only_file(tmp_path):
+    result = OrderExcelExporter(str(tmp_path)).export([], "day")
+
+    assert result["orders"] == 0
+    assert len(sheets(result["files"][0])["Orders"]) == 1
+
+
+def test_rejects_invalid_batch_names_and_limits(tmp_path):
+    assert not OrderExcelExporter(str(tmp_path)).export([], "../outside")["success"]
+    with pytest.raises(ValueError):
+        OrderExcelExporter(str(tmp_path), max_sheet_rows=2_000_000)
+
+
+def test_memory_does_not_grow_with_orders(tmp_path):
+    """Orders are streamed; rolled-over files release their rows"""
+    exporter = OrderExcelExporter(str(tmp_path), max_file_rows=500)
+
+    def peak(count):
+        tracemalloc.start()
+        exporter.export((make_order(index) for index in range(count)), f"run-{count}")
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_bytes
+
+    small = peak(500)
+    large = peak(3000)
+
+    assert large < small * 1.5
@@ -0,0 +1,118 @@
+# Unit tests for the fake Ollama server
+import json
+
+import pytest
+import requests
+
+from tshirt_fulfillment.src.core.resilience import ResilientDependency
+from tshirt_fulfillment.src.core.resilience import RetryPolicy
+from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent
+from tshirt_fulfillment.utils.fake_ollama import FakeOllamaConfig
+from tshirt_fulfillment.utils.fake_ollama import FakeOllamaServer
+
+MESSAGES = [{"role": "user", "content": "A cat playing guitar"}]
+
+
+@pytest.fixture
+def server():
+    config = FakeOllamaConfig(
+        latency=0.01, canned_responses={"guitar": "A cartoon cat strumming a blue guitar"}
+    )
+    with FakeOllamaServer(config) as server:
+        yield server
+
+
+def test_generate_returns_canned_response(server):
+    """Prompts matching a canned keyword get the canned response"""
+    response = requests.post(
+        f"{server.url}/api/generate",
+        json={"model": "mistral", "messages": MESSAGES, "stream": False},
+        timeout=5,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["response"] == "A cartoon cat strumming a blue guitar"
+
+
+def test_generate_default_response_uses_prompt(server):
+    """Other prompts are echoed through the default response template"""
+    response = requests.post(
+        f"{server.url}/api/generate",
+        json={"model": "mistral", "prompt": "A red dragon", "stream": False},
+        timeout=5,
+    )
+
+    assert response.json()["response"] == "Design idea for: A red dragon"
+
+
+def test_generate_streams_ndjson_chunks(server):
+    """Streaming responses arrive as NDJSON chunks ending with done"""
+    response = requests.post(
+        f"{server.url}/api/generate",
+        json={"model": "mistral", "messages": MESSAGES},
+        stream=True,
+        timeout=5,
+    )
+    chunks = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert len(chunks) > 2
+    assert chunks[-1]["done"] is True
+    assert "".join(chunk["response"] for chunk in chunks) == "A cartoon cat strumming a blue guitar"
+
+
+def test_batch_endpoint_answers_every_request(server):
+    """The batch endpoint returns one response per request, in order"""
+    response = requests.post(
+        f"{server.url}/api/generate/batch",
+        json={"model": "mistral", "requests": [{"prompt": "one"}, {"prompt": "two"}]},
+        timeout=5,
+    )
+
+    assert response.json()["responses"] == ["Design idea for: one", "Design idea for: two"]
+    assert server.stats() == {"requests": 2, "errors": 0, "batches": 1}
+
+
+def test_error_injection():
+    """With error_rate 1.0 every request fails with error_status"""
+    with FakeOllamaServer(FakeOllamaConfig(latency=0, error_rate=1.0, error_status=503)) as server:
+        response = requests.post(f"{server.url}/api/generate", json={"prompt": "x"}, timeout=5)
+
+        assert response.status_code == 503
+        assert server.stats()["errors"] == 1
+
+
+@pytest.mark.parametrize("distribution", ["fixed", "uniform", "normal", "lognormal"])
+def test_latency_samples_are_non_negative(distribution):
+    """Every distribution yields non-negative latencies around the mean"""
+    config = FakeOllamaConfig(
+        latency=0.1, latency_jitter=0.05, latency_distribution=distribution, seed=1
+    )
+    server = FakeOllamaServer(config)
+    try:
+        samples = [server.sample_latency() for _ in range(500)]
+    finally:
+        server.stop()
+
+    assert min(samples) >= 0
+    assert sum(samples) / len(samples) == pytest.approx(0.1, abs=0.02)
+
+
+def test_unknown_distribution_is_rejected():
+    """Typos in the distribution name fail early"""
+    with pytest.raises(ValueError):
+        FakeOllamaConfig(latency_distribution="pareto")
+
+
+def test_agent_calls_fake_server(server):
+    """TShirtFulfillmentAgent runs end to end against the fake server"""
+    agent = TShirtFulfillmentAgent(
+        redis_url="",
+        model_name="mistral",
+        llm_dependency=ResilientDependency("fake", retry_policy=RetryPolicy(max_attempts=1)),
+    )
+    agent.ollama_base_url = server.url
+
+    result = agent.process_order("order-1", "A cat playing guitar", language="en")
+
+    assert result["success"]
+    assert result["design"]["description"] == "A cartoon cat strumming a blue guitar"
@@ -0,0 +1,94 @@
+# Unit tests for prompt templates and prompt budgeting
+import pytest
+
+from tshirt_fulfillment.src.core.domain.tools import ToolCategory
+from tshirt_fulfillment.src.core.domain.tools import ToolDefinition
+from tshirt_fulfillment.src.core.domain.tools import ToolRegistry
+from tshirt_fulfillment.src.core.prompts import ADMIN_ROLE
+from tshirt_fulfillment.src.core.prompts import DESIGN_ASSISTANT_ROLE
+from tshirt_fulfillment.src.core.prompts import PromptBudget
+from tshirt_fulfillment.src.core.prompts import estimate_message_tokens
+from tshirt_fulfillment.src.core.prompts import get_system_prompt
+
+
+def make_tool(name, admin_only=False):
+    return ToolDefinition(
+        name=name,
+        description=f"{name} description",
+        category=ToolCategory.ADMIN if admin_only else ToolCategory.DESIGN,
+        input_schema={"order_id": "str"},
+        output_schema={},
+        handler=lambda **kwargs: {"success": True},
+        admin_only=admin_only,
+    )
+
+
+def test_system_prompt_is_rendered_once_per_role_and_language():
+    """Repeated calls return the cached rendering"""
+    first = get_system_prompt(DESIGN_ASSISTANT_ROLE, "vi")
+    second = get_system_prompt(DESIGN_ASSISTANT_ROLE, "vi")
+
+    assert first is second
+    assert first.startswith("You are a T-shirt design assistant.")
+    assert "Vietnamese" in first
+    assert "English" in get_system_prompt(DESIGN_ASSISTANT_ROLE, "en")
+
+
+def test_system_prompt_includes_tool_descriptions():
+    """Tool descriptions are appended when provided"""
+    prompt = get_system_prompt(ADMIN_ROLE, "en", "1. find_google_sheet(criteria): Find sheets")
+
+    assert prompt.endswith("Available tools:\n1. find_google_sheet(criteria): Find sheets")
+
+
+def test_unknown_prompt_role_is_rejected():
+    with pytest.raises(ValueError):
+        get_system_prompt("unknown", "en")
+
+
+def test_tool_descriptions_are_cached_until_registration():
+    """The registry renders its tool list once and refreshes on register"""
+    registry = ToolRegistry()
+    registry.register(make_tool("generate_design"))
+    registry.register(make_tool("find_google_sheet", admin_only=True))
+
+    customer_description = registry.describe_tools()
+    assert customer_description == "1. generate_design(order_id): generate_design description"
+    assert registry.describe_tools() is customer_description
+    assert "find_google_sheet" in registry.describe_tools(admin=True)
+
+    registry.register(make_tool("notify_customer"))
+    assert "2. notify_customer(order_id)" in registry.describe_tools()
+
+
+def test_budget_keeps_short_conversations_unchanged():
+    budget = PromptBudget(max_context_tokens=1000, reserved_response_tokens=100)
+    messages = [
+        {"role": "system", "content": "You are a T-shirt design assistant."},
+        {"role": "user", "content": "A cat playing guitar"},
+    ]
+
+    assert budget.trim(messages) == messages
+
+
+def test_budget_drops_oldest_history_first():
+    """System prompt and latest message are kept; the oldest history goes first"""
+    budget = PromptBudget(max_context_tokens=120, reserved_response_tokens=20)
+    system = {"role": "system", "content": "You are a T-shirt design assistant."}
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " + "x" * 100}
+        for i in range(6)
+    ]
+    latest = {"role": "user", "content": "Make the cat blue"}
+
+    trimmed = budget.trim([system, *history, latest])
+
+    assert trimmed[0] == system
+    assert trimmed[-1] == latest
+    assert trimmed[1:-1] == history[-len(trimmed) + 2 :]
+    assert sum(estimate_message_tokens(m) for m in trimmed) <= budget.prompt_tokens
+
+
+def test_budget_requires_room_for_the_prompt():
+    with pytest.raises(ValueError):
+        PromptBudget(max_context_tokens=512, reserved_response_tokens=512)
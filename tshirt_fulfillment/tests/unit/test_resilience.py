@@ -0,0 +1,271 @@
+# Unit tests for circuit breaking, retries and deadlines
+import threading
+import time
+
+import pytest
+
+from tshirt_fulfillment.src.core.resilience import CircuitBreaker
+from tshirt_fulfillment.src.core.resilience import CircuitOpenError
+from tshirt_fulfillment.src.core.resilience import CircuitState
+from tshirt_fulfillment.src.core.resilience import ConcurrencyLimitError
+from tshirt_fulfillment.src.core.resilience import DeadlineExceededError
+from tshirt_fulfillment.src.core.resilience import ResilientDependency
+from tshirt_fulfillment.src.core.resilience import RetryPolicy
+from tshirt_fulfillment.src.core.resilience import TokenBucket
+from tshirt_fulfillment.src.core.resilience import deadline_scope
+from tshirt_fulfillment.src.core.resilience import remaining_time
+from tshirt_fulfillment.src.core.resilience import result_failed
+from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyCall:
+    """Callable that fails a given number of times before succeeding"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("temporarily unavailable")
+        return "ok"
+
+
+def make_dependency(failure_threshold=5, max_attempts=3, **options):
+    return ResilientDependency(
+        "test",
+        circuit_breaker=CircuitBreaker(failure_threshold=failure_threshold),
+        retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0.001, max_delay=0.001),
+        **options,
+    )
+
+
+def test_circuit_opens_after_consecutive_failures():
+    """The breaker opens at the threshold and rejects further calls"""
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, clock=FakeClock())
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_circuit_half_opens_after_recovery_timeout():
+    """After the recovery timeout one trial call is allowed, and success closes it"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_failure_reopens_circuit():
+    """A failed trial call opens the circuit again"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_deadline_during_half_open_trial_releases_the_slot():
+    """A trial call cut short by the deadline does not leave the circuit stuck"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+    dependency = ResilientDependency("test", circuit_breaker=breaker)
+    breaker.record_failure()
+    clock.now = 10
+
+    def slow_request():
+        time.sleep(0.05)
+        return remaining_time(default=5.0)
+
+    with pytest.raises(DeadlineExceededError), deadline_scope(0.02):
+        dependency.call(slow_request)
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert dependency.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_backoff_is_jittered_and_capped():
+    """Backoff delays stay between zero and the capped exponential ceiling"""
+    policy = RetryPolicy(max_attempts=5, base_delay=0.1, max_delay=0.3)
+
+    delays = [policy.backoff(attempt) for attempt in range(1, 6) for _ in range(20)]
+
+    assert all(0 <= delay <= 0.3 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_call_retries_until_success():
+    """Transient exceptions are retried"""
+    dependency = make_dependency(max_attempts=3)
+    flaky = FlakyCall(failures=2)
+
+    assert dependency.call(flaky) == "ok"
+    assert flaky.calls == 3
+    assert dependency.circuit_breaker.state == CircuitState.CLOSED
+
+
+def test_call_raises_last_error_when_attempts_exhausted():
+    """The last exception is raised after the final attempt"""
+    dependency = make_dependency(max_attempts=2)
+
+    with pytest.raises(ConnectionError):
+        dependency.call(FlakyCall(failures=5))
+    assert dependency.snapshot()["failures"] == 2
+
+
+def test_failure_results_are_retried():
+    """Results matching is_failure are retried and the last one is returned"""
+    dependency = make_dependency(max_attempts=3)
+    calls = []
+
+    def upload():
+        calls.append(1)
+        return {"success": False, "error": "quota exceeded"}
+
+    result = dependency.call(upload, is_failure=result_failed)
+
+    assert result == {"success": False, "error": "quota exceeded"}
+    assert len(calls) == 3
+
+
+def test_open_circuit_rejects_without_calling():
+    """Once open, calls fail fast without reaching the dependency"""
+    dependency = make_dependency(failure_threshold=2, max_attempts=2)
+    with pytest.raises(ConnectionError):
+        dependency.call(FlakyCall(failures=5))
+
+    flaky = FlakyCall(failures=0)
+    with pytest.raises(CircuitOpenError):
+        dependency.call(flaky)
+    assert flaky.calls == 0
+    assert dependency.snapshot()["state"] == "open"
+
+
+def test_concurrency_limit_rejects_excess_calls():
+    """Calls beyond max_concurrency are rejected instead of queued"""
+    dependency = make_dependency(max_concurrency=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_call():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    worker = threading.Thread(target=dependency.call, args=(slow_call,))
+    worker.start()
+    started.wait(5)
+    try:
+        with pytest.raises(ConcurrencyLimitError):
+            dependency.call(lambda: "second")
+    finally:
+        release.set()
+        worker.join()
+    assert dependency.snapshot()["rejections"] == 1
+
+
+def test_deadline_scope_only_shortens_deadline():
+    """Nested deadlines cannot extend the outer one"""
+    with deadline_scope(0.5):
+        with deadline_scope(10):
+            assert remaining_time() <= 0.5
+        assert remaining_time(default=0.1) <= 0.1
+    assert remaining_time() is None
+
+
+def test_retries_stop_at_deadline():
+    """Retries give up once the deadline cannot fit another backoff"""
+    dependency = ResilientDependency(
+        "test",
+        retry_policy=RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=1.0),
+        timeout=0.05,
+    )
+    flaky = FlakyCall(failures=10)
+
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceededError):
+        dependency.call(flaky)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_token_bucket_allows_bursts_then_paces():
+    clock = FakeClock()
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    bucket = TokenBucket(rate=10, capacity=3, clock=clock, sleep=sleep)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3:] == pytest.approx([0.1, 0.1])
+    assert bucket.snapshot()["waits"] == 2
+
+
+def test_token_bucket_reserves_tokens_for_waiting_callers():
+    """A caller waiting for a large batch makes later callers wait behind it"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock, sleep=lambda seconds: None)
+
+    assert bucket.acquire(5) == pytest.approx(0.3)
+    assert bucket.acquire() == pytest.approx(0.4)
+
+    clock.now = 10.0
+    assert bucket.acquire() == 0
+
+
+def test_token_bucket_respects_deadline():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=lambda seconds: None)
+    bucket.acquire()
+
+    with deadline_scope(0.5):
+        with pytest.raises(DeadlineExceededError):
+            bucket.acquire()
+    # The rejected caller took no tokens
+    clock.now = 1.0
+    assert bucket.acquire() == 0
+
+
+def test_call_llm_fails_fast_when_circuit_open():
+    """The agent returns None immediately while the LLM circuit is open"""
+    dependency = make_dependency(failure_threshold=1)
+    dependency.circuit_breaker.record_failure()
+    agent = TShirtFulfillmentAgent(redis_url="", model_name="fake", llm_dependency=dependency)
+
+    start = time.perf_counter()
+    response = agent._call_llm([{"role": "user", "content": "hello"}])
+
+    assert response is None
+    assert time.perf_counter() - start < 0.5
@@ -1,6 +1,5 @@
 from typing import Optional
 from unittest.mock import MagicMock
-from unittest.mock import patch
 
 import pytest
 from langchain.llms.base import LLM
@@ -9,6 +8,7 @@ from tshirt_fulfillment.src.core.domain.agent import AgentRole
 from tshirt_fulfillment.src.core.domain.agent import AgentSession
 from tshirt_fulfillment.src.core.domain.agent import AgentStatus
 from tshirt_fulfillment.src.core.use_cases.agent_service import AgentService
+from tshirt_fulfillment.src.core.use_cases.agent_service import _create_llm
 
 
 @pytest.fixture
@@ -45,13 +45,12 @@ def mock_llm():
 @pytest.fixture
 def agent_service(mock_llm, order_processor, mock_tool_registry, mock_design_generator):
     """Create an agent service for testing"""
-    with patch("tshirt_fulfillment.src.core.use_cases.agent_service.Ollama", return_value=mock_llm):
-        service = AgentService(
-            order_processor=order_processor,
-            design_generator=mock_design_generator,
-            tool_registry=mock_tool_registry,
-        )
-        return service
+    return AgentService(
+        order_processor=order_processor,
+        design_generator=mock_design_generator,
+        tool_registry=mock_tool_registry,
+        llm=mock_llm,
+    )
 
 
 def test_create_customer_session(agent_service, order_data):
@@ -134,3 +133,14 @@ def test_execute_session_without_executor(agent_service):
     assert not execute_result.success
     assert execute_result.session.status == AgentStatus.FAILED
     assert "error" in execute_result.session.context
+
+
+def test_llm_follows_provider_config():
+    """The default LLM uses the configured model and Ollama server"""
+    llm = _create_llm(
+        {"provider": "ollama", "model": "llama3", "temperature": 0.2}, "http://ollama:11434"
+    )
+
+    assert llm.model == "llama3"
+    assert llm.base_url == "http://ollama:11434"
+    assert llm.temperature == 0.2
@@ -0,0 +1,78 @@
+# Import-time budget tests for the agent service
+import os
+import subprocess
+import sys
+
+import pytest
+
+PACKAGE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+REPO_ROOT = os.path.dirname(PACKAGE_DIR)
+SRC_DIR = os.path.join(PACKAGE_DIR, "src")
+
+AGENT_SERVICE_MODULE = "tshirt_fulfillment.src.core.use_cases.agent_service"
+
+# Generous budget for importing the agent service module (microseconds)
+IMPORT_BUDGET_US = 500_000
+
+
+def run_python(code, *flags):
+    """Run a snippet in a fresh interpreter and return the completed process"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([REPO_ROOT, SRC_DIR, env.get("PYTHONPATH", "")])
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=REPO_ROOT,
+        timeout=60,
+    )
+
+
+def parse_importtime(stderr):
+    """Parse ``-X importtime`` output into {module: cumulative_us}"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        try:
+            timings[module.strip()] = int(cumulative)
+        except ValueError:
+            continue  # Header line
+    return timings
+
+
+@pytest.mark.slow
+def test_agent_service_import_does_not_load_langchain():
+    """Importing the agent service must not import LangChain"""
+    result = run_python(f"import {AGENT_SERVICE_MODULE}", "-X", "importtime")
+    assert result.returncode == 0, result.stderr
+
+    timings = parse_importtime(result.stderr)
+    assert AGENT_SERVICE_MODULE in timings
+    assert not [module for module in timings if module.startswith("langchain")]
+
+
+@pytest.mark.slow
+def test_agent_service_import_within_budget():
+    """Importing the agent service stays within the import-time budget"""
+    result = run_python(f"import {AGENT_SERVICE_MODULE}", "-X", "importtime")
+    assert result.returncode == 0, result.stderr
+
+    timings = parse_importtime(result.stderr)
+    assert timings[AGENT_SERVICE_MODULE] < IMPORT_BUDGET_US
+
+
+@pytest.mark.slow
+def test_agent_service_construction_does_not_load_llm():
+    """Constructing AgentService defers LLM creation until first use"""
+    code = (
+        "import sys\n"
+        "from unittest.mock import MagicMock\n"
+        f"from {AGENT_SERVICE_MODULE} import AgentService\n"
+        "AgentService(MagicMock(), MagicMock(), MagicMock())\n"
+        "assert not [m for m in sys.modules if m.startswith('langchain')]\n"
+    )
+    result = run_python(code)
+    assert result.returncode == 0, result.stderr
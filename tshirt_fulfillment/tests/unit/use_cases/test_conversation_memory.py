@@ -0,0 +1,98 @@
+# Unit tests for bounded conversation memory
+import pytest
+
+from tshirt_fulfillment.src.core.prompts import estimate_message_tokens
+from tshirt_fulfillment.src.core.repositories.conversation_repository import ConversationRepository
+from tshirt_fulfillment.src.core.use_cases.conversation_memory import ConversationMemory
+from tshirt_fulfillment.src.core.use_cases.conversation_memory import MemoryMode
+
+
+@pytest.fixture
+def repository():
+    """In-memory conversation repository"""
+    return ConversationRepository()
+
+
+def add_turns(memory, count):
+    for i in range(count):
+        memory.add_message("user", f"Question number {i} about my t-shirt order")
+        memory.add_message("assistant", f"Answer number {i} about the t-shirt order")
+
+
+def test_buffer_window_keeps_last_messages(repository):
+    """Buffer-window mode keeps only the last window_size messages"""
+    memory = ConversationMemory(repository, "s1", mode=MemoryMode.BUFFER_WINDOW, window_size=4)
+
+    add_turns(memory, 10)
+
+    messages = memory.load()
+    assert len(messages) == 4
+    assert messages[-1]["content"] == "Answer number 9 about the t-shirt order"
+
+
+def test_token_window_stays_within_budget(repository):
+    """Token-window mode keeps the most recent messages within max_tokens"""
+    memory = ConversationMemory(repository, "s1", mode=MemoryMode.TOKEN_WINDOW, max_tokens=60)
+
+    add_turns(memory, 20)
+
+    messages = memory.load()
+    assert sum(estimate_message_tokens(message) for message in messages) <= 60
+    assert messages[-1]["content"] == "Answer number 19 about the t-shirt order"
+
+
+def test_summary_mode_folds_old_messages(repository):
+    """Summary mode folds old messages into the summary and stays bounded"""
+    folded = []
+
+    def summarizer(summary, messages):
+        folded.extend(messages)
+        return f"{len(folded)} earlier messages about a t-shirt order"
+
+    memory = ConversationMemory(
+        repository, "s1", mode=MemoryMode.SUMMARY, max_tokens=80, summarizer=summarizer
+    )
+
+    add_turns(memory, 20)
+
+    messages = memory.load()
+    assert messages[0]["role"] == "system"
+    assert f"{len(folded)} earlier messages" in messages[0]["content"]
+    assert len(folded) + len(messages) - 1 == 40
+    assert sum(estimate_message_tokens(message) for message in messages[1:]) <= 80
+
+
+def test_failing_summarizer_falls_back_to_truncation(repository):
+    """A summarizer error does not lose the conversation"""
+
+    def broken(summary, messages):
+        raise RuntimeError("LLM unavailable")
+
+    memory = ConversationMemory(
+        repository, "s1", mode=MemoryMode.SUMMARY, max_tokens=60, summarizer=broken
+    )
+
+    add_turns(memory, 10)
+
+    summary = memory.load()[0]["content"]
+    assert "about" in summary
+    assert len(summary) <= 60 + len("Summary of earlier conversation: ")
+
+
+def test_history_is_shared_through_repository(repository):
+    """A memory created elsewhere for the same session sees the history"""
+    ConversationMemory(repository, "s1").add_message("user", "Make it blue")
+
+    resumed = ConversationMemory(repository, "s1")
+
+    assert resumed.render() == "user: Make it blue"
+
+
+def test_clear_forgets_conversation(repository):
+    """Clearing removes the stored conversation"""
+    memory = ConversationMemory(repository, "s1")
+    memory.add_message("user", "Hello")
+
+    memory.clear()
+
+    assert memory.load() == []
@@ -2,6 +2,7 @@
 import pytest
 
 from tshirt_fulfillment.src.core.domain.design import Design
+from tshirt_fulfillment.src.core.domain.design import DesignProvider
 from tshirt_fulfillment.src.core.use_cases.design_generator import DesignGenerator
 
 
@@ -151,3 +152,55 @@ def test_regenerate_design(design_generator, design_data):
         assert result.image_path != design.image_path  # Should be a new URL
     else:
         pytest.skip("regenerate_design method not implemented")
+
+
+class FakeDesignService:
+    """Design service rendering every prompt to a fixed path"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def generate_for_order(self, order_id, prompt, style=None):
+        self.calls.append((order_id, prompt, style))
+        return self.result
+
+
+class ListDesignRepository:
+    def __init__(self):
+        self.designs = []
+
+    def save(self, design):
+        self.designs.append(design)
+        return design
+
+
+def test_generate_design_with_design_service():
+    """The configured design service renders the design, which is saved"""
+    service = FakeDesignService(
+        {"success": True, "image_path": "designs/order-1/design.png", "provider": "dalle"}
+    )
+    repository = ListDesignRepository()
+    generator = DesignGenerator(design_repository=repository, design_service=service)
+
+    result = generator.generate_design("order-1", "A cat surfing", style="retro")
+
+    assert result.success
+    assert result.image_path == "designs/order-1/design.png"
+    assert service.calls == [("order-1", "A cat surfing", "retro")]
+    assert repository.designs == [result.design]
+    assert result.design.provider == DesignProvider.DALLE
+    assert result.design.parameters.style == "retro"
+    assert result.design.success
+
+
+def test_design_service_failure_is_not_saved():
+    service = FakeDesignService({"success": False, "error": "GPU timeout"})
+    repository = ListDesignRepository()
+    generator = DesignGenerator(design_repository=repository, design_service=service)
+
+    result = generator.generate_design("order-1", "A cat surfing")
+
+    assert not result.success
+    assert result.error == "GPU timeout"
+    assert repository.designs == []
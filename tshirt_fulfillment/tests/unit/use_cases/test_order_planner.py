@@ -0,0 +1,178 @@
+# Unit tests for the rule-based order planner and agent fast path
+from unittest.mock import patch
+
+import pytest
+
+from tshirt_fulfillment.src.core.domain.design import DesignPriority
+from tshirt_fulfillment.src.core.domain.tools import ToolCategory
+from tshirt_fulfillment.src.core.domain.tools import ToolDefinition
+from tshirt_fulfillment.src.core.domain.tools import ToolRegistry
+from tshirt_fulfillment.src.core.use_cases.order_planner import FastPathMetrics
+from tshirt_fulfillment.src.core.use_cases.order_planner import RuleBasedOrderPlanner
+from tshirt_fulfillment.src.core.use_cases.order_planner import design_priority
+from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent
+
+
+@pytest.fixture
+def complete_customer_info():
+    """Customer info for a well-formed order"""
+    return {"name": "Test Customer", "size": "L", "color": "Blue", "quantity": 2}
+
+
+@pytest.fixture
+def planner():
+    return RuleBasedOrderPlanner(metrics=FastPathMetrics())
+
+
+@pytest.fixture
+def customer_tool_registry():
+    """Registry with fake customer tools"""
+    registry = ToolRegistry()
+    handlers = {
+        "generate_design": lambda order_id, prompt, style=None, priority=None, customer_id=None: {
+            "success": True,
+            "image_path": f"designs/{order_id}/design.png",
+        },
+        "create_excel_file": lambda order_id, customer_info: {
+            "success": True,
+            "file_path": f"orders/{order_id}/order_details.xlsx",
+        },
+        "upload_to_drive": lambda order_id, file_path, name=None: {
+            "success": True,
+            "drive_url": f"https://drive.example.com/{file_path}",
+        },
+        "notify_customer": lambda order_id, message, language="vi": {
+            "success": True,
+            "notification_id": f"notif_{order_id}",
+        },
+    }
+    for name, handler in handlers.items():
+        registry.register(
+            ToolDefinition(
+                name=name,
+                description=name,
+                category=ToolCategory.DESIGN,
+                input_schema={},
+                output_schema={},
+                handler=handler,
+            )
+        )
+    return registry
+
+
+def test_complete_order_takes_fast_path(planner, complete_customer_info):
+    """Orders with size, color, quantity and a clear prompt skip the LLM"""
+    decision = planner.evaluate("A mountain landscape at sunset", complete_customer_info)
+
+    assert decision.fast_path
+    assert decision.prompt == "A mountain landscape at sunset"
+
+
+def test_design_prompt_in_customer_info_is_preferred(planner, complete_customer_info):
+    """An explicit design prompt wins over the free-form message"""
+    complete_customer_info["design_prompt"] = "A red dragon breathing fire"
+
+    decision = planner.evaluate("hi, please make me a shirt", complete_customer_info)
+
+    assert decision.prompt == "A red dragon breathing fire"
+
+
+@pytest.mark.parametrize(
+    "message,overrides",
+    [
+        ("A mountain landscape at sunset", None),
+        ("A mountain landscape at sunset", {"size": None}),
+        ("A mountain landscape at sunset", {"size": "gigantic"}),
+        ("A mountain landscape at sunset", {"quantity": 0}),
+        ("A mountain landscape at sunset", {"quantity": "a few"}),
+        ("cat", {}),
+        ("Can you draw something cool for me?", {}),
+    ],
+)
+def test_ambiguous_orders_go_to_llm(planner, complete_customer_info, message, overrides):
+    """Incomplete or unclear orders are left to the LLM planner"""
+    customer_info = None if overrides is None else {**complete_customer_info, **overrides}
+
+    decision = planner.evaluate(message, customer_info)
+
+    assert not decision.fast_path
+
+
+@pytest.mark.parametrize(
+    "overrides,expected",
+    [
+        ({}, DesignPriority.STANDARD),
+        ({"quantity": 50}, DesignPriority.BULK),
+        ({"reprint": True}, DesignPriority.RUSH),
+        ({"quantity": 50, "priority": "rush"}, DesignPriority.RUSH),
+        ({"priority": "whenever"}, DesignPriority.STANDARD),
+    ],
+)
+def test_design_priority(complete_customer_info, overrides, expected):
+    """Explicit priority wins, then reprints are rushed and large orders are bulk"""
+    assert design_priority({**complete_customer_info, **overrides}) == expected
+
+
+def test_plan_passes_scheduling_inputs_to_design_step(planner, complete_customer_info):
+    """The design step carries the priority and customer for the scheduler"""
+    complete_customer_info.update(quantity=100, email="shop@example.com")
+
+    plan = planner.plan("order1", "A mountain landscape at sunset", complete_customer_info)
+    design_step = next(step for step in plan.steps if step.id == "design")
+
+    assert design_step.input["priority"] == "bulk"
+    assert design_step.input["customer_id"] == "shop@example.com"
+
+
+def test_planner_records_hit_rate(planner, complete_customer_info):
+    """Every planning decision is counted in the metrics"""
+    planner.plan("order1", "A mountain landscape at sunset", complete_customer_info)
+    planner.plan("order2", "A mountain landscape at sunset", complete_customer_info)
+    planner.plan("order3", "What can you make?", complete_customer_info)
+    planner.plan("order4", "A mountain landscape at sunset", None)
+
+    assert planner.metrics.snapshot() == {"hits": 2, "misses": 2, "total": 4, "hit_rate": 0.5}
+
+
+def test_agent_fast_path_skips_llm(customer_tool_registry, complete_customer_info):
+    """The agent runs the fixed pipeline without calling the LLM"""
+    agent = TShirtFulfillmentAgent(
+        redis_url="redis://localhost:6379/0",
+        model_name="mistral",
+        tool_registry=customer_tool_registry,
+        planner=RuleBasedOrderPlanner(metrics=FastPathMetrics()),
+    )
+
+    with patch.object(agent, "_call_llm") as call_llm:
+        result = agent.process_order(
+            order_id="order123",
+            customer_message="A mountain landscape at sunset",
+            customer_info=complete_customer_info,
+        )
+
+    call_llm.assert_not_called()
+    assert result["success"]
+    assert result["fast_path"]
+    assert result["drive_link"] == "https://drive.example.com/designs/order123/design.png"
+    assert [call["tool_name"] for call in result["tool_history"]].count("upload_to_drive") == 2
+
+
+def test_agent_uses_llm_for_ambiguous_orders(customer_tool_registry, complete_customer_info):
+    """Ambiguous messages still go through the LLM planner"""
+    agent = TShirtFulfillmentAgent(
+        redis_url="redis://localhost:6379/0",
+        model_name="mistral",
+        tool_registry=customer_tool_registry,
+        planner=RuleBasedOrderPlanner(metrics=FastPathMetrics()),
+    )
+
+    with patch.object(agent, "_call_llm", return_value="A cat playing guitar") as call_llm:
+        result = agent.process_order(
+            order_id="order123",
+            customer_message="Can you draw something fun?",
+            customer_info=complete_customer_info,
+        )
+
+    call_llm.assert_called_once()
+    assert result["success"]
+    assert not result["fast_path"]
@@ -0,0 +1,185 @@
+# Unit tests for PlanExecutor use case
+import threading
+import time
+
+import pytest
+
+from tshirt_fulfillment.src.core.domain.agent import AgentSession
+from tshirt_fulfillment.src.core.domain.plan import ExecutionPlan
+from tshirt_fulfillment.src.core.domain.plan import StepOutput
+from tshirt_fulfillment.src.core.domain.tools import ToolCategory
+from tshirt_fulfillment.src.core.domain.tools import ToolDefinition
+from tshirt_fulfillment.src.core.domain.tools import ToolRegistry
+from tshirt_fulfillment.src.core.use_cases.plan_executor import PlanExecutor
+from tshirt_fulfillment.src.core.use_cases.plan_executor import build_order_fulfillment_plan
+
+
+def make_tool(name, handler, category=ToolCategory.DESIGN):
+    return ToolDefinition(
+        name=name,
+        description=name,
+        category=category,
+        input_schema={},
+        output_schema={},
+        handler=handler,
+    )
+
+
+@pytest.fixture
+def fulfillment_registry():
+    """Registry with slow fake customer tools"""
+    registry = ToolRegistry()
+
+    def generate_design(order_id, prompt, style=None):
+        time.sleep(0.2)
+        return {"success": True, "image_path": f"designs/{order_id}/design.png"}
+
+    def create_excel_file(order_id, customer_info):
+        time.sleep(0.2)
+        return {"success": True, "file_path": f"orders/{order_id}/order_details.xlsx"}
+
+    def upload_to_drive(order_id, file_path, name=None):
+        return {"success": True, "drive_url": f"https://drive.example.com/{file_path}"}
+
+    def notify_customer(order_id, message, language="vi"):
+        return {"success": True, "message": message}
+
+    registry.register(make_tool("generate_design", generate_design))
+    registry.register(make_tool("create_excel_file", create_excel_file, ToolCategory.EXCEL))
+    registry.register(make_tool("upload_to_drive", upload_to_drive, ToolCategory.DRIVE))
+    registry.register(make_tool("notify_customer", notify_customer, ToolCategory.NOTIFICATION))
+    return registry
+
+
+def test_order_plan_runs_independent_steps_concurrently(fulfillment_registry):
+    """Design and Excel creation overlap instead of running back to back"""
+    session = AgentSession.create_customer_session("order123")
+    plan = build_order_fulfillment_plan("order123", "mountain landscape", {"size": "L"})
+
+    start = time.perf_counter()
+    result = PlanExecutor(fulfillment_registry).execute(plan, session)
+    elapsed = time.perf_counter() - start
+
+    assert result.success
+    assert elapsed < 0.35
+    assert len(session.tool_history) == 5
+    assert all(call.success for call in session.tool_history)
+    assert session.tool_history[-1].tool_name == "notify_customer"
+
+
+def test_order_plan_resolves_step_outputs(fulfillment_registry):
+    """Later steps receive values produced by their dependencies"""
+    session = AgentSession.create_customer_session("order123")
+    plan = build_order_fulfillment_plan("order123", "mountain landscape", {"size": "L"})
+
+    result = PlanExecutor(fulfillment_registry).execute(plan, session)
+
+    upload_calls = [c for c in session.tool_history if c.tool_name == "upload_to_drive"]
+    assert sorted(c.input["file_path"] for c in upload_calls) == [
+        "designs/order123/design.png",
+        "orders/order123/order_details.xlsx",
+    ]
+    assert result.outputs["notify"]["message"].endswith(
+        "https://drive.example.com/designs/order123/design.png"
+    )
+
+
+def test_async_upload_plan_stops_once_the_files_exist(fulfillment_registry):
+    """Uploads and the notification are left to the background uploader"""
+    session = AgentSession.create_customer_session("order123")
+    plan = build_order_fulfillment_plan(
+        "order123", "mountain landscape", {"size": "L"}, async_upload=True
+    )
+
+    result = PlanExecutor(fulfillment_registry).execute(plan, session)
+
+    assert result.success
+    assert sorted(call.tool_name for call in session.tool_history) == [
+        "create_excel_file",
+        "generate_design",
+    ]
+
+
+def test_dependencies_run_after_their_prerequisites():
+    """A step never starts before the steps it depends on have finished"""
+    registry = ToolRegistry()
+    order = []
+    lock = threading.Lock()
+
+    def record(label):
+        with lock:
+            order.append(label)
+        return {"success": True, "value": label}
+
+    registry.register(make_tool("record", record))
+    plan = ExecutionPlan()
+    plan.add_step("b", "record", {"label": "b"}, depends_on=["a"])
+    plan.add_step("a", "record", {"label": "a"})
+    plan.add_step(
+        "c",
+        "record",
+        {"label": StepOutput("b", "value", template="after {value}")},
+        depends_on=["b"],
+    )
+
+    result = PlanExecutor(registry).execute(plan, AgentSession.create_admin_session("cmd"))
+
+    assert result.success
+    assert order == ["a", "b", "after b"]
+
+
+def test_failed_step_skips_dependents(fulfillment_registry):
+    """Steps depending on a failed step are skipped but independent ones still run"""
+    fulfillment_registry._tools["generate_design"].handler = lambda **kwargs: {
+        "success": False,
+        "error": "GPU timeout",
+    }
+    session = AgentSession.create_customer_session("order123")
+    plan = build_order_fulfillment_plan("order123", "mountain landscape", {"size": "L"})
+
+    result = PlanExecutor(fulfillment_registry).execute(plan, session)
+
+    assert not result.success
+    assert result.failed_steps == ["design"]
+    assert sorted(result.skipped_steps) == ["notify", "upload_design"]
+    assert "upload_excel" in result.outputs
+    assert [c.success for c in session.tool_history].count(False) == 1
+
+
+def test_raising_tool_is_recorded_as_failure():
+    """Exceptions from a tool handler become failed tool calls"""
+    registry = ToolRegistry()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.register(make_tool("broken", broken))
+    plan = ExecutionPlan()
+    plan.add_step("broken", "broken")
+    session = AgentSession.create_admin_session("cmd")
+
+    result = PlanExecutor(registry).execute(plan, session)
+
+    assert not result.success
+    assert session.tool_history[0].output == {"success": False, "error": "boom"}
+
+
+def test_invalid_plans_are_rejected(fulfillment_registry):
+    """Cycles, unknown dependencies and unknown tools fail before running anything"""
+    session = AgentSession.create_admin_session("cmd")
+    executor = PlanExecutor(fulfillment_registry)
+
+    cyclic = ExecutionPlan()
+    cyclic.add_step("a", "generate_design", depends_on=["b"])
+    cyclic.add_step("b", "generate_design", depends_on=["a"])
+    assert "cycle" in executor.execute(cyclic, session).error
+
+    unknown_dep = ExecutionPlan()
+    unknown_dep.add_step("a", "generate_design", depends_on=["missing"])
+    assert "unknown steps" in executor.execute(unknown_dep, session).error
+
+    unknown_tool = ExecutionPlan()
+    unknown_tool.add_step("a", "does_not_exist")
+    assert "Unknown tool" in executor.execute(unknown_tool, session).error
+
+    assert session.tool_history == []
@@ -0,0 +1,145 @@
+# Unit tests for speculative design generation
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tshirt_fulfillment.src.core.prompts import prompt_similarity
+from tshirt_fulfillment.src.core.use_cases.order_processor import TShirtFulfillmentAgent
+from tshirt_fulfillment.src.core.use_cases.order_processor import speculation_metrics
+
+CUSTOMER_MESSAGE = "A cute cartoon cat playing guitar on a blue shirt"
+
+
+class SlowDesigns:
+    """Fake design generation that records the prompts it was given"""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def __call__(self, description):
+        with self.lock:
+            self.prompts.append(description)
+        time.sleep(self.delay)
+        return {"success": True, "design": {"description": description}}
+
+
+@pytest.fixture
+def agent():
+    agent = TShirtFulfillmentAgent(redis_url="", model_name="fake", speculative_design=True)
+    agent.designs = SlowDesigns()
+    agent._generate_design = agent.designs
+    speculation_metrics.reset()
+    return agent
+
+
+def slow_llm(response, delay=0.1):
+    def call_llm(messages):
+        time.sleep(delay)
+        return response
+
+    return call_llm
+
+
+def test_prompt_similarity():
+    """Similarity ignores case, punctuation and word order"""
+    assert prompt_similarity("A cat, playing guitar!", "playing guitar a CAT") == 1.0
+    assert prompt_similarity("a cat", "a dog") == pytest.approx(1 / 3)
+    assert prompt_similarity("", "") == 1.0
+
+
+def test_speculative_design_kept_when_prompt_unchanged(agent):
+    """A near-identical LLM prompt keeps the speculative design"""
+    agent._call_llm = slow_llm("A cute cartoon cat playing guitar on a blue shirt.")
+
+    start = time.perf_counter()
+    result = agent.process_order("order-1", CUSTOMER_MESSAGE, language="en")
+    elapsed = time.perf_counter() - start
+
+    assert result["success"]
+    assert result["speculative_design"] is True
+    assert result["design"]["description"] == CUSTOMER_MESSAGE
+    assert agent.designs.prompts == [CUSTOMER_MESSAGE]
+    # Design generation overlapped the LLM call instead of following it
+    assert elapsed < 0.18
+    assert speculation_metrics.snapshot()["hits"] == 1
+
+
+def test_speculative_design_discarded_when_prompt_changes(agent):
+    """A materially different LLM prompt regenerates the design"""
+    refined = "Minimalist mountain landscape at sunset in pastel colors"
+    agent._call_llm = slow_llm(refined)
+
+    result = agent.process_order("order-1", CUSTOMER_MESSAGE, language="en")
+
+    assert result["success"]
+    assert result["speculative_design"] is False
+    assert result["design"]["description"] == refined
+    metrics = speculation_metrics.snapshot()
+    assert (metrics["hits"], metrics["misses"], metrics["wasted"]) == (0, 1, 1)
+
+
+def test_abandoned_speculation_that_has_not_started_is_skipped(agent):
+    """A speculation still queued when the LLM fails never generates a design"""
+    agent._call_llm = lambda messages: None
+    agent._speculation_executor = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    agent._speculation_executor.submit(release.wait, 5)
+
+    result = agent.process_order("order-1", CUSTOMER_MESSAGE, language="en")
+    release.set()
+    agent._speculation_executor.shutdown(wait=True)
+
+    assert not result["success"]
+    assert agent.designs.prompts == []
+    metrics = speculation_metrics.snapshot()
+    assert (metrics["misses"], metrics["wasted"]) == (1, 0)
+
+
+def test_failed_speculation_falls_back_to_llm_prompt(agent):
+    """A failed speculative generation is replaced by a regular one"""
+    agent._call_llm = slow_llm(CUSTOMER_MESSAGE, delay=0)
+    calls = []
+
+    def flaky_design(description):
+        calls.append(description)
+        if len(calls) == 1:
+            return {"success": False, "error": "GPU busy"}
+        return {"success": True, "design": {"description": description}}
+
+    agent._generate_design = flaky_design
+
+    result = agent.process_order("order-1", CUSTOMER_MESSAGE, language="en")
+
+    assert result["success"]
+    assert result["speculative_design"] is False
+    assert len(calls) == 2
+
+
+def test_speculation_disabled_by_default():
+    """Without the option the design waits for the LLM response"""
+    agent = TShirtFulfillmentAgent(redis_url="", model_name="fake")
+    agent._call_llm = slow_llm(CUSTOMER_MESSAGE, delay=0)
+
+    result = agent.process_order("order-1", CUSTOMER_MESSAGE, language="en")
+
+    assert result["speculative_design"] is False
+    assert agent._speculation_executor is None
+
+
+def test_close_stops_speculation_threads(agent):
+    """Closing the agent shuts down its speculative design threads"""
+    agent._call_llm = slow_llm(CUSTOMER_MESSAGE, delay=0)
+    agent.process_order("order-1", CUSTOMER_MESSAGE, language="en")
+    executor = agent._speculation_executor
+    assert executor is not None
+
+    agent.close()
+
+    assert agent._speculation_executor is None
+    assert not any(t.name.startswith("speculative-design") for t in threading.enumerate())
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
@@ -0,0 +1,529 @@
+# Fake Google Drive server for offline upload testing
+#
+# Serves the OAuth token endpoint, folder and file metadata, permissions,
+# batch requests and Drive's resumable upload protocol, with latency and
+# failure injection, so GoogleDriveManager can upload without Google
+# credentials.
+#
+# Usage: python -m tshirt_fulfillment.utils.fake_drive --port 8090 --error-rate 0.1
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Optional
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+FAILURE_MODES = ("status", "disconnect")
+# Drive requires every chunk but the last to be a multiple of 256 KiB
+CHUNK_ALIGNMENT = 256 * 1024
+# Most calls Drive accepts in one batch request
+BATCH_LIMIT = 100
+
+
+@dataclass
+class FakeDriveConfig:
+    """Behaviour of the fake Drive server.
+
+    Upload chunks fail at random with ``error_rate`` and always at the
+    (zero-based, server-wide) chunk numbers in ``fail_chunks``. A failing
+    chunk either gets ``error_status`` or has its connection dropped,
+    depending on ``failure_mode``; with ``partial_failures`` the first
+    half of its bytes is persisted anyway, as when a connection breaks
+    mid-chunk. The first ``fail_permissions`` permission calls get
+    ``error_status``.
+    """
+
+    latency: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    failure_mode: str = "status"
+    fail_chunks: tuple[int, ...] = ()
+    partial_failures: bool = True
+    fail_permissions: int = 0
+    access_token_ttl: int = 3600
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.failure_mode not in FAILURE_MODES:
+            raise ValueError(f"Unknown failure mode: {self.failure_mode}")
+
+
+class FakeDriveServer:
+    """Fake Google Drive server running on a background thread.
+
+    Point a ``DriveClient`` at it with ``api_url=server.url`` and
+    ``token_url=server.token_url``::
+
+        with FakeDriveServer(FakeDriveConfig(fail_chunks=(1,))) as server:
+            client = DriveClient("id", "secret", "refresh", server.url, server.token_url)
+    """
+
+    def __init__(
+        self, config: Optional[FakeDriveConfig] = None, host: str = "127.0.0.1", port: int = 0
+    ):
+        """Initialize the server.
+
+        Args:
+            config: Server behaviour, defaults to ``FakeDriveConfig()``
+            host: Interface to bind
+            port: Port to bind, 0 for any free port
+        """
+        self.config = config or FakeDriveConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.files: dict[str, dict[str, Any]] = {}
+        self.uploads: dict[str, dict[str, Any]] = {}
+        self.tokens: set[str] = set()
+        self.requests = 0
+        self.token_requests = 0
+        self.chunks = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.batches = 0
+        self.batched_calls = 0
+        self.permission_calls = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, in place of https://www.googleapis.com."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def token_url(self) -> str:
+        """URL of the OAuth token endpoint."""
+        return f"{self.url}/token"
+
+    def start(self) -> "FakeDriveServer":
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-drive", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and release its port."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def serve_forever(self) -> None:
+        """Serve on the current thread until interrupted."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def __enter__(self) -> "FakeDriveServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def stats(self) -> dict[str, int]:
+        """Get request counters as a plain dict."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "token_requests": self.token_requests,
+                "chunks": self.chunks,
+                "errors": self.errors,
+                "bytes_received": self.bytes_received,
+                "batches": self.batches,
+                "batched_calls": self.batched_calls,
+            }
+
+    def file_content(self, file_id: str) -> bytes:
+        """Get the content of an uploaded file."""
+        with self._lock:
+            return bytes(self.files[file_id]["content"])
+
+    def expire_uploads(self) -> None:
+        """Forget every unfinished upload session, as Drive does after a week."""
+        with self._lock:
+            self.uploads = {
+                upload_id: upload
+                for upload_id, upload in self.uploads.items()
+                if upload["file_id"] is not None
+            }
+
+    def revoke_tokens(self) -> None:
+        """Invalidate every access token handed out so far."""
+        with self._lock:
+            self.tokens.clear()
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for counter, delta in deltas.items():
+                setattr(self, counter, getattr(self, counter) + delta)
+
+    def _create_file(self, metadata: dict[str, Any], content: bytes = b"") -> dict[str, Any]:
+        """Store a file (lock held) and get its metadata."""
+        for parent in metadata.get("parents") or ():
+            if parent not in self.files:
+                return {}
+        file_id = uuid.uuid4().hex
+        self.files[file_id] = {
+            "id": file_id,
+            "name": metadata.get("name", "Untitled"),
+            "mimeType": metadata.get("mimeType", "application/octet-stream"),
+            "parents": list(metadata.get("parents") or []),
+            "webViewLink": f"https://drive.google.com/file/d/{file_id}/view",
+            "permissions": [],
+            "content": content,
+        }
+        return _metadata(self.files[file_id])
+
+    def _api(self, method: str, path: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        """Serve a metadata or permission call; get its status and JSON body."""
+        match = re.fullmatch(r"/drive/v3/files(?:/([^/]+))?(/permissions)?", path)
+        if match is None:
+            return 404, _error(404, "Not found")
+        file_id, permissions = match.groups()
+        with self._lock:
+            if method == "POST" and file_id is None:
+                metadata = self._create_file(_json(body))
+                if not metadata:
+                    return 404, _error(404, "Parent folder not found")
+                return 200, metadata
+            file = self.files.get(file_id) if file_id else None
+            if file is None:
+                return 404, _error(404, "File not found")
+            if method == "GET" and not permissions:
+                return 200, _metadata(file)
+            if method == "POST" and permissions:
+                self.permission_calls += 1
+                if self.permission_calls <= self.config.fail_permissions:
+                    status = self.config.error_status
+                    return status, _error(status, "Permission service unavailable")
+                permission = {"id": uuid.uuid4().hex, **_json(body)}
+                file["permissions"].append(permission)
+                return 200, permission
+        return 405, _error(405, "Method not allowed")
+
+    def _should_fail(self, chunk: int) -> bool:
+        """Decide whether an upload chunk fails (lock held)."""
+        if chunk in self.config.fail_chunks:
+            return True
+        return self.config.error_rate > 0 and self._random.random() < self.config.error_rate
+
+    def _make_handler(self) -> type:
+        server = self
+
+        class FakeDriveHandler(BaseHTTPRequestHandler):
+            """Request handler bound to one FakeDriveServer."""
+
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._read_body()
+                if self._begin():
+                    self._send_json(*server._api("GET", self._path, b""))
+
+            def do_POST(self):
+                body = self._read_body()
+                if self._path == "/token":
+                    self._token(body)
+                    return
+                if not self._begin():
+                    return
+                if self._path == "/upload/drive/v3/files":
+                    self._start_upload(body)
+                elif self._path == "/batch/drive/v3":
+                    self._batch(body)
+                else:
+                    self._send_json(*server._api("POST", self._path, body))
+
+            def do_PUT(self):
+                body = self._read_body()
+                if not self._begin():
+                    return
+                upload_id = self._query.get("upload_id", [""])[0]
+                if self._path != "/upload/drive/v3/files" or not upload_id:
+                    self._send_json(404, _error(404, "Not found"))
+                    return
+                self._upload_chunk(upload_id, body)
+
+            def _begin(self) -> bool:
+                """Count the request, apply latency and check its access token."""
+                server._count(requests=1)
+                if server.config.latency:
+                    time.sleep(server.config.latency)
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                with server._lock:
+                    authorized = token in server.tokens
+                if not authorized:
+                    self._send_json(401, _error(401, "Invalid Credentials"))
+                return authorized
+
+            def _token(self, body: bytes) -> None:
+                server._count(requests=1, token_requests=1)
+                form = parse_qs(body.decode())
+                if form.get("grant_type") != ["refresh_token"] or not form.get("refresh_token"):
+                    self._send_json(400, {"error": "invalid_grant"})
+                    return
+                token = uuid.uuid4().hex
+                with server._lock:
+                    server.tokens.add(token)
+                self._send_json(
+                    200,
+                    {
+                        "access_token": token,
+                        "expires_in": server.config.access_token_ttl,
+                        "token_type": "Bearer",
+                    },
+                )
+
+            def _batch(self, body: bytes) -> None:
+                """Serve a multipart/mixed batch of metadata and permission calls."""
+                match = re.search(r"boundary=\"?([^\";]+)", self.headers.get("Content-Type", ""))
+                if match is None:
+                    self._send_json(400, _error(400, "Missing multipart boundary"))
+                    return
+                parts = _split_multipart(body, match.group(1).encode())
+                if len(parts) > BATCH_LIMIT:
+                    self._send_json(400, _error(400, f"Too many calls in batch: {len(parts)}"))
+                    return
+                server._count(batches=1, batched_calls=len(parts))
+
+                boundary = f"batch_{uuid.uuid4().hex}"
+                out = bytearray()
+                for headers, request in parts:
+                    content_id = headers.get("content-id", "").strip("<>")
+                    request_line, _, request_body = _split_message(request)
+                    method, target = request_line.split(" ")[:2]
+                    status, payload = server._api(method, urlsplit(target).path, request_body)
+                    data = json.dumps(payload).encode()
+                    out += (
+                        (
+                            f"--{boundary}\r\nContent-Type: application/http\r\n"
+                            f"Content-ID: <response-{content_id}>\r\n\r\n"
+                            f"HTTP/1.1 {status} {_reason(status)}\r\n"
+                            f"Content-Type: application/json; charset=UTF-8\r\n"
+                            f"Content-Length: {len(data)}\r\n\r\n"
+                        ).encode()
+                        + data
+                        + b"\r\n"
+                    )
+                out += f"--{boundary}--\r\n".encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def _start_upload(self, body: bytes) -> None:
+                if self._query.get("uploadType") != ["resumable"]:
+                    self._send_json(400, _error(400, "Only resumable uploads are supported"))
+                    return
+                metadata = _json(body)
+                with server._lock:
+                    missing = [p for p in metadata.get("parents") or () if p not in server.files]
+                    upload_id = uuid.uuid4().hex
+                    if not missing:
+                        server.uploads[upload_id] = {
+                            "metadata": metadata,
+                            "data": bytearray(),
+                            "file_id": None,
+                        }
+                if missing:
+                    self._send_json(404, _error(404, "Parent folder not found"))
+                    return
+                self.send_response(200)
+                self.send_header(
+                    "Location",
+                    f"{server.url}/upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}",
+                )
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _upload_chunk(self, upload_id: str, body: bytes) -> None:
+                content_range = self.headers.get("Content-Range", "")
+                match = re.fullmatch(r"bytes (?:(\d+)-(\d+)|\*)/(\d+)", content_range)
+                if match is None:
+                    self._send_json(400, _error(400, f"Invalid Content-Range: {content_range}"))
+                    return
+                total = int(match.group(3))
+
+                with server._lock:
+                    upload = server.uploads.get(upload_id)
+                    if upload is None:
+                        status, payload = 404, _error(404, "Upload session not found")
+                    elif upload["file_id"] is not None:
+                        status, payload = 200, _metadata(server.files[upload["file_id"]])
+                    elif match.group(1) is None:
+                        # Status query, or the final request of an empty file
+                        status, payload = self._finish(upload, total)
+                    else:
+                        status, payload = self._store_chunk(upload, match, total, body)
+
+                if status == 0:
+                    # Injected dropped connection
+                    self.close_connection = True
+                elif status == 308:
+                    self._send_incomplete(len(payload["data"]))
+                else:
+                    self._send_json(status, payload)
+
+            def _store_chunk(
+                self, upload: dict[str, Any], match: re.Match, total: int, body: bytes
+            ) -> tuple[int, dict[str, Any]]:
+                """Add a chunk to an upload (lock held); get the response."""
+                start, end = int(match.group(1)), int(match.group(2))
+                data = upload["data"]
+                if start > len(data) or end - start + 1 != len(body) or end >= total:
+                    return 400, _error(400, "Chunk does not continue the upload")
+                if end + 1 < total and len(body) % CHUNK_ALIGNMENT:
+                    return 400, _error(400, "Chunk size is not a multiple of 256 KiB")
+
+                chunk = server.chunks
+                server.chunks += 1
+                if server._should_fail(chunk):
+                    server.errors += 1
+                    if server.config.partial_failures:
+                        del data[start:]
+                        data.extend(body[: len(body) // 2])
+                        server.bytes_received += len(body) // 2
+                    if server.config.failure_mode == "disconnect":
+                        return 0, {}
+                    return server.config.error_status, _error(
+                        server.config.error_status, "Backend Error"
+                    )
+
+                del data[start:]
+                data.extend(body)
+                server.bytes_received += len(body)
+                return self._finish(upload, total)
+
+            def _finish(self, upload: dict[str, Any], total: int) -> tuple[int, dict[str, Any]]:
+                """Complete the upload if every byte arrived (lock held)."""
+                if len(upload["data"]) < total:
+                    return 308, {"data": upload["data"]}
+                metadata = server._create_file(upload["metadata"], bytes(upload["data"]))
+                upload["file_id"] = metadata["id"]
+                upload["data"] = bytearray()
+                return 200, metadata
+
+            def _send_incomplete(self, received: int) -> None:
+                self.send_response(308, "Resume Incomplete")
+                if received:
+                    self.send_header("Range", f"bytes=0-{received - 1}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _read_body(self) -> bytes:
+                parts = urlsplit(self.path)
+                self._path = parts.path
+                self._query = parse_qs(parts.query)
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return FakeDriveHandler
+
+
+def _metadata(file: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in file.items() if key not in ("content", "permissions")}
+
+
+def _split_multipart(body: bytes, boundary: bytes) -> list[tuple[dict[str, str], bytes]]:
+    """Split a multipart body into (lower-cased part headers, part body) pairs."""
+    parts = []
+    for chunk in body.split(b"--" + boundary)[1:]:
+        if chunk.startswith(b"--"):
+            break
+        header_block, _, content = chunk.strip(b"\r\n").partition(b"\r\n\r\n")
+        headers = {}
+        for line in header_block.decode().split("\r\n"):
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        parts.append((headers, content))
+    return parts
+
+
+def _split_message(message: bytes) -> tuple[str, dict[str, str], bytes]:
+    """Split an embedded HTTP message into its start line, headers and body."""
+    head, _, body = message.partition(b"\r\n\r\n")
+    start_line, *header_lines = head.decode().split("\r\n")
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return start_line, headers, body
+
+
+def _reason(status: int) -> str:
+    return {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}.get(
+        status, "Error"
+    )
+
+
+def _json(body: bytes) -> dict[str, Any]:
+    try:
+        return json.loads(body or b"{}")
+    except json.JSONDecodeError:
+        return {}
+
+
+def _error(code: int, message: str) -> dict[str, Any]:
+    """Drive's error response body."""
+    return {"error": {"code": code, "message": message}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Google Drive server for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Failing upload chunks")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--failure-mode", choices=FAILURE_MODES, default="status")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = FakeDriveConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        failure_mode=args.failure_mode,
+        seed=args.seed,
+    )
+    server = FakeDriveServer(config, host=args.host, port=args.port)
+    print(f"Fake Drive server listening on {server.url} (token URL {server.token_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# Fake Ollama server for offline load testing
+#
+# Serves /api/generate (optionally streaming), /api/generate/batch and
+# /api/tags with configurable latency, error injection and canned
+# responses, so TShirtFulfillmentAgent can be driven without a model.
+#
+# Usage: python -m tshirt_fulfillment.utils.fake_ollama --port 11434 --latency 0.5
+
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+@dataclass
+class FakeOllamaConfig:
+    """Behaviour of the fake Ollama server.
+
+    Latency is sampled once per forward pass from ``latency_distribution``
+    with mean ``latency`` and spread ``latency_jitter`` (seconds), plus
+    ``per_item_latency`` for every request in a batch. At most
+    ``parallel_slots`` forward passes run at once, like a GPU-backed
+    server. Streaming responses additionally wait ``token_latency`` per
+    token.
+    """
+
+    latency: float = 0.05
+    latency_jitter: float = 0.0
+    latency_distribution: str = "fixed"
+    per_item_latency: float = 0.0
+    token_latency: float = 0.0
+    parallel_slots: int = 1
+    error_rate: float = 0.0
+    error_status: int = 500
+    canned_responses: dict[str, str] = field(default_factory=dict)
+    default_response: str = "Design idea for: {prompt}"
+    models: list[str] = field(default_factory=lambda: ["mistral"])
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency_distribution}")
+        if self.parallel_slots < 1:
+            raise ValueError("parallel_slots must be at least 1")
+
+
+class FakeOllamaServer:
+    """Fake Ollama server running on a background thread.
+
+    Can be used as a context manager::
+
+        with FakeOllamaServer(FakeOllamaConfig(latency=0.2)) as server:
+            agent.ollama_base_url = server.url
+    """
+
+    def __init__(
+        self, config: Optional[FakeOllamaConfig] = None, host: str = "127.0.0.1", port: int = 0
+    ):
+        """Initialize the server.
+
+        Args:
+            config: Server behaviour, defaults to ``FakeOllamaConfig()``
+            host: Interface to bind
+            port: Port to bind, 0 for any free port
+        """
+        self.config = config or FakeOllamaConfig()
+        self._random = random.Random(self.config.seed)
+        self._random_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.config.parallel_slots)
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-ollama", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and release its port."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def serve_forever(self) -> None:
+        """Serve on the current thread until interrupted."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def stats(self) -> dict[str, int]:
+        """Get request counters as a plain dict."""
+        with self._stats_lock:
+            return {"requests": self.requests, "errors": self.errors, "batches": self.batches}
+
+    def respond(self, prompt: str) -> str:
+        """Get the response for a prompt.
+
+        The first canned response whose key appears in the prompt (case
+        insensitive) wins; otherwise ``default_response`` is formatted with
+        the prompt.
+        """
+        lowered = prompt.lower()
+        for keyword, response in self.config.canned_responses.items():
+            if keyword.lower() in lowered:
+                return response
+        return self.config.default_response.format(prompt=prompt)
+
+    def sample_latency(self) -> float:
+        """Sample the duration of one forward pass, in seconds."""
+        config = self.config
+        with self._random_lock:
+            if config.latency_distribution == "uniform":
+                value = self._random.uniform(
+                    config.latency - config.latency_jitter, config.latency + config.latency_jitter
+                )
+            elif config.latency_distribution == "normal":
+                value = self._random.gauss(config.latency, config.latency_jitter)
+            elif config.latency_distribution == "lognormal":
+                value = _lognormal(self._random, config.latency, config.latency_jitter)
+            else:
+                value = config.latency
+        return max(0.0, value)
+
+    def _should_fail(self) -> bool:
+        if self.config.error_rate <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.config.error_rate
+
+    def _forward_pass(self, batch_size: int) -> None:
+        """Hold a model slot for the duration of one forward pass."""
+        duration = self.sample_latency() + self.config.per_item_latency * batch_size
+        with self._slots:
+            time.sleep(duration)
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for counter, delta in deltas.items():
+                setattr(self, counter, getattr(self, counter) + delta)
+
+    def _make_handler(self) -> type:
+        server = self
+
+        class FakeOllamaHandler(BaseHTTPRequestHandler):
+            """Request handler bound to one FakeOllamaServer."""
+
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path != "/api/tags":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                models = [{"name": name, "model": name} for name in server.config.models]
+                self._send_json(200, {"models": models})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": "invalid JSON"})
+                    return
+
+                if self.path == "/api/generate":
+                    server._count(requests=1)
+                    self._generate(body)
+                elif self.path == "/api/generate/batch":
+                    server._count(requests=len(body.get("requests", [])), batches=1)
+                    self._generate_batch(body)
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def _generate(self, body: dict[str, Any]) -> None:
+                if server._should_fail():
+                    server._count(errors=1)
+                    self._send_json(server.config.error_status, {"error": "injected failure"})
+                    return
+
+                prompt = _prompt_text(body)
+                server._forward_pass(1)
+                text = server.respond(prompt)
+                model = body.get("model", server.config.models[0])
+                # Ollama streams by default
+                if body.get("stream", True):
+                    self._stream(model, text)
+                else:
+                    self._send_json(200, {"model": model, "response": text, "done": True})
+
+            def _generate_batch(self, body: dict[str, Any]) -> None:
+                if server._should_fail():
+                    server._count(errors=1)
+                    self._send_json(server.config.error_status, {"error": "injected failure"})
+                    return
+
+                prompts = [_prompt_text(request) for request in body.get("requests", [])]
+                server._forward_pass(len(prompts))
+                self._send_json(200, {"responses": [server.respond(p) for p in prompts]})
+
+            def _stream(self, model: str, text: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                tokens = text.split(" ")
+                for index, token in enumerate(tokens):
+                    if server.config.token_latency:
+                        time.sleep(server.config.token_latency)
+                    piece = token if index == 0 else f" {token}"
+                    self._write_chunk({"model": model, "response": piece, "done": False})
+                self._write_chunk({"model": model, "response": "", "done": True})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload).encode() + b"\n"
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return FakeOllamaHandler
+
+
+def _prompt_text(body: dict[str, Any]) -> str:
+    """Get the prompt of a request, accepting ``prompt`` or ``messages``."""
+    if body.get("prompt"):
+        return str(body["prompt"])
+    messages = body.get("messages") or []
+    return str(messages[-1].get("content", "")) if messages else ""
+
+
+def _lognormal(rng: random.Random, mean: float, stddev: float) -> float:
+    """Sample a log-normal value with the given mean and standard deviation."""
+    if mean <= 0:
+        return 0.0
+    if stddev <= 0:
+        return mean
+    sigma_squared = math.log(1 + (stddev / mean) ** 2)
+    mu = math.log(mean) - sigma_squared / 2
+    return rng.lognormvariate(mu, math.sqrt(sigma_squared))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server for offline load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean seconds per forward pass")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency spread in seconds")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--per-item-latency", type=float, default=0.0)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--slots", type=int, default=1, help="Parallel forward passes")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--canned", help="JSON file mapping prompt keywords to responses")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    canned_responses = {}
+    if args.canned:
+        with open(args.canned, encoding="utf-8") as f:
+            canned_responses = json.load(f)
+
+    config = FakeOllamaConfig(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        latency_distribution=args.distribution,
+        per_item_latency=args.per_item_latency,
+        token_latency=args.token_latency,
+        parallel_slots=args.slots,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        canned_responses=canned_responses,
+        seed=args.seed,
+    )
+    server = FakeOllamaServer(config, host=args.host, port=args.port)
+    print(f"Fake Ollama server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()